@@ -16,6 +16,22 @@ class Settings(BaseSettings):
     max_batch_size: int = 5000
     max_queue_size: int = 10000
     max_correlation_history: int = 10000
+    correlation_window_mode: str = "tumbling"  # tumbling, session (per-trace event-time windows)
+    correlation_quiet_seconds: float = 10.0  # session: emit a trace after this long without new records
+    correlation_allowed_lateness_seconds: float = 60.0  # session: late records merged into the emitted trace
+    correlation_max_clock_skew_seconds: float = 5.0  # session: event times ahead of arrival are capped to this
+
+    # Consumer worker pools (per queue)
+    log_consumer_workers: int = 2
+    trace_consumer_workers: int = 2
+    export_consumer_workers: int = 4  # Per signal (logs, traces)
+    export_queue_size: int = 10000
+
+    # Off-loop log normalization
+    enable_normalizer_pool: bool = False
+    normalizer_pool_workers: int = 4
+    normalizer_pool_chunk_size: int = 500  # Records per worker task
+    normalizer_pool_executor: str = "auto"  # auto, process, thread
 
     # Advanced correlation features
     enable_trace_synthesis: bool = True
@@ -36,6 +52,27 @@ class Settings(BaseSettings):
     circuit_breaker_failure_threshold: int = 5
     circuit_breaker_recovery_timeout: int = 60
 
+    # Per-backend log export queues (Loki and Datadog isolated from each other)
+    backend_queue_size: int = 1000  # Batches per backend
+    backend_queue_workers: int = 2  # Export workers per backend
+    backend_queue_drain_seconds: float = 5.0  # Shutdown drain timeout per backend
+    loki_overflow_policy: str = "block"  # block, drop_oldest, spill
+    datadog_overflow_policy: str = "drop_oldest"  # block, drop_oldest, spill
+    export_spill_dir: str = "/tmp/correlation-engine/spill"  # Used by the spill policy
+
+    # Loki push batching (entries aggregated per label set)
+    loki_batch_enabled: bool = True
+    loki_batch_linger_seconds: float = 1.0  # Max time an entry waits in the buffer
+    loki_batch_max_entries: int = 5000  # Flush early when this many entries are buffered
+    loki_push_encoding: str = "protobuf"  # protobuf (snappy), json
+    loki_push_gzip: bool = False  # gzip JSON push bodies (protobuf is already snappy-compressed)
+
+    # Tempo span batching (correlation, bridge and pass-through spans)
+    tempo_batch_enabled: bool = True
+    tempo_batch_max_spans: int = 500  # Flush when this many spans are buffered
+    tempo_batch_max_age_seconds: float = 1.0  # ...or when the oldest is this old
+    tempo_batch_gzip: bool = True
+
     # Authentication
     enable_basic_auth: bool = False
     basic_auth_user: Optional[str] = None
@@ -83,17 +120,42 @@ class Settings(BaseSettings):
     queue_retry_delay: float = 0.1
     enable_queue_metrics: bool = True
 
+    # Durable ingest spool (on-disk write-ahead log in front of the consumers)
+    ingest_spool_enabled: bool = False
+    ingest_spool_dir: str = "/tmp/correlation-engine/ingest-spool"
+    ingest_spool_segment_mb: int = 64  # Preallocated segment file size
+    ingest_spool_max_mb: int = 4096  # Unconsumed backlog limit per signal
+    ingest_spool_fsync: str = "interval"  # always, interval, never
+    ingest_spool_fsync_interval: float = 1.0  # Seconds between flushes (interval policy)
+
     # Request Size Limits (security)
     max_request_body_size: int = 10 * 1024 * 1024  # 10MB
     max_protobuf_size: int = 10 * 1024 * 1024  # 10MB
     max_json_size: int = 10 * 1024 * 1024  # 10MB
+    otlp_stream_part_bytes: int = 256 * 1024  # Protobuf bodies are decoded and queued in parts of about this size
+
+    # OTLP metrics aggregation
+    otlp_metrics_max_circuits: int = 5000  # Distinct circuit_id label values; later ones aggregate as "other"
+    otlp_metrics_max_streams: int = 100000  # Cumulative streams tracked for delta conversion (LRU)
 
     # State Management & Horizontal Scaling
     use_redis_state: bool = False  # Feature flag for Redis state management
     redis_url: str = "redis://localhost:6379"  # Redis connection URL
     redis_max_connections: int = 50  # Max connections in pool
     redis_key_prefix: str = "corr:"  # Prefix for all Redis keys
+    redis_batch_size: int = 500  # Keys per pipeline / MGET / ZRANGEBYSCORE page
+    state_codec: str = "json"  # Value format written to Redis: json or msgpack
+    state_codec_compress_logs: bool = True  # zstd-compress log bodies (msgpack codec)
     correlation_ttl_seconds: int = 3600  # TTL for correlations (1 hour)
+
+    # Sharding: route each trace_id to one instance (consistent hashing)
+    shard_enabled: bool = False
+    shard_self_url: str = ""  # URL peers use to reach this instance, e.g. http://corr-0:8080
+    shard_membership: str = "static"  # static (shard_nodes) or redis (heartbeats in redis_url)
+    shard_nodes: str = ""  # Comma-separated peer URLs for static membership
+    shard_virtual_nodes: int = 128  # Ring points per instance
+    shard_refresh_seconds: float = 5.0  # Heartbeat / membership refresh interval
+    shard_forward_timeout: float = 2.0  # Timeout per forwarded request
     correlation_window_seconds: int = 60  # Time window for correlation
     max_correlation_age_hours: int = 24  # Max age before cleanup
 
@@ -8,7 +8,7 @@ a mapping of trace relationships.
 import logging
 from typing import Dict, List, Set, Optional
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 logger = logging.getLogger(__name__)
 
@@ -160,11 +160,11 @@ class LinkResolver:
 
     def _cleanup_old_links(self):
         """Remove links outside retention window"""
-        now = datetime.utcnow()
+        now = datetime.now(timezone.utc)
         cutoff = now - self.retention
 
         initial_count = len(self._links)
-        self._links = [link for link in self._links if link.timestamp >= cutoff]
+        self._links = [link for link in self._links if self._as_utc(link.timestamp) >= cutoff]
 
         if len(self._links) < initial_count:
             # Rebuild indices
@@ -173,6 +173,13 @@ class LinkResolver:
             removed = initial_count - len(self._links)
             logger.debug(f"Cleaned up {removed} old trace links")
 
+    @staticmethod
+    def _as_utc(timestamp: datetime) -> datetime:
+        """Treat naive timestamps as UTC so they compare with aware ones"""
+        if timestamp.tzinfo is None:
+            return timestamp.replace(tzinfo=timezone.utc)
+        return timestamp
+
     def _rebuild_indices(self):
         """Rebuild circuit and trace indices from scratch"""
         self._circuit_index.clear()
@@ -5,14 +5,20 @@ Handles the core correlation logic for bridging trace gaps when MDSO
 doesn't propagate W3C Trace Context to Sense apps.
 """
 
-from typing import List, Dict, Optional, Tuple
+from collections import deque
+from typing import Deque, List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import hashlib
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Business keys a parent must share with a child to be considered.
+# Without one, the best possible score (temporal 40 + flow 50) stays below
+# the 0.5 confidence threshold, so non-matching segments never win.
+CORRELATION_KEYS = ("circuit_id", "resource_id", "product_id")
+
 
 @dataclass
 class TraceSegment:
@@ -55,6 +61,15 @@ class TraceSynthesizer:
         MDSO creates resource (trace A) → calls Sense app (trace B)
         Since MDSO doesn't propagate trace context, we create synthetic
         bridge span linking trace A → trace B via circuit_id match.
+
+    Segments are held in an arrival-ordered deque (expired from the left) and
+    indexed by each correlation key, so parent lookup only scores segments
+    that share a key with the child. Newly added segments are queued until
+    the caller collects them with take_pending().
+
+    Children that found a parent are marked matched, and bridge span IDs
+    already handed out are remembered for the window, so a segment is linked
+    at most once and a bridge span is never exported twice.
     """
 
     def __init__(self, correlation_window_seconds: int = 60):
@@ -65,7 +80,15 @@ class TraceSynthesizer:
             correlation_window_seconds: Time window for correlating segments
         """
         self.window = timedelta(seconds=correlation_window_seconds)
-        self.segments: List[TraceSegment] = []
+        self.segments: Deque[TraceSegment] = deque()
+        # (key name, key value) -> arrival-ordered (sequence, segment) entries
+        self._index: Dict[Tuple[str, str], Deque[Tuple[int, TraceSegment]]] = {}
+        self._sequence = 0
+        self._pending: List[TraceSegment] = []
+        # (trace_id, span_id) of children already linked to a parent
+        self._matched: set = set()
+        # Bridge span_id -> time it was claimed, in claim order
+        self._bridge_span_ids: Dict[str, datetime] = {}
         self._correlation_stats = {
             "segments_added": 0,
             "parents_found": 0,
@@ -79,7 +102,13 @@ class TraceSynthesizer:
         Args:
             segment: Trace segment to add
         """
+        self._sequence += 1
         self.segments.append(segment)
+        for key in CORRELATION_KEYS:
+            value = getattr(segment, key)
+            if value:
+                self._index.setdefault((key, value), deque()).append((self._sequence, segment))
+        self._pending.append(segment)
         self._correlation_stats["segments_added"] += 1
         self._cleanup_old_segments()
 
@@ -89,6 +118,86 @@ class TraceSynthesizer:
             f"circuit_id={segment.circuit_id}"
         )
 
+    def take_pending(self) -> List[TraceSegment]:
+        """
+        Return segments added since the last call and clear the pending list
+
+        Returns:
+            Newly added segments, in arrival order
+        """
+        pending, self._pending = self._pending, []
+        return pending
+
+    def mark_matched(self, segment: TraceSegment):
+        """Record that ``segment`` has been linked to a parent"""
+        self._matched.add((segment.trace_id, segment.span_id))
+
+    def is_matched(self, segment: TraceSegment) -> bool:
+        """True if ``segment`` has already been linked to a parent"""
+        return (segment.trace_id, segment.span_id) in self._matched
+
+    def unmatched_children(self, parent: TraceSegment, max_children: int = 50) -> List[TraceSegment]:
+        """
+        Find earlier-arrived segments that ``parent`` could be a parent of
+
+        Used when a parent segment arrives after its children: only unmatched
+        segments that share a correlation key, come from another service and
+        are not older than the parent are returned.
+
+        Args:
+            parent: Newly arrived segment
+            max_children: Bound on the number of children to re-match
+
+        Returns:
+            Up to ``max_children`` candidate children, in arrival order
+        """
+        children = []
+        for candidate in self._candidates(parent):
+            if candidate is parent or candidate.service == parent.service:
+                continue
+            if candidate.timestamp < parent.timestamp:
+                continue
+            if (candidate.timestamp - parent.timestamp) > self.window:
+                continue
+            if self.is_matched(candidate):
+                continue
+            children.append(candidate)
+            if len(children) >= max_children:
+                break
+        return children
+
+    def claim_bridge_span_id(self, span_id: str) -> bool:
+        """
+        Claim a bridge span ID for export
+
+        Args:
+            span_id: Deterministic bridge span ID (see bridge_span_id)
+
+        Returns:
+            True the first time an ID is claimed within the window, False for
+            repeats (the bridge was already exported)
+        """
+        if span_id in self._bridge_span_ids:
+            return False
+        self._bridge_span_ids[span_id] = datetime.now(timezone.utc)
+        return True
+
+    @staticmethod
+    def bridge_span_id(parent: TraceSegment, child: TraceSegment) -> str:
+        """Deterministic bridge span ID for a parent/child pair"""
+        span_id_str = f"{parent.span_id}-{child.span_id}"
+        return hashlib.md5(span_id_str.encode()).hexdigest()[:16]
+
+    def _candidates(self, segment: TraceSegment) -> List[TraceSegment]:
+        """Segments sharing at least one correlation key with ``segment``, in arrival order"""
+        seen = {}
+        for key in CORRELATION_KEYS:
+            value = getattr(segment, key)
+            if value:
+                for sequence, candidate in self._index.get((key, value), ()):
+                    seen[sequence] = candidate
+        return [seen[sequence] for sequence in sorted(seen)]
+
     def find_parent_trace(
         self,
         segment: TraceSegment,
@@ -113,7 +222,7 @@ class TraceSynthesizer:
         """
         candidates = []
 
-        for parent in self.segments:
+        for parent in self._candidates(segment):
             # Skip same service
             if parent.service == segment.service:
                 continue
@@ -243,8 +352,7 @@ class TraceSynthesizer:
             OpenTelemetry span dict (ready for OTLP export)
         """
         # Generate deterministic span_id
-        span_id_str = f"{parent.span_id}-{child.span_id}"
-        span_id = hashlib.md5(span_id_str.encode()).hexdigest()[:16]
+        span_id = self.bridge_span_id(parent, child)
 
         # Create bridge span
         bridge_span = {
@@ -301,20 +409,52 @@ class TraceSynthesizer:
         return bridge_span
 
     def _cleanup_old_segments(self):
-        """Remove segments outside correlation window"""
-        now = datetime.utcnow()
-        cutoff = now - self.window
+        """Remove segments outside correlation window
 
-        initial_count = len(self.segments)
-        self.segments = [
-            s for s in self.segments
-            if s.timestamp >= cutoff
-        ]
+        Expires from the oldest end of the arrival-ordered deque and stops at
+        the first segment still inside the window, so the cost is proportional
+        to the number of segments removed.
+        """
+        removed = 0
+
+        while self.segments:
+            oldest = self.segments[0]
+            if oldest.timestamp >= self._now_like(oldest.timestamp) - self.window:
+                break
+
+            self.segments.popleft()
+            self._matched.discard((oldest.trace_id, oldest.span_id))
+            removed += 1
+
+            # The oldest segment is also the front entry of each index it is in
+            for key in CORRELATION_KEYS:
+                value = getattr(oldest, key)
+                if not value:
+                    continue
+                entries = self._index.get((key, value))
+                if entries and entries[0][1] is oldest:
+                    entries.popleft()
+                    if not entries:
+                        del self._index[(key, value)]
+
+        # Forget bridge span IDs claimed before the window
+        bridge_cutoff = datetime.now(timezone.utc) - self.window
+        while self._bridge_span_ids:
+            span_id = next(iter(self._bridge_span_ids))
+            if self._bridge_span_ids[span_id] >= bridge_cutoff:
+                break
+            del self._bridge_span_ids[span_id]
 
-        removed = initial_count - len(self.segments)
         if removed > 0:
             logger.debug(f"Cleaned up {removed} old trace segments")
 
+    @staticmethod
+    def _now_like(timestamp: datetime) -> datetime:
+        """Current UTC time, timezone-aware only if ``timestamp`` is"""
+        if timestamp.tzinfo is not None:
+            return datetime.now(timezone.utc)
+        return datetime.utcnow()
+
     def get_stats(self) -> Dict[str, int]:
         """
         Get correlation statistics
@@ -12,6 +12,8 @@ import structlog
 from app.config import settings
 from app.mdso import MDSOClient, MDSORepository, HTTPMDSORepository, CachedMDSORepository
 from app.pipeline.state_manager import StateManager, InMemoryStateManager, RedisStateManager
+from app.pipeline.state_codec import get_codec
+from app.pipeline.sharding import ShardRouter, StaticMembership, RedisMembership
 
 logger = structlog.get_logger()
 
@@ -179,12 +181,50 @@ def create_state_manager() -> StateManager:
             redis_url=settings.redis_url,
             key_prefix=settings.redis_key_prefix,
             max_connections=settings.redis_max_connections,
+            batch_size=settings.redis_batch_size,
+            codec=get_codec(settings.state_codec, compress_logs=settings.state_codec_compress_logs),
         )
     else:
         logger.info("state_manager_creating_in_memory")
         return InMemoryStateManager()
 
 
+def create_shard_router() -> ShardRouter:
+    """Create the shard router and its membership source from configuration"""
+    if not settings.shard_self_url:
+        raise ValueError("SHARD_SELF_URL is required when sharding is enabled")
+
+    if settings.shard_membership == "redis":
+        import redis.asyncio as redis
+        membership = RedisMembership(
+            redis.from_url(settings.redis_url),
+            key=f"{settings.redis_key_prefix}shard_members",
+            ttl_seconds=settings.shard_refresh_seconds * 3,
+        )
+    elif settings.shard_membership == "static":
+        membership = StaticMembership(settings.shard_nodes.split(","))
+    else:
+        raise ValueError(f"Unknown shard membership {settings.shard_membership!r}, expected static or redis")
+
+    auth = None
+    if settings.enable_basic_auth:
+        auth = (settings.basic_auth_user or "", settings.basic_auth_pass or "")
+
+    logger.info(
+        "shard_router_creating",
+        self_url=settings.shard_self_url,
+        membership=settings.shard_membership,
+    )
+    return ShardRouter(
+        self_url=settings.shard_self_url,
+        membership=membership,
+        vnodes=settings.shard_virtual_nodes,
+        refresh_seconds=settings.shard_refresh_seconds,
+        forward_timeout=settings.shard_forward_timeout,
+        auth=auth,
+    )
+
+
 # FastAPI dependency functions (use with Depends())
 
 async def get_mdso_client() -> Optional[MDSOClient]:
@@ -15,9 +15,11 @@ from prometheus_client import Counter, Histogram, generate_latest
 import structlog
 
 from app.config import settings
-from app.routes import health, logs, otlp, correlations, seca_reviews
+from app.routes import health, logs, otlp, correlations, seca_reviews, shard
 from app.pipeline.correlator import CorrelationEngine
 from app.pipeline.exporters import ExporterManager
+from app.pipeline.metrics_aggregator import MetricsAggregator
+from app.dependencies import create_shard_router, create_state_manager
 from app.database import init_database, seed_sample_data
 
 # Pyroscope profiling
@@ -120,17 +122,33 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         datadog_api_key=settings.datadog_api_key,
         datadog_site=settings.datadog_site,
     )
+    exporter_manager.start()
+
+    # Shared state is only needed when instances scale horizontally
+    state_manager = create_state_manager() if settings.use_redis_state else None
+
+    # Route each trace_id to a single instance so windows see all its records
+    shard_router = None
+    if settings.shard_enabled:
+        shard_router = create_shard_router()
+        await shard_router.start()
 
     # Initialize correlation engine
     correlation_engine = CorrelationEngine(
         window_seconds=settings.corr_window_seconds,
         exporter_manager=exporter_manager,
+        state_manager=state_manager,
+        shard_router=shard_router,
     )
     
     # Store in app state
     app.state.correlation_engine = correlation_engine
     app.state.LOG_RECORDS_RECEIVED = LOG_RECORDS_RECEIVED
     app.state.TRACES_RECEIVED = TRACES_RECEIVED
+    app.state.metrics_aggregator = MetricsAggregator(
+        max_circuits=settings.otlp_metrics_max_circuits,
+        max_streams=settings.otlp_metrics_max_streams,
+    )
 
     # Start background correlation task
     correlation_task = asyncio.create_task(correlation_engine.run())
@@ -161,6 +179,18 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
         except Exception as e:
             logger.exception("Error closing exporters", error=str(e))
 
+        if shard_router:
+            try:
+                await shard_router.stop()
+            except Exception as e:
+                logger.exception("Error stopping shard router", error=str(e))
+
+        if state_manager:
+            try:
+                await state_manager.close()
+            except Exception as e:
+                logger.exception("Error closing state manager", error=str(e))
+
         logger.info("Correlation Engine stopped")
 
 
@@ -282,6 +312,7 @@ app.include_router(logs.router, prefix="/api", tags=["logs"])
 app.include_router(otlp.router, prefix="/api/otlp/v1", tags=["otlp"])
 app.include_router(correlations.router, prefix="/api", tags=["correlations"])
 app.include_router(seca_reviews.router, prefix="/api", tags=["seca-reviews"])
+app.include_router(shard.router, prefix="/internal/shard", tags=["internal"])
 
 
 # Prometheus metrics endpoint
@@ -67,61 +67,61 @@ class MDSOPatterns:
     @classmethod
     def extract_circuit_id(cls, text: str) -> Optional[str]:
         """Extract circuit ID from text"""
-        match = re.search(cls.CIRCUIT_ID, text, re.IGNORECASE)
+        match = _IDENTIFIER_RES["circuit_id"].search(text)
         return match.group(0) if match else None
 
     @classmethod
     def extract_tid(cls, text: str) -> Optional[str]:
         """Extract TID from text"""
-        match = re.search(cls.TID, text)
+        match = _IDENTIFIER_RES["tid"].search(text)
         return match.group(0).rstrip('-: ') if match else None
 
     @classmethod
     def extract_resource_id(cls, text: str) -> Optional[str]:
         """Extract resource ID (UUID) from text"""
-        match = re.search(cls.RESOURCE_ID, text)
+        match = _IDENTIFIER_RES["resource_id"].search(text)
         return match.group(0) if match else None
 
     @classmethod
     def extract_fqdn(cls, text: str) -> Optional[str]:
         """Extract FQDN from text"""
-        match = re.search(cls.FQDN, text)
+        match = _IDENTIFIER_RES["fqdn"].search(text)
         return match.group(0) if match else None
 
     @classmethod
     def extract_ipv4(cls, text: str) -> Optional[str]:
         """Extract IPv4 address from text"""
-        match = re.search(cls.IPV4, text)
+        match = _IDENTIFIER_RES["ipv4"].search(text)
         return match.group(0) if match else None
 
     @classmethod
     def extract_ipv6(cls, text: str) -> Optional[str]:
         """Extract IPv6 address from text"""
-        match = re.search(cls.IPV6, text)
+        match = _IDENTIFIER_RES["ipv6"].search(text)
         return match.group(0) if match else None
 
     @classmethod
     def extract_error_code(cls, text: str) -> Optional[str]:
         """Extract error code (DE-1000, etc.)"""
-        match = re.search(cls.ERROR_CODE, text)
+        match = _IDENTIFIER_RES["error_code"].search(text)
         return match.group(1) if match else None
 
     @classmethod
     def extract_service_type(cls, text: str) -> Optional[str]:
         """Extract service type (ELAN, ELINE, etc.)"""
-        match = re.search(cls.SERVICE_TYPE, text, re.IGNORECASE)
+        match = _IDENTIFIER_RES["service_type"].search(text)
         return match.group(1).upper() if match else None
 
     @classmethod
     def extract_product_type(cls, text: str) -> Optional[str]:
         """Extract product type"""
-        match = re.search(cls.PRODUCT_TYPE, text, re.IGNORECASE)
+        match = _IDENTIFIER_RES["product_type"].search(text)
         return match.group(1).lower() if match else None
 
     @classmethod
     def extract_orch_state(cls, text: str) -> Optional[str]:
         """Extract orchestration state"""
-        match = re.search(cls.ORCH_STATE, text)
+        match = _IDENTIFIER_RES["orch_state"].search(text)
         return match.group(1) if match else None
 
     @classmethod
@@ -141,6 +141,21 @@ class MDSOPatterns:
         }
 
 
+# Compiled once at import; MDSOPatterns.extract_* and MDSOExtractor share these
+_IDENTIFIER_RES = {
+    "circuit_id": re.compile(MDSOPatterns.CIRCUIT_ID, re.IGNORECASE),
+    "tid": re.compile(MDSOPatterns.TID),
+    "resource_id": re.compile(MDSOPatterns.RESOURCE_ID),
+    "fqdn": re.compile(MDSOPatterns.FQDN),
+    "ipv4": re.compile(MDSOPatterns.IPV4),
+    "ipv6": re.compile(MDSOPatterns.IPV6),
+    "error_code": re.compile(MDSOPatterns.ERROR_CODE),
+    "service_type": re.compile(MDSOPatterns.SERVICE_TYPE, re.IGNORECASE),
+    "product_type": re.compile(MDSOPatterns.PRODUCT_TYPE, re.IGNORECASE),
+    "orch_state": re.compile(MDSOPatterns.ORCH_STATE),
+}
+
+
 class ErrorCategorizer:
     """
     Categorize errors using regex patterns
@@ -258,6 +273,127 @@ class ErrorCategorizer:
         return result
 
 
+class MDSOExtractor:
+    """
+    Single-pass MDSO field extraction and error categorization
+
+    Produces the same results as ``MDSOPatterns.extract_all_identifiers`` plus
+    ``ErrorCategorizer.categorize``, but cheaper per message:
+
+    - all patterns are compiled once
+    - the message is lowercased once, not per check
+    - each pattern is guarded by literal tokens it cannot match without
+      ("..", ".COM", "DE-", "_IN_PROGRESS", "unable to connect", ...), so most
+      regexes are skipped after a substring test
+
+    Patterns are kept as separate searches rather than one alternation: several
+    of them overlap (a TID is the prefix of an FQDN), and a combined scan would
+    change which match each field gets.
+    """
+
+    # field -> (tokens checked against the message, tokens checked against its lowercase form)
+    # The regex only runs when any listed token is present.
+    IDENTIFIER_PREFILTERS = {
+        "circuit_id": (("..",), ()),
+        "tid": (("W",), ()),
+        "resource_id": (("-",), ()),
+        "fqdn": ((".COM",), ()),
+        "ipv4": ((".",), ()),
+        "ipv6": ((":",), ()),
+        "error_code": (("DE-", "DEF-", "ERR-"), ()),
+        "service_type": ((), ("service", "type")),
+        "product_type": ((), ("service_mapper", "network_service", "resource_agent", "orchestration_engine")),
+        "orch_state": (("_IN_PROGRESS", "_COMPLETE", "_FAILED"), ()),
+    }
+
+    # (literal guard, compiled pattern or None when the guard is the whole pattern, category)
+    # Checked in ErrorCategorizer priority order; UNABLE_TO_CONNECT is matched on lowercase text.
+    ERROR_RULES = (
+        ("unable to connect to device", None,
+         {"category": "CONNECTIVITY_ERROR", "type": "Device Unreachable", "severity": "CRITICAL"}),
+        ("GRANITE DESIGN |", None,
+         {"category": "GRANITE_ERROR", "type": "Granite Design Issue", "severity": "ERROR"}),
+        (" does not appear to be an IPv4 or IPv6 address", re.compile(MDSOPatterns.NOT_IPV4_IPV6),
+         {"category": "IP_VALIDATION_ERROR", "type": "Invalid IPv4/IPv6", "severity": "ERROR"}),
+        (" is not a network address", re.compile(MDSOPatterns.NOT_NETWORK_ADDRESS),
+         {"category": "IP_VALIDATION_ERROR", "type": "Not Network Address", "severity": "ERROR"}),
+        (" already exists on device", re.compile(MDSOPatterns.IP_EXISTS),
+         {"category": "IP_CONFLICT_ERROR", "type": "IP Already Exists", "severity": "WARNING"}),
+        ("DEVICE ROLE CPE is INVALID for ", re.compile(MDSOPatterns.DEVICE_CPE_ROLE_INVALID),
+         {"category": "DEVICE_ROLE_ERROR", "type": "Invalid CPE Role", "severity": "ERROR"}),
+        ("DEVICE ROLE PE is INVALID for ", re.compile(MDSOPatterns.DEVICE_PE_ROLE_INVALID),
+         {"category": "DEVICE_ROLE_ERROR", "type": "Invalid PE Role", "severity": "ERROR"}),
+        (" is not valid", re.compile(MDSOPatterns.NODE_NAME_INVALID),
+         {"category": "NODE_ERROR", "type": "Invalid Node Name", "severity": "ERROR"}),
+    )
+    GENERIC_ERROR_WORDS = ('error', 'fail', 'exception', 'critical')
+    GENERIC_ERROR = {"category": "GENERIC_ERROR", "type": "Unspecified Error", "severity": "ERROR"}
+    NO_ERROR = {"category": "INFO", "type": "No Error", "severity": "INFO"}
+
+    ALL_FIELDS = tuple(IDENTIFIER_PREFILTERS)
+
+    def extract(
+        self,
+        text: str,
+        fields: tuple = ALL_FIELDS,
+        categorize: bool = True,
+    ) -> Dict[str, Optional[str]]:
+        """
+        Extract MDSO identifiers and (optionally) the error category
+
+        Args:
+            text: Log message text
+            fields: Identifier fields to extract (default: all of
+                ``extract_all_identifiers``)
+            categorize: Also add ``category``, ``type`` and ``severity``
+
+        Returns:
+            Dictionary with one entry per requested field (None when absent),
+            plus the categorization when requested
+        """
+        lower = text.lower()
+        result = {}
+
+        for field in fields:
+            tokens, lower_tokens = self.IDENTIFIER_PREFILTERS[field]
+            if not (any(t in text for t in tokens) or any(t in lower for t in lower_tokens)):
+                result[field] = None
+                continue
+
+            match = _IDENTIFIER_RES[field].search(text)
+            if not match:
+                result[field] = None
+            elif field == "tid":
+                result[field] = match.group(0).rstrip('-: ')
+            elif field == "error_code":
+                result[field] = match.group(1)
+            elif field == "service_type":
+                result[field] = match.group(1).upper()
+            elif field == "product_type":
+                result[field] = match.group(1).lower()
+            elif field == "orch_state":
+                result[field] = match.group(1)
+            else:
+                result[field] = match.group(0)
+
+        if categorize:
+            result.update(self._categorize(text, lower))
+
+        return result
+
+    def _categorize(self, text: str, lower: str) -> Dict[str, str]:
+        """Same decision order as ErrorCategorizer.categorize"""
+        for index, (guard, pattern, category) in enumerate(self.ERROR_RULES):
+            haystack = lower if index == 0 else text
+            if guard in haystack and (pattern is None or pattern.search(text)):
+                return dict(category)
+
+        if any(word in lower for word in self.GENERIC_ERROR_WORDS):
+            return dict(self.GENERIC_ERROR)
+
+        return dict(self.NO_ERROR)
+
+
 # ========================================
 # Vendor Resource Type Mapping
 # ========================================
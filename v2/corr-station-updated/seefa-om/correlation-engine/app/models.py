@@ -18,6 +18,7 @@ class LogRecord(BaseModel):
     resource_type_id: Optional[str] = None
     request_id: Optional[str] = None
     labels: Optional[Dict[str, Any]] = Field(default_factory=dict)
+    time_unix_nano: Optional[int] = None  # Original OTLP timestamp, when known
 
 
 class ResourceInfo(BaseModel):
@@ -0,0 +1,303 @@
+"""Per-backend export queues - isolate exporters from each other
+
+Each ``BackendQueue`` owns a bounded ``asyncio.Queue`` and its own worker
+tasks, so a slow backend only backs up its own queue instead of delaying the
+other backends or the correlation loop. Callers pay for an enqueue; what
+happens when the queue is full is set per backend:
+
+- ``block``: wait for space (backpressure reaches the caller)
+- ``drop_oldest``: discard the oldest queued item to make room
+- ``spill``: append the item to a JSONL file on disk, replayed by the workers
+  once the in-memory queue has drained
+
+Spill file I/O runs on one dedicated thread per queue, so it never blocks the
+event loop and appends, reads and truncation happen in order. The file stays
+open for the life of the queue; items spilled while a write is in flight go
+out together in the next write, and replay reads ``SPILL_READ_BATCH`` items at
+a time. The replay offset is kept in ``<backend>.offset`` next to the spill
+file, so a restart resumes where replay stopped instead of exporting the
+already replayed items again. On shutdown, items read back but not yet
+exported go back to the head of the file and items still queued in memory are
+appended after the rest, so nothing is lost and replay keeps its order.
+"""
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, List, Optional, Set, Tuple
+
+import structlog
+from prometheus_client import Counter, Gauge
+
+logger = structlog.get_logger()
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "spill")
+SPILL_READ_BATCH = 32
+
+# Metrics
+BACKEND_QUEUE_DEPTH = Gauge(
+    'backend_queue_depth',
+    'Items waiting in a backend export queue (in memory and spilled)',
+    ['backend']
+)
+BACKEND_QUEUE_OVERFLOW = Counter(
+    'backend_queue_overflow_total',
+    'Items that hit a full backend export queue',
+    ['backend', 'policy']
+)
+
+
+class BackendQueue:
+    """Bounded export queue with dedicated workers for one backend"""
+
+    def __init__(
+        self,
+        backend: str,
+        export: Callable[[Any], Awaitable[None]],
+        maxsize: int = 1000,
+        workers: int = 1,
+        overflow: str = "block",
+        spill_dir: Optional[str] = None,
+        serialize: Optional[Callable[[Any], str]] = None,
+        deserialize: Optional[Callable[[str], Any]] = None,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy {overflow!r}, expected one of {OVERFLOW_POLICIES}")
+        if overflow == "spill" and not (spill_dir and serialize and deserialize):
+            raise ValueError("spill overflow requires spill_dir, serialize and deserialize")
+
+        self.backend = backend
+        self.export = export
+        self.overflow = overflow
+        self.worker_count = workers
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._workers: List[asyncio.Task] = []
+
+        # Spill file: append-only JSONL, read back from _spill_offset. Only the
+        # spill thread touches the files; _spilled counts items spilled and not
+        # yet read back, _replay holds items read back and not yet exported.
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.spill_path: Optional[Path] = None
+        self.offset_path: Optional[Path] = None
+        self._spill_io: Optional[ThreadPoolExecutor] = None
+        self._spill_file = None
+        self._offset_file = None
+        self._spill_offset = 0
+        self._spilled = 0
+        self._spill_pending: List[str] = []
+        self._spill_flush: Optional[asyncio.Future] = None
+        self._replay: Deque[Any] = deque()
+        self._spill_reads: Set[asyncio.Future] = set()
+        if overflow == "spill":
+            Path(spill_dir).mkdir(parents=True, exist_ok=True)
+            self.spill_path = Path(spill_dir) / f"{backend}.jsonl"
+            self.offset_path = Path(spill_dir) / f"{backend}.offset"
+            self._spill_io = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"spill-{backend}")
+            if self.spill_path.exists():
+                # Items left over from a previous run are replayed first
+                if self.offset_path.exists():
+                    saved = self.offset_path.read_text().strip()
+                    self._spill_offset = min(int(saved or 0), self.spill_path.stat().st_size)
+                with open(self.spill_path, "rb") as f:
+                    f.seek(self._spill_offset)
+                    self._spilled = sum(1 for _ in f)
+                if self._spilled:
+                    logger.info("Replaying spilled export items", backend=backend, items=self._spilled)
+
+    @property
+    def depth(self) -> int:
+        """Items waiting for export, including spilled ones"""
+        return self.queue.qsize() + self._spilled + len(self._replay)
+
+    def start(self):
+        """Start the export workers"""
+        if self._workers:
+            return
+        for worker_id in range(self.worker_count):
+            self._workers.append(asyncio.create_task(self._worker(worker_id)))
+
+    async def enqueue(self, item: Any):
+        """Queue an item for export, applying the overflow policy when full"""
+        if self.overflow == "block":
+            await self.queue.put(item)
+        else:
+            try:
+                self.queue.put_nowait(item)
+            except asyncio.QueueFull:
+                BACKEND_QUEUE_OVERFLOW.labels(backend=self.backend, policy=self.overflow).inc()
+                if self.overflow == "drop_oldest":
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.queue.put_nowait(item)
+                else:
+                    await self._spill(item)
+
+        BACKEND_QUEUE_DEPTH.labels(backend=self.backend).set(self.depth)
+
+    async def _spill(self, item: Any):
+        """Append an item to the spill file, returning once it has been written"""
+        self._spill_pending.append(self.serialize(item) + "\n")
+        self._spilled += 1
+        if self._spill_flush is None:
+            self._spill_flush = asyncio.ensure_future(self._flush_spill())
+        await asyncio.shield(self._spill_flush)
+
+    async def _flush_spill(self):
+        """Write pending spilled items until none are left"""
+        loop = asyncio.get_running_loop()
+        try:
+            while self._spill_pending:
+                lines, self._spill_pending = self._spill_pending, []
+                await loop.run_in_executor(self._spill_io, self._write_spilled, "".join(lines).encode("utf-8"))
+        finally:
+            self._spill_flush = None
+
+    def _open_spill(self):
+        """Open the spill and offset files (spill thread)"""
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, "a+b")
+            self._offset_file = open(self.offset_path, "a+b")
+
+    def _write_spilled(self, data: bytes):
+        """Append serialized items to the spill file (spill thread)"""
+        self._open_spill()
+        self._spill_file.write(data)
+        self._spill_file.flush()
+
+    def _read_spilled(self, limit: int) -> Tuple[int, List[Any]]:
+        """Read up to ``limit`` items from the replay offset (spill thread)
+
+        Returns the number of lines consumed and the items that could be
+        deserialized. The file is truncated once everything in it has been read.
+        """
+        self._open_spill()
+        self._spill_file.flush()
+        self._spill_file.seek(self._spill_offset)
+        lines = []
+        for line in self._spill_file:
+            lines.append(line)
+            if len(lines) == limit:
+                break
+        self._spill_offset = self._spill_file.tell()
+        if self._spill_offset >= self._spill_file.seek(0, 2):
+            self._spill_file.truncate(0)
+            self._spill_offset = 0
+        self._save_offset()
+
+        items = []
+        for line in lines:
+            if line.strip():
+                try:
+                    items.append(self.deserialize(line.decode("utf-8")))
+                except Exception as e:
+                    logger.error("Dropping unreadable spilled item", backend=self.backend, error=str(e))
+        return len(lines), items
+
+    def _save_offset(self):
+        """Persist the replay offset (spill thread)"""
+        self._offset_file.truncate(0)
+        self._offset_file.write(b"%d\n" % self._spill_offset)
+        self._offset_file.flush()
+
+    def _rewrite_spilled(self, head: bytes, tail: bytes):
+        """Rewrite the spill file as ``head``, the unread items, then ``tail`` (spill thread)"""
+        self._open_spill()
+        self._spill_file.flush()
+        self._spill_file.seek(self._spill_offset)
+        unread = self._spill_file.read()
+        tmp_path = self.spill_path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(head + unread + tail)
+            f.flush()
+            os.fsync(f.fileno())
+        self._spill_file.close()
+        os.replace(tmp_path, self.spill_path)
+        self._spill_file = open(self.spill_path, "a+b")
+        self._spill_offset = 0
+        self._save_offset()
+
+    def _close_spill(self):
+        """Close the spill and offset files (spill thread)"""
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._offset_file.close()
+            self._spill_file = self._offset_file = None
+
+    async def _next_spilled(self) -> Optional[Any]:
+        """Next spilled item, read back in batches of ``SPILL_READ_BATCH``"""
+        loop = asyncio.get_running_loop()
+        while not self._replay and self._spilled:
+            if self._spill_flush is not None:
+                await asyncio.shield(self._spill_flush)
+            # Applied by callback, so a worker cancelled mid-read loses nothing
+            read = loop.run_in_executor(self._spill_io, self._read_spilled, SPILL_READ_BATCH)
+            read.add_done_callback(self._replayed)
+            self._spill_reads.add(read)
+            consumed, _ = await asyncio.shield(read)
+            if not consumed:
+                break
+        return self._replay.popleft() if self._replay else None
+
+    def _replayed(self, read: asyncio.Future):
+        """Move items read back from the spill file into the replay buffer"""
+        self._spill_reads.discard(read)
+        if not read.cancelled() and read.exception() is None:
+            consumed, items = read.result()
+            self._spilled -= consumed
+            self._replay.extend(items)
+
+    async def _worker(self, worker_id: int):
+        """Export queued items, then spilled ones once the queue is empty"""
+        while True:
+            item = await self._next_spilled() if self.queue.empty() else None
+            from_queue = item is None
+            if from_queue:
+                item = await self.queue.get()
+            try:
+                BACKEND_QUEUE_DEPTH.labels(backend=self.backend).set(self.depth)
+                await self.export(item)
+            except Exception as e:
+                logger.exception("Error exporting from backend queue", backend=self.backend, worker=worker_id, error=str(e))
+            finally:
+                if from_queue:
+                    self.queue.task_done()
+
+    async def stop(self, timeout: float = 5.0):
+        """Drain the in-memory queue for up to ``timeout`` seconds, then stop workers
+
+        Spilled items stay on disk and are replayed on the next start. Under
+        ``spill``, items read back but not yet exported are put back ahead of
+        them and items the drain did not reach are spilled after them.
+        """
+        if self._workers:
+            try:
+                await asyncio.wait_for(self.queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Backend queue not drained before shutdown", backend=self.backend, pending=self.queue.qsize())
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._spill_io is not None:
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*self._spill_reads, return_exceptions=True)
+            if self._spill_flush is not None:
+                await asyncio.gather(self._spill_flush, return_exceptions=True)
+
+            # Replayed items are older than the unread ones; queued items go last
+            head = [self.serialize(item) + "\n" for item in self._replay]
+            tail = []
+            while not self.queue.empty():
+                tail.append(self.serialize(self.queue.get_nowait()) + "\n")
+                self.queue.task_done()
+            if head or tail:
+                await loop.run_in_executor(
+                    self._spill_io, self._rewrite_spilled, "".join(head).encode("utf-8"), "".join(tail).encode("utf-8")
+                )
+                self._spilled += len(head) + len(tail)
+                self._replay.clear()
+            await loop.run_in_executor(self._spill_io, self._close_spill)
@@ -0,0 +1,440 @@
+"""Correlation history - fixed-capacity ring buffer with secondary indexes
+
+Closed-window correlations are kept in a preallocated ring of slots. Each
+correlation gets a monotonically increasing sequence number; its slot is
+``seq % capacity``. Secondary indexes map a field value to its sequence
+numbers in insertion order, so evicting the oldest correlation is a
+``popleft`` on each of its index entries rather than a rebuild of the lists.
+Values seen once (most trace IDs) map to a bare ``int`` instead of a deque.
+
+A time index groups sequence numbers into fixed-width buckets of correlation
+timestamp; time-range queries bisect the sorted bucket keys and merge the
+buckets in range instead of scanning the whole history.
+
+Queries return correlations newest first (descending sequence number) and
+page with opaque cursors that encode the last sequence number returned.
+
+Correlations are stored as compact ``__slots__`` records and materialized
+back into ``CorrelationEvent`` models only when returned from a query.
+
+``replace()`` updates a retained correlation in place (same correlation_id,
+sequence number and time bucket) so a trace re-emitted with late records does
+not appear twice.
+"""
+import base64
+import binascii
+import heapq
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from app.models import CorrelationEvent
+
+# Fields with a secondary index; every equality filter accepted by query()
+INDEXED_FIELDS = (
+    "trace_id",
+    "service",
+    "circuit_id",
+    "product_id",
+    "resource_id",
+    "resource_type_id",
+    "request_id",
+)
+
+# Width of a time index bucket
+TIME_BUCKET_SECONDS = 60
+
+_CURSOR_PREFIX = "h1:"
+
+# Index entry: one sequence number, or several in insertion order
+IndexEntry = Union[int, Deque[int]]
+
+
+def _entry_seqs(entry: IndexEntry):
+    """Sequence numbers of an index entry, oldest first"""
+    return (entry,) if isinstance(entry, int) else entry
+
+
+def _epoch(timestamp: datetime) -> float:
+    """Unix seconds for a timestamp, treating naive values as UTC"""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def _descending_below(seqs, before: Optional[int]) -> Iterator[int]:
+    """Iterate ascending ``seqs`` from the newest down, skipping seq >= ``before``"""
+    skip = 0 if before is None else len(seqs) - bisect_left(seqs, before)
+    return islice(reversed(seqs), skip, None)
+
+
+def encode_cursor(seq: int) -> str:
+    """Opaque continuation cursor resuming below ``seq``"""
+    return base64.urlsafe_b64encode(f"{_CURSOR_PREFIX}{seq}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Sequence number from a cursor, raising ValueError if it is malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if not raw.startswith(_CURSOR_PREFIX) or not raw[len(_CURSOR_PREFIX):].isdigit():
+        raise ValueError("Invalid cursor")
+    return int(raw[len(_CURSOR_PREFIX):])
+
+
+class _HistoryRecord:
+    """Compact storage for one CorrelationEvent"""
+    __slots__ = (
+        "seq",
+        "epoch",
+        "correlation_id",
+        "trace_id",
+        "timestamp",
+        "service",
+        "env",
+        "log_count",
+        "span_count",
+        "circuit_id",
+        "product_id",
+        "resource_id",
+        "resource_type_id",
+        "request_id",
+        "metadata",
+    )
+
+    def __init__(self, seq: int, event: CorrelationEvent):
+        self.seq = seq
+        self.epoch = _epoch(event.timestamp)
+        self.correlation_id = event.correlation_id
+        self.trace_id = event.trace_id
+        self.timestamp = event.timestamp
+        self.service = event.service
+        self.env = event.env
+        self.log_count = event.log_count
+        self.span_count = event.span_count
+        self.circuit_id = event.circuit_id
+        self.product_id = event.product_id
+        self.resource_id = event.resource_id
+        self.resource_type_id = event.resource_type_id
+        self.request_id = event.request_id
+        # Most correlations carry no metadata; don't keep an empty dict per record
+        self.metadata = event.metadata or None
+
+    def to_event(self) -> CorrelationEvent:
+        return CorrelationEvent.model_construct(
+            correlation_id=self.correlation_id,
+            trace_id=self.trace_id,
+            timestamp=self.timestamp,
+            service=self.service,
+            env=self.env,
+            log_count=self.log_count,
+            span_count=self.span_count,
+            circuit_id=self.circuit_id,
+            product_id=self.product_id,
+            resource_id=self.resource_id,
+            resource_type_id=self.resource_type_id,
+            request_id=self.request_id,
+            metadata=self.metadata if self.metadata is not None else {},
+        )
+
+
+class IndexView(Mapping):
+    """Read-only mapping of field value -> correlations (oldest first)"""
+
+    def __init__(self, history: "CorrelationHistory", field: str):
+        self._history = history
+        self._index = history._indexes[field]
+
+    def __getitem__(self, value: str) -> List[CorrelationEvent]:
+        slots, capacity = self._history._slots, self._history.capacity
+        return [slots[seq % capacity].to_event() for seq in _entry_seqs(self._index[value])]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, value) -> bool:
+        return value in self._index
+
+
+class CorrelationHistory:
+    """Bounded correlation history with O(1) append and eviction"""
+
+    def __init__(self, capacity: int):
+        self._reset(capacity)
+
+    def _reset(self, capacity: int):
+        """Empty the history with room for ``capacity`` correlations"""
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._slots: List[Optional[_HistoryRecord]] = [None] * capacity
+        self._next_seq = 0  # Sequence number of the next append
+        self._oldest_seq = 0  # Sequence number of the oldest retained record
+        self._indexes: Dict[str, Dict[Any, IndexEntry]] = {field: {} for field in INDEXED_FIELDS}
+        self._seq_by_id: Dict[str, int] = {}
+        # Time index: bucket number -> seqs in insertion order, plus sorted bucket numbers
+        self._time_buckets: Dict[int, Deque[int]] = {}
+        self._bucket_keys: List[int] = []
+
+    def __len__(self) -> int:
+        return self._next_seq - self._oldest_seq
+
+    def __iter__(self) -> Iterator[CorrelationEvent]:
+        """Correlations from oldest to newest"""
+        for seq in range(self._oldest_seq, self._next_seq):
+            yield self._slots[seq % self.capacity].to_event()
+
+    def __reversed__(self) -> Iterator[CorrelationEvent]:
+        """Correlations from newest to oldest"""
+        for record in self._newest_records():
+            yield record.to_event()
+
+    def __getitem__(self, position: int) -> CorrelationEvent:
+        """Correlation by position, 0 being the oldest and -1 the newest"""
+        size = len(self)
+        if position < 0:
+            position += size
+        if not 0 <= position < size:
+            raise IndexError("correlation history index out of range")
+        return self._slots[(self._oldest_seq + position) % self.capacity].to_event()
+
+    def index(self, field: str) -> IndexView:
+        """Mapping view of the secondary index on ``field``"""
+        return IndexView(self, field)
+
+    def append(self, event: CorrelationEvent):
+        """Add a correlation, evicting the oldest one when full"""
+        if len(self) == self.capacity:
+            self._evict_oldest()
+
+        seq = self._next_seq
+        record = _HistoryRecord(seq, event)
+        self._slots[seq % self.capacity] = record
+        self._next_seq += 1
+        self._seq_by_id[record.correlation_id] = seq
+
+        for field, index in self._indexes.items():
+            value = getattr(record, field)
+            if value is not None:
+                self._index_seq(index, value, seq)
+
+        bucket_key = int(record.epoch // TIME_BUCKET_SECONDS)
+        bucket = self._time_buckets.get(bucket_key)
+        if bucket is None:
+            bucket = self._time_buckets[bucket_key] = deque()
+            insort(self._bucket_keys, bucket_key)
+        bucket.append(seq)
+
+    def _evict_oldest(self):
+        """Drop the oldest record from its slot and every index"""
+        slot = self._oldest_seq % self.capacity
+        record = self._slots[slot]
+        self._slots[slot] = None
+        self._oldest_seq += 1
+        if self._seq_by_id.get(record.correlation_id) == record.seq:
+            del self._seq_by_id[record.correlation_id]
+
+        for field, index in self._indexes.items():
+            value = getattr(record, field)
+            if value is None:
+                continue
+            entry = index[value]
+            if isinstance(entry, int):
+                del index[value]
+                continue
+            # Appends and evictions both happen in sequence order, so the
+            # evicted record is always the leftmost entry for its value
+            entry.popleft()
+            if len(entry) == 1:
+                index[value] = entry[0]
+
+        bucket_key = int(record.epoch // TIME_BUCKET_SECONDS)
+        bucket = self._time_buckets[bucket_key]
+        bucket.popleft()
+        if not bucket:
+            del self._time_buckets[bucket_key]
+            del self._bucket_keys[bisect_left(self._bucket_keys, bucket_key)]
+
+    @staticmethod
+    def _index_seq(index: Dict[Any, IndexEntry], value, seq: int):
+        """Add ``seq`` to ``value``'s entry, keeping sequence order"""
+        entry = index.get(value)
+        if entry is None:
+            index[value] = seq
+        elif isinstance(entry, int):
+            index[value] = deque(sorted((entry, seq)))
+        elif seq > entry[-1]:
+            entry.append(seq)
+        else:
+            entry.insert(bisect_left(entry, seq), seq)
+
+    @staticmethod
+    def _unindex_seq(index: Dict[Any, IndexEntry], value, seq: int):
+        """Remove ``seq`` from ``value``'s entry"""
+        entry = index[value]
+        if isinstance(entry, int):
+            del index[value]
+            return
+        entry.remove(seq)
+        if len(entry) == 1:
+            index[value] = entry[0]
+
+    def replace(self, event: CorrelationEvent) -> bool:
+        """Update a retained correlation in place, matched by correlation_id
+
+        The record keeps its sequence number and timestamp (so its time
+        bucket); only indexes whose field value changed are touched. Returns
+        False if the correlation is no longer retained.
+        """
+        seq = self._seq_by_id.get(event.correlation_id)
+        if seq is None:
+            return False
+
+        slot = seq % self.capacity
+        old = self._slots[slot]
+        record = _HistoryRecord(seq, event)
+        record.epoch, record.timestamp = old.epoch, old.timestamp
+        self._slots[slot] = record
+
+        for field, index in self._indexes.items():
+            before, after = getattr(old, field), getattr(record, field)
+            if before == after:
+                continue
+            if before is not None:
+                self._unindex_seq(index, before, seq)
+            if after is not None:
+                self._index_seq(index, after, seq)
+        return True
+
+    def resize(self, capacity: int):
+        """Change capacity, keeping the newest correlations that still fit"""
+        if capacity == self.capacity:
+            return
+
+        retained = list(self)[-capacity:]
+        self._reset(capacity)
+        for event in retained:
+            self.append(event)
+
+    def _newest_records(self) -> Iterator[_HistoryRecord]:
+        """Records from newest to oldest"""
+        for seq in range(self._next_seq - 1, self._oldest_seq - 1, -1):
+            yield self._slots[seq % self.capacity]
+
+    def _candidate_seqs(
+        self,
+        filters: Dict[str, str],
+        start: Optional[float],
+        end: Optional[float],
+        before: Optional[int],
+    ) -> Iterable[int]:
+        """Newest-first seqs from the smallest source that covers the query
+
+        Sources are the index entry of each filter, the time buckets
+        overlapping [start, end], or the whole history. Candidates still need
+        every filter checked against the record.
+        """
+        newest = self._next_seq - 1 if before is None else min(before, self._next_seq) - 1
+        best_size = newest - self._oldest_seq + 1
+        if best_size <= 0:
+            return ()
+        best: Iterable[int] = range(newest, self._oldest_seq - 1, -1)
+
+        for field, value in filters.items():
+            entry = self._indexes[field].get(value)
+            if entry is None:
+                return ()
+            seqs = _entry_seqs(entry)
+            if len(seqs) < best_size:
+                best_size, best = len(seqs), _descending_below(seqs, before)
+
+        if start is not None or end is not None:
+            lo = 0 if start is None else bisect_left(self._bucket_keys, int(start // TIME_BUCKET_SECONDS))
+            hi = len(self._bucket_keys) if end is None else bisect_right(self._bucket_keys, int(end // TIME_BUCKET_SECONDS))
+            buckets = [self._time_buckets[key] for key in self._bucket_keys[lo:hi]]
+            size = sum(len(bucket) for bucket in buckets)
+            if size < best_size:
+                best = heapq.merge(*(_descending_below(bucket, before) for bucket in buckets), reverse=True)
+
+        return best
+
+    def query_page(
+        self,
+        filters: Optional[Dict[str, str]] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[CorrelationEvent], Optional[str]]:
+        """
+        One page of newest-first correlations matching every filter
+
+        Args:
+            filters: Field equality filters, keys from ``INDEXED_FIELDS``
+            start_time: Inclusive lower bound on correlation timestamp
+            end_time: Inclusive upper bound on correlation timestamp
+            limit: Maximum correlations in the page
+            cursor: Cursor from a previous page, to continue after it
+
+        Returns:
+            (correlations, cursor for the next page or None when exhausted)
+
+        Raises:
+            ValueError: Unknown filter field or malformed cursor
+        """
+        filters = {field: value for field, value in (filters or {}).items() if value}
+        unknown = set(filters) - set(INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown filter fields: {sorted(unknown)}")
+        before = decode_cursor(cursor) if cursor else None
+        if limit < 1:
+            return [], None
+        start = _epoch(start_time) if start_time else None
+        end = _epoch(end_time) if end_time else None
+
+        matches: List[_HistoryRecord] = []
+        for seq in self._candidate_seqs(filters, start, end, before):
+            record = self._slots[seq % self.capacity]
+            if start is not None and record.epoch < start:
+                continue
+            if end is not None and record.epoch > end:
+                continue
+            if any(getattr(record, field) != value for field, value in filters.items()):
+                continue
+
+            matches.append(record)
+            # One extra match tells whether another page exists
+            if len(matches) > limit:
+                break
+
+        next_cursor = None
+        if len(matches) > limit:
+            matches.pop()
+            next_cursor = encode_cursor(matches[-1].seq)
+        return [record.to_event() for record in matches], next_cursor
+
+    def query(
+        self,
+        trace_id: Optional[str] = None,
+        service: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: int = 100,
+        **filters: Optional[str],
+    ) -> List[CorrelationEvent]:
+        """Newest-first correlations matching every given filter (see ``INDEXED_FIELDS``)"""
+        results, _ = self.query_page(
+            {"trace_id": trace_id, "service": service, **filters},
+            start_time=start_time,
+            end_time=end_time,
+            limit=limit,
+        )
+        return results
@@ -1,23 +1,38 @@
 """Correlation Engine - Core windowed correlation logic"""
 import asyncio
+import time
 import uuid
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 import structlog
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
 
 from app.models import (
     LogBatch,
     CorrelationEvent,
     SyntheticEvent,
 )
+from app.pipeline import otlp_decoder
+from app.pipeline.ingest_spool import (
+    IngestSpool,
+    SpoolFull,
+    decode_log_batch,
+    decode_trace_batch,
+    encode_log_batch,
+    encode_trace_batch,
+)
+from app.pipeline.correlation_history import CorrelationHistory, IndexView, INDEXED_FIELDS
 from app.pipeline.normalizer import LogNormalizer
+from app.pipeline.normalizer_pool import NormalizerPool
 from app.pipeline.exporters import ExporterManager
+from app.pipeline.state_manager import CorrelationEntry, StateManager
+from app.pipeline.sharding import ShardRouter
 from app.correlation.trace_synthesizer import TraceSynthesizer, TraceSegment
 from app.correlation.link_resolver import LinkResolver, TraceLink
 from app.config import settings
 from app.profiling import profile_function
-from prometheus_client import Counter, Gauge
+from prometheus_client import Counter, Gauge, Histogram
 
 # Metrics
 CORRELATION_EVENTS = Counter(
@@ -45,10 +60,83 @@ QUEUE_FULL_RETRIES = Counter(
     'Total queue full retry attempts',
     ['type']
 )
+LATE_RECORDS = Counter(
+    'correlation_late_records_total',
+    'Records arriving after their trace was finalized (beyond allowed lateness)',
+    ['type']
+)
+STAGE_DURATION = Histogram(
+    'correlation_stage_duration_seconds',
+    'Time spent in each correlation pipeline stage',
+    ['stage']
+)
 
 logger = structlog.get_logger()
 
 
+def _build_correlation(
+    trace_id: str,
+    logs: List[dict],
+    traces: List[dict],
+    log_count: int,
+    span_count: int,
+    metadata: Dict[str, Any],
+    correlation_id: Optional[str] = None,
+    timestamp: Optional[datetime] = None,
+) -> CorrelationEvent:
+    """Correlation event for one trace; attributes come from its first log, else first span"""
+    # Extract common attributes
+    service = "unknown"
+    env = "dev"
+    circuit_id = None
+    product_id = None
+    resource_id = None
+    resource_type_id = None
+    request_id = None
+
+    # Get service from first log or trace
+    if logs:
+        service = logs[0].get("service", "unknown")
+        env = logs[0].get("env", "dev")
+        circuit_id = logs[0].get("circuit_id")
+        product_id = logs[0].get("product_id")
+        resource_id = logs[0].get("resource_id")
+        resource_type_id = logs[0].get("resource_type_id")
+        request_id = logs[0].get("request_id")
+    elif traces:
+        service = traces[0].get("service", "unknown")
+        env = traces[0].get("env", "dev")
+
+    return CorrelationEvent(
+        correlation_id=correlation_id or str(uuid.uuid4()),
+        trace_id=trace_id,
+        timestamp=timestamp or datetime.now(timezone.utc),
+        service=service,
+        env=env,
+        log_count=log_count,
+        span_count=span_count,
+        circuit_id=circuit_id,
+        product_id=product_id,
+        resource_id=resource_id,
+        resource_type_id=resource_type_id,
+        request_id=request_id,
+        metadata=metadata,
+    )
+
+
+def _event_time(record: dict) -> Optional[float]:
+    """Record timestamp as epoch seconds, None if missing or unparseable"""
+    timestamp = record.get("timestamp")
+    try:
+        if isinstance(timestamp, str):
+            timestamp = datetime.fromisoformat(timestamp)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return timestamp.timestamp()
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
 class CorrelationWindow:
     """Sliding window for correlation"""
     def __init__(self, window_seconds: int):
@@ -71,8 +159,16 @@ class CorrelationWindow:
 
     def should_close(self) -> bool:
         """Check if window should close"""
+        return self.seconds_until_close() <= 0
+
+    def seconds_until_close(self) -> float:
+        """Seconds remaining until the window is due to close"""
         elapsed = (datetime.now(timezone.utc) - self.window_start).total_seconds()
-        return elapsed >= self.window_seconds
+        return self.window_seconds - elapsed
+
+    def roll(self) -> "CorrelationWindow":
+        """Window that collects records after this one closes"""
+        return CorrelationWindow(self.window_seconds)
 
     @profile_function(tags={"operation": "create_correlations"})
     def create_correlations(self) -> List[CorrelationEvent]:
@@ -87,67 +183,258 @@ class CorrelationWindow:
             traces = self.traces_by_trace.get(trace_id, [])
 
             if logs or traces:
-                # Extract common attributes
-                service = "unknown"
-                env = "dev"
-                circuit_id = None
-                product_id = None
-                resource_id = None
-                resource_type_id = None
-                request_id = None
-
-                # Get service from first log or trace
-                if logs:
-                    service = logs[0].get("service", "unknown")
-                    env = logs[0].get("env", "dev")
-                    circuit_id = logs[0].get("circuit_id")
-                    product_id = logs[0].get("product_id")
-                    resource_id = logs[0].get("resource_id")
-                    resource_type_id = logs[0].get("resource_type_id")
-                    request_id = logs[0].get("request_id")
-                elif traces:
-                    service = traces[0].get("service", "unknown")
-                    env = traces[0].get("env", "dev")
-
-                correlation = CorrelationEvent(
-                    correlation_id=str(uuid.uuid4()),
-                    trace_id=trace_id,
-                    timestamp=datetime.now(timezone.utc),
-                    service=service,
-                    env=env,
+                correlations.append(_build_correlation(
+                    trace_id,
+                    logs,
+                    traces,
                     log_count=len(logs),
                     span_count=len(traces),
-                    circuit_id=circuit_id,
-                    product_id=product_id,
-                    resource_id=resource_id,
-                    resource_type_id=resource_type_id,
-                    request_id=request_id,
                     metadata={
                         "window_start": self.window_start.isoformat(),
                         "window_seconds": self.window_seconds,
-                    }
-                )
-                correlations.append(correlation)
+                    },
+                ))
 
         return correlations
 
 
+class _TraceSession:
+    """Per-trace state of a TraceSessionWindow
+
+    Only the first log/span (attribute source) and counts are kept, not
+    every record.
+    """
+    __slots__ = (
+        "trace_id", "correlation_id", "first_log", "first_trace", "log_count", "span_count",
+        "first_event", "last_event", "last_arrival", "emitted_at", "revision",
+    )
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.correlation_id = str(uuid.uuid4())
+        self.first_log: Optional[dict] = None
+        self.first_trace: Optional[dict] = None
+        self.log_count = 0
+        self.span_count = 0
+        self.first_event: Optional[float] = None
+        self.last_event: Optional[float] = None
+        self.last_arrival = 0.0
+        self.emitted_at: Optional[datetime] = None
+        self.revision = -1  # Bumped on every emission
+
+
+class TraceSessionWindow:
+    """Event-time correlation windows keyed by trace_id
+
+    Each trace has its own session. A trace is emitted once no record for it
+    has arrived for ``quiet_seconds``. After emission the session is kept
+    until the watermark (latest event time seen minus
+    ``allowed_lateness_seconds``) passes its last event, or until no record
+    arrived for ``allowed_lateness_seconds``. Records arriving meanwhile are
+    merged and the trace is re-emitted as a new revision of the same
+    correlation_id, which replaces the earlier one in history and the state
+    store; only the first emission exports a correlation span. Records for a trace that has already been finalized are
+    counted as late and left out of correlation.
+
+    Sessions are kept in arrival order, so the next emission or eviction is
+    always at the head and ``seconds_until_close`` is O(1).
+
+    The watermark only advances up to the arrival wall clock plus
+    ``max_clock_skew_seconds``, so a record stamped in the future by a skewed
+    client clock cannot push every open session past it.
+    """
+
+    def __init__(
+        self,
+        quiet_seconds: float,
+        allowed_lateness_seconds: float,
+        max_clock_skew_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        wall_clock: Callable[[], float] = time.time,
+    ):
+        self.quiet_seconds = quiet_seconds
+        self.allowed_lateness_seconds = allowed_lateness_seconds
+        self.max_clock_skew_seconds = max_clock_skew_seconds
+        self._clock = clock
+        self._wall_clock = wall_clock
+        # Sessions with records not yet emitted, and emitted sessions, in arrival order
+        self._pending: "OrderedDict[str, _TraceSession]" = OrderedDict()
+        self._emitted: "OrderedDict[str, _TraceSession]" = OrderedDict()
+        # Finalized trace_id -> finalize time, remembered for allowed_lateness_seconds
+        self._finalized: "OrderedDict[str, float]" = OrderedDict()
+        self._max_event: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._emitted)
+
+    @property
+    def watermark(self) -> Optional[float]:
+        """Event time (epoch seconds) before which sessions are complete"""
+        if self._max_event is None:
+            return None
+        return self._max_event - self.allowed_lateness_seconds
+
+    def add_log(self, log_record: dict):
+        """Merge a log record into its trace's session"""
+        session = self._session_for(log_record, "logs")
+        if session:
+            session.log_count += 1
+            if session.first_log is None:
+                session.first_log = log_record
+
+    def add_trace(self, trace_record: dict):
+        """Merge a span into its trace's session"""
+        session = self._session_for(trace_record, "traces")
+        if session:
+            session.span_count += 1
+            if session.first_trace is None:
+                session.first_trace = trace_record
+
+    def _session_for(self, record: dict, record_type: str) -> Optional[_TraceSession]:
+        """Session to merge ``record`` into, moved to the tail of the pending queue"""
+        trace_id = record.get("trace_id")
+        if not trace_id:
+            return None
+
+        now = self._clock()
+        session = self._pending.pop(trace_id, None) or self._emitted.pop(trace_id, None)
+        if session is None:
+            if trace_id in self._finalized:
+                LATE_RECORDS.labels(type=record_type).inc()
+                return None
+            session = _TraceSession(trace_id)
+
+        event = _event_time(record)
+        if event is not None:
+            session.first_event = event if session.first_event is None else min(session.first_event, event)
+            session.last_event = event if session.last_event is None else max(session.last_event, event)
+            event = min(event, self._wall_clock() + self.max_clock_skew_seconds)
+            self._max_event = event if self._max_event is None else max(self._max_event, event)
+
+        session.last_arrival = now
+        self._pending[trace_id] = session
+        return session
+
+    def should_close(self) -> bool:
+        """Check if any trace is due for emission or eviction"""
+        return self.seconds_until_close() <= 0
+
+    def seconds_until_close(self) -> float:
+        """Seconds until the next trace goes quiet or an emitted session expires"""
+        now = self._clock()
+        timeout = self.quiet_seconds
+        if self._pending:
+            head = next(iter(self._pending.values()))
+            timeout = min(timeout, head.last_arrival + self.quiet_seconds - now)
+        if self._emitted:
+            head = next(iter(self._emitted.values()))
+            timeout = min(timeout, head.last_arrival + self.allowed_lateness_seconds - now)
+        return timeout
+
+    def roll(self) -> "TraceSessionWindow":
+        """Sessions span window closes, so the same window keeps collecting"""
+        return self
+
+    @profile_function(tags={"operation": "create_correlations"})
+    def create_correlations(self) -> List[CorrelationEvent]:
+        """Emit traces that have gone quiet and finalize expired sessions
+
+        A trace emitted before carries its original correlation_id and
+        timestamp with ``metadata["revision"]`` > 0.
+        """
+        now = self._clock()
+        correlations = []
+
+        while self._pending:
+            session = next(iter(self._pending.values()))
+            if now - session.last_arrival < self.quiet_seconds:
+                break
+            del self._pending[session.trace_id]
+            correlations.append(self._emit(session))
+            self._emitted[session.trace_id] = session
+
+        watermark = self.watermark
+        while self._emitted:
+            session = next(iter(self._emitted.values()))
+            expired = now - session.last_arrival >= self.allowed_lateness_seconds
+            passed = watermark is not None and session.last_event is not None and session.last_event < watermark
+            if not (expired or passed):
+                break
+            del self._emitted[session.trace_id]
+            self._finalized[session.trace_id] = now
+
+        while self._finalized:
+            trace_id, finalized_at = next(iter(self._finalized.items()))
+            if now - finalized_at < self.allowed_lateness_seconds:
+                break
+            del self._finalized[trace_id]
+
+        return correlations
+
+    def _emit(self, session: _TraceSession) -> CorrelationEvent:
+        session.revision += 1
+        if session.emitted_at is None:
+            session.emitted_at = datetime.now(timezone.utc)
+        metadata: Dict[str, Any] = {
+            "window_mode": "session",
+            "quiet_seconds": self.quiet_seconds,
+            "revision": session.revision,
+        }
+        if session.first_event is not None:
+            metadata["first_event"] = datetime.fromtimestamp(session.first_event, timezone.utc).isoformat()
+            metadata["last_event"] = datetime.fromtimestamp(session.last_event, timezone.utc).isoformat()
+        return _build_correlation(
+            session.trace_id,
+            [session.first_log] if session.first_log else [],
+            [session.first_trace] if session.first_trace else [],
+            log_count=session.log_count,
+            span_count=session.span_count,
+            metadata=metadata,
+            correlation_id=session.correlation_id,
+            timestamp=session.emitted_at,
+        )
+
+
 class CorrelationEngine:
     """Main correlation engine with windowed correlation"""
-    def __init__(self, window_seconds: int, exporter_manager: ExporterManager):
+    # Minimum spacing between trace synthesis passes while segments keep arriving
+    SYNTHESIS_INTERVAL_SECONDS = 1.0
+    # Max earlier children re-matched when a late parent segment arrives
+    LATE_PARENT_REMATCH_LIMIT = 50
+
+    def __init__(
+        self,
+        window_seconds: int,
+        exporter_manager: ExporterManager,
+        state_manager: Optional[StateManager] = None,
+        shard_router: Optional[ShardRouter] = None,
+    ):
         self.window_seconds = window_seconds
         self.exporter_manager = exporter_manager
+        # Shared correlation state (Redis) written once per closed window
+        self.state_manager = state_manager
+        # Multi-instance routing: records go to the instance owning their trace_id
+        self.shard_router = shard_router
         self.normalizer = LogNormalizer()
+        self.normalizer_pool = None
+        if settings.enable_normalizer_pool:
+            self.normalizer_pool = NormalizerPool(
+                workers=settings.normalizer_pool_workers,
+                chunk_size=settings.normalizer_pool_chunk_size,
+                executor=settings.normalizer_pool_executor,
+            )
 
-        self.current_window = CorrelationWindow(window_seconds)
-        self.correlation_history: List[CorrelationEvent] = []
-        self.max_history = settings.max_correlation_history
-
-        # Performance optimization: Index correlation history for faster queries
-        self.correlation_index: Dict[str, List[CorrelationEvent]] = {
-            "by_trace_id": defaultdict(list),
-            "by_service": defaultdict(list),
-        }
+        if settings.correlation_window_mode == "session":
+            # Per-trace event-time sessions: emit when quiet, merge late records
+            self.current_window = TraceSessionWindow(
+                quiet_seconds=settings.correlation_quiet_seconds,
+                allowed_lateness_seconds=settings.correlation_allowed_lateness_seconds,
+                max_clock_skew_seconds=settings.correlation_max_clock_skew_seconds,
+            )
+        else:
+            self.current_window = CorrelationWindow(window_seconds)
+        # Ring buffer with trace_id/service indexes, evicts in O(1) at capacity
+        self.correlation_history = CorrelationHistory(settings.max_correlation_history)
 
         # Advanced correlation features
         self.trace_synthesizer = None
@@ -163,8 +450,75 @@ class CorrelationEngine:
         self.log_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.max_queue_size)
         self.trace_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.max_queue_size)
 
-    async def add_logs(self, batch: LogBatch):
-        """Add log batch to processing queue with backpressure retry"""
+        # Durable on-disk spool replacing the in-memory ingest queues when enabled
+        self.log_spool: Optional[IngestSpool] = None
+        self.trace_spool: Optional[IngestSpool] = None
+        if settings.ingest_spool_enabled:
+            self.log_spool = self._create_spool("logs", encode_log_batch, decode_log_batch)
+            self.trace_spool = self._create_spool("traces", encode_trace_batch, decode_trace_batch)
+            logger.info("Ingest spool enabled", directory=settings.ingest_spool_dir, fsync=settings.ingest_spool_fsync)
+
+        # Normalized batches waiting for backend export (decouples export from ingestion)
+        self.log_export_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.export_queue_size)
+        self.trace_export_queue: asyncio.Queue = asyncio.Queue(maxsize=settings.export_queue_size)
+
+        # Consumer worker pools, started by run()
+        self.log_consumer_workers = settings.log_consumer_workers
+        self.trace_consumer_workers = settings.trace_consumer_workers
+        self.export_consumer_workers = settings.export_consumer_workers
+        self._workers: List[asyncio.Task] = []
+
+        # Wake-ups for the coordinator loop in run()
+        self._stop_event = asyncio.Event()
+        self._segments_ready = asyncio.Event()
+
+    @staticmethod
+    def _create_spool(name: str, serialize, deserialize) -> IngestSpool:
+        return IngestSpool(
+            name,
+            settings.ingest_spool_dir,
+            serialize,
+            deserialize,
+            segment_bytes=settings.ingest_spool_segment_mb * 1024 * 1024,
+            max_bytes=settings.ingest_spool_max_mb * 1024 * 1024,
+            fsync=settings.ingest_spool_fsync,
+            fsync_interval=settings.ingest_spool_fsync_interval,
+        )
+
+    @staticmethod
+    async def _spool(spool: IngestSpool, batch, queue_type: str):
+        """Append a batch to the ingest spool, dropping it only when the disk limit is hit"""
+        try:
+            await spool.put(batch)
+            QUEUE_DEPTH.labels(queue_type=queue_type).set(spool.depth)
+        except (SpoolFull, ValueError, OSError) as e:
+            DROPPED_BATCHES.labels(type=queue_type).inc()
+            logger.error(
+                "Ingest spool rejected batch, dropping",
+                queue_type=queue_type,
+                error=str(e),
+                recommendation="Increase INGEST_SPOOL_MAX_MB or add more consumers"
+            )
+
+    async def add_logs(self, batch: LogBatch, forwarded: bool = False):
+        """Add log batch to processing queue
+
+        With sharding, records owned by other instances are forwarded to them
+        first; ``forwarded`` batches already reached their owner.
+        """
+        if self.shard_router and not forwarded:
+            parts = self.shard_router.split_logs(batch)
+            for local in await self.shard_router.route("logs", parts, lambda b: len(b.records)):
+                await self._queue_logs(local)
+            return
+        await self._queue_logs(batch)
+
+    async def _queue_logs(self, batch: LogBatch):
+        """Put a log batch on the processing queue with backpressure retry"""
+        if self.log_spool:
+            await self._spool(self.log_spool, batch, "logs")
+            return
+
         retry_count = 0
         max_retries = settings.queue_retry_attempts
         base_delay = settings.queue_retry_delay
@@ -211,8 +565,24 @@ class CorrelationEngine:
                     logger.error("Log queue timeout, dropping batch", service=batch.resource.service)
                     return
 
-    async def add_traces(self, trace_batch: dict):
-        """Add trace batch to processing queue with backpressure retry"""
+    async def add_traces(self, trace_batch: Union[Dict[str, Any], TracesData], forwarded: bool = False):
+        """Add trace batch (OTLP JSON dict or TracesData) to processing queue
+
+        Routed by trace_id like add_logs() when sharding is enabled.
+        """
+        if self.shard_router and not forwarded:
+            parts = self.shard_router.split_traces(trace_batch)
+            for local in await self.shard_router.route("traces", parts, otlp_decoder.count_spans):
+                await self._queue_traces(local)
+            return
+        await self._queue_traces(trace_batch)
+
+    async def _queue_traces(self, trace_batch: Union[Dict[str, Any], TracesData]):
+        """Put a trace batch on the processing queue with backpressure retry"""
+        if self.trace_spool:
+            await self._spool(self.trace_spool, trace_batch, "traces")
+            return
+
         retry_count = 0
         max_retries = settings.queue_retry_attempts
         base_delay = settings.queue_retry_delay
@@ -264,67 +634,61 @@ class CorrelationEngine:
         start_time: Optional[datetime] = None,
         end_time: Optional[datetime] = None,
         limit: int = 100,
+        **filters: Optional[str],
     ) -> List[CorrelationEvent]:
-        """Query correlation history with optimized indexing"""
-        results = []
+        """Query correlation history with optimized indexing
+
+        ``filters`` takes the business keys (circuit_id, product_id,
+        resource_id, resource_type_id, request_id).
+        """
+        return self.correlation_history.query(
+            trace_id=trace_id,
+            service=service,
+            start_time=start_time,
+            end_time=end_time,
+            limit=limit,
+            **filters,
+        )
 
-        # Use index for faster lookup when possible
-        if trace_id:
-            candidates = self.correlation_index["by_trace_id"].get(trace_id, [])
-        elif service:
-            candidates = self.correlation_index["by_service"].get(service, [])
-        else:
-            candidates = self.correlation_history
-
-        for correlation in reversed(candidates):
-            # Apply filters
-            if trace_id and correlation.trace_id != trace_id:
-                continue
-            if service and correlation.service != service:
-                continue
-            if start_time and correlation.timestamp < start_time:
-                continue
-            if end_time and correlation.timestamp > end_time:
-                continue
-
-            results.append(correlation)
-
-            if len(results) >= limit:
-                break
+    def query_correlation_page(
+        self,
+        filters: Optional[Dict[str, str]] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[CorrelationEvent], Optional[str]]:
+        """Query one page of correlation history, returning the next page's cursor"""
+        return self.correlation_history.query_page(
+            filters,
+            start_time=start_time,
+            end_time=end_time,
+            limit=limit,
+            cursor=cursor,
+        )
+
+    @property
+    def max_history(self) -> int:
+        """Correlation history capacity"""
+        return self.correlation_history.capacity
 
-        return results
+    @max_history.setter
+    def max_history(self, capacity: int):
+        self.correlation_history.resize(capacity)
+
+    @property
+    def correlation_index(self) -> Dict[str, IndexView]:
+        """Read-only views of the correlation history indexes"""
+        return {f"by_{field}": self.correlation_history.index(field) for field in INDEXED_FIELDS}
 
     def _add_to_correlation_history(self, correlation: CorrelationEvent):
-        """Add correlation to history and update indices"""
-        self.correlation_history.append(correlation)
+        """Add correlation to history; the ring buffer evicts the oldest at capacity
 
-        # Update indices
-        self.correlation_index["by_trace_id"][correlation.trace_id].append(correlation)
-        self.correlation_index["by_service"][correlation.service].append(correlation)
-
-        # Trim history if needed
-        if len(self.correlation_history) > self.max_history:
-            # Remove oldest
-            removed = self.correlation_history.pop(0)
-
-            # Remove from indices safely (filter by correlation_id to avoid removing wrong entries)
-            if removed.trace_id in self.correlation_index["by_trace_id"]:
-                self.correlation_index["by_trace_id"][removed.trace_id] = [
-                    c for c in self.correlation_index["by_trace_id"][removed.trace_id]
-                    if c.correlation_id != removed.correlation_id
-                ]
-                # Clean up empty index entries to prevent memory leaks
-                if not self.correlation_index["by_trace_id"][removed.trace_id]:
-                    del self.correlation_index["by_trace_id"][removed.trace_id]
-
-            if removed.service in self.correlation_index["by_service"]:
-                self.correlation_index["by_service"][removed.service] = [
-                    c for c in self.correlation_index["by_service"][removed.service]
-                    if c.correlation_id != removed.correlation_id
-                ]
-                # Clean up empty index entries
-                if not self.correlation_index["by_service"][removed.service]:
-                    del self.correlation_index["by_service"][removed.service]
+        A re-emitted trace (session windows) replaces its earlier revision.
+        """
+        if correlation.metadata.get("revision") and self.correlation_history.replace(correlation):
+            return
+        self.correlation_history.append(correlation)
 
     async def inject_synthetic_event(self, event: SyntheticEvent) -> CorrelationEvent:
         """Inject a synthetic correlation event"""
@@ -353,187 +717,343 @@ class CorrelationEngine:
         return correlation
 
     @profile_function(tags={"operation": "normalize_trace"})
-    def _normalize_trace(self, trace_batch: dict) -> List[dict]:
-        """Normalize OTLP trace batch to internal format"""
-        normalized = []
-
-        for resource_span in trace_batch.get("resourceSpans", []):
-            resource = resource_span.get("resource", {})
-            attributes = {attr["key"]: attr.get("value", {}) for attr in resource.get("attributes", [])}
-
-            service = attributes.get("service.name", {}).get("stringValue", "unknown")
-            env = attributes.get("deployment.environment", {}).get("stringValue", "dev")
-
-            for scope_span in resource_span.get("scopeSpans", []):
-                for span in scope_span.get("spans", []):
-                    # Extract span attributes
-                    span_attrs = {attr["key"]: attr.get("value", {}) for attr in span.get("attributes", [])}
-
-                    trace_id = span.get("traceId", "")
-                    if isinstance(trace_id, bytes):
-                        trace_id = trace_id.hex()
-
-                    span_id = span.get("spanId", "")
-                    if isinstance(span_id, bytes):
-                        span_id = span_id.hex()
-
-                    # Extract correlation keys
-                    circuit_id = span_attrs.get("circuit_id", {}).get("stringValue")
-                    product_id = span_attrs.get("product_id", {}).get("stringValue")
-                    resource_id = span_attrs.get("resource_id", {}).get("stringValue")
-                    resource_type_id = span_attrs.get("resource_type_id", {}).get("stringValue")
-
-                    normalized.append({
-                        "trace_id": trace_id,
-                        "span_id": span_id,
-                        "service": service,
-                        "env": env,
-                        "name": span.get("name", ""),
-                        "circuit_id": circuit_id,
-                        "product_id": product_id,
-                        "resource_id": resource_id,
-                        "resource_type_id": resource_type_id,
-                        "timestamp": datetime.fromtimestamp(
-                            int(span.get("startTimeUnixNano", 0)) / 1e9, tz=timezone.utc
-                        ).isoformat() if span.get("startTimeUnixNano") else datetime.now(timezone.utc).isoformat(),
-                    })
-
-        return normalized
+    def _normalize_trace(self, trace_batch: Union[Dict[str, Any], TracesData]) -> List[dict]:
+        """Normalize OTLP trace batch (JSON dict or TracesData) to internal format"""
+        if isinstance(trace_batch, TracesData):
+            return otlp_decoder.spans_from_proto(trace_batch)
+        return otlp_decoder.spans_from_json(trace_batch)
 
     @profile_function(tags={"operation": "correlation_loop"})
     async def run(self):
-        """Main correlation loop"""
+        """Main correlation loop
+
+        Starts the consumer worker pools and then drives trace synthesis and
+        window close. Normalization/window insertion and backend export run in
+        separate workers so a slow exporter does not stall ingestion.
+
+        The loop does not poll: it sleeps until the window deadline, a pending
+        trace synthesis pass, or stop(), whichever comes first.
+        """
         self.running = True
-        logger.info("Correlation engine started", window_seconds=self.window_seconds)
+        self._stop_event.clear()
+        self._start_workers()
+        logger.info(
+            "Correlation engine started",
+            window_seconds=self.window_seconds,
+            log_workers=self.log_consumer_workers,
+            trace_workers=self.trace_consumer_workers,
+            export_workers=self.export_consumer_workers,
+        )
 
-        while self.running:
-            try:
-                # Update queue depth metrics
-                QUEUE_DEPTH.labels(queue_type="logs").set(self.log_queue.qsize())
-                QUEUE_DEPTH.labels(queue_type="traces").set(self.trace_queue.qsize())
+        loop = asyncio.get_running_loop()
+        next_synthesis_at = loop.time()
 
-                # Process logs from queue
-                while not self.log_queue.empty():
-                    try:
-                        batch = await asyncio.wait_for(self.log_queue.get(), timeout=0.1)
+        try:
+            while self.running:
+                try:
+                    self._update_queue_depths()
 
-                        # Normalize and add to window
-                        normalized_logs = self.normalizer.normalize_log_batch(batch)
-                        for log in normalized_logs:
-                            self.current_window.add_log(log)
+                    # Wait for the earliest of: window deadline, due synthesis pass, stop()
+                    timeout = self.current_window.seconds_until_close()
+                    if self._segments_ready.is_set():
+                        timeout = min(timeout, next_synthesis_at - loop.time())
+                        wake_on = [self._stop_event]
+                    else:
+                        wake_on = [self._stop_event, self._segments_ready]
 
-                        # Export logs to Loki immediately
-                        await self.exporter_manager.export_logs(batch)
-                    except asyncio.TimeoutError:
-                        break
+                    if timeout > 0:
+                        await self._wait_for_any(wake_on, timeout)
 
-                # Process traces from queue
-                while not self.trace_queue.empty():
-                    try:
-                        trace_batch = await asyncio.wait_for(self.trace_queue.get(), timeout=0.1)
-
-                        # Normalize traces and add to window
-                        normalized_traces = self._normalize_trace(trace_batch)
-                        for trace in normalized_traces:
-                            self.current_window.add_trace(trace)
-
-                            # Add to trace synthesizer if enabled
-                            if self.trace_synthesizer and trace.get("circuit_id"):
-                                segment = TraceSegment(
-                                    trace_id=trace["trace_id"],
-                                    span_id=trace["span_id"],
-                                    service=trace["service"],
-                                    timestamp=trace["timestamp"],
-                                    circuit_id=trace.get("circuit_id"),
-                                    resource_id=trace.get("resource_id"),
-                                    product_id=trace.get("product_id"),
-                                    resource_type_id=trace.get("resource_type_id"),
-                                    operation=trace.get("name"),
-                                )
-                                self.trace_synthesizer.add_segment(segment)
-
-                        # Export traces to Tempo immediately
-                        await self.exporter_manager.export_traces(trace_batch)
-                    except asyncio.TimeoutError:
+                    if not self.running:
                         break
 
-                # Perform trace synthesis if enabled
-                if self.trace_synthesizer and self.link_resolver:
-                    await self._perform_trace_synthesis()
+                    # Perform trace synthesis once new segments have arrived
+                    if self._segments_ready.is_set() and loop.time() >= next_synthesis_at:
+                        self._segments_ready.clear()
+                        next_synthesis_at = loop.time() + self.SYNTHESIS_INTERVAL_SECONDS
+                        with STAGE_DURATION.labels(stage="trace_synthesis").time():
+                            await self._perform_trace_synthesis()
+
+                    # Check if window should close
+                    if self.current_window.should_close():
+                        await self._close_window()
+                except Exception as e:
+                    logger.exception("Error in correlation loop", error=str(e))
+                    await asyncio.sleep(5)
+        finally:
+            await self._stop_workers()
+            if self.normalizer_pool:
+                self.normalizer_pool.shutdown()
+            for spool in (self.log_spool, self.trace_spool):
+                if spool:
+                    spool.close()
+
+    @staticmethod
+    async def _wait_for_any(events: List[asyncio.Event], timeout: float):
+        """Block until any of ``events`` is set or ``timeout`` seconds pass"""
+        waiters = [asyncio.create_task(event.wait()) for event in events]
+        try:
+            await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    def _start_workers(self):
+        """Start the consumer worker pools for each pipeline queue"""
+        for worker_id in range(self.log_consumer_workers):
+            self._workers.append(asyncio.create_task(self._log_consumer(worker_id)))
+        for worker_id in range(self.trace_consumer_workers):
+            self._workers.append(asyncio.create_task(self._trace_consumer(worker_id)))
+        for worker_id in range(self.export_consumer_workers):
+            self._workers.append(asyncio.create_task(self._export_consumer(
+                self.log_export_queue, "log_export", self.exporter_manager.export_logs, "export_logs", worker_id
+            )))
+            self._workers.append(asyncio.create_task(self._export_consumer(
+                self.trace_export_queue, "trace_export", self.exporter_manager.export_traces, "export_traces", worker_id
+            )))
+
+    async def _stop_workers(self):
+        """Cancel all consumer workers and wait for them to exit"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def _ingest_depth(self, queue_type: str) -> int:
+        """Batches waiting for a consumer: in the spool when enabled, else in the queue"""
+        if queue_type == "logs":
+            return self.log_spool.depth if self.log_spool else self.log_queue.qsize()
+        return self.trace_spool.depth if self.trace_spool else self.trace_queue.qsize()
+
+    def _update_queue_depths(self):
+        """Publish queue depth for every pipeline stage"""
+        QUEUE_DEPTH.labels(queue_type="logs").set(self._ingest_depth("logs"))
+        QUEUE_DEPTH.labels(queue_type="traces").set(self._ingest_depth("traces"))
+        QUEUE_DEPTH.labels(queue_type="log_export").set(self.log_export_queue.qsize())
+        QUEUE_DEPTH.labels(queue_type="trace_export").set(self.trace_export_queue.qsize())
+
+    async def _log_consumer(self, worker_id: int):
+        """Normalize log batches into the current window, then queue them for export"""
+        while True:
+            if self.log_spool:
+                token, batch = await self.log_spool.get()
+            else:
+                batch = await self.log_queue.get()
+            try:
+                QUEUE_DEPTH.labels(queue_type="logs").set(self._ingest_depth("logs"))
 
-                # Check if window should close
-                if self.current_window.should_close():
-                    # Create correlations
-                    correlations = self.current_window.create_correlations()
+                with STAGE_DURATION.labels(stage="normalize_logs").time():
+                    if self.normalizer_pool:
+                        normalized_logs = await self.normalizer_pool.normalize_log_batch(batch)
+                    else:
+                        normalized_logs = self.normalizer.normalize_log_batch(batch)
+                    for log in normalized_logs:
+                        self.current_window.add_log(log)
 
-                    logger.info(
-                        "correlation_window_closed",
-                        correlations=len(correlations),
-                        window_seconds=self.window_seconds,
-                    )
+                await self.log_export_queue.put(batch)
+                QUEUE_DEPTH.labels(queue_type="log_export").set(self.log_export_queue.qsize())
+            except Exception as e:
+                logger.exception("Error in log consumer", worker=worker_id, error=str(e))
+            finally:
+                if self.log_spool:
+                    self.log_spool.ack(token)
+                else:
+                    self.log_queue.task_done()
+
+    async def _trace_consumer(self, worker_id: int):
+        """Normalize trace batches into the current window, then queue them for export"""
+        while True:
+            if self.trace_spool:
+                token, trace_batch = await self.trace_spool.get()
+            else:
+                trace_batch = await self.trace_queue.get()
+            try:
+                QUEUE_DEPTH.labels(queue_type="traces").set(self._ingest_depth("traces"))
+
+                segments = []
+                with STAGE_DURATION.labels(stage="normalize_traces").time():
+                    normalized_traces = self._normalize_trace(trace_batch)
+                    for trace in normalized_traces:
+                        self.current_window.add_trace(trace)
+
+                        # Add to trace synthesizer if enabled
+                        if self.trace_synthesizer and trace.get("circuit_id"):
+                            segments.append(TraceSegment(
+                                trace_id=trace["trace_id"],
+                                span_id=trace["span_id"],
+                                service=trace["service"],
+                                timestamp=trace["timestamp"],
+                                circuit_id=trace.get("circuit_id"),
+                                resource_id=trace.get("resource_id"),
+                                product_id=trace.get("product_id"),
+                                resource_type_id=trace.get("resource_type_id"),
+                                operation=trace.get("name"),
+                            ))
+
+                if segments and self.shard_router:
+                    # Synthesis joins on circuit_id, so segments go to that key's owner
+                    parts = self.shard_router.split_segments(segments)
+                    segments = [
+                        segment
+                        for local in await self.shard_router.route("segments", parts, len)
+                        for segment in local
+                    ]
+                self.add_synthesis_segments(segments)
+
+                await self.trace_export_queue.put(trace_batch)
+                QUEUE_DEPTH.labels(queue_type="trace_export").set(self.trace_export_queue.qsize())
+            except Exception as e:
+                logger.exception("Error in trace consumer", worker=worker_id, error=str(e))
+            finally:
+                if self.trace_spool:
+                    self.trace_spool.ack(token)
+                else:
+                    self.trace_queue.task_done()
+
+    def add_synthesis_segments(self, segments: List[TraceSegment]):
+        """Hand trace segments to the synthesizer and wake the coordinator"""
+        if not self.trace_synthesizer or not segments:
+            return
+        for segment in segments:
+            self.trace_synthesizer.add_segment(segment)
+        self._segments_ready.set()
+
+    async def _export_consumer(
+        self,
+        queue: asyncio.Queue,
+        queue_type: str,
+        export: Callable[[Any], Awaitable[None]],
+        stage: str,
+        worker_id: int,
+    ):
+        """Drain an export queue into the exporter manager"""
+        while True:
+            payload = await queue.get()
+            try:
+                QUEUE_DEPTH.labels(queue_type=queue_type).set(queue.qsize())
 
-                    # Add to history with indexing
-                    for correlation in correlations:
-                        self._add_to_correlation_history(correlation)
+                with STAGE_DURATION.labels(stage=stage).time():
+                    await export(payload)
+            except Exception as e:
+                logger.exception("Error in export consumer", stage=stage, worker=worker_id, error=str(e))
+            finally:
+                queue.task_done()
+
+    async def _close_window(self):
+        """Emit correlations for the current window and start a new one"""
+        with STAGE_DURATION.labels(stage="window_close").time():
+            closed_window = self.current_window
+            self.current_window = closed_window.roll()
+
+            # Create correlations
+            correlations = closed_window.create_correlations()
+
+            logger.info(
+                "correlation_window_closed",
+                correlations=len(correlations),
+                window_seconds=self.window_seconds,
+            )
 
-                    # Track metrics
-                    CORRELATION_EVENTS.labels(status="success").inc(len(correlations))
+            # Add to history with indexing
+            for correlation in correlations:
+                self._add_to_correlation_history(correlation)
 
-                    # Export correlation spans to Tempo
-                    for correlation in correlations:
-                        await self.exporter_manager.export_correlation_span(correlation)
+            await self._persist_correlations(correlations)
 
-                    # Create new window
-                    self.current_window = CorrelationWindow(self.window_seconds)
+            # Track metrics
+            updated = sum(1 for c in correlations if c.metadata.get("revision"))
+            CORRELATION_EVENTS.labels(status="success").inc(len(correlations) - updated)
+            if updated:
+                CORRELATION_EVENTS.labels(status="updated").inc(updated)
 
-                # Sleep briefly
-                await asyncio.sleep(1)
-            except Exception as e:
-                logger.exception("Error in correlation loop", error=str(e))
-                await asyncio.sleep(5)
+            # Export correlation spans to Tempo; the span ID derives from correlation_id, so
+            # later revisions only update history and the state store
+            for correlation in correlations:
+                if not correlation.metadata.get("revision"):
+                    await self.exporter_manager.export_correlation_span(correlation)
+
+    async def _persist_correlations(self, correlations: List[CorrelationEvent]):
+        """Write a closed window's correlations to the state manager in one batch"""
+        if not self.state_manager or not correlations:
+            return
+
+        try:
+            await self.state_manager.set_many(
+                {c.correlation_id: CorrelationEntry.from_event(c) for c in correlations},
+                ttl_seconds=settings.correlation_ttl_seconds,
+            )
+        except Exception as e:
+            logger.error("correlation_state_persist_failed", count=len(correlations), error=str(e))
 
     async def _perform_trace_synthesis(self):
-        """Perform trace synthesis to link disconnected traces"""
+        """Perform trace synthesis to link disconnected traces
+
+        Each newly arrived segment is matched once as a child. It is then
+        offered as a late parent to a bounded set of earlier, still
+        unmatched children that share a correlation key.
+        """
         if not self.trace_synthesizer or not self.link_resolver:
             return
 
-        # Get all segments from the synthesizer
-        for segment in self.trace_synthesizer.segments[-100:]:  # Process last 100 segments
-            # Try to find parent trace
-            parent_match = self.trace_synthesizer.find_parent_trace(segment)
+        for segment in self.trace_synthesizer.take_pending():
+            await self._link_to_parent(segment)
 
-            if parent_match:
-                parent_segment, confidence = parent_match
+            for child in self.trace_synthesizer.unmatched_children(
+                segment, max_children=self.LATE_PARENT_REMATCH_LIMIT
+            ):
+                await self._link_to_parent(child)
 
-                if confidence >= settings.correlation_confidence_threshold:
-                    # Create bridge span
-                    bridge_span = self.trace_synthesizer.create_bridge_span(
-                        parent_segment, segment, confidence
-                    )
+    async def _link_to_parent(self, segment: TraceSegment):
+        """Find a parent for ``segment`` and export the bridge span once"""
+        if self.trace_synthesizer.is_matched(segment):
+            return
 
-                    # Export bridge span to Tempo
-                    await self.exporter_manager.export_bridge_span(bridge_span)
-
-                    # Add trace link
-                    link = TraceLink(
-                        parent_trace_id=parent_segment.trace_id,
-                        child_trace_id=segment.trace_id,
-                        link_type="synthetic",
-                        timestamp=datetime.now(timezone.utc),
-                        circuit_id=segment.circuit_id,
-                        confidence=confidence,
-                    )
-                    self.link_resolver.add_link(link)
-
-                    TRACE_SYNTHESIS.labels(status="success").inc()
-                    logger.debug(
-                        "trace_synthesis_complete",
-                        parent=parent_segment.service,
-                        child=segment.service,
-                        confidence=confidence,
-                    )
+        # Try to find parent trace
+        parent_match = self.trace_synthesizer.find_parent_trace(segment)
+        if not parent_match:
+            return
+
+        parent_segment, confidence = parent_match
+        if confidence < settings.correlation_confidence_threshold:
+            return
+
+        self.trace_synthesizer.mark_matched(segment)
+
+        # Deterministic bridge span_id makes re-delivered segments idempotent
+        bridge_span_id = self.trace_synthesizer.bridge_span_id(parent_segment, segment)
+        if not self.trace_synthesizer.claim_bridge_span_id(bridge_span_id):
+            TRACE_SYNTHESIS.labels(status="duplicate").inc()
+            return
+
+        # Create bridge span
+        bridge_span = self.trace_synthesizer.create_bridge_span(
+            parent_segment, segment, confidence
+        )
+
+        # Export bridge span to Tempo
+        await self.exporter_manager.export_bridge_span(bridge_span)
+
+        # Add trace link
+        link = TraceLink(
+            parent_trace_id=parent_segment.trace_id,
+            child_trace_id=segment.trace_id,
+            link_type="synthetic",
+            timestamp=datetime.now(timezone.utc),
+            circuit_id=segment.circuit_id,
+            confidence=confidence,
+        )
+        self.link_resolver.add_link(link)
+
+        TRACE_SYNTHESIS.labels(status="success").inc()
+        logger.debug(
+            "trace_synthesis_complete",
+            parent=parent_segment.service,
+            child=segment.service,
+            confidence=confidence,
+        )
 
     def stop(self):
         """Stop the correlation engine"""
         self.running = False
+        self._stop_event.set()
         logger.info("Correlation engine stopping")
\ No newline at end of file
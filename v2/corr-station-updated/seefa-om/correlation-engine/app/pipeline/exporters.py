@@ -1,19 +1,32 @@
 """Exporters - send correlated data to backends (Loki/Tempo/Prometheus/Datadog)"""
+import gzip
 import json
 import time
 import asyncio
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple, Union
 from datetime import datetime, timedelta
 import httpx
 import structlog
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+from opentelemetry.proto.trace.v1.trace_pb2 import ResourceSpans, TracesData
 from prometheus_client import Counter, Histogram, Gauge
 
-from app.models import LogBatch, CorrelationEvent
+from app.models import LogBatch, LogRecord, CorrelationEvent
 from app.config import settings
+from app.pipeline import otlp_decoder
+from app.pipeline.backend_queue import BackendQueue
+from app.pipeline.loki_proto import encode_push_request
 from app.profiling import profile_function
 
 logger = structlog.get_logger()
 
+# Loki's protobuf push API requires snappy block compression
+try:
+    import snappy
+    SNAPPY_AVAILABLE = True
+except ImportError:
+    SNAPPY_AVAILABLE = False
+
 # Exporter metrics
 EXPORT_ATTEMPTS = Counter(
     'export_attempts_total',
@@ -30,6 +43,24 @@ EXPORT_RETRIES = Counter(
     'Total export retries',
     ['backend']
 )
+LOKI_FLUSH_ENTRIES = Histogram(
+    'loki_flush_entries',
+    'Log entries per batched Loki push request',
+    buckets=(1, 10, 100, 500, 1000, 2500, 5000, 10000, 25000)
+)
+LOKI_FLUSH_LATENCY = Histogram(
+    'loki_flush_latency_seconds',
+    'Time from first buffered entry to completed Loki flush'
+)
+TEMPO_FLUSH_SPANS = Histogram(
+    'tempo_flush_spans',
+    'Spans per batched Tempo export request',
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+TEMPO_FLUSH_LATENCY = Histogram(
+    'tempo_flush_latency_seconds',
+    'Time from first buffered span to completed Tempo flush'
+)
 CIRCUIT_BREAKER_STATE = Gauge(
     'circuit_breaker_state',
     'Circuit breaker state (0=closed, 1=open, 2=half-open)',
@@ -109,9 +140,48 @@ async def retry_with_backoff(func, max_retries: int = 3, initial_delay: float =
             await asyncio.sleep(delay)
 
 
+def _escape_label_value(value: Any) -> str:
+    """Escape a label value for a Prometheus/Loki label selector string"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _encode_body(body: bytes, content_type: str, compress: bool) -> Tuple[bytes, Dict[str, str]]:
+    """Request body and headers, gzipped with ``Content-Encoding`` when ``compress`` is set"""
+    headers = {"Content-Type": content_type}
+    if compress:
+        body = gzip.compress(body)
+        headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+def _json_request(payload: Dict[str, Any], compress: bool) -> Dict[str, Any]:
+    """``httpx`` request kwargs for a JSON body, gzipped when ``compress`` is set"""
+    if not compress:
+        return {"json": payload, "headers": {"Content-Type": "application/json"}}
+    body, headers = _encode_body(json.dumps(payload).encode(), "application/json", compress)
+    return {"content": body, "headers": headers}
+
+
 class LokiExporter:
-    """Export logs to Loki"""
-    def __init__(self, loki_url: str):
+    """Export logs to Loki
+
+    With ``batching`` enabled, entries from successive log batches are
+    aggregated per label set and pushed together once ``batch_linger`` seconds
+    have passed since the first buffered entry, or ``batch_max_entries``
+    entries are buffered. Pushes use Loki's protobuf ``PushRequest`` with
+    snappy compression when ``encoding="protobuf"`` and python-snappy is
+    installed, and the JSON push API otherwise; JSON bodies are gzipped when
+    ``compress`` is set.
+    """
+    def __init__(
+        self,
+        loki_url: str,
+        batching: bool = False,
+        batch_linger: float = 1.0,
+        batch_max_entries: int = 5000,
+        encoding: str = "json",
+        compress: bool = False,
+    ):
         self.loki_url = loki_url
         self.client = httpx.AsyncClient(timeout=settings.export_timeout)
         self.circuit_breaker = CircuitBreaker(
@@ -119,9 +189,26 @@ class LokiExporter:
             recovery_timeout=settings.circuit_breaker_recovery_timeout
         ) if settings.enable_circuit_breaker else None
 
+        # Stream buffer (batching mode): label string -> (labels, [(timestamp_ns, line)])
+        self.batching = batching
+        self.batch_linger = batch_linger
+        self.batch_max_entries = batch_max_entries
+        self.use_protobuf = encoding == "protobuf" and SNAPPY_AVAILABLE
+        if encoding == "protobuf" and not SNAPPY_AVAILABLE:
+            logger.warning("python-snappy not installed, Loki push falls back to JSON")
+        self.compress = compress
+        self._streams: Dict[str, Tuple[Dict[str, str], List[Tuple[int, str]]]] = {}
+        self._buffered_entries = 0
+        self._buffer_started_at: Optional[float] = None
+        self._flush_timer: Optional[asyncio.Task] = None
+
     @profile_function(tags={"backend": "loki", "operation": "export_logs"})
     async def export_logs(self, batch: LogBatch):
         """Export log batch to Loki with retry and circuit breaker"""
+        if self.batching:
+            await self._enqueue(batch)
+            return
+
         # Check circuit breaker
         if self.circuit_breaker and not self.circuit_breaker.can_execute():
             EXPORT_ATTEMPTS.labels(backend="loki", status="circuit_open").inc()
@@ -133,12 +220,10 @@ class LokiExporter:
         async def _export():
             # Convert to Loki streams format
             streams = self._convert_to_loki_streams(batch)
-
             # Send to Loki
             response = await self.client.post(
                 self.loki_url,
-                json={"streams": streams},
-                headers={"Content-Type": "application/json"},
+                **_json_request({"streams": streams}, self.compress),
             )
             response.raise_for_status()
 
@@ -164,6 +249,106 @@ class LokiExporter:
         finally:
             EXPORT_DURATION.labels(backend="loki").observe(time.time() - start_time)
 
+    async def _enqueue(self, batch: LogBatch):
+        """Add a batch's entries to the per-stream buffer, flushing when full"""
+        if not batch.records:
+            return
+
+        if not self._streams:
+            self._buffer_started_at = time.time()
+
+        for record in batch.records:
+            labels = self._create_labels(batch.resource, record)
+            label_str = self._labels_to_string(labels)
+            stream = self._streams.get(label_str)
+            if stream is None:
+                stream = self._streams[label_str] = (labels, [])
+            stream[1].append((
+                self._record_nanoseconds(record),
+                json.dumps(self._create_log_line(batch.resource, record)),
+            ))
+        self._buffered_entries += len(batch.records)
+
+        if self._buffered_entries >= self.batch_max_entries:
+            await self.flush()
+        elif self._flush_timer is None or self._flush_timer.done():
+            self._flush_timer = asyncio.create_task(self._flush_after(self.batch_linger))
+
+    async def _flush_after(self, delay: float):
+        """Flush the buffer once the linger time has passed"""
+        await asyncio.sleep(delay)
+        self._flush_timer = None
+        await self.flush()
+
+    def _encode_push(self, streams) -> Tuple[bytes, Dict[str, str]]:
+        """Encode buffered streams as a Loki push body and headers"""
+        if self.use_protobuf:
+            body = encode_push_request((label_str, entries) for label_str, (_, entries) in streams.items())
+            return snappy.compress(body), {"Content-Type": "application/x-protobuf"}
+
+        payload = {
+            "streams": [
+                {"stream": labels, "values": [[str(ts), line] for ts, line in entries]}
+                for labels, entries in streams.values()
+            ]
+        }
+        return _encode_body(json.dumps(payload).encode(), "application/json", self.compress)
+
+    async def flush(self):
+        """Push all buffered streams to Loki in one request"""
+        if self._flush_timer is not None and self._flush_timer is not asyncio.current_task():
+            self._flush_timer.cancel()
+        self._flush_timer = None
+
+        if not self._streams:
+            return
+
+        streams, self._streams = self._streams, {}
+        entry_count, self._buffered_entries = self._buffered_entries, 0
+        started_at, self._buffer_started_at = self._buffer_started_at, None
+
+        LOKI_FLUSH_ENTRIES.observe(entry_count)
+
+        # Check circuit breaker
+        if self.circuit_breaker and not self.circuit_breaker.can_execute():
+            EXPORT_ATTEMPTS.labels(backend="loki", status="circuit_open").inc()
+            logger.warning("Loki flush skipped, circuit breaker open", entries=entry_count)
+            return
+
+        start_time = time.time()
+
+        # Loki rejects out-of-order entries within a stream
+        for _, entries in streams.values():
+            entries.sort(key=lambda entry: entry[0])
+        body, headers = self._encode_push(streams)
+
+        async def _export():
+            response = await self.client.post(self.loki_url, content=body, headers=headers)
+            response.raise_for_status()
+
+        try:
+            await retry_with_backoff(
+                _export,
+                max_retries=settings.export_retry_attempts,
+                initial_delay=settings.export_retry_delay,
+                backend="loki"
+            )
+
+            EXPORT_ATTEMPTS.labels(backend="loki", status="success").inc()
+            if self.circuit_breaker:
+                self.circuit_breaker.record_success()
+                CIRCUIT_BREAKER_STATE.labels(backend="loki").set(self.circuit_breaker.get_state_code())
+            logger.debug("Log batch flushed to Loki", streams=len(streams), entries=entry_count)
+        except Exception as e:
+            EXPORT_ATTEMPTS.labels(backend="loki", status="error").inc()
+            if self.circuit_breaker:
+                self.circuit_breaker.record_failure()
+                CIRCUIT_BREAKER_STATE.labels(backend="loki").set(self.circuit_breaker.get_state_code())
+            logger.error("Failed to flush log batch to Loki", error=str(e), entries=entry_count)
+        finally:
+            EXPORT_DURATION.labels(backend="loki").observe(time.time() - start_time)
+            LOKI_FLUSH_LATENCY.observe(time.time() - started_at)
+
     def _convert_to_loki_streams(self, batch: LogBatch) -> List[Dict[str, Any]]:
         """Convert log batch to Loki streams format"""
         streams_dict = {}
@@ -176,11 +361,17 @@ class LokiExporter:
             if label_str not in streams_dict:
                 streams_dict[label_str] = {"stream": labels, "values": []}
 
-            timestamp_ns = self._to_nanoseconds(record.timestamp)
+            timestamp_ns = self._record_nanoseconds(record)
             streams_dict[label_str]["values"].append([str(timestamp_ns), json.dumps(log_line)])
 
         return list(streams_dict.values())
 
+    def _record_nanoseconds(self, record: LogRecord) -> int:
+        """Record timestamp in unix nanoseconds, from OTLP timeUnixNano when available"""
+        if getattr(record, "time_unix_nano", None):
+            return record.time_unix_nano
+        return self._to_nanoseconds(record.timestamp)
+
     def _create_labels(self, resource, record) -> Dict[str, str]:
         """Create low-cardinality labels for Loki"""
         labels = {"service": resource.service, "env": resource.env}
@@ -211,8 +402,13 @@ class LokiExporter:
         return log_line
 
     def _labels_to_string(self, labels: Dict[str, str]) -> str:
-        """Convert labels dict to Loki label string"""
-        parts = [f'{k}="{v}"' for k, v in sorted(labels.items())]
+        """Convert labels dict to a Loki label string
+
+        Values are escaped like Prometheus label strings, so a quote or
+        backslash in client-supplied values (e.g. trace_id) cannot make Loki
+        reject the whole push.
+        """
+        parts = [f'{k}="{_escape_label_value(v)}"' for k, v in sorted(labels.items())]
         return "{" + ",".join(parts) + "}"
 
     def _to_nanoseconds(self, timestamp_str: str) -> int:
@@ -220,19 +416,38 @@ class LokiExporter:
         try:
             from datetime import datetime
             dt = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-            return int(dt.timestamp() * 1e9)
+            # Integer math keeps the microseconds that float seconds would round away
+            return int(dt.replace(microsecond=0).timestamp()) * 1_000_000_000 + dt.microsecond * 1000
         except Exception:
             # Fallback to current time
-            return int(time.time() * 1e9)
+            return time.time_ns()
 
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Flush buffered entries and close HTTP client"""
+        try:
+            await self.flush()
+        finally:
+            await self.client.aclose()
 
 
 class TempoExporter:
-    """Export traces to Tempo"""
-    def __init__(self, tempo_http_endpoint: str):
+    """Export traces to Tempo
+
+    With ``batching`` enabled, correlation spans, bridge spans and pass-through
+    trace batches are buffered and merged into a single OTLP/protobuf
+    ``ExportTraceServiceRequest``, flushed when ``batch_max_spans`` spans are
+    buffered or the oldest buffered span is ``batch_max_age`` seconds old.
+    Without it, every call is sent as its own request. ``compress`` gzips
+    every request body.
+    """
+    def __init__(
+        self,
+        tempo_http_endpoint: str,
+        batching: bool = False,
+        batch_max_spans: int = 500,
+        batch_max_age: float = 1.0,
+        compress: bool = False,
+    ):
         self.tempo_http_endpoint = tempo_http_endpoint
         self.client = httpx.AsyncClient(timeout=settings.export_timeout)
         self.circuit_breaker = CircuitBreaker(
@@ -240,9 +455,114 @@ class TempoExporter:
             recovery_timeout=settings.circuit_breaker_recovery_timeout
         ) if settings.enable_circuit_breaker else None
 
+        # Span buffer (batching mode)
+        self.batching = batching
+        self.batch_max_spans = batch_max_spans
+        self.batch_max_age = batch_max_age
+        self.compress = compress
+        self._buffer: List[ResourceSpans] = []
+        self._buffered_spans = 0
+        self._buffer_started_at: Optional[float] = None
+        self._flush_timer: Optional[asyncio.Task] = None
+
+    async def _enqueue(self, resource_spans: List[ResourceSpans]):
+        """Add ResourceSpans to the buffer, flushing when it is full"""
+        if not resource_spans:
+            return
+
+        if not self._buffer:
+            self._buffer_started_at = time.time()
+        self._buffer.extend(resource_spans)
+        self._buffered_spans += sum(
+            len(scope_span.spans) for rs in resource_spans for scope_span in rs.scope_spans
+        )
+
+        if self._buffered_spans >= self.batch_max_spans:
+            await self.flush()
+        elif self._flush_timer is None or self._flush_timer.done():
+            self._flush_timer = asyncio.create_task(self._flush_after(self.batch_max_age))
+
+    async def _enqueue_json(self, otlp_trace: Dict[str, Any], kind: str):
+        """Convert an OTLP/JSON document and add it to the buffer"""
+        try:
+            traces_data = otlp_decoder.traces_data_from_json(otlp_trace)
+        except ValueError as e:
+            EXPORT_ATTEMPTS.labels(backend="tempo", status="error").inc()
+            logger.error("Dropping span with invalid IDs", kind=kind, error=str(e))
+            return
+        await self._enqueue(list(traces_data.resource_spans))
+
+    async def _flush_after(self, delay: float):
+        """Flush the buffer once its oldest span reaches max age"""
+        await asyncio.sleep(delay)
+        self._flush_timer = None
+        await self.flush()
+
+    async def flush(self):
+        """Send all buffered spans to Tempo as one protobuf request"""
+        if self._flush_timer is not None and self._flush_timer is not asyncio.current_task():
+            self._flush_timer.cancel()
+        self._flush_timer = None
+
+        if not self._buffer:
+            return
+
+        buffered, self._buffer = self._buffer, []
+        span_count, self._buffered_spans = self._buffered_spans, 0
+        started_at, self._buffer_started_at = self._buffer_started_at, None
+
+        TEMPO_FLUSH_SPANS.observe(span_count)
+
+        # Check circuit breaker
+        if self.circuit_breaker and not self.circuit_breaker.can_execute():
+            EXPORT_ATTEMPTS.labels(backend="tempo", status="circuit_open").inc()
+            logger.warning("Tempo flush skipped, circuit breaker open", spans=span_count)
+            return
+
+        start_time = time.time()
+
+        request = ExportTraceServiceRequest()
+        request.resource_spans.extend(buffered)
+        body, headers = _encode_body(request.SerializeToString(), "application/x-protobuf", self.compress)
+
+        async def _export():
+            response = await self.client.post(
+                f"{self.tempo_http_endpoint}/v1/traces",
+                content=body,
+                headers=headers,
+            )
+            response.raise_for_status()
+
+        try:
+            await retry_with_backoff(
+                _export,
+                max_retries=settings.export_retry_attempts,
+                initial_delay=settings.export_retry_delay,
+                backend="tempo"
+            )
+
+            EXPORT_ATTEMPTS.labels(backend="tempo", status="success").inc()
+            if self.circuit_breaker:
+                self.circuit_breaker.record_success()
+                CIRCUIT_BREAKER_STATE.labels(backend="tempo").set(self.circuit_breaker.get_state_code())
+            logger.debug("Span batch flushed to Tempo", spans=span_count, bytes=len(body))
+        except Exception as e:
+            EXPORT_ATTEMPTS.labels(backend="tempo", status="error").inc()
+            if self.circuit_breaker:
+                self.circuit_breaker.record_failure()
+                CIRCUIT_BREAKER_STATE.labels(backend="tempo").set(self.circuit_breaker.get_state_code())
+            logger.error("Failed to flush span batch to Tempo", error=str(e), spans=span_count)
+        finally:
+            EXPORT_DURATION.labels(backend="tempo").observe(time.time() - start_time)
+            TEMPO_FLUSH_LATENCY.observe(time.time() - started_at)
+
     @profile_function(tags={"backend": "tempo", "operation": "export_correlation_span"})
     async def export_correlation_span(self, correlation: CorrelationEvent):
         """Export a synthetic correlation span to Tempo"""
+        if self.batching:
+            await self._enqueue_json(self._create_otlp_trace(correlation), "correlation")
+            return
+
         start_time = time.time()
 
         try:
@@ -252,8 +572,7 @@ class TempoExporter:
             # Send to Tempo (OTLP HTTP endpoint)
             response = await self.client.post(
                 f"{self.tempo_http_endpoint}/v1/traces",
-                json=otlp_trace,
-                headers={"Content-Type": "application/json"},
+                **_json_request(otlp_trace, self.compress),
             )
             response.raise_for_status()
 
@@ -356,8 +675,20 @@ class TempoExporter:
         }
 
     @profile_function(tags={"backend": "tempo", "operation": "export_traces"})
-    async def export_traces(self, trace_batch: Dict[str, Any]):
-        """Export OTLP traces to Tempo"""
+    async def export_traces(self, trace_batch: Union[Dict[str, Any], TracesData]):
+        """Export OTLP traces to Tempo
+
+        JSON dicts are forwarded as OTLP/JSON; TracesData messages (from the
+        protobuf ingest path) are forwarded as OTLP/protobuf without conversion.
+        In batching mode both are merged into the span buffer instead.
+        """
+        if self.batching:
+            if isinstance(trace_batch, TracesData):
+                await self._enqueue(list(trace_batch.resource_spans))
+            else:
+                await self._enqueue_json(trace_batch, "traces")
+            return
+
         # Check circuit breaker
         if self.circuit_breaker and not self.circuit_breaker.can_execute():
             EXPORT_ATTEMPTS.labels(backend="tempo", status="circuit_open").inc()
@@ -366,11 +697,16 @@ class TempoExporter:
 
         start_time = time.time()
 
+        if isinstance(trace_batch, TracesData):
+            body, headers = _encode_body(trace_batch.SerializeToString(), "application/x-protobuf", self.compress)
+            request_kwargs = {"content": body, "headers": headers}
+        else:
+            request_kwargs = _json_request(trace_batch, self.compress)
+
         async def _export():
             response = await self.client.post(
                 f"{self.tempo_http_endpoint}/v1/traces",
-                json=trace_batch,
-                headers={"Content-Type": "application/json"},
+                **request_kwargs,
             )
             response.raise_for_status()
 
@@ -399,6 +735,10 @@ class TempoExporter:
     @profile_function(tags={"backend": "tempo", "operation": "export_bridge_span"})
     async def export_bridge_span(self, bridge_span: Dict[str, Any]):
         """Export synthetic bridge span to Tempo"""
+        if self.batching:
+            await self._enqueue_json(self._bridge_span_to_otlp(bridge_span), "bridge")
+            return
+
         # Check circuit breaker
         if self.circuit_breaker and not self.circuit_breaker.can_execute():
             EXPORT_ATTEMPTS.labels(backend="tempo", status="circuit_open").inc()
@@ -413,8 +753,7 @@ class TempoExporter:
 
             response = await self.client.post(
                 f"{self.tempo_http_endpoint}/v1/traces",
-                json=otlp_trace,
-                headers={"Content-Type": "application/json"},
+                **_json_request(otlp_trace, self.compress),
             )
             response.raise_for_status()
 
@@ -502,8 +841,11 @@ class TempoExporter:
         }
 
     async def close(self):
-        """Close HTTP client"""
-        await self.client.aclose()
+        """Flush buffered spans and close HTTP client"""
+        try:
+            await self.flush()
+        finally:
+            await self.client.aclose()
 
 
 class DatadogExporter:
@@ -571,7 +913,12 @@ class DatadogExporter:
 
 
 class ExporterManager:
-    """Manages all exporters"""
+    """Manages all exporters
+
+    After ``start()``, every log backend sits behind its own ``BackendQueue``
+    and ``export_logs`` only enqueues; before that (or in tests) it exports to
+    all backends concurrently and waits for them.
+    """
     def __init__(
         self,
         loki_url: str,
@@ -580,19 +927,63 @@ class ExporterManager:
         datadog_api_key: Optional[str] = None,
         datadog_site: str = "datadoghq.com",
     ):
-        self.loki = LokiExporter(loki_url)
-        self.tempo = TempoExporter(tempo_http_endpoint)
+        self.loki = LokiExporter(
+            loki_url,
+            batching=settings.loki_batch_enabled,
+            batch_linger=settings.loki_batch_linger_seconds,
+            batch_max_entries=settings.loki_batch_max_entries,
+            encoding=settings.loki_push_encoding,
+            compress=settings.loki_push_gzip,
+        )
+        self.tempo = TempoExporter(
+            tempo_http_endpoint,
+            batching=settings.tempo_batch_enabled,
+            batch_max_spans=settings.tempo_batch_max_spans,
+            batch_max_age=settings.tempo_batch_max_age_seconds,
+            compress=settings.tempo_batch_gzip,
+        )
         self.datadog = DatadogExporter(datadog_api_key, datadog_site)
+        self.log_queues: Dict[str, BackendQueue] = {}
+
+    def start(self):
+        """Put each log backend behind its own queue and export workers"""
+        if self.log_queues:
+            return
+
+        backends = {"loki": (self.loki, settings.loki_overflow_policy)}
+        if self.datadog.enabled:
+            backends["datadog"] = (self.datadog, settings.datadog_overflow_policy)
+
+        for backend, (exporter, overflow) in backends.items():
+            queue = BackendQueue(
+                backend,
+                exporter.export_logs,
+                maxsize=settings.backend_queue_size,
+                workers=settings.backend_queue_workers,
+                overflow=overflow,
+                spill_dir=settings.export_spill_dir,
+                serialize=lambda batch: batch.model_dump_json(),
+                deserialize=LogBatch.model_validate_json,
+            )
+            queue.start()
+            self.log_queues[backend] = queue
+
+        logger.info("Backend export queues started", backends=list(backends))
 
     async def export_logs(self, batch: LogBatch):
         """Export logs to all configured backends"""
-        # Export to Loki (primary)
-        await self.loki.export_logs(batch)
+        if self.log_queues:
+            for queue in self.log_queues.values():
+                await queue.enqueue(batch)
+            return
 
-        # Export to Datadog (optional)
-        await self.datadog.export_logs(batch)
+        # Loki (primary) and Datadog (optional) concurrently
+        await asyncio.gather(
+            self.loki.export_logs(batch),
+            self.datadog.export_logs(batch),
+        )
 
-    async def export_traces(self, trace_batch: Dict[str, Any]):
+    async def export_traces(self, trace_batch: Union[Dict[str, Any], TracesData]):
         """Export traces to Tempo"""
         await self.tempo.export_traces(trace_batch)
 
@@ -608,6 +999,15 @@ class ExporterManager:
         """Close all exporters with proper error handling"""
         errors = []
 
+        # Drain backend queues before their exporters flush and close
+        for backend, queue in self.log_queues.items():
+            try:
+                await queue.stop(timeout=settings.backend_queue_drain_seconds)
+            except Exception as e:
+                errors.append(f"{backend} queue stop error: {e}")
+                logger.error("Failed to stop backend queue", backend=backend, error=str(e))
+        self.log_queues = {}
+
         # Attempt to close all exporters even if some fail
         try:
             await self.loki.close()
@@ -0,0 +1,359 @@
+"""Durable write-ahead spool for ingestion batches
+
+``IngestSpool`` sits between the ingest routes and the correlator's consumer
+workers. Batches are appended to an on-disk segment log instead of an
+in-memory queue, so a burst larger than RAM waits on disk rather than being
+dropped, and a restart replays everything not yet processed.
+
+Layout under ``<directory>/<name>/``:
+
+- ``<index>.seg``: fixed-size, preallocated segment files written and read
+  through ``mmap``. Records are ``[u32 length][u32 crc32][payload]``; the
+  zero-filled tail marks the end of a segment.
+- ``consumer.offset``: the committed consumer offset. Offsets are global
+  byte positions (``index * segment_bytes + position``).
+
+Producers on the event loop ``await put()``: serialization, the copy into
+the mapping and any flush run on the spool's writer thread, which also writes
+the committed offset, so disk I/O never blocks the loop. ``append()`` is the
+same write done inline, for callers outside the loop.
+
+Consumers take records with ``get()`` and ``ack()`` them once processed.
+Several workers may finish out of order, so the committed offset is the
+low-water mark of acknowledged records. Delivery is at-least-once: records
+acknowledged after the last commit write are replayed after a crash.
+Segments wholly below the committed offset are deleted.
+
+fsync policy:
+
+- ``always``: flush the mapping after every append and persist every commit
+- ``interval``: flush and persist at most every ``fsync_interval`` seconds
+- ``never``: leave write-back to the OS (flushed on close)
+"""
+import asyncio
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple, Union
+
+import structlog
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+from prometheus_client import Gauge
+
+from app.models import LogBatch
+
+logger = structlog.get_logger()
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+RECORD_HEADER = struct.Struct("<II")  # payload length, crc32
+OFFSET_FILE = "consumer.offset"
+
+# Metrics
+INGEST_SPOOL_BYTES = Gauge(
+    'ingest_spool_backlog_bytes',
+    'Bytes appended to the ingest spool but not yet committed by consumers',
+    ['stream']
+)
+
+
+class SpoolFull(Exception):
+    """The spool reached its configured size limit"""
+
+
+class _Segment:
+    """One preallocated, memory-mapped segment file"""
+
+    __slots__ = ("index", "path", "fd", "map", "write_pos")
+
+    def __init__(self, index: int, path: Path, size: int):
+        self.index = index
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.map = mmap.mmap(self.fd, size)
+        self.write_pos = self._scan()
+
+    def _scan(self) -> int:
+        """End of the last intact record (a torn tail write is discarded)"""
+        pos = 0
+        while pos + RECORD_HEADER.size <= len(self.map):
+            length, crc = RECORD_HEADER.unpack_from(self.map, pos)
+            end = pos + RECORD_HEADER.size + length
+            if length == 0 or end > len(self.map):
+                break
+            if zlib.crc32(self.map[pos + RECORD_HEADER.size:end]) != crc:
+                logger.warning("Ingest spool record corrupt, truncating", segment=str(self.path), position=pos)
+                break
+            pos = end
+        # Zero the tail so a torn record cannot be mistaken for data later
+        self.map[pos:pos + RECORD_HEADER.size] = bytes(min(RECORD_HEADER.size, len(self.map) - pos))
+        return pos
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+        os.close(self.fd)
+
+
+class IngestSpool:
+    """Append-only segment log with committed consumer offsets"""
+
+    def __init__(
+        self,
+        name: str,
+        directory: str,
+        serialize: Callable[[Any], bytes],
+        deserialize: Callable[[bytes], Any],
+        segment_bytes: int = 64 * 1024 * 1024,
+        max_bytes: int = 4 * 1024 * 1024 * 1024,
+        fsync: str = "interval",
+        fsync_interval: float = 1.0,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync!r}, expected one of {FSYNC_POLICIES}")
+
+        self.name = name
+        self.path = Path(directory) / name
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+
+        self._committed = self._read_committed()
+        self._segments: Dict[int, _Segment] = {}
+        # The writer thread adds segments on rollover while ack() drops consumed ones
+        self._segments_lock = threading.Lock()
+        for seg_path in sorted(self.path.glob("*.seg")):
+            index = int(seg_path.stem)
+            if (index + 1) * segment_bytes <= self._committed:
+                seg_path.unlink()  # fully consumed before the last shutdown
+            else:
+                self._segments[index] = _Segment(index, seg_path, segment_bytes)
+        if not self._segments:
+            index = self._committed // segment_bytes
+            self._segments[index] = self._open_segment(index)
+
+        first = min(self._segments)
+        self._committed = max(self._committed, first * segment_bytes)
+        self._read_offset = self._committed
+        self._active = self._segments[max(self._segments)]
+
+        # Offsets handed to consumers, in read order, and those acknowledged
+        self._inflight: deque = deque()
+        self._acked = set()
+        self._unread = self._count_records(self._read_offset)
+        self._data_ready = asyncio.Event()
+        self._last_flush = time.monotonic()
+        self._last_commit_write = time.monotonic()
+        # Appends and commit writes from put()/ack(), in submission order
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"spool-{name}")
+        self._update_backlog()
+
+        if self.backlog_bytes:
+            logger.info("Replaying ingest spool", stream=name, backlog_bytes=self.backlog_bytes)
+
+    @property
+    def write_offset(self) -> int:
+        return self._active.index * self.segment_bytes + self._active.write_pos
+
+    @property
+    def backlog_bytes(self) -> int:
+        """Bytes appended but not yet committed"""
+        return self.write_offset - self._committed
+
+    @property
+    def depth(self) -> int:
+        """Records appended and not yet taken by a consumer"""
+        return self._unread
+
+    def _count_records(self, offset: int) -> int:
+        """Records between ``offset`` and the write offset"""
+        count = 0
+        for index in sorted(self._segments):
+            segment = self._segments[index]
+            pos = max(offset - index * self.segment_bytes, 0)
+            while pos < segment.write_pos:
+                length, _ = RECORD_HEADER.unpack_from(segment.map, pos)
+                pos += RECORD_HEADER.size + length
+                count += 1
+        return count
+
+    def _open_segment(self, index: int) -> _Segment:
+        return _Segment(index, self.path / f"{index:010d}.seg", self.segment_bytes)
+
+    def _read_committed(self) -> int:
+        try:
+            return int((self.path / OFFSET_FILE).read_text().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_committed(self, committed: int):
+        tmp = self.path / f"{OFFSET_FILE}.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(committed))
+            if self.fsync != "never":
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, self.path / OFFSET_FILE)
+
+    def _update_backlog(self):
+        INGEST_SPOOL_BYTES.labels(stream=self.name).set(self.backlog_bytes)
+
+    async def put(self, item: Any):
+        """Write one item durably (per the fsync policy) on the writer thread
+
+        Raises:
+            SpoolFull: the unconsumed backlog would exceed ``max_bytes``
+            ValueError: the serialized item does not fit in a segment
+        """
+        await asyncio.get_running_loop().run_in_executor(self._writer, self._write, item)
+        self._appended()
+
+    def append(self, item: Any):
+        """Write one item durably (per the fsync policy) in the calling thread
+
+        Raises the same errors as ``put()``.
+        """
+        self._writer.submit(self._write, item).result()
+        self._appended()
+
+    def _appended(self):
+        self._unread += 1
+        self._update_backlog()
+        self._data_ready.set()
+
+    def _write(self, item: Any):
+        """Serialize and append one record (writer thread)"""
+        payload = self.serialize(item)
+        size = RECORD_HEADER.size + len(payload)
+        if size > self.segment_bytes:
+            raise ValueError(f"Spool record of {size} bytes exceeds segment size {self.segment_bytes}")
+        if self.backlog_bytes + size > self.max_bytes:
+            raise SpoolFull(f"{self.name} spool backlog at {self.backlog_bytes} bytes")
+
+        segment = self._active
+        if segment.write_pos + size > self.segment_bytes:
+            segment.map.flush()
+            index = segment.index + 1
+            new_segment = self._open_segment(index)
+            with self._segments_lock:
+                self._segments[index] = new_segment
+                self._active = new_segment  # only once readers can find it in _segments
+            segment = new_segment
+
+        pos = segment.write_pos
+        RECORD_HEADER.pack_into(segment.map, pos, len(payload), zlib.crc32(payload))
+        segment.map[pos + RECORD_HEADER.size:pos + size] = payload
+        segment.write_pos = pos + size  # published to readers after the payload is in place
+
+        now = time.monotonic()
+        if self.fsync == "always" or (self.fsync == "interval" and now - self._last_flush >= self.fsync_interval):
+            segment.map.flush()
+            self._last_flush = now
+
+    def _read_next(self) -> Tuple[int, bytes]:
+        """Next record after the read offset; caller checks one exists"""
+        while True:
+            index, pos = divmod(self._read_offset, self.segment_bytes)
+            segment = self._segments[index]
+            if pos >= segment.write_pos:
+                # End of a sealed segment: continue at the next one
+                self._read_offset = (index + 1) * self.segment_bytes
+                continue
+            length, _ = RECORD_HEADER.unpack_from(segment.map, pos)
+            start = pos + RECORD_HEADER.size
+            self._read_offset += RECORD_HEADER.size + length
+            return self._read_offset, bytes(segment.map[start:start + length])
+
+    async def get(self) -> Tuple[int, Any]:
+        """Wait for the next unread item; returns ``(token, item)`` for ack()"""
+        while True:
+            while self._read_offset >= self.write_offset:
+                self._data_ready.clear()
+                await self._data_ready.wait()
+
+            token, payload = self._read_next()
+            self._inflight.append(token)
+            self._unread -= 1
+            try:
+                return token, self.deserialize(payload)
+            except Exception as e:
+                logger.error("Dropping undecodable ingest spool record", stream=self.name, error=str(e))
+                self.ack(token)
+
+    def ack(self, token: int):
+        """Mark an item processed; advances the committed offset when contiguous"""
+        self._acked.add(token)
+        advanced = False
+        while self._inflight and self._inflight[0] in self._acked:
+            self._committed = self._inflight.popleft()
+            self._acked.discard(self._committed)
+            advanced = True
+        if not advanced:
+            return
+
+        # Drop segments that are entirely consumed; the active one stays for the writer
+        with self._segments_lock:
+            consumed = [
+                self._segments.pop(index)
+                for index in list(self._segments)
+                if (index + 1) * self.segment_bytes <= self._committed and index < self._active.index
+            ]
+        for segment in consumed:
+            segment.close()
+            segment.path.unlink()
+
+        if self.fsync == "always" or time.monotonic() - self._last_commit_write >= self.fsync_interval:
+            self._last_commit_write = time.monotonic()
+            self._writer.submit(self._write_committed, self._committed)
+        self._update_backlog()
+
+    def close(self):
+        """Finish pending writes, flush segments and persist the committed offset"""
+        self._writer.shutdown(wait=True)
+        self._write_committed(self._committed)
+        for segment in self._segments.values():
+            segment.close()
+        self._segments.clear()
+
+
+# ----------------------------------------------------------------------
+# Payload codecs for the engine's log and trace spools
+# ----------------------------------------------------------------------
+
+TRACES_PROTOBUF = b"P"
+TRACES_JSON = b"J"
+
+
+def encode_log_batch(batch: LogBatch) -> bytes:
+    return batch.model_dump_json().encode()
+
+
+def decode_log_batch(payload: bytes) -> LogBatch:
+    return LogBatch.model_validate_json(payload)
+
+
+def encode_trace_batch(trace_batch: Union[Dict[str, Any], TracesData]) -> bytes:
+    if isinstance(trace_batch, TracesData):
+        return TRACES_PROTOBUF + trace_batch.SerializeToString()
+    return TRACES_JSON + json.dumps(trace_batch).encode()
+
+
+def decode_trace_batch(payload: bytes) -> Union[Dict[str, Any], TracesData]:
+    if payload[:1] == TRACES_PROTOBUF:
+        data = TracesData()
+        data.ParseFromString(payload[1:])
+        return data
+    return json.loads(payload[1:])
@@ -0,0 +1,68 @@
+"""Loki push protobuf encoding
+
+Encodes Loki's ``logproto.PushRequest`` directly in protobuf wire format, so
+the push path does not need generated Loki protobuf modules::
+
+    message PushRequest   { repeated StreamAdapter streams = 1; }
+    message StreamAdapter { string labels = 1; repeated EntryAdapter entries = 2; }
+    message EntryAdapter  { google.protobuf.Timestamp timestamp = 1; string line = 2; }
+    message Timestamp     { int64 seconds = 1; int32 nanos = 2; }
+
+Loki expects the encoded request to be snappy (block format) compressed.
+"""
+from typing import Iterable, Tuple
+
+# Field tags: (field_number << 3) | wire_type
+_TAG_FIELD1_LEN = 0x0A
+_TAG_FIELD2_LEN = 0x12
+_TAG_FIELD1_VARINT = 0x08
+_TAG_FIELD2_VARINT = 0x10
+
+
+def _varint(value: int) -> bytes:
+    """Encode a non-negative int as a protobuf varint"""
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _length_delimited(tag: int, payload: bytes) -> bytes:
+    return bytes((tag,)) + _varint(len(payload)) + payload
+
+
+def _timestamp(timestamp_ns: int) -> bytes:
+    """Encode a google.protobuf.Timestamp from unix nanoseconds"""
+    seconds, nanos = divmod(timestamp_ns, 1_000_000_000)
+    out = b""
+    if seconds:
+        out += bytes((_TAG_FIELD1_VARINT,)) + _varint(seconds)
+    if nanos:
+        out += bytes((_TAG_FIELD2_VARINT,)) + _varint(nanos)
+    return out
+
+
+def encode_push_request(streams: Iterable[Tuple[str, Iterable[Tuple[int, str]]]]) -> bytes:
+    """
+    Encode a Loki PushRequest
+
+    Args:
+        streams: (label string, [(timestamp_ns, line), ...]) per stream, where
+            the label string is in Loki selector form: ``{env="dev",service="x"}``
+
+    Returns:
+        Serialized (uncompressed) PushRequest
+    """
+    request = bytearray()
+
+    for labels, entries in streams:
+        stream = bytearray(_length_delimited(_TAG_FIELD1_LEN, labels.encode()))
+        for timestamp_ns, line in entries:
+            entry = _length_delimited(_TAG_FIELD1_LEN, _timestamp(timestamp_ns))
+            entry += _length_delimited(_TAG_FIELD2_LEN, line.encode())
+            stream += _length_delimited(_TAG_FIELD2_LEN, entry)
+        request += _length_delimited(_TAG_FIELD1_LEN, bytes(stream))
+
+    return bytes(request)
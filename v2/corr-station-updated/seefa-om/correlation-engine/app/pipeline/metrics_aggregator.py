@@ -0,0 +1,177 @@
+"""Correlation-aware aggregation of OTLP metrics
+
+The gateway's metrics pipeline pushes OTLP metrics to ``/api/otlp/v1/metrics``.
+The engine does not store or forward them; each data point is folded into
+Prometheus series keyed by service and circuit_id, exposed on ``/metrics``:
+
+- ``otlp_metric_points_total{service, type}``: data points received
+- ``circuit_requests_total{service, circuit_id}``: requests, from the count
+  of request-duration histograms (``DURATION_METRICS``)
+- ``circuit_request_errors_total{service, circuit_id}``: requests with a 5xx
+  status code or an ``error.type`` attribute
+- ``circuit_request_duration_seconds_total{service, circuit_id}``: summed
+  request duration; divided by requests it gives the mean latency
+
+circuit_id is read from the data point attributes, then from the resource
+attributes; points without one are aggregated under ``circuit_id="none"``.
+Only the first ``max_circuits`` distinct circuit ids get their own series,
+later ones fall under ``"other"``, so a flood of new circuits cannot blow up
+the exposition.
+
+Cumulative histograms (the OTel SDK default) are turned into increments
+against the previous point of the same stream. Streams are tracked in an LRU
+of ``max_streams`` entries. A point with a new start time or a lower count
+is a counter reset and counts in full. The first point of an unknown stream
+counts in full only if the stream started after this aggregator, otherwise
+it just sets the baseline (so a restart does not replay lifetime totals).
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import structlog
+from opentelemetry.proto.metrics.v1.metrics_pb2 import AGGREGATION_TEMPORALITY_CUMULATIVE, MetricsData
+from prometheus_client import Counter
+
+logger = structlog.get_logger()
+
+# Request-duration histograms that carry RED data (OTel semantic conventions)
+DURATION_METRICS = frozenset({
+    "http.server.request.duration",
+    "http.server.duration",
+    "rpc.server.duration",
+})
+UNIT_SECONDS = {"s": 1.0, "ms": 1e-3, "us": 1e-6, "ns": 1e-9}
+STATUS_CODE_ATTRIBUTES = ("http.response.status_code", "http.status_code")
+
+OTHER_CIRCUIT = "other"
+NO_CIRCUIT = "none"
+
+# Metrics
+OTLP_METRIC_POINTS = Counter(
+    'otlp_metric_points_total',
+    'OTLP metric data points received',
+    ['service', 'type']
+)
+CIRCUIT_REQUESTS = Counter(
+    'circuit_requests_total',
+    'Requests per circuit, aggregated from OTLP request-duration histograms',
+    ['service', 'circuit_id']
+)
+CIRCUIT_ERRORS = Counter(
+    'circuit_request_errors_total',
+    'Failed requests per circuit (5xx status or error.type)',
+    ['service', 'circuit_id']
+)
+CIRCUIT_DURATION = Counter(
+    'circuit_request_duration_seconds',
+    'Summed request duration per circuit',
+    ['service', 'circuit_id']
+)
+CIRCUIT_OVERFLOW = Counter(
+    'otlp_metrics_circuit_overflow_total',
+    'Data points aggregated under circuit_id="other" after the circuit cap was reached'
+)
+
+
+def _attributes(key_values) -> Dict[str, Any]:
+    """Scalar KeyValue attributes from a protobuf repeated field"""
+    result = {}
+    for kv in key_values:
+        kind = kv.value.WhichOneof("value")
+        if kind in ("string_value", "int_value", "bool_value", "double_value"):
+            result[kv.key] = getattr(kv.value, kind)
+    return result
+
+
+def _is_error(attributes: Dict[str, Any]) -> bool:
+    if attributes.get("error.type"):
+        return True
+    for key in STATUS_CODE_ATTRIBUTES:
+        if key in attributes:
+            try:
+                return int(attributes[key]) >= 500
+            except (TypeError, ValueError):
+                return False
+    return False
+
+
+class MetricsAggregator:
+    """Folds OTLP metrics into per-service, per-circuit Prometheus series"""
+
+    def __init__(self, max_circuits: int = 5000, max_streams: int = 100000):
+        self.max_circuits = max_circuits
+        self.max_streams = max_streams
+        self.started_at_ns = time.time_ns()
+        self._circuits = set()
+        # (resource, metric, point attributes) -> (start_time_unix_nano, count, sum)
+        self._streams: "OrderedDict[Tuple, Tuple[int, int, float]]" = OrderedDict()
+
+    def add(self, metrics_data: MetricsData) -> int:
+        """Aggregate one MetricsData message; returns its data point count"""
+        total_points = 0
+        for resource_metrics in metrics_data.resource_metrics:
+            resource_attrs = _attributes(resource_metrics.resource.attributes)
+            service = str(resource_attrs.get("service.name", "unknown"))
+            resource_key = tuple(sorted(resource_attrs.items()))
+
+            for scope_metrics in resource_metrics.scope_metrics:
+                for metric in scope_metrics.metrics:
+                    kind = metric.WhichOneof("data")
+                    if kind is None:
+                        continue
+                    data = getattr(metric, kind)
+                    total_points += len(data.data_points)
+                    OTLP_METRIC_POINTS.labels(service=service, type=kind).inc(len(data.data_points))
+
+                    if metric.name not in DURATION_METRICS or kind not in ("histogram", "exponential_histogram"):
+                        continue
+                    scale = UNIT_SECONDS.get(metric.unit, 1.0)
+                    cumulative = data.aggregation_temporality == AGGREGATION_TEMPORALITY_CUMULATIVE
+                    for point in data.data_points:
+                        self._add_request_point(
+                            service, resource_key, resource_attrs, metric.name, point, scale, cumulative
+                        )
+        return total_points
+
+    def _add_request_point(self, service, resource_key, resource_attrs, name, point, scale, cumulative):
+        attrs = _attributes(point.attributes)
+        count, duration = point.count, point.sum
+        if cumulative:
+            key = (resource_key, name, tuple(sorted(attrs.items())))
+            count, duration = self._increment(key, point.start_time_unix_nano, count, duration)
+        if count <= 0:
+            return
+
+        circuit_id = self._circuit_label(attrs.get("circuit_id") or resource_attrs.get("circuit_id"))
+        CIRCUIT_REQUESTS.labels(service=service, circuit_id=circuit_id).inc(count)
+        if _is_error(attrs):
+            CIRCUIT_ERRORS.labels(service=service, circuit_id=circuit_id).inc(count)
+        CIRCUIT_DURATION.labels(service=service, circuit_id=circuit_id).inc(max(duration * scale, 0.0))
+
+    def _increment(self, key: Tuple, start: int, count: int, duration: float) -> Tuple[int, float]:
+        """Delta of a cumulative point against the stream's previous point"""
+        previous = self._streams.pop(key, None)
+        self._streams[key] = (start, count, duration)
+        if len(self._streams) > self.max_streams:
+            self._streams.popitem(last=False)
+
+        if previous is None:
+            return (count, duration) if start >= self.started_at_ns else (0, 0.0)
+        previous_start, previous_count, previous_duration = previous
+        if start != previous_start or count < previous_count:
+            return count, duration  # counter reset
+        return count - previous_count, duration - previous_duration
+
+    def _circuit_label(self, circuit_id: Optional[Any]) -> str:
+        """circuit_id label value, capped at ``max_circuits`` distinct ids"""
+        if not circuit_id:
+            return NO_CIRCUIT
+        circuit_id = str(circuit_id)
+        if circuit_id in self._circuits:
+            return circuit_id
+        if len(self._circuits) < self.max_circuits:
+            self._circuits.add(circuit_id)
+            return circuit_id
+        CIRCUIT_OVERFLOW.inc()
+        return OTHER_CIRCUIT
@@ -5,10 +5,15 @@ from datetime import datetime, timezone
 import structlog
 
 from app.models import LogBatch, LogRecord
-from app.mdso_patterns import MDSOPatterns, ErrorCategorizer
+from app.mdso_patterns import MDSOPatterns, ErrorCategorizer, MDSOExtractor
 
 logger = structlog.get_logger()
 
+# Identifier fields the normalizer enriches log records with
+MDSO_ENRICHMENT_FIELDS = (
+    "circuit_id", "resource_id", "fqdn", "service_type", "product_type", "orch_state", "error_code",
+)
+
 
 class LogNormalizer:
     """Normalizes logs from various sources into a common format"""
@@ -38,6 +43,7 @@ class LogNormalizer:
         # MDSO pattern extractors
         self.mdso_patterns = MDSOPatterns()
         self.error_categorizer = ErrorCategorizer()
+        self.mdso_extractor = MDSOExtractor()
 
     def normalize_log_batch(self, batch: LogBatch) -> List[Dict[str, Any]]:
         """Normalize a log batch to internal format"""
@@ -65,8 +71,10 @@ class LogNormalizer:
         # Add trace context if present
         if record.trace_id:
             normalized["trace_id"] = record.trace_id
-        elif self._extract_trace_id_from_message(record.message):
-            normalized["trace_id"] = self._extract_trace_id_from_message(record.message)
+        else:
+            trace_id = self._extract_trace_id_from_message(record.message)
+            if trace_id:
+                normalized["trace_id"] = trace_id
 
         if record.span_id:
             normalized["span_id"] = record.span_id
@@ -102,47 +110,34 @@ class LogNormalizer:
         """
         enrichment = {}
 
+        # One pass over the message for every field; error categorization only for error severities
+        is_error = existing.get("severity") in ["ERROR", "FATAL", "CRITICAL"]
+        extracted = self.mdso_extractor.extract(message, fields=MDSO_ENRICHMENT_FIELDS, categorize=is_error)
+
         # Only extract if not already present in existing record
-        if not existing.get("circuit_id"):
-            circuit_id = self.mdso_patterns.extract_circuit_id(message)
-            if circuit_id:
-                enrichment["circuit_id"] = circuit_id
+        if not existing.get("circuit_id") and extracted["circuit_id"]:
+            enrichment["circuit_id"] = extracted["circuit_id"]
 
-        if not existing.get("resource_id"):
-            resource_id = self.mdso_patterns.extract_resource_id(message)
-            if resource_id:
-                enrichment["resource_id"] = resource_id
+        if not existing.get("resource_id") and extracted["resource_id"]:
+            enrichment["resource_id"] = extracted["resource_id"]
 
         # Always extract additional MDSO fields (may not be in OTLP attributes)
-        fqdn = self.mdso_patterns.extract_fqdn(message)
+        fqdn = extracted["fqdn"]
         if fqdn:
             enrichment["fqdn"] = fqdn
             # Extract TID from FQDN (first 10 chars)
             enrichment["tid"] = fqdn[:10] if len(fqdn) >= 10 else None
 
-        service_type = self.mdso_patterns.extract_service_type(message)
-        if service_type:
-            enrichment["service_type"] = service_type
-
-        product_type = self.mdso_patterns.extract_product_type(message)
-        if product_type:
-            enrichment["product_type"] = product_type
-
-        orch_state = self.mdso_patterns.extract_orch_state(message)
-        if orch_state:
-            enrichment["orch_state"] = orch_state
-
-        error_code = self.mdso_patterns.extract_error_code(message)
-        if error_code:
-            enrichment["error_code"] = error_code
+        for field in ("service_type", "product_type", "orch_state", "error_code"):
+            if extracted[field]:
+                enrichment[field] = extracted[field]
 
         # Categorize errors if severity indicates error
-        if existing.get("severity") in ["ERROR", "FATAL", "CRITICAL"]:
-            error_context = self.error_categorizer.categorize(message)
-            enrichment["error_category"] = error_context.get("category")
-            enrichment["error_type"] = error_context.get("type")
+        if is_error:
+            enrichment["error_category"] = extracted.get("category")
+            enrichment["error_type"] = extracted.get("type")
             # Don't override severity from categorizer unless it's higher priority
-            categorized_severity = error_context.get("severity")
+            categorized_severity = extracted.get("severity")
             if categorized_severity == "CRITICAL" and existing.get("severity") != "FATAL":
                 enrichment["severity"] = "FATAL"
 
@@ -0,0 +1,141 @@
+"""Off-loop log normalization - runs LogNormalizer in a worker pool
+
+Regex enrichment in ``LogNormalizer`` (trace-id scan, MDSO field extraction,
+error categorization) is CPU bound and otherwise runs on the event loop
+thread, where it competes with HTTP ingestion. ``NormalizerPool`` splits a
+``LogBatch`` into chunks, normalizes them in a ``ProcessPoolExecutor`` (or a
+``ThreadPoolExecutor`` on free-threaded builds, where threads run in
+parallel), and reassembles the results in record order.
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+from prometheus_client import Counter, Histogram
+
+from app.models import LogBatch, LogRecord
+from app.pipeline.normalizer import LogNormalizer
+
+# Metrics
+NORMALIZE_WORKER_DURATION = Histogram(
+    'normalizer_pool_chunk_duration_seconds',
+    'Time a pool worker spent normalizing one chunk',
+    ['worker']
+)
+NORMALIZE_WORKER_RECORDS = Counter(
+    'normalizer_pool_records_total',
+    'Log records normalized by each pool worker',
+    ['worker']
+)
+
+logger = structlog.get_logger()
+
+# One LogNormalizer per worker process/thread, created on first use
+_worker_state = threading.local()
+
+
+def _worker_id() -> str:
+    """Stable identifier for the current pool worker"""
+    return f"{os.getpid()}-{threading.get_ident()}"
+
+
+def _normalize_chunk(
+    resource: Dict[str, Any], records: List[LogRecord]
+) -> Tuple[List[Dict[str, Any]], str, float]:
+    """Normalize a chunk of records inside a pool worker
+
+    Returns the normalized records plus the worker id and elapsed time, so the
+    parent process can record per-worker metrics.
+    """
+    start = time.perf_counter()
+
+    normalizer = getattr(_worker_state, "normalizer", None)
+    if normalizer is None:
+        normalizer = LogNormalizer()
+        _worker_state.normalizer = normalizer
+
+    normalized = [normalizer._normalize_log_record(resource, record) for record in records]
+    return normalized, _worker_id(), time.perf_counter() - start
+
+
+def is_free_threaded() -> bool:
+    """True when running on a free-threaded (no-GIL) CPython build"""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+class NormalizerPool:
+    """Normalizes log batches in a worker pool, preserving record order"""
+
+    def __init__(self, workers: int = 4, chunk_size: int = 500, executor: str = "auto"):
+        """
+        Args:
+            workers: Number of pool workers
+            chunk_size: Max records shipped to a worker per task
+            executor: "process", "thread", or "auto" (threads on free-threaded
+                builds, processes otherwise)
+        """
+        if executor == "auto":
+            executor = "thread" if is_free_threaded() else "process"
+        if executor not in ("process", "thread"):
+            raise ValueError(f"Unknown normalizer pool executor: {executor}")
+
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self.executor_type = executor
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        """Create the executor on first use"""
+        if self._executor is None:
+            if self.executor_type == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="normalizer"
+                )
+            else:
+                # spawn: never fork a process that has a running event loop and threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            logger.info("Normalizer pool started", executor=self.executor_type, workers=self.workers)
+        return self._executor
+
+    async def normalize_log_batch(self, batch: LogBatch) -> List[Dict[str, Any]]:
+        """Normalize a log batch off the event loop
+
+        Results are returned in the same order as ``batch.records``.
+        """
+        records = batch.records
+        if not records:
+            return []
+
+        resource = batch.resource.model_dump()
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+
+        chunks = await asyncio.gather(*[
+            loop.run_in_executor(
+                executor, _normalize_chunk, resource, records[i:i + self.chunk_size]
+            )
+            for i in range(0, len(records), self.chunk_size)
+        ])
+
+        normalized = []
+        for chunk, worker, elapsed in chunks:
+            NORMALIZE_WORKER_DURATION.labels(worker=worker).observe(elapsed)
+            NORMALIZE_WORKER_RECORDS.labels(worker=worker).inc(len(chunk))
+            normalized.extend(chunk)
+
+        return normalized
+
+    def shutdown(self):
+        """Shut down the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
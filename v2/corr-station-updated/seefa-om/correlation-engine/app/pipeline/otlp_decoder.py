@@ -0,0 +1,353 @@
+"""OTLP decoding - converts OTLP logs/traces into internal models
+
+Two decode paths are provided for each signal:
+
+- ``*_from_json``: walks the OTLP/JSON dict structure (camelCase keys, hex IDs)
+- ``*_from_proto``: reads ``LogsData``/``TracesData`` messages directly,
+  without a ``MessageToDict`` round trip. Trace and span IDs are read as raw
+  bytes and only hex-encoded once a non-empty ID is actually emitted.
+
+Both paths produce identical ``LogBatch`` objects and normalized span dicts.
+
+``traces_data_from_json`` goes the other way for export: it turns an OTLP/JSON
+trace document into a ``TracesData`` message so it can be merged with other
+spans into a single protobuf request. ``metrics_data_from_json`` likewise
+turns OTLP/JSON metrics into a ``MetricsData`` message, so the metrics
+aggregator reads a single representation.
+"""
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from google.protobuf.json_format import MessageToDict, ParseDict
+from opentelemetry.proto.logs.v1.logs_pb2 import LogsData
+from opentelemetry.proto.metrics.v1.metrics_pb2 import MetricsData
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+
+from app.models import LogBatch, LogRecord, ResourceInfo
+
+# OTLP severity numbers that map to a named severity
+SEVERITY_MAP = {
+    1: "TRACE", 5: "DEBUG", 9: "INFO",
+    13: "WARN", 17: "ERROR", 21: "FATAL"
+}
+
+# Span attributes copied onto normalized spans as correlation keys
+SPAN_CORRELATION_KEYS = ("circuit_id", "product_id", "resource_id", "resource_type_id")
+
+# OTLP/JSON metric data fields (JSON name, protobuf field), each holding dataPoints
+METRIC_DATA_FIELDS = (
+    ("gauge", "gauge"),
+    ("sum", "sum"),
+    ("histogram", "histogram"),
+    ("exponentialHistogram", "exponential_histogram"),
+    ("summary", "summary"),
+)
+
+# OTLP/JSON ID fields - hex strings in OTLP/JSON, but base64 to ParseDict
+_ID_FIELDS = ("traceId", "spanId", "parentSpanId")
+
+
+def _unix_nano_to_iso(time_unix_nano: int) -> str:
+    """Convert OTLP unix nanoseconds to ISO-8601, defaulting to now"""
+    if time_unix_nano:
+        return datetime.fromtimestamp(int(time_unix_nano) / 1e9, tz=timezone.utc).isoformat()
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _string_attributes_proto(attributes) -> Dict[str, str]:
+    """Collect string-valued KeyValue attributes from a protobuf repeated field"""
+    result = {}
+    for attr in attributes:
+        if attr.value.WhichOneof("value") == "string_value":
+            result[attr.key] = attr.value.string_value
+    return result
+
+
+def _string_attributes_json(attributes: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Collect string-valued KeyValue attributes from OTLP/JSON"""
+    result = {}
+    for attr in attributes:
+        value = attr.get("value", {})
+        if "stringValue" in value:
+            result[attr.get("key", "")] = value["stringValue"]
+    return result
+
+
+def _resource_info(resource_attrs: Dict[str, str]) -> ResourceInfo:
+    """Build ResourceInfo from resource string attributes"""
+    return ResourceInfo(
+        service=resource_attrs.get("service.name", "unknown"),
+        host=resource_attrs.get("host.name", "unknown"),
+        env=resource_attrs.get("deployment.environment", "dev")
+    )
+
+
+# ============================================
+# Logs
+# ============================================
+
+def log_batches_from_json(data: Dict[str, Any]) -> List[LogBatch]:
+    """Convert an OTLP/JSON logs payload into LogBatches (one per resource)"""
+    batches = []
+
+    for resource_log in data.get("resourceLogs", []):
+        resource_attrs = _string_attributes_json(resource_log.get("resource", {}).get("attributes", []))
+        resource_info = _resource_info(resource_attrs)
+
+        records = []
+        for scope_log in resource_log.get("scopeLogs", []):
+            for log_record in scope_log.get("logRecords", []):
+                body = log_record.get("body", {})
+                message = body.get("stringValue", str(body))
+
+                severity = SEVERITY_MAP.get(log_record.get("severityNumber", 9), "INFO")
+
+                trace_id = log_record.get("traceId", "")
+                if isinstance(trace_id, bytes):
+                    trace_id = trace_id.hex()
+
+                span_id = log_record.get("spanId", "")
+                if isinstance(span_id, bytes):
+                    span_id = span_id.hex()
+
+                log_attrs = _string_attributes_json(log_record.get("attributes", []))
+
+                time_unix_nano = int(log_record.get("timeUnixNano", 0))
+
+                records.append(LogRecord(
+                    timestamp=_unix_nano_to_iso(time_unix_nano),
+                    severity=severity,
+                    message=message,
+                    trace_id=trace_id or None,
+                    span_id=span_id or None,
+                    circuit_id=log_attrs.get("circuit_id"),
+                    product_id=log_attrs.get("product_id"),
+                    resource_id=log_attrs.get("resource_id"),
+                    resource_type_id=log_attrs.get("resource_type_id"),
+                    request_id=log_attrs.get("request_id"),
+                    labels=log_attrs,
+                    time_unix_nano=time_unix_nano or None
+                ))
+
+        if records:
+            batches.append(LogBatch(resource=resource_info, records=records))
+
+    return batches
+
+
+def log_batches_from_proto(logs_data: LogsData) -> List[LogBatch]:
+    """Convert a parsed LogsData message into LogBatches (one per resource)
+
+    Field values come straight from the protobuf message, so records are built
+    with ``model_construct`` and skip pydantic re-validation.
+    """
+    batches = []
+
+    for resource_log in logs_data.resource_logs:
+        resource_info = _resource_info(_string_attributes_proto(resource_log.resource.attributes))
+
+        records = []
+        for scope_log in resource_log.scope_logs:
+            for log_record in scope_log.log_records:
+                body = log_record.body
+                kind = body.WhichOneof("value")
+                if kind == "string_value":
+                    message = body.string_value
+                elif kind is None:
+                    message = "{}"
+                else:
+                    message = str(MessageToDict(body))
+
+                trace_id = log_record.trace_id
+                span_id = log_record.span_id
+                log_attrs = _string_attributes_proto(log_record.attributes)
+
+                records.append(LogRecord.model_construct(
+                    timestamp=_unix_nano_to_iso(log_record.time_unix_nano),
+                    severity=SEVERITY_MAP.get(log_record.severity_number or 9, "INFO"),
+                    message=message,
+                    trace_id=trace_id.hex() if trace_id else None,
+                    span_id=span_id.hex() if span_id else None,
+                    circuit_id=log_attrs.get("circuit_id"),
+                    product_id=log_attrs.get("product_id"),
+                    resource_id=log_attrs.get("resource_id"),
+                    resource_type_id=log_attrs.get("resource_type_id"),
+                    request_id=log_attrs.get("request_id"),
+                    labels=log_attrs,
+                    time_unix_nano=log_record.time_unix_nano or None
+                ))
+
+        if records:
+            batches.append(LogBatch.model_construct(resource=resource_info, records=records))
+
+    return batches
+
+
+# ============================================
+# Traces
+# ============================================
+
+def count_spans(trace_batch) -> int:
+    """Count spans in an OTLP trace payload (JSON dict or TracesData)"""
+    if isinstance(trace_batch, TracesData):
+        return sum(
+            len(scope_span.spans)
+            for resource_span in trace_batch.resource_spans
+            for scope_span in resource_span.scope_spans
+        )
+
+    return sum(
+        len(scope_span.get("spans", []))
+        for resource_span in trace_batch.get("resourceSpans", [])
+        for scope_span in resource_span.get("scopeSpans", [])
+    )
+
+
+def spans_from_json(trace_batch: Dict[str, Any]) -> List[dict]:
+    """Normalize an OTLP/JSON trace payload to internal span dicts"""
+    normalized = []
+
+    for resource_span in trace_batch.get("resourceSpans", []):
+        resource = resource_span.get("resource", {})
+        attributes = {attr["key"]: attr.get("value", {}) for attr in resource.get("attributes", [])}
+
+        service = attributes.get("service.name", {}).get("stringValue", "unknown")
+        env = attributes.get("deployment.environment", {}).get("stringValue", "dev")
+
+        for scope_span in resource_span.get("scopeSpans", []):
+            for span in scope_span.get("spans", []):
+                span_attrs = {attr["key"]: attr.get("value", {}) for attr in span.get("attributes", [])}
+
+                trace_id = span.get("traceId", "")
+                if isinstance(trace_id, bytes):
+                    trace_id = trace_id.hex()
+
+                span_id = span.get("spanId", "")
+                if isinstance(span_id, bytes):
+                    span_id = span_id.hex()
+
+                normalized_span = {
+                    "trace_id": trace_id,
+                    "span_id": span_id,
+                    "service": service,
+                    "env": env,
+                    "name": span.get("name", ""),
+                }
+                for key in SPAN_CORRELATION_KEYS:
+                    normalized_span[key] = span_attrs.get(key, {}).get("stringValue")
+                normalized_span["timestamp"] = _unix_nano_to_iso(span.get("startTimeUnixNano", 0))
+
+                normalized.append(normalized_span)
+
+    return normalized
+
+
+def spans_from_proto(traces_data: TracesData) -> List[dict]:
+    """Normalize a parsed TracesData message to internal span dicts"""
+    normalized = []
+
+    for resource_span in traces_data.resource_spans:
+        resource_attrs = _string_attributes_proto(resource_span.resource.attributes)
+        service = resource_attrs.get("service.name", "unknown")
+        env = resource_attrs.get("deployment.environment", "dev")
+
+        for scope_span in resource_span.scope_spans:
+            for span in scope_span.spans:
+                span_attrs = _string_attributes_proto(span.attributes)
+
+                normalized_span = {
+                    "trace_id": span.trace_id.hex(),
+                    "span_id": span.span_id.hex(),
+                    "service": service,
+                    "env": env,
+                    "name": span.name,
+                }
+                for key in SPAN_CORRELATION_KEYS:
+                    normalized_span[key] = span_attrs.get(key)
+                normalized_span["timestamp"] = _unix_nano_to_iso(span.start_time_unix_nano)
+
+                normalized.append(normalized_span)
+
+    return normalized
+
+
+def _hex_id(value) -> bytes:
+    """Decode an OTLP/JSON hex ID (bytes are passed through)"""
+    if isinstance(value, bytes):
+        return value
+    return bytes.fromhex(value) if value else b""
+
+
+def _without(data: Dict[str, Any], keys) -> Dict[str, Any]:
+    return {k: v for k, v in data.items() if k not in keys}
+
+
+def traces_data_from_json(trace_batch: Dict[str, Any]) -> TracesData:
+    """Convert an OTLP/JSON trace document into a TracesData message
+
+    Raises:
+        ValueError: if a trace/span ID is not valid hex
+    """
+    traces_data = TracesData()
+
+    for resource_span in trace_batch.get("resourceSpans", []):
+        rs = traces_data.resource_spans.add()
+        ParseDict(_without(resource_span, ("scopeSpans",)), rs, ignore_unknown_fields=True)
+
+        for scope_span in resource_span.get("scopeSpans", []):
+            ss = rs.scope_spans.add()
+            ParseDict(_without(scope_span, ("spans",)), ss, ignore_unknown_fields=True)
+
+            for span in scope_span.get("spans", []):
+                sp = ParseDict(_without(span, _ID_FIELDS + ("links",)), ss.spans.add(), ignore_unknown_fields=True)
+                sp.trace_id = _hex_id(span.get("traceId"))
+                sp.span_id = _hex_id(span.get("spanId"))
+                sp.parent_span_id = _hex_id(span.get("parentSpanId"))
+
+                for link in span.get("links", []):
+                    ln = ParseDict(_without(link, _ID_FIELDS), sp.links.add(), ignore_unknown_fields=True)
+                    ln.trace_id = _hex_id(link.get("traceId"))
+                    ln.span_id = _hex_id(link.get("spanId"))
+
+    return traces_data
+
+
+# ============================================
+# Metrics
+# ============================================
+
+def metrics_data_from_json(data: Dict[str, Any]) -> MetricsData:
+    """Convert an OTLP/JSON metrics document into a MetricsData message
+
+    Raises:
+        ValueError: if an exemplar trace/span ID is not valid hex
+    """
+    metrics_data = MetricsData()
+    data_keys = tuple(json_name for json_name, _ in METRIC_DATA_FIELDS)
+
+    for resource_metric in data.get("resourceMetrics", []):
+        rm = metrics_data.resource_metrics.add()
+        ParseDict(_without(resource_metric, ("scopeMetrics",)), rm, ignore_unknown_fields=True)
+
+        for scope_metric in resource_metric.get("scopeMetrics", []):
+            sm = rm.scope_metrics.add()
+            ParseDict(_without(scope_metric, ("metrics",)), sm, ignore_unknown_fields=True)
+
+            for metric in scope_metric.get("metrics", []):
+                m = ParseDict(_without(metric, data_keys), sm.metrics.add(), ignore_unknown_fields=True)
+
+                for json_name, field in METRIC_DATA_FIELDS:
+                    if json_name not in metric:
+                        continue
+                    points = getattr(m, field)
+                    ParseDict(_without(metric[json_name], ("dataPoints",)), points, ignore_unknown_fields=True)
+                    points.SetInParent()
+
+                    for point in metric[json_name].get("dataPoints", []):
+                        dp = ParseDict(_without(point, ("exemplars",)), points.data_points.add(), ignore_unknown_fields=True)
+                        for exemplar in point.get("exemplars", []):
+                            ex = ParseDict(_without(exemplar, ("traceId", "spanId")), dp.exemplars.add(), ignore_unknown_fields=True)
+                            ex.trace_id = _hex_id(exemplar.get("traceId"))
+                            ex.span_id = _hex_id(exemplar.get("spanId"))
+
+    return metrics_data
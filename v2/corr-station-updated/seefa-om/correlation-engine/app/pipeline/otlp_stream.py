@@ -0,0 +1,384 @@
+"""Streaming OTLP request bodies - bounded reads, decompression, incremental decode
+
+``iter_request_body`` reads a request body chunk by chunk, decompresses
+``Content-Encoding: gzip``/``deflate``/``zstd`` on the fly and enforces hard
+caps on both the wire size and the decompressed size. Chunked uploads without
+``Content-Length`` hit the same caps, and a decompression bomb is stopped as
+soon as the decompressed total crosses the limit.
+
+``iter_otlp_parts`` decodes a protobuf ``LogsData``/``TracesData``/
+``MetricsData`` stream without materializing the whole message. The top
+level of each is a repeated, length-delimited ``resource_*`` field, so
+resources are parsed one at a time. A resource larger than ``part_bytes`` is
+descended into: its ``scope_*`` messages are grouped into parts of about
+``part_bytes``, and a single oversized scope is split by record/span/metric.
+Each part is a message of the same type carrying its resource and scope, so
+the existing decoders and exporters handle it unchanged. Peak memory per request is roughly one part
+plus one body chunk. A resource/scope field serialized after the records
+(``schema_url`` in canonical field order) only reaches the parts emitted
+from that point on.
+"""
+import zlib
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, Optional
+
+from google.protobuf.message import DecodeError
+from opentelemetry.proto.logs.v1.logs_pb2 import LogsData, ResourceLogs, ScopeLogs
+from opentelemetry.proto.metrics.v1.metrics_pb2 import MetricsData, ResourceMetrics, ScopeMetrics
+from opentelemetry.proto.trace.v1.trace_pb2 import ResourceSpans, ScopeSpans, TracesData
+from starlette.requests import Request
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Decompressed output produced per step, so one small input cannot inflate unchecked
+DECOMPRESS_STEP_BYTES = 64 * 1024
+# zstd has no output bound per call; feed it small slices instead (RLE blocks
+# expand ~32000x, so a 128-byte slice yields at most ~4MB before the cap check)
+ZSTD_FEED_BYTES = 128
+
+# Protobuf wire types
+_VARINT, _I64, _LEN, _I32 = 0, 1, 2, 5
+
+
+class PayloadTooLarge(ValueError):
+    """Body exceeded its size limit"""
+
+
+class UnsupportedEncoding(ValueError):
+    """Content-Encoding the engine cannot decode"""
+
+
+class BodyDecodeError(ValueError):
+    """Compressed body is corrupt or truncated"""
+
+
+# ============================================
+# Body reading
+# ============================================
+
+class _Identity:
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        yield data
+
+    def flush(self) -> Iterator[bytes]:
+        return iter(())
+
+
+class _Zlib:
+    """gzip or zlib-wrapped deflate (header auto-detected)"""
+
+    def __init__(self):
+        self._obj = zlib.decompressobj(wbits=47)
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        try:
+            while data:
+                out = self._obj.decompress(data, DECOMPRESS_STEP_BYTES)
+                data = self._obj.unconsumed_tail
+                if out:
+                    yield out
+                if self._obj.eof:
+                    return
+        except zlib.error as e:
+            raise BodyDecodeError(f"Invalid compressed body: {e}") from e
+
+    def flush(self) -> Iterator[bytes]:
+        if not self._obj.eof:
+            raise BodyDecodeError("Truncated compressed body")
+        return iter(())
+
+
+class _Zstd:
+    def __init__(self):
+        self._obj = zstandard.ZstdDecompressor().decompressobj()
+        self._done = False
+
+    def decompress(self, data: bytes) -> Iterator[bytes]:
+        try:
+            for i in range(0, len(data), ZSTD_FEED_BYTES):
+                if self._done:
+                    return
+                out = self._obj.decompress(data[i:i + ZSTD_FEED_BYTES])
+                self._done = self._obj.eof
+                if out:
+                    yield out
+        except zstandard.ZstdError as e:
+            raise BodyDecodeError(f"Invalid compressed body: {e}") from e
+
+    def flush(self) -> Iterator[bytes]:
+        if not self._done:
+            raise BodyDecodeError("Truncated compressed body")
+        return iter(())
+
+
+def _decompressor(content_encoding: Optional[str]):
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding == "identity":
+        return _Identity()
+    if encoding in ("gzip", "x-gzip", "deflate"):
+        return _Zlib()
+    if encoding == "zstd" and ZSTD_AVAILABLE:
+        return _Zstd()
+    raise UnsupportedEncoding(f"Unsupported Content-Encoding: {content_encoding}")
+
+
+async def iter_request_body(request: Request, max_bytes: int, max_wire_bytes: int) -> AsyncIterator[bytes]:
+    """Decompressed body chunks, at most ``max_bytes`` in total
+
+    Raises:
+        PayloadTooLarge: more than ``max_wire_bytes`` on the wire or
+            ``max_bytes`` after decompression
+        UnsupportedEncoding: unknown Content-Encoding
+        BodyDecodeError: corrupt or truncated compressed body
+    """
+    decoder = _decompressor(request.headers.get("content-encoding"))
+    wire = size = 0
+
+    async for chunk in request.stream():
+        wire += len(chunk)
+        if wire > max_wire_bytes:
+            raise PayloadTooLarge(f"more than {max_wire_bytes} bytes on the wire")
+        for piece in decoder.decompress(chunk):
+            size += len(piece)
+            if size > max_bytes:
+                raise PayloadTooLarge(f"more than {max_bytes} bytes")
+            yield piece
+
+    for piece in decoder.flush():
+        yield piece
+
+
+async def read_request_body(request: Request, max_bytes: int, max_wire_bytes: int) -> bytes:
+    """Whole decompressed body, enforcing the same limits as iter_request_body"""
+    body = bytearray()
+    async for piece in iter_request_body(request, max_bytes, max_wire_bytes):
+        body += piece
+    return bytes(body)
+
+
+# ============================================
+# Incremental protobuf decoding
+# ============================================
+
+def _varint_bytes(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+class _ByteReader:
+    """Pull reader over an async chunk iterator, tracking the absolute position"""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._buf = bytearray()
+        self._off = 0
+        self._eof = False
+        self.pos = 0
+
+    async def _fill(self, n: int) -> bool:
+        """Buffer at least ``n`` unread bytes; False if the stream ends first"""
+        while len(self._buf) - self._off < n and not self._eof:
+            try:
+                chunk = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                self._eof = True
+                break
+            if self._off:
+                del self._buf[:self._off]
+                self._off = 0
+            self._buf += chunk
+        return len(self._buf) - self._off >= n
+
+    async def at_end(self) -> bool:
+        return not await self._fill(1)
+
+    async def read(self, n: int) -> bytes:
+        if not await self._fill(n):
+            raise DecodeError("Truncated protobuf message")
+        data = bytes(self._buf[self._off:self._off + n])
+        self._off += n
+        self.pos += n
+        return data
+
+    async def varint(self) -> int:
+        await self._fill(10)
+        result = shift = 0
+        for i in range(self._off, min(len(self._buf), self._off + 10)):
+            byte = self._buf[i]
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                self.pos += i + 1 - self._off
+                self._off = i + 1
+                return result
+            shift += 7
+        raise DecodeError("Truncated or invalid varint")
+
+    async def field(self):
+        """(field number, wire type, raw tag bytes) of the next field"""
+        tag = await self.varint()
+        return tag >> 3, tag & 7, _varint_bytes(tag)
+
+    async def raw_value(self, wire_type: int) -> bytes:
+        """Encoded value of a field (length prefix included for LEN)"""
+        if wire_type == _VARINT:
+            return _varint_bytes(await self.varint())
+        if wire_type == _I64:
+            return await self.read(8)
+        if wire_type == _I32:
+            return await self.read(4)
+        if wire_type == _LEN:
+            length = await self.varint()
+            return _varint_bytes(length) + await self.read(length)
+        raise DecodeError(f"Unsupported wire type {wire_type}")
+
+
+@dataclass(frozen=True)
+class _Layout:
+    """One OTLP signal's Data -> Resource* -> Scope* -> items nesting"""
+    data_cls: type
+    resource_cls: type
+    scope_cls: type
+    resources: str
+    scopes: str
+    items: str
+
+
+LOGS = _Layout(LogsData, ResourceLogs, ScopeLogs, "resource_logs", "scope_logs", "log_records")
+TRACES = _Layout(TracesData, ResourceSpans, ScopeSpans, "resource_spans", "scope_spans", "spans")
+METRICS = _Layout(MetricsData, ResourceMetrics, ScopeMetrics, "resource_metrics", "scope_metrics", "metrics")
+
+# Field number of the repeated child at every level: resource_*, scope_*, items
+_CHILD_FIELD = 1
+_SCOPES_FIELD = 2
+_ITEMS_FIELD = 2
+
+
+class _PartBuilder:
+    """Groups the scopes/items of one oversized resource into parts of about ``part_bytes``
+
+    Header fields (everything but the repeated children) are kept on
+    ``resource_header``/``scope_header`` and copied into every part.
+    """
+
+    def __init__(self, layout: _Layout, part_bytes: int):
+        self.layout = layout
+        self.part_bytes = part_bytes
+        self.resource_header = layout.resource_cls()
+        self.scope_header = None
+        self._part = None
+        self._scope = None
+        self._size = 0
+
+    def _resource(self):
+        if self._part is None:
+            self._part = self.layout.data_cls()
+            getattr(self._part, self.layout.resources).add().CopyFrom(self.resource_header)
+        return getattr(self._part, self.layout.resources)[0]
+
+    def merge_resource_field(self, raw: bytes):
+        self.resource_header.MergeFromString(raw)
+        if self._part is not None:
+            self._resource().MergeFromString(raw)
+
+    def merge_scope_field(self, raw: bytes):
+        self.scope_header.MergeFromString(raw)
+        if self._scope is not None:
+            self._scope.MergeFromString(raw)
+
+    def add_scope(self, payload: bytes):
+        getattr(self._resource(), self.layout.scopes).add().MergeFromString(payload)
+        self._size += len(payload)
+
+    def start_scope(self):
+        self.scope_header = self.layout.scope_cls()
+        self._scope = None
+
+    def add_item(self, payload: bytes):
+        if self._scope is None:
+            self._scope = getattr(self._resource(), self.layout.scopes).add()
+            self._scope.CopyFrom(self.scope_header)
+        getattr(self._scope, self.layout.items).add().MergeFromString(payload)
+        self._size += len(payload)
+
+    def end_scope(self):
+        self.scope_header = None
+        self._scope = None
+
+    def full(self) -> bool:
+        return self._size >= self.part_bytes
+
+    def take(self):
+        part, self._part, self._scope, self._size = self._part, None, None, 0
+        return part
+
+
+async def _split_scope(reader: _ByteReader, end: int, builder: _PartBuilder):
+    """Parts of one oversized scope message, split by record/span"""
+    builder.start_scope()
+    while reader.pos < end:
+        number, wire_type, tag = await reader.field()
+        if number == _ITEMS_FIELD and wire_type == _LEN:
+            builder.add_item(await reader.read(await reader.varint()))
+            if builder.full():
+                yield builder.take()
+        else:
+            builder.merge_scope_field(tag + await reader.raw_value(wire_type))
+    builder.end_scope()
+
+
+async def _split_resource(reader: _ByteReader, end: int, builder: _PartBuilder):
+    """Parts of one oversized resource message"""
+    while reader.pos < end:
+        number, wire_type, tag = await reader.field()
+        if number != _SCOPES_FIELD or wire_type != _LEN:
+            builder.merge_resource_field(tag + await reader.raw_value(wire_type))
+            continue
+
+        length = await reader.varint()
+        if length <= builder.part_bytes:
+            builder.add_scope(await reader.read(length))
+        else:
+            async for part in _split_scope(reader, reader.pos + length, builder):
+                yield part
+        if builder.full():
+            yield builder.take()
+
+    if reader.pos != end:
+        raise DecodeError("Nested message overruns its length")
+    part = builder.take()
+    if part is not None:
+        yield part
+
+
+async def iter_otlp_parts(chunks: AsyncIterator[bytes], layout: _Layout, part_bytes: int):
+    """``LogsData``/``TracesData``/``MetricsData`` parts of a protobuf stream, in order
+
+    Raises:
+        DecodeError: malformed or truncated protobuf
+    """
+    reader = _ByteReader(chunks)
+    while not await reader.at_end():
+        number, wire_type, _ = await reader.field()
+        if number != _CHILD_FIELD or wire_type != _LEN:
+            await reader.raw_value(wire_type)  # unknown top-level field
+            continue
+
+        length = await reader.varint()
+        if length <= part_bytes:
+            part = layout.data_cls()
+            getattr(part, layout.resources).add().MergeFromString(await reader.read(length))
+            yield part
+        else:
+            async for part in _split_resource(reader, reader.pos + length, _PartBuilder(layout, part_bytes)):
+                yield part
@@ -0,0 +1,332 @@
+"""Trace-affine sharding across correlation engine instances
+
+A ``CorrelationWindow`` only joins logs and spans that reach the same
+process. With several instances behind a load balancer, ``ShardRouter``
+routes every record to the instance that owns its key on a consistent-hash
+ring:
+
+- logs and spans by ``trace_id`` (the window join key)
+- trace synthesis segments by ``circuit_id`` (the synthesis join key)
+
+Records owned elsewhere are forwarded to the owner's ``/internal/shard``
+endpoints; records without a key stay local. Ring membership comes from a
+static node list or from heartbeats in the Redis state store. Adding or
+removing an instance only moves the keys on the ring arcs next to its
+virtual nodes.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from bisect import bisect_right
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import httpx
+import structlog
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+from prometheus_client import Counter, Gauge
+
+from app.correlation.trace_synthesizer import TraceSegment
+from app.models import LogBatch
+
+logger = structlog.get_logger()
+
+# Metrics
+SHARD_RECORDS = Counter(
+    'shard_records_total',
+    'Records routed by the shard router',
+    ['kind', 'result']  # result: local, forwarded, fallback
+)
+SHARD_MEMBERS = Gauge(
+    'shard_ring_members',
+    'Instances currently on the consistent-hash ring'
+)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes"""
+
+    def __init__(self, nodes: Iterable[str] = (), vnodes: int = 128):
+        self.vnodes = vnodes
+        self.nodes: Tuple[str, ...] = ()
+        self._hashes: List[int] = []
+        self._owners: List[str] = []
+        self.set_nodes(nodes)
+
+    def set_nodes(self, nodes: Iterable[str]) -> bool:
+        """Replace ring membership; returns True if it changed"""
+        nodes = tuple(sorted(set(nodes)))
+        if nodes == self.nodes:
+            return False
+
+        points = sorted(
+            (_hash(f"{node}#{i}"), node)
+            for node in nodes
+            for i in range(self.vnodes)
+        )
+        self._hashes = [h for h, _ in points]
+        self._owners = [node for _, node in points]
+        self.nodes = nodes
+        return True
+
+    def node_for(self, key: str) -> str:
+        """Node owning ``key`` (first virtual node clockwise from its hash)"""
+        if not self._hashes:
+            raise LookupError("Hash ring has no nodes")
+        i = bisect_right(self._hashes, _hash(key))
+        return self._owners[i % len(self._owners)]
+
+
+class StaticMembership:
+    """Fixed node list from configuration"""
+
+    def __init__(self, nodes: Iterable[str]):
+        self.nodes = [node.rstrip("/") for node in nodes if node]
+
+    async def heartbeat(self, node: str):
+        pass
+
+    async def members(self) -> List[str]:
+        return list(self.nodes)
+
+    async def leave(self, node: str):
+        pass
+
+
+class RedisMembership:
+    """Instances announce themselves in a sorted set in the Redis state store
+
+    Each member's score is its last heartbeat time; members that miss
+    heartbeats for ``ttl_seconds`` drop off the ring.
+    """
+
+    def __init__(self, client, key: str = "corr:shard_members", ttl_seconds: float = 15.0):
+        self.client = client
+        self.key = key
+        self.ttl_seconds = ttl_seconds
+
+    async def heartbeat(self, node: str):
+        now = time.time()
+        pipe = self.client.pipeline(transaction=False)
+        pipe.zadd(self.key, {node: now})
+        pipe.zremrangebyscore(self.key, 0, now - self.ttl_seconds)
+        await pipe.execute()
+
+    async def members(self) -> List[str]:
+        members = await self.client.zrangebyscore(self.key, time.time() - self.ttl_seconds, "+inf")
+        return [m.decode() if isinstance(m, bytes) else m for m in members]
+
+    async def leave(self, node: str):
+        await self.client.zrem(self.key, node)
+
+
+def _normalize_key(key) -> Optional[str]:
+    if isinstance(key, bytes):
+        key = key.hex()
+    return key.lower() if key else None
+
+
+def segment_to_dict(segment: TraceSegment) -> Dict[str, Any]:
+    data = asdict(segment)
+    data["timestamp"] = segment.timestamp.isoformat()
+    return data
+
+
+class ShardRouter:
+    """Routes records to their owning instance and forwards the rest"""
+
+    def __init__(
+        self,
+        self_url: str,
+        membership,
+        vnodes: int = 128,
+        refresh_seconds: float = 5.0,
+        forward_timeout: float = 2.0,
+        auth: Optional[Tuple[str, str]] = None,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        """Initialize router
+
+        Args:
+            self_url: Base URL peers use to reach this instance (its ring identity)
+            membership: StaticMembership or RedisMembership
+            vnodes: Virtual nodes per instance on the ring
+            refresh_seconds: Heartbeat / membership refresh interval
+            forward_timeout: Timeout for one forward request
+            auth: Basic auth credentials for peers' internal endpoints
+            client: HTTP client for forwarding (one pooled client by default)
+        """
+        self.self_url = self_url.rstrip("/")
+        self.membership = membership
+        self.ring = HashRing([self.self_url], vnodes=vnodes)
+        self.refresh_seconds = refresh_seconds
+        self.client = client or httpx.AsyncClient(timeout=forward_timeout, auth=auth)
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Join the ring and keep membership fresh in the background"""
+        await self.refresh()
+        self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._refresh_task:
+            self._refresh_task.cancel()
+            await asyncio.gather(self._refresh_task, return_exceptions=True)
+            self._refresh_task = None
+        try:
+            await self.membership.leave(self.self_url)
+        except Exception as e:
+            logger.warning("shard_leave_failed", error=str(e))
+        await self.client.aclose()
+
+    async def refresh(self):
+        """Heartbeat and rebuild the ring from current membership"""
+        await self.membership.heartbeat(self.self_url)
+        nodes = set(await self.membership.members())
+        nodes.add(self.self_url)
+        if self.ring.set_nodes(nodes):
+            SHARD_MEMBERS.set(len(nodes))
+            logger.info("shard_ring_updated", nodes=sorted(nodes))
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("shard_membership_refresh_failed", error=str(e))
+
+    def owner(self, key) -> str:
+        """Instance owning ``key``; keyless records belong to this instance"""
+        key = _normalize_key(key)
+        return self.ring.node_for(key) if key else self.self_url
+
+    # ------------------------------------------------------------------
+    # Partitioning
+    # ------------------------------------------------------------------
+
+    def split_logs(self, batch: LogBatch) -> Dict[str, LogBatch]:
+        """Partition a log batch by the owner of each record's trace_id"""
+        if len(self.ring.nodes) == 1:
+            return {self.self_url: batch}
+
+        records: Dict[str, list] = {}
+        for record in batch.records:
+            records.setdefault(self.owner(record.trace_id), []).append(record)
+        if len(records) == 1 and self.self_url in records:
+            return {self.self_url: batch}
+        return {
+            node: LogBatch(resource=batch.resource, records=node_records)
+            for node, node_records in records.items()
+        }
+
+    def split_traces(self, trace_batch: Union[Dict[str, Any], TracesData]) -> Dict[str, Any]:
+        """Partition an OTLP trace payload (JSON dict or TracesData) by trace_id owner"""
+        if len(self.ring.nodes) == 1:
+            return {self.self_url: trace_batch}
+        if isinstance(trace_batch, TracesData):
+            return self._split_traces_proto(trace_batch)
+        return self._split_traces_json(trace_batch)
+
+    def _split_traces_proto(self, traces_data: TracesData) -> Dict[str, TracesData]:
+        owners = [
+            [self.owner(span.trace_id) for span in scope_span.spans]
+            for resource_span in traces_data.resource_spans
+            for scope_span in resource_span.scope_spans
+        ]
+        if all(node == self.self_url for scope_owners in owners for node in scope_owners):
+            return {self.self_url: traces_data}
+
+        parts: Dict[str, TracesData] = {}
+        scope_owners = iter(owners)
+        for resource_span in traces_data.resource_spans:
+            for scope_span in resource_span.scope_spans:
+                by_node: Dict[str, list] = {}
+                for span, node in zip(scope_span.spans, next(scope_owners)):
+                    by_node.setdefault(node, []).append(span)
+                for node, spans in by_node.items():
+                    rs = parts.setdefault(node, TracesData()).resource_spans.add()
+                    rs.resource.CopyFrom(resource_span.resource)
+                    rs.schema_url = resource_span.schema_url
+                    ss = rs.scope_spans.add()
+                    ss.scope.CopyFrom(scope_span.scope)
+                    ss.schema_url = scope_span.schema_url
+                    ss.spans.extend(spans)
+        return parts
+
+    def _split_traces_json(self, trace_batch: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        parts: Dict[str, Dict[str, Any]] = {}
+        for resource_span in trace_batch.get("resourceSpans", []):
+            for scope_span in resource_span.get("scopeSpans", []):
+                by_node: Dict[str, list] = {}
+                for span in scope_span.get("spans", []):
+                    by_node.setdefault(self.owner(span.get("traceId")), []).append(span)
+                for node, spans in by_node.items():
+                    parts.setdefault(node, {"resourceSpans": []})["resourceSpans"].append(
+                        {**resource_span, "scopeSpans": [{**scope_span, "spans": spans}]}
+                    )
+        if set(parts) <= {self.self_url}:
+            return {self.self_url: trace_batch}
+        return parts
+
+    def split_segments(self, segments: List[TraceSegment]) -> Dict[str, List[TraceSegment]]:
+        """Partition synthesis segments by circuit_id owner"""
+        parts: Dict[str, List[TraceSegment]] = {}
+        for segment in segments:
+            parts.setdefault(self.owner(segment.circuit_id), []).append(segment)
+        return parts
+
+    # ------------------------------------------------------------------
+    # Forwarding
+    # ------------------------------------------------------------------
+
+    async def forward(self, node: str, kind: str, payload) -> bool:
+        """POST ``payload`` to ``node``'s internal endpoint; False on failure"""
+        if kind == "logs":
+            content, content_type = payload.model_dump_json(), "application/json"
+        elif kind == "traces" and isinstance(payload, TracesData):
+            content, content_type = payload.SerializeToString(), "application/x-protobuf"
+        elif kind == "traces":
+            content, content_type = json.dumps(payload), "application/json"
+        elif kind == "segments":
+            content, content_type = json.dumps([segment_to_dict(s) for s in payload]), "application/json"
+        else:
+            raise ValueError(f"Unknown shard payload kind {kind!r}")
+
+        try:
+            response = await self.client.post(
+                f"{node}/internal/shard/{kind}",
+                content=content,
+                headers={"Content-Type": content_type},
+            )
+            response.raise_for_status()
+            return True
+        except Exception as e:
+            logger.warning("shard_forward_failed", node=node, kind=kind, error=str(e))
+            return False
+
+    async def route(self, kind: str, parts: Dict[str, Any], size) -> List[Any]:
+        """Forward remote parts concurrently; return the parts to process locally
+
+        A part whose owner cannot be reached is processed here instead, so a
+        peer outage degrades correlation for its keys rather than losing data.
+        """
+        local = [parts[self.self_url]] if self.self_url in parts else []
+        remote = [(node, part) for node, part in parts.items() if node != self.self_url]
+        if local:
+            SHARD_RECORDS.labels(kind=kind, result="local").inc(size(local[0]))
+        if not remote:
+            return local
+
+        results = await asyncio.gather(*(self.forward(node, kind, part) for node, part in remote))
+        for (node, part), ok in zip(remote, results):
+            SHARD_RECORDS.labels(kind=kind, result="forwarded" if ok else "fallback").inc(size(part))
+            if not ok:
+                local.append(part)
+        return local
+
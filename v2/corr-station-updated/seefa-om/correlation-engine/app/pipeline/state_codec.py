@@ -0,0 +1,191 @@
+"""Codecs for CorrelationEntry values in the shared state store
+
+``JsonCodec`` writes the original JSON text. ``MsgpackCodec`` writes a
+compact binary form: msgpack with hex trace IDs packed as raw bytes,
+timestamps as integer epoch nanoseconds and, optionally, the ``logs`` list
+compressed with zstd.
+
+Binary values start with a 3-byte header: ``0xc1`` (a byte msgpack never
+emits and JSON never starts with), a format version, and flag bits.
+``decode_entry`` reads every known format whatever codec is configured for
+writing. That allows rolling upgrades: deploy readers first, then switch
+``STATE_CODEC`` once no instance still reads JSON only.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import structlog
+
+from app.pipeline.state_manager import CorrelationEntry
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = structlog.get_logger()
+
+MAGIC = 0xC1
+FORMAT_VERSION = 1
+FLAG_LOGS_ZSTD = 0x01
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_ns(value: Optional[datetime]) -> Optional[int]:
+    """Exact epoch nanoseconds; naive datetimes are treated as UTC"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def _from_ns(value: Optional[int]) -> Optional[datetime]:
+    if value is None:
+        return None
+    return _EPOCH + timedelta(microseconds=value // 1000)
+
+
+def _pack_trace_id(trace_id: Optional[str]):
+    """Lowercase even-length hex IDs become raw bytes, anything else stays text"""
+    if trace_id and len(trace_id) % 2 == 0 and trace_id == trace_id.lower():
+        try:
+            return bytes.fromhex(trace_id)
+        except ValueError:
+            pass
+    return trace_id
+
+
+def _unpack_trace_id(trace_id):
+    return trace_id.hex() if isinstance(trace_id, bytes) else trace_id
+
+
+class StateCodec(ABC):
+    """Serializes CorrelationEntry values for a StateManager"""
+
+    name: str = ""
+
+    @abstractmethod
+    def encode(self, entry: CorrelationEntry) -> bytes:
+        """Serialize an entry"""
+        pass
+
+    def decode(self, data: bytes) -> CorrelationEntry:
+        """Deserialize an entry written by any codec version"""
+        return decode_entry(data)
+
+
+class JsonCodec(StateCodec):
+    """UTF-8 JSON, the format used before binary codecs existed"""
+
+    name = "json"
+
+    def encode(self, entry: CorrelationEntry) -> bytes:
+        return entry.to_json().encode()
+
+
+class MsgpackCodec(StateCodec):
+    """Versioned msgpack with binary trace IDs and optional zstd log bodies"""
+
+    name = "msgpack"
+
+    def __init__(self, compress_logs: bool = True, compress_min_bytes: int = 512, level: int = 3):
+        """Initialize codec
+
+        Args:
+            compress_logs: zstd-compress the packed ``logs`` list (needs zstandard)
+            compress_min_bytes: Leave smaller packed log lists uncompressed
+            level: zstd compression level
+        """
+        if not MSGPACK_AVAILABLE:
+            raise ImportError("msgpack library required for MsgpackCodec")
+        if compress_logs and not ZSTD_AVAILABLE:
+            logger.warning("zstandard not installed, state log bodies stored uncompressed")
+            compress_logs = False
+        self.compress_logs = compress_logs
+        self.compress_min_bytes = compress_min_bytes
+        self._compressor = zstandard.ZstdCompressor(level=level) if compress_logs else None
+
+    def encode(self, entry: CorrelationEntry) -> bytes:
+        flags = 0
+        logs = msgpack.packb(entry.logs, use_bin_type=True)
+        if self._compressor and len(logs) >= self.compress_min_bytes:
+            logs = self._compressor.compress(logs)
+            flags |= FLAG_LOGS_ZSTD
+
+        body = msgpack.packb(
+            [
+                entry.correlation_id,
+                _pack_trace_id(entry.trace_id),
+                entry.service,
+                entry.env,
+                _to_ns(entry.first_seen),
+                _to_ns(entry.last_updated),
+                entry.spans,
+                logs,
+                entry.metadata,
+            ],
+            use_bin_type=True,
+        )
+        return bytes((MAGIC, FORMAT_VERSION, flags)) + body
+
+
+def _decode_v1(flags: int, body: bytes) -> CorrelationEntry:
+    (correlation_id, trace_id, service, env,
+     first_seen, last_updated, spans, logs, metadata) = msgpack.unpackb(body, raw=False)
+
+    if flags & FLAG_LOGS_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstd-compressed state entry but zstandard is not installed")
+        logs = zstandard.ZstdDecompressor().decompress(logs)
+
+    return CorrelationEntry(
+        correlation_id=correlation_id,
+        trace_id=_unpack_trace_id(trace_id),
+        service=service,
+        env=env,
+        first_seen=_from_ns(first_seen),
+        last_updated=_from_ns(last_updated),
+        spans=spans,
+        logs=msgpack.unpackb(logs, raw=False),
+        metadata=metadata,
+    )
+
+
+_DECODERS = {1: _decode_v1}
+
+
+def decode_entry(data: bytes) -> CorrelationEntry:
+    """Decode a stored entry, dispatching on the version header
+
+    Raises:
+        ValueError: The value uses a format version this build cannot read
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    if not data or data[0] != MAGIC:
+        return CorrelationEntry.from_json(data)
+
+    if len(data) < 3 or data[1] not in _DECODERS:
+        raise ValueError(f"Unsupported state entry format version: {data[1] if len(data) > 1 else None}")
+    if not MSGPACK_AVAILABLE:
+        raise ValueError("Binary state entry but msgpack is not installed")
+    return _DECODERS[data[1]](data[2], data[3:])
+
+
+def get_codec(name: str, compress_logs: bool = True) -> StateCodec:
+    """Build the codec configured by ``STATE_CODEC`` (``json`` or ``msgpack``)"""
+    if name == JsonCodec.name:
+        return JsonCodec()
+    if name == MsgpackCodec.name:
+        return MsgpackCodec(compress_logs=compress_logs)
+    raise ValueError(f"Unknown state codec {name!r}, expected 'json' or 'msgpack'")
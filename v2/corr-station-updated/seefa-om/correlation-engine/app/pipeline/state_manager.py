@@ -6,11 +6,17 @@ deployments.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+from operator import itemgetter
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Any
 from datetime import datetime, timedelta, timezone
 import json
 import structlog
 
+if TYPE_CHECKING:
+    from app.pipeline.state_codec import StateCodec
+
 logger = structlog.get_logger()
 
 
@@ -72,6 +78,27 @@ class CorrelationEntry:
             metadata=data.get("metadata", {}),
         )
 
+    @classmethod
+    def from_event(cls, event) -> "CorrelationEntry":
+        """Create from a closed-window CorrelationEvent
+
+        Counts and business keys travel in ``metadata`` alongside the
+        event's own metadata.
+        """
+        metadata = event.model_dump(
+            mode="json",
+            exclude={"correlation_id", "trace_id", "service", "env", "timestamp"},
+        )
+        return cls(
+            correlation_id=event.correlation_id,
+            trace_id=event.trace_id,
+            service=event.service,
+            env=event.env,
+            first_seen=event.timestamp,
+            last_updated=event.timestamp,
+            metadata=metadata,
+        )
+
     def to_json(self) -> str:
         """Convert to JSON string"""
         return json.dumps(self.to_dict())
@@ -118,6 +145,39 @@ class StateManager(ABC):
         """
         pass
 
+    async def set_many(
+        self,
+        entries: Dict[str, CorrelationEntry],
+        ttl_seconds: Optional[int] = None
+    ):
+        """Store several correlations at once
+
+        Implementations backed by a remote store should override this to
+        batch the writes; the default stores them one at a time.
+
+        Args:
+            entries: Correlation entries keyed by correlation ID
+            ttl_seconds: Optional time-to-live in seconds
+        """
+        for correlation_id, entry in entries.items():
+            await self.set_correlation(correlation_id, entry, ttl_seconds)
+
+    async def get_many(self, correlation_ids: Iterable[str]) -> Dict[str, CorrelationEntry]:
+        """Retrieve several correlations at once
+
+        Args:
+            correlation_ids: The correlation identifiers
+
+        Returns:
+            Found entries keyed by correlation ID (missing IDs are omitted)
+        """
+        found = {}
+        for correlation_id in correlation_ids:
+            entry = await self.get_correlation(correlation_id)
+            if entry:
+                found[correlation_id] = entry
+        return found
+
     @abstractmethod
     async def delete_correlation(self, correlation_id: str):
         """Delete a correlation
@@ -176,12 +236,55 @@ class InMemoryStateManager(StateManager):
 
     Stores correlation state in Python dictionaries. Fast and simple,
     but limited to single instance (no horizontal scaling).
+
+    ``time_index`` is kept sorted by ``last_updated`` so range reads and
+    cleanup bisect to the matching slice. Each index item carries a
+    generation number, so deletes and re-sets leave lazy tombstones (items
+    whose generation no longer matches ``_indexed_at``) that can never match
+    again; they are skipped on read and compacted once they outnumber live
+    entries.
     """
 
+    # Tombstones tolerated before compaction, regardless of live count
+    MIN_COMPACT_TOMBSTONES = 1024
+
     def __init__(self):
         """Initialize in-memory storage"""
         self.correlations: Dict[str, CorrelationEntry] = {}
-        self.time_index: List[tuple[datetime, str]] = []  # (timestamp, correlation_id)
+        self.time_index: List[tuple[datetime, int, str]] = []  # sorted (timestamp, generation, correlation_id)
+        self._indexed_at: Dict[str, tuple[datetime, int]] = {}  # live (timestamp, generation) per correlation
+        self._generations = count()
+        self._tombstones = 0
+
+    def _is_live(self, item: tuple[datetime, int, str]) -> bool:
+        return self._indexed_at.get(item[2]) == item[:2]
+
+    def _index(self, correlation_id: str, ts: datetime):
+        previous = self._indexed_at.get(correlation_id)
+        if previous is not None and previous[0] == ts:
+            return
+        if previous is not None:
+            self._tombstones += 1
+        item = (ts, next(self._generations), correlation_id)
+        self._indexed_at[correlation_id] = item[:2]
+
+        # Entries mostly arrive in time order, so appending is the common case
+        if not self.time_index or item >= self.time_index[-1]:
+            self.time_index.append(item)
+        else:
+            insort(self.time_index, item)
+        self._maybe_compact()
+
+    def _unindex(self, correlation_id: str):
+        if self._indexed_at.pop(correlation_id, None) is None:
+            return
+        self._tombstones += 1
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._tombstones > max(self.MIN_COMPACT_TOMBSTONES, len(self._indexed_at)):
+            self.time_index = [item for item in self.time_index if self._is_live(item)]
+            self._tombstones = 0
 
     async def get_correlation(self, correlation_id: str) -> Optional[CorrelationEntry]:
         """Get correlation from memory"""
@@ -197,7 +300,7 @@ class InMemoryStateManager(StateManager):
         self.correlations[correlation_id] = entry
 
         # Update time index
-        self.time_index.append((entry.last_updated, correlation_id))
+        self._index(correlation_id, entry.last_updated)
 
         # Note: TTL is handled by periodic cleanup, not enforced here
         if ttl_seconds:
@@ -213,39 +316,43 @@ class InMemoryStateManager(StateManager):
         if correlation_id in self.correlations:
             del self.correlations[correlation_id]
 
-        # Remove from time index
-        self.time_index = [
-            (ts, cid) for ts, cid in self.time_index
-            if cid != correlation_id
-        ]
+        # Tombstone the time index entry
+        self._unindex(correlation_id)
 
     async def get_correlations_by_time_range(
         self,
         start_time: datetime,
         end_time: Optional[datetime] = None
     ) -> List[CorrelationEntry]:
-        """Get correlations from time index"""
+        """Get correlations from time index, oldest first"""
         end_time = end_time or datetime.now(timezone.utc)
 
+        lo = bisect_left(self.time_index, start_time, key=itemgetter(0))
+        hi = bisect_right(self.time_index, end_time, lo=lo, key=itemgetter(0))
         return [
-            self.correlations[cid]
-            for ts, cid in self.time_index
-            if start_time <= ts <= end_time and cid in self.correlations
+            self.correlations[item[2]]
+            for item in self.time_index[lo:hi]
+            if self._is_live(item)
         ]
 
     async def cleanup_old_correlations(self, cutoff_time: datetime) -> int:
-        """Remove old correlations from memory"""
-        to_delete = [
-            correlation_id
-            for correlation_id, entry in self.correlations.items()
-            if entry.last_updated < cutoff_time
-        ]
+        """Remove old correlations from memory
 
-        for correlation_id in to_delete:
-            await self.delete_correlation(correlation_id)
-
-        logger.info("in_memory_cleanup", deleted_count=len(to_delete))
-        return len(to_delete)
+        Only the index prefix older than ``cutoff_time`` is visited.
+        """
+        end = bisect_left(self.time_index, cutoff_time, key=itemgetter(0))
+        deleted = 0
+        for item in self.time_index[:end]:
+            if self._is_live(item):
+                self.correlations.pop(item[2], None)
+                del self._indexed_at[item[2]]
+                deleted += 1
+            else:
+                self._tombstones -= 1
+        del self.time_index[:end]
+
+        logger.info("in_memory_cleanup", deleted_count=deleted)
+        return deleted
 
     async def get_correlation_count(self) -> int:
         """Get count from memory"""
@@ -269,7 +376,10 @@ class RedisStateManager(StateManager):
         self,
         redis_url: str = "redis://localhost:6379",
         key_prefix: str = "corr:",
-        max_connections: int = 50
+        max_connections: int = 50,
+        batch_size: int = 500,
+        codec: Optional["StateCodec"] = None,
+        client=None
     ):
         """Initialize Redis state manager
 
@@ -277,12 +387,21 @@ class RedisStateManager(StateManager):
             redis_url: Redis connection URL
             key_prefix: Prefix for all Redis keys
             max_connections: Max connections in pool
+            batch_size: Max keys per pipeline, MGET or ZRANGEBYSCORE page
+            codec: Value serialization for writes (JSON by default); values
+                written by any codec are readable
+            client: Pre-built redis.asyncio client (must use decode_responses=False)
         """
+        if codec is None:
+            from app.pipeline.state_codec import JsonCodec
+            codec = JsonCodec()
         self.redis_url = redis_url
         self.key_prefix = key_prefix
         self.max_connections = max_connections
-        self.redis = None
-        self._initialized = False
+        self.batch_size = batch_size
+        self.codec = codec
+        self.redis = client
+        self._initialized = client is not None
 
     async def _ensure_connected(self):
         """Lazy initialization of Redis connection"""
@@ -301,7 +420,7 @@ class RedisStateManager(StateManager):
         self.redis = redis.from_url(
             self.redis_url,
             max_connections=self.max_connections,
-            decode_responses=True  # Get strings instead of bytes
+            decode_responses=False  # Values may be binary (see state_codec)
         )
 
         # Test connection
@@ -313,6 +432,14 @@ class RedisStateManager(StateManager):
         """Create Redis key for correlation"""
         return f"{self.key_prefix}{correlation_id}"
 
+    @property
+    def _time_index_key(self) -> str:
+        return f"{self.key_prefix}time_index"
+
+    def _chunks(self, items: List) -> Iterable[List]:
+        for i in range(0, len(items), self.batch_size):
+            yield items[i:i + self.batch_size]
+
     async def get_correlation(self, correlation_id: str) -> Optional[CorrelationEntry]:
         """Retrieve correlation from Redis"""
         await self._ensure_connected()
@@ -324,7 +451,7 @@ class RedisStateManager(StateManager):
             return None
 
         try:
-            return CorrelationEntry.from_json(data)
+            return self.codec.decode(data)
         except Exception as e:
             logger.error(
                 "redis_deserialize_error",
@@ -343,7 +470,7 @@ class RedisStateManager(StateManager):
         await self._ensure_connected()
 
         key = self._make_key(correlation_id)
-        value = entry.to_json()
+        value = self.codec.encode(entry)
 
         if ttl_seconds:
             # Set with expiration
@@ -354,7 +481,7 @@ class RedisStateManager(StateManager):
 
         # Add to time-sorted index
         await self.redis.zadd(
-            f"{self.key_prefix}time_index",
+            self._time_index_key,
             {correlation_id: entry.last_updated.timestamp()}
         )
 
@@ -364,6 +491,55 @@ class RedisStateManager(StateManager):
             ttl_seconds=ttl_seconds
         )
 
+    async def set_many(
+        self,
+        entries: Dict[str, CorrelationEntry],
+        ttl_seconds: Optional[int] = None
+    ):
+        """Store correlations with one pipelined round trip per batch
+
+        Each batch sends a SET (with EX when ``ttl_seconds`` is given) per
+        entry and a single ZADD covering the whole batch.
+        """
+        if not entries:
+            return
+        await self._ensure_connected()
+
+        for chunk in self._chunks(list(entries.items())):
+            pipe = self.redis.pipeline(transaction=False)
+            for correlation_id, entry in chunk:
+                pipe.set(self._make_key(correlation_id), self.codec.encode(entry), ex=ttl_seconds or None)
+            pipe.zadd(
+                self._time_index_key,
+                {correlation_id: entry.last_updated.timestamp() for correlation_id, entry in chunk}
+            )
+            await pipe.execute()
+
+        logger.debug("redis_correlations_stored", count=len(entries), ttl_seconds=ttl_seconds)
+
+    async def get_many(self, correlation_ids: Iterable[str]) -> Dict[str, CorrelationEntry]:
+        """Retrieve correlations with one MGET per batch"""
+        correlation_ids = list(correlation_ids)
+        if not correlation_ids:
+            return {}
+        await self._ensure_connected()
+
+        found = {}
+        for chunk in self._chunks(correlation_ids):
+            values = await self.redis.mget([self._make_key(cid) for cid in chunk])
+            for correlation_id, data in zip(chunk, values):
+                if not data:
+                    continue
+                try:
+                    found[correlation_id] = self.codec.decode(data)
+                except Exception as e:
+                    logger.error(
+                        "redis_deserialize_error",
+                        correlation_id=correlation_id,
+                        error=str(e)
+                    )
+        return found
+
     async def delete_correlation(self, correlation_id: str):
         """Delete correlation from Redis"""
         await self._ensure_connected()
@@ -374,7 +550,7 @@ class RedisStateManager(StateManager):
         await self.redis.delete(key)
 
         # Remove from time index
-        await self.redis.zrem(f"{self.key_prefix}time_index", correlation_id)
+        await self.redis.zrem(self._time_index_key, correlation_id)
 
         logger.debug("redis_correlation_deleted", correlation_id=correlation_id)
 
@@ -383,24 +559,35 @@ class RedisStateManager(StateManager):
         start_time: datetime,
         end_time: Optional[datetime] = None
     ) -> List[CorrelationEntry]:
-        """Get correlations from Redis time index"""
+        """Get correlations from Redis time index
+
+        The sorted set is read in ``batch_size`` pages with
+        ZRANGEBYSCORE ... LIMIT and each page is fetched with one MGET.
+        """
         await self._ensure_connected()
 
         end_time = end_time or datetime.now(timezone.utc)
 
-        # Query sorted set by score (timestamp)
-        correlation_ids = await self.redis.zrangebyscore(
-            f"{self.key_prefix}time_index",
-            start_time.timestamp(),
-            end_time.timestamp()
-        )
-
-        # Fetch all correlations
         correlations = []
-        for correlation_id in correlation_ids:
-            entry = await self.get_correlation(correlation_id)
-            if entry:
-                correlations.append(entry)
+        offset = 0
+        while True:
+            # Query sorted set by score (timestamp), one page at a time
+            members = await self.redis.zrangebyscore(
+                self._time_index_key,
+                start_time.timestamp(),
+                end_time.timestamp(),
+                start=offset,
+                num=self.batch_size
+            )
+            correlation_ids = [member.decode() for member in members]
+
+            # Expired keys still listed in the index are skipped
+            found = await self.get_many(correlation_ids)
+            correlations.extend(found[cid] for cid in correlation_ids if cid in found)
+
+            if len(correlation_ids) < self.batch_size:
+                break
+            offset += self.batch_size
 
         return correlations
 
@@ -410,7 +597,7 @@ class RedisStateManager(StateManager):
 
         # Find old correlation IDs from time index
         old_ids = await self.redis.zrangebyscore(
-            f"{self.key_prefix}time_index",
+            self._time_index_key,
             0,
             cutoff_time.timestamp()
         )
@@ -419,12 +606,12 @@ class RedisStateManager(StateManager):
             return 0
 
         # Delete correlations
-        keys_to_delete = [self._make_key(cid) for cid in old_ids]
+        keys_to_delete = [self._make_key(cid.decode()) for cid in old_ids]
         await self.redis.delete(*keys_to_delete)
 
         # Remove from time index
         await self.redis.zremrangebyscore(
-            f"{self.key_prefix}time_index",
+            self._time_index_key,
             0,
             cutoff_time.timestamp()
         )
@@ -436,7 +623,7 @@ class RedisStateManager(StateManager):
         """Get count of correlations in Redis"""
         await self._ensure_connected()
 
-        count = await self.redis.zcard(f"{self.key_prefix}time_index")
+        count = await self.redis.zcard(self._time_index_key)
         return count
 
     async def close(self):
@@ -1,5 +1,6 @@
 """Pyroscope profiling utilities for hot path instrumentation"""
 import functools
+import inspect
 import logging
 from typing import Callable, Any
 
@@ -56,7 +57,7 @@ def profile_function(tags: dict = None):
                 return func(*args, **kwargs)
 
         # Return appropriate wrapper based on function type
-        if hasattr(func, '__code__') and func.__code__.co_flags & 0x100:  # CO_COROUTINE
+        if inspect.iscoroutinefunction(func):
             return async_wrapper
         else:
             return sync_wrapper
@@ -1,7 +1,8 @@
 """Correlation query and synthetic event injection endpoints"""
 import structlog
-from fastapi import APIRouter, HTTPException, Query, Depends, Request
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
 
 from app.models import CorrelationEvent, SyntheticEvent
@@ -10,21 +11,50 @@ from app.routes.auth import verify_basic_auth
 router = APIRouter()
 logger = structlog.get_logger()
 
+# Correlations fetched per history lookup while streaming NDJSON
+STREAM_PAGE_SIZE = 500
+
+
+def correlation_filters(
+    trace_id: Optional[str] = Query(None),
+    service: Optional[str] = Query(None),
+    circuit_id: Optional[str] = Query(None),
+    product_id: Optional[str] = Query(None),
+    resource_id: Optional[str] = Query(None),
+    resource_type_id: Optional[str] = Query(None),
+    request_id: Optional[str] = Query(None),
+) -> Dict[str, str]:
+    """Equality filters shared by the correlation query endpoints"""
+    filters = {
+        "trace_id": trace_id,
+        "service": service,
+        "circuit_id": circuit_id,
+        "product_id": product_id,
+        "resource_id": resource_id,
+        "resource_type_id": resource_type_id,
+        "request_id": request_id,
+    }
+    return {field: value for field, value in filters.items() if value}
+
 
 @router.get("/correlations", response_model=List[CorrelationEvent])
 async def query_correlations(
     request: Request,
-    trace_id: Optional[str] = Query(None),
-    service: Optional[str] = Query(None),
+    response: Response,
+    filters: Dict[str, str] = Depends(correlation_filters),
     start_time: Optional[datetime] = Query(None),
     end_time: Optional[datetime] = Query(None),
-    limit: int = Query(default=100, le=1000),
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
     authenticated: bool = Depends(verify_basic_auth),
 ):
     """
     Query correlation events
 
-    Retrieve correlation events by trace_id, service, or time range.
+    Retrieve correlation events by trace_id, service, business keys
+    (circuit_id, product_id, resource_id, resource_type_id, request_id)
+    and/or time range, newest first. When more results exist, the ``X-Next-Cursor``
+    response header holds the cursor for the next page.
     """
     correlation_engine = request.app.state.correlation_engine
     
@@ -32,27 +62,80 @@ async def query_correlations(
         raise HTTPException(status_code=503, detail="Correlation engine not initialized")
 
     try:
-        correlations = correlation_engine.query_correlations(
-            trace_id=trace_id,
-            service=service,
+        correlations, next_cursor = correlation_engine.query_correlation_page(
+            filters,
             start_time=start_time,
             end_time=end_time,
             limit=limit,
+            cursor=cursor,
         )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
 
-        logger.info(
-            "correlations_queried",
-            trace_id=trace_id,
-            service=service,
-            count=len(correlations),
-        )
+        logger.info("correlations_queried", **filters, count=len(correlations))
 
         return correlations
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.exception("Failed to query correlations", error=str(e))
         raise HTTPException(status_code=500, detail=f"Failed to query correlations: {str(e)}")
 
 
+@router.get("/correlations/stream")
+async def stream_correlations(
+    request: Request,
+    filters: Dict[str, str] = Depends(correlation_filters),
+    start_time: Optional[datetime] = Query(None),
+    end_time: Optional[datetime] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, description="Stop after this many correlations"),
+    cursor: Optional[str] = Query(None),
+    authenticated: bool = Depends(verify_basic_auth),
+):
+    """
+    Stream correlation events as NDJSON
+
+    Same filters as ``/correlations``, without the page size cap: results are
+    read from history a page at a time and written one JSON object per line.
+    """
+    correlation_engine = request.app.state.correlation_engine
+
+    if not correlation_engine:
+        raise HTTPException(status_code=503, detail="Correlation engine not initialized")
+
+    # Fetch the first page up front so bad filters or cursors fail with 400
+    try:
+        first_page = correlation_engine.query_correlation_page(
+            filters,
+            start_time=start_time,
+            end_time=end_time,
+            limit=min(STREAM_PAGE_SIZE, limit or STREAM_PAGE_SIZE),
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def ndjson() -> AsyncIterator[str]:
+        page, next_cursor = first_page
+        sent = 0
+        while True:
+            for correlation in page:
+                yield correlation.model_dump_json() + "\n"
+            sent += len(page)
+            if next_cursor is None or (limit and sent >= limit):
+                break
+            page, next_cursor = correlation_engine.query_correlation_page(
+                filters,
+                start_time=start_time,
+                end_time=end_time,
+                limit=min(STREAM_PAGE_SIZE, limit - sent if limit else STREAM_PAGE_SIZE),
+                cursor=next_cursor,
+            )
+        logger.info("correlations_streamed", **filters, count=sent)
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 @router.post("/events", status_code=201)
 async def inject_synthetic_event(
     event: SyntheticEvent,
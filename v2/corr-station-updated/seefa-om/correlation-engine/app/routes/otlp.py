@@ -1,15 +1,15 @@
 """OTLP ingestion endpoints (supports both JSON and protobuf)"""
+import json
 import structlog
 from fastapi import APIRouter, HTTPException, Request, Depends
-from typing import Dict, Any
 
-from opentelemetry.proto.logs.v1.logs_pb2 import LogsData
-from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
-from google.protobuf.json_format import MessageToDict
+from google.protobuf.json_format import ParseError
 from google.protobuf.message import DecodeError
 
 from app.routes.auth import verify_basic_auth
 from app.config import settings
+from app.models import OTLPMetricsRequest
+from app.pipeline import otlp_decoder, otlp_stream
 from app.profiling import profile_function
 
 router = APIRouter()
@@ -32,6 +32,43 @@ async def validate_request_size(request: Request):
             pass  # Invalid content-length, will be caught when reading body
 
 
+def _body_error(error: Exception, payload_type: str) -> HTTPException:
+    """HTTP error for a body that could not be read or decoded"""
+    if isinstance(error, otlp_stream.PayloadTooLarge):
+        return HTTPException(status_code=413, detail=f"{payload_type} payload too large: {error}")
+    if isinstance(error, otlp_stream.UnsupportedEncoding):
+        return HTTPException(status_code=415, detail=str(error))
+    logger.error(f"Invalid {payload_type.lower()} format", error=str(error))
+    return HTTPException(status_code=400, detail=f"Invalid {payload_type.lower()} format: {str(error)}")
+
+
+async def _read_json(request: Request) -> dict:
+    """Read and parse a JSON body within ``max_json_size``
+
+    The standard library has no incremental JSON parser, so the body is
+    decoded once it has been read; the cap still applies while reading.
+    """
+    try:
+        body = await otlp_stream.read_request_body(
+            request, settings.max_json_size, settings.max_request_body_size
+        )
+        return json.loads(body)
+    except (ValueError, UnicodeDecodeError) as e:  # includes JSONDecodeError
+        raise _body_error(e, "JSON")
+
+
+async def _iter_protobuf_parts(request: Request, layout):
+    """Protobuf body decoded incrementally into LogsData/TracesData/MetricsData parts"""
+    chunks = otlp_stream.iter_request_body(
+        request, settings.max_protobuf_size, settings.max_request_body_size
+    )
+    try:
+        async for part in otlp_stream.iter_otlp_parts(chunks, layout, settings.otlp_stream_part_bytes):
+            yield part
+    except (DecodeError, ValueError) as e:
+        raise _body_error(e, "Protobuf")
+
+
 @router.post("/logs", status_code=202)
 @profile_function(tags={"endpoint": "otlp_logs", "operation": "ingest"})
 async def ingest_otlp_logs(
@@ -41,7 +78,9 @@ async def ingest_otlp_logs(
     """
     Ingest OTLP logs (supports both JSON and protobuf)
 
-    Accepts OTLP format logs and normalizes them for correlation.
+    Accepts OTLP format logs and normalizes them for correlation. Protobuf
+    bodies are decoded incrementally and each part is queued as soon as it
+    is decoded.
     """
     correlation_engine = request.app.state.correlation_engine
     LOG_RECORDS_RECEIVED = request.app.state.LOG_RECORDS_RECEIVED
@@ -54,136 +93,29 @@ async def ingest_otlp_logs(
 
     try:
         content_type = request.headers.get("content-type", "")
+        total_logs = 0
 
         # Handle protobuf format
         if "application/x-protobuf" in content_type:
-            body = await request.body()
-
-            # Additional size check after reading body
-            if len(body) > settings.max_protobuf_size:
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"Protobuf payload too large: {len(body)} bytes"
-                )
-
-            try:
-                logs_data = LogsData()
-                logs_data.ParseFromString(body)
-                data = MessageToDict(logs_data, preserving_proto_field_name=True)
-            except DecodeError as e:
-                logger.error("Invalid protobuf format", error=str(e))
-                raise HTTPException(status_code=400, detail=f"Invalid protobuf format: {str(e)}")
-            except Exception as e:
-                logger.error("Failed to parse protobuf", error=str(e))
-                raise HTTPException(status_code=400, detail=f"Failed to parse protobuf: {str(e)}")
+            async for part in _iter_protobuf_parts(request, otlp_stream.LOGS):
+                for batch in otlp_decoder.log_batches_from_proto(part):
+                    await correlation_engine.add_logs(batch)
+                    total_logs += len(batch.records)
         else:
-            # Handle JSON format with size check
-            body = await request.body()
-            if len(body) > settings.max_json_size:
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"JSON payload too large: {len(body)} bytes"
-                )
-
-            import json
-            try:
-                data = json.loads(body)
-            except json.JSONDecodeError as e:
-                logger.error("Invalid JSON format", error=str(e))
-                raise HTTPException(status_code=400, detail=f"Invalid JSON format: {str(e)}")
-
-        # Extract resource logs and convert to internal format
-        resource_logs = data.get("resourceLogs", [])
+            data = await _read_json(request)
 
-        from app.models import LogBatch, LogRecord, ResourceInfo
-        from datetime import datetime, timezone
-
-        total_logs = 0
-        for resource_log in resource_logs:
-            # Extract resource attributes
-            resource = resource_log.get("resource", {})
-            resource_attrs = {}
-            for attr in resource.get("attributes", []):
-                key = attr.get("key", "")
-                value = attr.get("value", {})
-                # Extract string value (simplified - could handle other types)
-                if "stringValue" in value:
-                    resource_attrs[key] = value["stringValue"]
-
-            # Build ResourceInfo
-            resource_info = ResourceInfo(
-                service=resource_attrs.get("service.name", "unknown"),
-                host=resource_attrs.get("host.name", "unknown"),
-                env=resource_attrs.get("deployment.environment", "dev")
-            )
-
-            # Extract log records
-            records = []
-            for scope_log in resource_log.get("scopeLogs", []):
-                for log_record in scope_log.get("logRecords", []):
-                    # Extract timestamp
-                    time_unix_nano = log_record.get("timeUnixNano", 0)
-                    if time_unix_nano:
-                        timestamp = datetime.fromtimestamp(int(time_unix_nano) / 1e9, tz=timezone.utc).isoformat()
-                    else:
-                        timestamp = datetime.now(timezone.utc).isoformat()
-
-                    # Extract message
-                    body = log_record.get("body", {})
-                    message = body.get("stringValue", str(body))
-
-                    # Extract severity
-                    severity_number = log_record.get("severityNumber", 9)  # Default to INFO
-                    severity_map = {
-                        1: "TRACE", 5: "DEBUG", 9: "INFO",
-                        13: "WARN", 17: "ERROR", 21: "FATAL"
-                    }
-                    severity = severity_map.get(severity_number, "INFO")
-
-                    # Extract trace context
-                    trace_id = log_record.get("traceId", "")
-                    if isinstance(trace_id, bytes):
-                        trace_id = trace_id.hex()
-
-                    span_id = log_record.get("spanId", "")
-                    if isinstance(span_id, bytes):
-                        span_id = span_id.hex()
-
-                    # Extract custom attributes
-                    log_attrs = {}
-                    for attr in log_record.get("attributes", []):
-                        key = attr.get("key", "")
-                        value = attr.get("value", {})
-                        if "stringValue" in value:
-                            log_attrs[key] = value["stringValue"]
-
-                    # Create LogRecord
-                    record = LogRecord(
-                        timestamp=timestamp,
-                        severity=severity,
-                        message=message,
-                        trace_id=trace_id or None,
-                        span_id=span_id or None,
-                        circuit_id=log_attrs.get("circuit_id"),
-                        product_id=log_attrs.get("product_id"),
-                        resource_id=log_attrs.get("resource_id"),
-                        resource_type_id=log_attrs.get("resource_type_id"),
-                        request_id=log_attrs.get("request_id"),
-                        labels=log_attrs
-                    )
-                    records.append(record)
-                    total_logs += 1
-
-            # Create and add batch to correlator
-            if records:
-                batch = LogBatch(resource=resource_info, records=records)
+            # Add batches (one per resource) to correlator
+            for batch in otlp_decoder.log_batches_from_json(data):
                 await correlation_engine.add_logs(batch)
+                total_logs += len(batch.records)
 
         LOG_RECORDS_RECEIVED.labels(source="otlp").inc(total_logs)
 
         logger.info("otlp_logs_ingested", count=total_logs)
 
         return {"status": "accepted", "count": total_logs}
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Failed to ingest OTLP logs", error=str(e))
         raise HTTPException(status_code=500, detail=f"Failed to ingest OTLP logs: {str(e)}")
@@ -199,6 +131,8 @@ async def ingest_otlp_traces(
     Ingest OTLP traces (supports both JSON and protobuf)
 
     Accepts OTLP format traces and adds them to correlation windows.
+    Protobuf bodies are decoded incrementally and each part is queued as
+    soon as it is decoded.
     """
     correlation_engine = request.app.state.correlation_engine
     TRACES_RECEIVED = request.app.state.TRACES_RECEIVED
@@ -211,63 +145,73 @@ async def ingest_otlp_traces(
 
     try:
         content_type = request.headers.get("content-type", "")
+        total_spans = 0
 
-        # Handle protobuf format
+        # Handle protobuf format. Parts stay as TracesData so span IDs are
+        # only hex-encoded by the consumer.
         if "application/x-protobuf" in content_type:
-            body = await request.body()
+            async for part in _iter_protobuf_parts(request, otlp_stream.TRACES):
+                await correlation_engine.add_traces(part)
+                total_spans += otlp_decoder.count_spans(part)
+        else:
+            data = await _read_json(request)
+            total_spans = otlp_decoder.count_spans(data)
+            await correlation_engine.add_traces(data)
 
-            # Additional size check
-            if len(body) > settings.max_protobuf_size:
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"Protobuf payload too large: {len(body)} bytes"
-                )
+        TRACES_RECEIVED.labels(source="otlp").inc(total_spans)
 
-            try:
-                traces_data = TracesData()
-                traces_data.ParseFromString(body)
-                data = MessageToDict(traces_data, preserving_proto_field_name=True)
-            except DecodeError as e:
-                logger.error("Invalid protobuf format", error=str(e))
-                raise HTTPException(status_code=400, detail=f"Invalid protobuf format: {str(e)}")
-            except Exception as e:
-                logger.error("Failed to parse protobuf", error=str(e))
-                raise HTTPException(status_code=400, detail=f"Failed to parse protobuf: {str(e)}")
-        else:
-            # Handle JSON format with size check
-            body = await request.body()
-            if len(body) > settings.max_json_size:
-                raise HTTPException(
-                    status_code=413,
-                    detail=f"JSON payload too large: {len(body)} bytes"
-                )
+        logger.info("otlp_traces_ingested", span_count=total_spans)
 
-            import json
-            try:
-                data = json.loads(body)
-            except json.JSONDecodeError as e:
-                logger.error("Invalid JSON format", error=str(e))
-                raise HTTPException(status_code=400, detail=f"Invalid JSON format: {str(e)}")
+        return {"status": "accepted", "span_count": total_spans}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to ingest OTLP traces", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to ingest OTLP traces: {str(e)}")
 
-        # Extract resource spans
-        resource_spans = data.get("resourceSpans", [])
 
-        total_spans = 0
-        for resource_span in resource_spans:
-            scope_spans = resource_span.get("scopeSpans", [])
+@router.post("/metrics", status_code=202)
+@profile_function(tags={"endpoint": "otlp_metrics", "operation": "ingest"})
+async def ingest_otlp_metrics(
+    request: Request,
+    authenticated: bool = Depends(verify_basic_auth),
+):
+    """
+    Ingest OTLP metrics (supports both JSON and protobuf)
 
-            for scope_span in scope_spans:
-                spans = scope_span.get("spans", [])
-                total_spans += len(spans)
+    Metrics are not stored or forwarded: data points are aggregated per
+    service and circuit_id into Prometheus series (see ``MetricsAggregator``).
+    Protobuf bodies are decoded incrementally.
+    """
+    metrics_aggregator = request.app.state.metrics_aggregator
 
-        # Forward traces to correlation engine for processing
-        await correlation_engine.add_traces(data)
+    if not metrics_aggregator:
+        raise HTTPException(status_code=503, detail="Metrics aggregator not initialized")
 
-        TRACES_RECEIVED.labels(source="otlp").inc(total_spans)
+    # Validate request size
+    await validate_request_size(request)
 
-        logger.info("otlp_traces_ingested", span_count=total_spans)
+    try:
+        content_type = request.headers.get("content-type", "")
+        total_points = 0
 
-        return {"status": "accepted", "span_count": total_spans}
+        if "application/x-protobuf" in content_type:
+            async for part in _iter_protobuf_parts(request, otlp_stream.METRICS):
+                total_points += metrics_aggregator.add(part)
+        else:
+            data = await _read_json(request)
+            try:
+                OTLPMetricsRequest.model_validate(data)
+                metrics_data = otlp_decoder.metrics_data_from_json(data)
+            except (ValueError, ParseError) as e:  # includes pydantic ValidationError
+                raise _body_error(e, "JSON")
+            total_points = metrics_aggregator.add(metrics_data)
+
+        logger.info("otlp_metrics_ingested", data_point_count=total_points)
+
+        return {"status": "accepted", "data_point_count": total_points}
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.exception("Failed to ingest OTLP traces", error=str(e))
-        raise HTTPException(status_code=500, detail=f"Failed to ingest OTLP traces: {str(e)}")
\ No newline at end of file
+        logger.exception("Failed to ingest OTLP metrics", error=str(e))
+        raise HTTPException(status_code=500, detail=f"Failed to ingest OTLP metrics: {str(e)}")
@@ -0,0 +1,87 @@
+"""Internal endpoints receiving records forwarded by peer instances
+
+Payloads posted here already reached the instance that owns their keys, so
+they are queued locally without being routed again.
+"""
+import json
+from typing import Any, Dict, List
+
+import structlog
+from fastapi import APIRouter, Depends, HTTPException, Request
+from google.protobuf.message import DecodeError
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+
+from app.correlation.trace_synthesizer import TraceSegment
+from app.models import LogBatch
+from app.routes.auth import verify_basic_auth
+
+router = APIRouter()
+logger = structlog.get_logger()
+
+
+def _engine(request: Request):
+    correlation_engine = request.app.state.correlation_engine
+    if not correlation_engine:
+        raise HTTPException(status_code=503, detail="Correlation engine not initialized")
+    return correlation_engine
+
+
+@router.post("/logs", status_code=202)
+async def receive_logs(
+    batch: LogBatch,
+    request: Request,
+    authenticated: bool = Depends(verify_basic_auth),
+):
+    """Queue a log batch forwarded by a peer"""
+    await _engine(request).add_logs(batch, forwarded=True)
+    return {"status": "accepted", "count": len(batch.records)}
+
+
+@router.post("/traces", status_code=202)
+async def receive_traces(
+    request: Request,
+    authenticated: bool = Depends(verify_basic_auth),
+):
+    """Queue a trace payload (protobuf or OTLP/JSON) forwarded by a peer"""
+    correlation_engine = _engine(request)
+    body = await request.body()
+
+    try:
+        if "application/x-protobuf" in request.headers.get("content-type", ""):
+            data = TracesData()
+            data.ParseFromString(body)
+        else:
+            data = json.loads(body)
+    except (DecodeError, json.JSONDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid trace payload: {str(e)}")
+
+    await correlation_engine.add_traces(data, forwarded=True)
+    return {"status": "accepted"}
+
+
+@router.post("/segments", status_code=202)
+async def receive_segments(
+    segments: List[Dict[str, Any]],
+    request: Request,
+    authenticated: bool = Depends(verify_basic_auth),
+):
+    """Hand trace synthesis segments forwarded by a peer to the synthesizer"""
+    try:
+        parsed = [TraceSegment(**segment) for segment in segments]
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid segment: {str(e)}")
+
+    _engine(request).add_synthesis_segments(parsed)
+    return {"status": "accepted", "count": len(parsed)}
+
+
+@router.get("/members")
+async def ring_members(
+    request: Request,
+    authenticated: bool = Depends(verify_basic_auth),
+):
+    """Instances on this node's hash ring"""
+    shard_router = _engine(request).shard_router
+    if not shard_router:
+        return {"enabled": False, "members": []}
+    return {"enabled": True, "self": shard_router.self_url, "members": list(shard_router.ring.nodes)}
@@ -0,0 +1,116 @@
+"""Benchmark: ring-buffer CorrelationHistory vs list history with rebuilt indexes
+
+Compares the previous history store (a list of CorrelationEvent models trimmed
+with ``pop(0)``, whose trace_id/service index lists were rebuilt on every
+eviction) with ``CorrelationHistory`` (slot records in a ring, deque indexes):
+
+- memory: traced allocation size once the history is full
+- append latency: per-correlation cost once at capacity (every append evicts)
+
+Usage (from correlation-engine/):
+    python -m benchmarks.bench_correlation_history
+    python -m benchmarks.bench_correlation_history --capacity 100000 --appends 2000
+"""
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from app.models import CorrelationEvent
+from app.pipeline.correlation_history import CorrelationHistory
+
+SERVICES = ["beorn", "arda", "palantir", "mdso-scriptplan"]
+BASE_TIME = datetime(2025, 10, 15, tzinfo=timezone.utc)
+
+
+class ListHistory:
+    """The list-based history and index maintenance CorrelationEngine used before"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.history = []
+        self.index = {"by_trace_id": defaultdict(list), "by_service": defaultdict(list)}
+
+    def append(self, correlation: CorrelationEvent):
+        self.history.append(correlation)
+        self.index["by_trace_id"][correlation.trace_id].append(correlation)
+        self.index["by_service"][correlation.service].append(correlation)
+
+        if len(self.history) > self.capacity:
+            removed = self.history.pop(0)
+            for name, key in (("by_trace_id", removed.trace_id), ("by_service", removed.service)):
+                index = self.index[name]
+                index[key] = [c for c in index[key] if c.correlation_id != removed.correlation_id]
+                if not index[key]:
+                    del index[key]
+
+
+def make_events(count: int, offset: int = 0):
+    return [
+        CorrelationEvent(
+            correlation_id=str(uuid.uuid4()),
+            trace_id=uuid.uuid4().hex,
+            timestamp=BASE_TIME + timedelta(milliseconds=offset + i),
+            service=SERVICES[i % len(SERVICES)],
+            env="dev",
+            log_count=3,
+            span_count=1,
+        )
+        for i in range(count)
+    ]
+
+
+def fill(store_cls, capacity: int):
+    """Build a full store and return it with its traced memory footprint"""
+    gc.collect()
+    tracemalloc.start()
+    events = make_events(capacity)
+    store = store_cls(capacity)
+    for event in events:
+        store.append(event)
+    # Events are referenced by the store (list) or copied into records (ring);
+    # dropping the source list leaves only what each store keeps alive
+    del events
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, size
+
+
+def append_latency(store, events):
+    """Per-append wall times in microseconds (each append evicts the oldest)"""
+    samples = []
+    for event in events:
+        start = time.perf_counter()
+        store.append(event)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--capacity", type=int, default=20000, help="history capacity (max_correlation_history)")
+    parser.add_argument("--appends", type=int, default=2000, help="timed appends once the history is full")
+    args = parser.parse_args()
+
+    extra = make_events(args.appends, offset=args.capacity)
+
+    print(f"\nCorrelation history: capacity {args.capacity}, {args.appends} appends at capacity")
+    print(f"  {'store':<8} {'memory':>10} {'bytes/entry':>12} {'p50 append':>12} {'p99 append':>12}")
+    for name, store_cls in (("list", ListHistory), ("ring", CorrelationHistory)):
+        store, size = fill(store_cls, args.capacity)
+        samples = sorted(append_latency(store, extra))
+        p50 = statistics.median(samples)
+        p99 = samples[int(len(samples) * 0.99) - 1]
+        print(
+            f"  {name:<8} {size / 2**20:>8.1f}MB {size / args.capacity:>12.0f}"
+            f" {p50:>10.1f}us {p99:>10.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
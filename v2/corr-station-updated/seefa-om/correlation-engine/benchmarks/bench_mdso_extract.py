@@ -0,0 +1,109 @@
+"""Benchmark: single-pass MDSOExtractor vs per-pattern MDSO extraction
+
+Compares, over a corpus of MDSO-shaped syslog lines:
+
+- per-pattern: MDSOPatterns.extract_all_identifiers + ErrorCategorizer.categorize
+  (one re.search per field, eight more for categorization)
+- single-pass: MDSOExtractor.extract (compiled patterns behind literal prefilters)
+
+Usage (from correlation-engine/):
+    python -m benchmarks.bench_mdso_extract
+    python -m benchmarks.bench_mdso_extract --lines 50000 --rounds 7
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.mdso_patterns import MDSOPatterns, ErrorCategorizer, MDSOExtractor
+
+# Shapes seen in MDSO scriptplan / resource-agent syslog output
+TEMPLATES = [
+    "{ts} {host} scriptplan[{pid}]: INFO resource {uuid} state CREATE_IN_PROGRESS",
+    "{ts} {host} scriptplan[{pid}]: INFO resource {uuid} state UPDATE_COMPLETE",
+    "{ts} {host} scriptplan[{pid}]: INFO Creating service for circuit: {circuit} on device {fqdn}",
+    "{ts} {host} resource_agent[{pid}]: DEBUG polling {uuid} product=network_service",
+    "{ts} {host} scriptplan[{pid}]: INFO service: ELAN provisioning started by service_mapper for {circuit}",
+    "{ts} {host} scriptplan[{pid}]: ERROR unable to connect to device {fqdn}",
+    "{ts} {host} scriptplan[{pid}]: ERROR GRANITE DESIGN | missing path element for {circuit}",
+    "{ts} {host} scriptplan[{pid}]: ERROR IP {ip}/30 is not a network address.",
+    "{ts} {host} scriptplan[{pid}]: ERROR Orchestration DELETE_FAILED with DE-{code} on {circuit}",
+    "{ts} {host} scriptplan[{pid}]: WARN IP {ip} already exists on device {tid}",
+    "{ts} {host} scriptplan[{pid}]: ERROR DEVICE ROLE CPE is INVALID for {fqdn}.",
+    "{ts} {host} orchestration_engine[{pid}]: INFO heartbeat ok",
+    "{ts} {host} scriptplan[{pid}]: INFO Completed request req-{pid} in 231 ms",
+]
+
+
+def build_corpus(lines: int, seed: int = 7):
+    """Generate MDSO-shaped syslog lines"""
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(lines):
+        tid = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789") for _ in range(10))
+        corpus.append(rng.choice(TEMPLATES).format(
+            ts=f"2025-10-15T10:{i % 60:02d}:{i % 60:02d}.123Z",
+            host=f"mdso-node-{i % 4}",
+            pid=1000 + i % 5000,
+            uuid=f"{rng.getrandbits(32):08x}-1111-2222-3333-{rng.getrandbits(48):012x}",
+            circuit=f"{rng.randint(10, 99)}.L1XX.{rng.randint(0, 999999):06d}..CHTR",
+            fqdn=f"{tid}.CHTRSE.COM",
+            tid=f"{tid}W",
+            ip=f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}",
+            code=rng.randint(1000, 9999),
+        ))
+    return corpus
+
+
+def per_pattern(corpus):
+    categorizer = ErrorCategorizer()
+    for line in corpus:
+        MDSOPatterns.extract_all_identifiers(line)
+        categorizer.categorize(line)
+
+
+def single_pass(corpus):
+    extractor = MDSOExtractor()
+    for line in corpus:
+        extractor.extract(line)
+
+
+def _time(func, corpus, rounds: int) -> float:
+    """Median wall time in seconds over ``rounds`` runs (after one warmup)"""
+    func(corpus)
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(corpus)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=20000, help="syslog lines in the corpus")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per path")
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.lines)
+
+    # Sanity check: both paths agree before timing them
+    extractor = MDSOExtractor()
+    categorizer = ErrorCategorizer()
+    for line in corpus:
+        expected = MDSOPatterns.extract_all_identifiers(line)
+        expected.update(categorizer.categorize(line))
+        assert extractor.extract(line) == expected, line
+
+    per_pattern_s = _time(per_pattern, corpus, args.rounds)
+    single_pass_s = _time(single_pass, corpus, args.rounds)
+
+    print(f"\nMDSO extraction: {args.lines} lines")
+    print(f"  {'path':<12} {'median':>10} {'lines/s':>14}")
+    print(f"  {'per-pattern':<12} {per_pattern_s * 1000:>8.1f}ms {args.lines / per_pattern_s:>14,.0f}")
+    print(f"  {'single-pass':<12} {single_pass_s * 1000:>8.1f}ms {args.lines / single_pass_s:>14,.0f}")
+    print(f"  speedup: {per_pattern_s / single_pass_s:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
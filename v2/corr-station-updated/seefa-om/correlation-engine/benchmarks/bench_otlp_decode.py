@@ -0,0 +1,172 @@
+"""Benchmark: native protobuf OTLP decode vs MessageToDict + dict walk
+
+Compares the two ways the OTLP routes can turn an ``application/x-protobuf``
+body into internal models:
+
+- dict path:   ParseFromString -> MessageToDict -> walk OTLP/JSON dicts
+- native path: ParseFromString -> read LogsData/TracesData fields directly
+
+Usage (from correlation-engine/):
+    python -m benchmarks.bench_otlp_decode
+    python -m benchmarks.bench_otlp_decode --records 50000 --rounds 5
+"""
+import argparse
+import base64
+import os
+import statistics
+import time
+
+from google.protobuf.json_format import MessageToDict
+from opentelemetry.proto.logs.v1.logs_pb2 import LogsData
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+
+from app.pipeline import otlp_decoder
+
+SERVICES = ["beorn", "arda", "palantir", "mdso-scriptplan"]
+
+
+def _set_str(kv, key, value):
+    kv.key = key
+    kv.value.string_value = value
+
+
+def build_logs_payload(records: int) -> bytes:
+    """Build a serialized LogsData with MDSO-shaped log lines"""
+    logs_data = LogsData()
+    per_resource = max(1, records // len(SERVICES))
+
+    for service in SERVICES:
+        resource_log = logs_data.resource_logs.add()
+        _set_str(resource_log.resource.attributes.add(), "service.name", service)
+        _set_str(resource_log.resource.attributes.add(), "host.name", f"{service}-host-01")
+        _set_str(resource_log.resource.attributes.add(), "deployment.environment", "prod")
+        scope_log = resource_log.scope_logs.add()
+
+        for i in range(per_resource):
+            record = scope_log.log_records.add()
+            record.time_unix_nano = 1_700_000_000_000_000_000 + i * 1_000_000
+            record.severity_number = 17 if i % 10 == 0 else 9
+            record.body.string_value = (
+                f"{service}[{1000 + i}]: resource 3f2b8c1e-1111-2222-3333-{i:012d} "
+                f"circuit 51.L1XX.{i % 1000000:06d}..CHTR state CREATE_IN_PROGRESS "
+                f"device NYCMNYBW1AW.CHTRSE.COM"
+            )
+            record.trace_id = os.urandom(16)
+            record.span_id = os.urandom(8)
+            _set_str(record.attributes.add(), "circuit_id", f"51.L1XX.{i % 1000000:06d}..CHTR")
+            _set_str(record.attributes.add(), "request_id", f"req-{i}")
+
+    return logs_data.SerializeToString()
+
+
+def build_traces_payload(spans: int) -> bytes:
+    """Build a serialized TracesData with correlation attributes"""
+    traces_data = TracesData()
+    per_resource = max(1, spans // len(SERVICES))
+
+    for service in SERVICES:
+        resource_span = traces_data.resource_spans.add()
+        _set_str(resource_span.resource.attributes.add(), "service.name", service)
+        _set_str(resource_span.resource.attributes.add(), "deployment.environment", "prod")
+        scope_span = resource_span.scope_spans.add()
+
+        for i in range(per_resource):
+            span = scope_span.spans.add()
+            span.trace_id = os.urandom(16)
+            span.span_id = os.urandom(8)
+            span.name = f"{service}.operation.{i % 20}"
+            span.start_time_unix_nano = 1_700_000_000_000_000_000 + i * 1_000_000
+            span.end_time_unix_nano = span.start_time_unix_nano + 5_000_000
+            _set_str(span.attributes.add(), "circuit_id", f"51.L1XX.{i % 1000000:06d}..CHTR")
+            _set_str(span.attributes.add(), "resource_id", f"3f2b8c1e-1111-2222-3333-{i:012d}")
+
+    return traces_data.SerializeToString()
+
+
+def _hexify_ids(node):
+    """MessageToDict base64-encodes bytes; OTLP/JSON expects hex IDs"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key in ("traceId", "spanId") and isinstance(value, str):
+                node[key] = base64.b64decode(value).hex()
+            else:
+                _hexify_ids(value)
+    elif isinstance(node, list):
+        for item in node:
+            _hexify_ids(item)
+
+
+def logs_dict_path(body: bytes):
+    logs_data = LogsData()
+    logs_data.ParseFromString(body)
+    data = MessageToDict(logs_data)
+    _hexify_ids(data)
+    return otlp_decoder.log_batches_from_json(data)
+
+
+def logs_native_path(body: bytes):
+    logs_data = LogsData()
+    logs_data.ParseFromString(body)
+    return otlp_decoder.log_batches_from_proto(logs_data)
+
+
+def traces_dict_path(body: bytes):
+    traces_data = TracesData()
+    traces_data.ParseFromString(body)
+    data = MessageToDict(traces_data)
+    _hexify_ids(data)
+    return otlp_decoder.spans_from_json(data)
+
+
+def traces_native_path(body: bytes):
+    traces_data = TracesData()
+    traces_data.ParseFromString(body)
+    return otlp_decoder.spans_from_proto(traces_data)
+
+
+def _time(func, body: bytes, rounds: int) -> float:
+    """Median wall time in seconds over ``rounds`` runs (after one warmup)"""
+    func(body)
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(body)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def _report(signal: str, items: int, body: bytes, dict_s: float, native_s: float):
+    print(f"\n{signal}: {items} items, {len(body) / 1024 / 1024:.1f} MiB payload")
+    print(f"  {'path':<10} {'median':>10} {'items/s':>14}")
+    print(f"  {'dict':<10} {dict_s * 1000:>8.1f}ms {items / dict_s:>14,.0f}")
+    print(f"  {'native':<10} {native_s * 1000:>8.1f}ms {items / native_s:>14,.0f}")
+    print(f"  speedup: {dict_s / native_s:.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=20000, help="log records / spans per payload")
+    parser.add_argument("--rounds", type=int, default=5, help="timed rounds per path")
+    args = parser.parse_args()
+
+    logs_body = build_logs_payload(args.records)
+    traces_body = build_traces_payload(args.records)
+
+    # Sanity check: both paths agree before timing them
+    assert len(logs_dict_path(logs_body)) == len(logs_native_path(logs_body))
+    assert traces_dict_path(traces_body) == traces_native_path(traces_body)
+
+    _report(
+        "logs", args.records, logs_body,
+        _time(logs_dict_path, logs_body, args.rounds),
+        _time(logs_native_path, logs_body, args.rounds),
+    )
+    _report(
+        "traces", args.records, traces_body,
+        _time(traces_dict_path, traces_body, args.rounds),
+        _time(traces_native_path, traces_body, args.rounds),
+    )
+
+
+if __name__ == "__main__":
+    main()
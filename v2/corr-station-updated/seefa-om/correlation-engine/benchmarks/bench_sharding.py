@@ -0,0 +1,214 @@
+"""Benchmark: sharded correlation throughput across N local engine instances
+
+Starts N correlation engine processes on localhost (uvicorn, static ring
+membership, no-op exporters) and has sender processes POST log batches with
+random trace_ids to them round-robin, as a load balancer would. Each
+instance forwards the records it does not own to their owner. Throughput is
+measured from the first request until every record has reached the
+correlation window on its owning instance:
+
+- records/s: cluster throughput
+- scaling: throughput relative to a single instance
+- forwarded: share of records that crossed to a peer
+
+Scaling is only meaningful with more free cores than nodes + senders.
+
+Usage (from correlation-engine/):
+    python -m benchmarks.bench_sharding
+    python -m benchmarks.bench_sharding --nodes 1 2 4 --batches 400 --records 200 --senders 2
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+BASE_PORT = 18600
+
+
+class NullExporterManager:
+    """Exporter stand-in so the benchmark measures routing and correlation only"""
+
+    async def export_logs(self, batch):
+        pass
+
+    async def export_traces(self, traces):
+        pass
+
+    async def export_correlation_span(self, correlation):
+        pass
+
+    async def export_bridge_span(self, span):
+        pass
+
+
+def serve(port: int, nodes):
+    """Run one engine instance (child process)"""
+    import structlog
+    import uvicorn
+    from fastapi import FastAPI
+    from prometheus_client import Counter
+
+    from app.pipeline.correlator import CorrelationEngine
+    from app.pipeline.sharding import ShardRouter, StaticMembership
+    from app.routes import logs, shard
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    counts = {"processed": 0, "forwarded": 0}
+
+    @asynccontextmanager
+    async def lifespan(app):
+        router = ShardRouter(f"http://127.0.0.1:{port}", StaticMembership(nodes))
+        await router.start()
+        forward = router.forward
+
+        async def counting_forward(node, kind, payload):
+            ok = await forward(node, kind, payload)
+            if ok and kind == "logs":
+                counts["forwarded"] += len(payload.records)
+            return ok
+
+        router.forward = counting_forward
+        engine = CorrelationEngine(window_seconds=3600, exporter_manager=NullExporterManager(), shard_router=router)
+
+        normalize = engine.normalizer.normalize_log_batch
+
+        def counting_normalize(batch):
+            counts["processed"] += len(batch.records)
+            return normalize(batch)
+
+        engine.normalizer.normalize_log_batch = counting_normalize
+        app.state.correlation_engine = engine
+        app.state.LOG_RECORDS_RECEIVED = Counter("bench_log_records_received_total", "", ["source"])
+        task = asyncio.create_task(engine.run())
+        yield
+        engine.stop()
+        task.cancel()
+        await router.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(logs.router, prefix="/api")
+    app.include_router(shard.router, prefix="/internal/shard")
+
+    @app.get("/bench/counts")
+    async def bench_counts():
+        return counts
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", access_log=False)
+
+
+def make_payloads(batches: int, records: int):
+    from app.models import LogBatch, LogRecord, ResourceInfo
+
+    return [
+        LogBatch(
+            resource=ResourceInfo(service="beorn", host="bench", env="dev"),
+            records=[
+                LogRecord(
+                    timestamp="2025-10-15T10:30:00Z",
+                    message=f"circuit CID-{i:06d} provisioning step {n}",
+                    trace_id=uuid.uuid4().hex,
+                )
+                for n in range(records)
+            ],
+        ).model_dump_json()
+        for i in range(batches)
+    ]
+
+
+def send(urls, payloads, concurrency: int):
+    """POST ``payloads`` round-robin across ``urls`` (sender process)"""
+    import httpx
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        async with httpx.AsyncClient(timeout=60) as client:
+            async def post(i, payload):
+                async with semaphore:
+                    response = await client.post(
+                        f"{urls[i % len(urls)]}/api/logs",
+                        content=payload, headers={"Content-Type": "application/json"},
+                    )
+                    response.raise_for_status()
+            await asyncio.gather(*(post(i, p) for i, p in enumerate(payloads)))
+
+    asyncio.run(run())
+
+
+async def cluster_counts(urls):
+    """Records (processed, forwarded) summed over all instances"""
+    import httpx
+
+    async with httpx.AsyncClient(timeout=5) as client:
+        responses = await asyncio.gather(*(client.get(f"{url}/bench/counts") for url in urls))
+    counts = [r.json() for r in responses]
+    return sum(c["processed"] for c in counts), sum(c["forwarded"] for c in counts)
+
+
+def wait_ready(urls, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            asyncio.run(cluster_counts(urls))
+            return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError("engine instances did not start")
+
+
+def run_cluster(nodes: int, payloads, total: int, senders: int, concurrency: int):
+    """Seconds until all records are processed, and the number forwarded"""
+    ctx = multiprocessing.get_context("spawn")
+    urls = [f"http://127.0.0.1:{BASE_PORT + i}" for i in range(nodes)]
+    servers = [ctx.Process(target=serve, args=(BASE_PORT + i, urls), daemon=True) for i in range(nodes)]
+    for server in servers:
+        server.start()
+    try:
+        wait_ready(urls)
+        start = time.perf_counter()
+        workers = [
+            ctx.Process(target=send, args=(urls, payloads[i::senders], concurrency))
+            for i in range(senders)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        while True:
+            done, forwarded = asyncio.run(cluster_counts(urls))
+            if done >= total:
+                return time.perf_counter() - start, forwarded
+            time.sleep(0.01)
+    finally:
+        for server in servers:
+            server.terminate()
+            server.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1, 2, 4], help="cluster sizes to run")
+    parser.add_argument("--batches", type=int, default=400, help="log batches to send")
+    parser.add_argument("--records", type=int, default=200, help="records per batch")
+    parser.add_argument("--senders", type=int, default=2, help="load generator processes")
+    parser.add_argument("--concurrency", type=int, default=16, help="in-flight requests per sender")
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.batches, args.records)
+    total = args.batches * args.records
+
+    print(f"\nSharded correlation: {args.batches} batches x {args.records} records, "
+          f"{args.senders} senders, {multiprocessing.cpu_count()} CPUs")
+    print(f"  {'nodes':>5} {'seconds':>8} {'records/s':>11} {'scaling':>8} {'forwarded':>10}")
+    baseline = None
+    for nodes in args.nodes:
+        elapsed, forwarded = run_cluster(nodes, payloads, total, args.senders, args.concurrency)
+        rate = total / elapsed
+        baseline = baseline or rate
+        print(f"  {nodes:>5} {elapsed:>8.2f} {rate:>11.0f} {rate / baseline:>7.2f}x {forwarded / total:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark: CorrelationEntry state codecs (JSON vs msgpack vs msgpack+zstd)
+
+Encodes the same correlation entries with each codec and reports:
+
+- size: mean stored bytes per entry (what Redis keeps in memory)
+- encode / decode: mean wall time per entry
+
+Usage (from correlation-engine/):
+    python -m benchmarks.bench_state_codec
+    python -m benchmarks.bench_state_codec --entries 2000 --logs 50 --spans 10
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app.pipeline.state_codec import JsonCodec, MsgpackCodec, ZSTD_AVAILABLE
+from app.pipeline.state_manager import CorrelationEntry
+
+SERVICES = ["beorn", "arda", "palantir", "mdso-scriptplan"]
+BASE_TIME = datetime(2025, 10, 15, tzinfo=timezone.utc)
+
+
+def make_entries(count: int, logs: int, spans: int):
+    entries = []
+    for i in range(count):
+        trace_id = uuid.uuid4().hex
+        ts = BASE_TIME + timedelta(milliseconds=i)
+        entries.append(CorrelationEntry(
+            correlation_id=str(uuid.uuid4()),
+            trace_id=trace_id,
+            service=SERVICES[i % len(SERVICES)],
+            env="prod",
+            first_seen=ts,
+            last_updated=ts,
+            spans=[
+                {
+                    "trace_id": trace_id,
+                    "span_id": uuid.uuid4().hex[:16],
+                    "name": f"POST /api/v3/circuit/{i}/step-{s}",
+                    "start_time": (ts + timedelta(milliseconds=s)).isoformat(),
+                    "duration_ms": 12.5 + s,
+                }
+                for s in range(spans)
+            ],
+            logs=[
+                {
+                    "timestamp": (ts + timedelta(milliseconds=n)).isoformat(),
+                    "severity": "INFO",
+                    "message": f"Processing circuit CID-{i:06d} resource lookup step {n} completed",
+                    "service": SERVICES[i % len(SERVICES)],
+                    "circuit_id": f"CID-{i:06d}",
+                }
+                for n in range(logs)
+            ],
+            metadata={"circuit_id": f"CID-{i:06d}", "log_count": logs, "span_count": spans},
+        ))
+    return entries
+
+
+def measure(codec, entries):
+    """Mean size in bytes and mean encode/decode time in microseconds"""
+    start = time.perf_counter()
+    encoded = [codec.encode(entry) for entry in entries]
+    encode_us = (time.perf_counter() - start) / len(entries) * 1e6
+
+    start = time.perf_counter()
+    for data in encoded:
+        codec.decode(data)
+    decode_us = (time.perf_counter() - start) / len(entries) * 1e6
+
+    return sum(map(len, encoded)) / len(encoded), encode_us, decode_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=2000, help="correlation entries to encode")
+    parser.add_argument("--logs", type=int, default=20, help="log records per entry")
+    parser.add_argument("--spans", type=int, default=5, help="spans per entry")
+    args = parser.parse_args()
+
+    entries = make_entries(args.entries, args.logs, args.spans)
+    codecs = [("json", JsonCodec()), ("msgpack", MsgpackCodec(compress_logs=False))]
+    if ZSTD_AVAILABLE:
+        codecs.append(("msgpack+zstd", MsgpackCodec(compress_logs=True)))
+
+    print(f"\nState codecs: {args.entries} entries, {args.logs} logs and {args.spans} spans each")
+    print(f"  {'codec':<14} {'bytes/entry':>12} {'vs json':>8} {'encode':>10} {'decode':>10}")
+    baseline = None
+    for name, codec in codecs:
+        size, encode_us, decode_us = measure(codec, entries)
+        baseline = baseline or size
+        print(f"  {name:<14} {size:>12.0f} {size / baseline:>7.0%} {encode_us:>8.1f}us {decode_us:>8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""Tests for per-backend export queues and ExporterManager fan-out"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+
+from app.config import settings
+from app.models import LogBatch, LogRecord, ResourceInfo
+from app.pipeline import backend_queue
+from app.pipeline.backend_queue import BackendQueue
+from app.pipeline.exporters import ExporterManager
+
+
+def make_batch(message="test") -> LogBatch:
+    return LogBatch(
+        resource=ResourceInfo(service="beorn", host="host-1", env="dev"),
+        records=[LogRecord(timestamp="2025-10-15T10:30:00Z", severity="INFO", message=message)],
+    )
+
+
+async def wait_for(condition, timeout: float = 1.0) -> bool:
+    """Poll ``condition`` until it is true or ``timeout`` passes"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while asyncio.get_running_loop().time() < deadline:
+        if condition():
+            return True
+        await asyncio.sleep(0.01)
+    return condition()
+
+
+class TestOverflowPolicies:
+    """Full-queue behaviour per policy"""
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest(self):
+        """The oldest queued item makes room for the new one"""
+        queue = BackendQueue("test", AsyncMock(), maxsize=2, overflow="drop_oldest")
+
+        for item in ("a", "b", "c"):
+            await queue.enqueue(item)
+
+        assert [queue.queue.get_nowait() for _ in range(2)] == ["b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_block_waits_for_space(self):
+        """enqueue() waits until a worker frees a slot"""
+        queue = BackendQueue("test", AsyncMock(), maxsize=1, overflow="block")
+        await queue.enqueue("a")
+
+        blocked = asyncio.create_task(queue.enqueue("b"))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+
+        queue.start()
+        await asyncio.wait_for(blocked, timeout=1.0)
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_spill_and_replay(self, tmp_path):
+        """Overflow goes to disk and is exported after the in-memory queue"""
+        exported = []
+        queue = BackendQueue(
+            "test", AsyncMock(side_effect=exported.append), maxsize=1, overflow="spill",
+            spill_dir=str(tmp_path), serialize=str, deserialize=lambda line: line.strip(),
+        )
+
+        for item in ("a", "b", "c"):
+            await queue.enqueue(item)
+        assert queue.depth == 3
+        assert (tmp_path / "test.jsonl").read_text().splitlines() == ["b", "c"]
+
+        queue.start()
+        assert await wait_for(lambda: len(exported) == 3)
+        await queue.stop()
+
+        assert exported == ["a", "b", "c"]
+        assert (tmp_path / "test.jsonl").read_text() == ""
+
+    @pytest.mark.asyncio
+    async def test_spill_survives_restart(self, tmp_path):
+        """Items spilled by a previous instance are replayed"""
+        (tmp_path / "test.jsonl").write_text("x\ny\n")
+        exported = []
+        queue = BackendQueue(
+            "test", AsyncMock(side_effect=exported.append), overflow="spill",
+            spill_dir=str(tmp_path), serialize=str, deserialize=lambda line: line.strip(),
+        )
+
+        queue.start()
+        assert await wait_for(lambda: len(exported) == 2)
+        await queue.stop()
+
+        assert exported == ["x", "y"]
+
+    @pytest.mark.asyncio
+    async def test_replay_offset_survives_crash(self, tmp_path, monkeypatch):
+        """A restart after a crash resumes replay after the items already read"""
+        monkeypatch.setattr(backend_queue, "SPILL_READ_BATCH", 1)
+        (tmp_path / "test.jsonl").write_text("x\ny\nz\n")
+        kwargs = dict(overflow="spill", spill_dir=str(tmp_path), serialize=str, deserialize=lambda line: line.strip())
+        crashed = BackendQueue("test", AsyncMock(), **kwargs)
+        assert await crashed._next_spilled() == "x"
+        crashed._spill_io.shutdown()
+
+        restarted = BackendQueue("test", AsyncMock(), **kwargs)
+
+        assert restarted.depth == 2
+        assert [await restarted._next_spilled() for _ in range(2)] == ["y", "z"]
+        await restarted.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_keeps_unexported_replay_items(self, tmp_path):
+        """Items read back but not exported at shutdown go back to disk"""
+        (tmp_path / "test.jsonl").write_text("x\ny\nz\n")
+        kwargs = dict(overflow="spill", spill_dir=str(tmp_path), serialize=str, deserialize=lambda line: line.strip())
+        queue = BackendQueue("test", AsyncMock(), **kwargs)
+        assert await queue._next_spilled() == "x"
+        await queue.stop()
+
+        assert (tmp_path / "test.jsonl").read_text().splitlines() == ["y", "z"]
+        assert BackendQueue("test", AsyncMock(), **kwargs).depth == 2
+
+    @pytest.mark.asyncio
+    async def test_stop_keeps_replay_order(self, tmp_path, monkeypatch):
+        """Unexported replay items go back ahead of the unread ones, queued items after"""
+        monkeypatch.setattr(backend_queue, "SPILL_READ_BATCH", 2)
+        (tmp_path / "test.jsonl").write_text("a\nb\nc\nd\n")
+        kwargs = dict(overflow="spill", spill_dir=str(tmp_path), serialize=str, deserialize=lambda line: line.strip())
+        queue = BackendQueue("test", AsyncMock(), maxsize=2, **kwargs)
+        assert await queue._next_spilled() == "a"
+        await queue.enqueue("q1")
+        await queue.enqueue("q2")
+        await queue.stop()
+
+        assert (tmp_path / "test.jsonl").read_text().splitlines() == ["b", "c", "d", "q1", "q2"]
+        restarted = BackendQueue("test", AsyncMock(), **kwargs)
+        assert restarted.depth == 5
+        assert [await restarted._next_spilled() for _ in range(5)] == ["b", "c", "d", "q1", "q2"]
+        await restarted.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_spills_undrained_items(self, tmp_path):
+        """Items the drain timeout did not reach are spilled, not dropped"""
+        release = asyncio.Event()
+        exported = []
+
+        async def export(item):
+            await release.wait()
+            exported.append(item)
+
+        kwargs = dict(overflow="spill", spill_dir=str(tmp_path), serialize=str, deserialize=lambda line: line.strip())
+        queue = BackendQueue("test", export, maxsize=10, **kwargs)
+        queue.start()
+        for item in ("a", "b", "c"):
+            await queue.enqueue(item)
+        await asyncio.sleep(0)  # the worker takes "a" and blocks exporting it
+        await queue.stop(timeout=0.05)
+
+        assert exported == []
+        assert (tmp_path / "test.jsonl").read_text().splitlines() == ["b", "c"]
+        assert BackendQueue("test", AsyncMock(), **kwargs).depth == 2
+
+    def test_unknown_policy_rejected(self):
+        with pytest.raises(ValueError):
+            BackendQueue("test", AsyncMock(), overflow="discard")
+
+
+class TestBackendQueueWorkers:
+    """Worker behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_export_error_does_not_kill_worker(self):
+        """A failed export is logged and the worker moves on"""
+        export = AsyncMock(side_effect=[Exception("boom"), None])
+        queue = BackendQueue("test", export)
+        queue.start()
+
+        await queue.enqueue("a")
+        await queue.enqueue("b")
+
+        assert await wait_for(lambda: export.await_count == 2)
+        await queue.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_queue(self):
+        """stop() lets workers finish queued items first"""
+        export = AsyncMock()
+        queue = BackendQueue("test", export, workers=2)
+        queue.start()
+        for item in range(5):
+            await queue.enqueue(item)
+
+        await queue.stop()
+
+        assert export.await_count == 5
+
+
+class TestExporterManagerFanOut:
+    """Backends are isolated from each other"""
+
+    @pytest.fixture
+    def manager(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(settings, "export_spill_dir", str(tmp_path))
+        manager = ExporterManager(
+            loki_url="http://test-loki:3100",
+            tempo_grpc_endpoint="test-tempo:4317",
+            tempo_http_endpoint="http://test-tempo:4318",
+            datadog_api_key="dd-key",
+        )
+        manager.loki.export_logs = AsyncMock()
+        manager.datadog.export_logs = AsyncMock()
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_slow_backend_does_not_delay_others(self, manager):
+        """A stalled Datadog export leaves Loki and the caller unaffected"""
+        stalled = asyncio.Event()
+
+        async def stalled_export(batch):
+            await stalled.wait()
+
+        manager.datadog.export_logs.side_effect = stalled_export
+        manager.start()
+
+        await asyncio.wait_for(manager.export_logs(make_batch()), timeout=0.5)
+
+        assert await wait_for(lambda: manager.loki.export_logs.await_count == 1)
+        assert manager.log_queues["datadog"].queue.qsize() == 0  # taken by a stalled worker
+        stalled.set()
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_unstarted_manager_exports_concurrently(self, manager):
+        """Without queues both backends are awaited together"""
+        started = []
+
+        def recorder(name):
+            async def export(batch):
+                started.append(name)
+                await asyncio.sleep(0.05)
+            return export
+
+        manager.loki.export_logs = recorder("loki")
+        manager.datadog.export_logs = recorder("datadog")
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await manager.export_logs(make_batch())
+
+        assert sorted(started) == ["datadog", "loki"]
+        assert loop.time() - start < 0.09
+
+    @pytest.mark.asyncio
+    async def test_datadog_queue_only_when_enabled(self, manager):
+        """A disabled Datadog exporter gets no queue"""
+        manager.datadog.enabled = False
+        manager.start()
+
+        assert list(manager.log_queues) == ["loki"]
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_spilled_batches_round_trip(self, manager, monkeypatch):
+        """LogBatch spills through JSON and comes back intact"""
+        monkeypatch.setattr(settings, "loki_overflow_policy", "spill")
+        monkeypatch.setattr(settings, "backend_queue_size", 1)
+        manager.datadog.enabled = False
+        manager.start()
+        queue = manager.log_queues["loki"]
+        for worker in queue._workers:
+            worker.cancel()
+        queue._workers = []
+
+        await manager.export_logs(make_batch("first"))
+        await manager.export_logs(make_batch("second"))
+
+        assert await queue._next_spilled() == make_batch("second")
+        await manager.close()
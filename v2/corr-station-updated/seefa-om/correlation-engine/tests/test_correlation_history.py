@@ -0,0 +1,302 @@
+"""Tests for the ring-buffer correlation history"""
+import uuid
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from app.models import CorrelationEvent
+from app.pipeline.correlation_history import CorrelationHistory, TIME_BUCKET_SECONDS, encode_cursor
+
+
+BASE_TIME = datetime(2025, 10, 15, 10, 0, tzinfo=timezone.utc)
+
+
+def make_event(i: int, trace_id=None, service="beorn", **fields) -> CorrelationEvent:
+    return CorrelationEvent(
+        correlation_id=str(uuid.uuid4()),
+        trace_id=trace_id or f"trace-{i}",
+        timestamp=BASE_TIME + timedelta(seconds=i),
+        service=service,
+        env="dev",
+        **fields,
+    )
+
+
+class TestRingBuffer:
+    """Append, eviction and ordering"""
+
+    def test_evicts_oldest_at_capacity(self):
+        history = CorrelationHistory(3)
+        events = [make_event(i) for i in range(5)]
+        for event in events:
+            history.append(event)
+
+        assert len(history) == 3
+        assert list(history) == events[2:]
+        assert list(reversed(history)) == events[:1:-1]
+        assert history[0] == events[2]
+        assert history[-1] == events[4]
+
+    def test_round_trips_all_fields(self):
+        """Materialized events equal the originals, metadata included"""
+        history = CorrelationHistory(2)
+        event = make_event(1, circuit_id="C", request_id="R", log_count=3, metadata={"synthetic": True})
+        plain = make_event(2)
+        history.append(event)
+        history.append(plain)
+
+        assert history[0] == event
+        assert history[1].metadata == {}
+
+    def test_index_follows_eviction(self):
+        """Evicted correlations leave their index entries, empty keys are removed"""
+        history = CorrelationHistory(3)
+        for i in range(3):
+            history.append(make_event(i, trace_id="shared" if i < 2 else None, service=f"svc-{i}"))
+        history.append(make_event(3, trace_id="shared"))
+
+        by_trace = history.index("trace_id")
+        assert [e.timestamp for e in by_trace["shared"]] == [BASE_TIME + timedelta(seconds=s) for s in (1, 3)]
+        assert "svc-0" not in history.index("service")
+        assert len(history.index("service")) == 3
+
+    def test_resize_keeps_newest(self):
+        history = CorrelationHistory(5)
+        events = [make_event(i) for i in range(5)]
+        for event in events:
+            history.append(event)
+
+        history.resize(2)
+
+        assert list(history) == events[3:]
+        assert set(history.index("trace_id")) == {"trace-3", "trace-4"}
+
+    def test_invalid_capacity(self):
+        with pytest.raises(ValueError):
+            CorrelationHistory(0)
+
+
+class TestQuery:
+    """Newest-first filtered queries"""
+
+    @pytest.fixture
+    def history(self):
+        history = CorrelationHistory(100)
+        for i in range(10):
+            history.append(make_event(i, trace_id=f"trace-{i % 3}", service="arda" if i % 2 else "beorn"))
+        return history
+
+    def test_by_trace_id(self, history):
+        results = history.query(trace_id="trace-0")
+
+        assert [r.timestamp.second for r in results] == [9, 6, 3, 0]
+
+    def test_by_trace_id_and_service(self, history):
+        results = history.query(trace_id="trace-0", service="beorn")
+
+        assert [r.timestamp.second for r in results] == [6, 0]
+
+    def test_time_range_and_limit(self, history):
+        results = history.query(
+            start_time=BASE_TIME + timedelta(seconds=2),
+            end_time=BASE_TIME + timedelta(seconds=7),
+            limit=3,
+        )
+
+        assert [r.timestamp.second for r in results] == [7, 6, 5]
+
+    def test_unknown_key(self, history):
+        assert history.query(service="palantir") == []
+
+
+class TestTimeIndex:
+    """Bucketed time-range lookup"""
+
+    @pytest.fixture
+    def history(self):
+        """One correlation every 10s across ~17 time buckets"""
+        history = CorrelationHistory(1000)
+        for i in range(100):
+            history.append(make_event(i * 10, service="arda" if i % 2 else "beorn", circuit_id=f"C{i % 4}"))
+        return history
+
+    def test_range_matches_linear_scan(self, history):
+        start = BASE_TIME + timedelta(seconds=125)
+        end = BASE_TIME + timedelta(seconds=610)
+
+        results = history.query(start_time=start, end_time=end, limit=1000)
+
+        expected = [e for e in reversed(history) if start <= e.timestamp <= end]
+        assert results == expected
+        assert len(results) == 49
+
+    def test_range_only_reads_overlapping_buckets(self, history):
+        """Candidates come from buckets in range, not the whole history"""
+        start = BASE_TIME + timedelta(seconds=300)
+        end = start + timedelta(seconds=TIME_BUCKET_SECONDS - 1)
+
+        candidates = list(history._candidate_seqs({}, start.timestamp(), end.timestamp(), None))
+
+        assert len(candidates) <= 2 * TIME_BUCKET_SECONDS // 10
+
+    def test_combined_filters(self, history):
+        """service + circuit_id + time range"""
+        results = history.query(
+            service="beorn",
+            circuit_id="C2",
+            start_time=BASE_TIME,
+            end_time=BASE_TIME + timedelta(seconds=500),
+        )
+
+        # beorn has even i, C2 has i % 4 == 2
+        assert [r.timestamp for r in results] == [BASE_TIME + timedelta(seconds=10 * i) for i in range(50, 1, -4)]
+
+    def test_naive_bounds_treated_as_utc(self, history):
+        results = history.query(start_time=datetime(2025, 10, 15, 10, 16, 20), limit=1000)
+
+        assert [r.timestamp.second for r in results] == [30, 20]
+
+    def test_buckets_evicted(self):
+        history = CorrelationHistory(2)
+        for i in range(3):
+            history.append(make_event(i * TIME_BUCKET_SECONDS))
+
+        assert len(history._bucket_keys) == 2
+        assert history.query(end_time=BASE_TIME + timedelta(seconds=1)) == []
+
+
+class TestCursors:
+    """Opaque continuation cursors"""
+
+    @pytest.fixture
+    def history(self):
+        history = CorrelationHistory(1000)
+        for i in range(25):
+            history.append(make_event(i, service="beorn" if i % 5 else "arda"))
+        return history
+
+    @pytest.mark.parametrize("filters", [{}, {"service": "beorn"}])
+    def test_pages_cover_results_once(self, history, filters):
+        seen, cursor = [], None
+        while True:
+            page, cursor = history.query_page(filters, limit=7, cursor=cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+
+        expected, _ = history.query_page(filters, limit=1000)
+        assert seen == expected
+
+    def test_last_full_page_has_no_cursor(self, history):
+        page, cursor = history.query_page({"service": "arda"}, limit=5)
+
+        assert len(page) == 5
+        assert cursor is None
+
+    def test_pages_stable_under_appends(self, history):
+        """New correlations do not shift later pages"""
+        first, cursor = history.query_page(limit=10)
+        history.append(make_event(99))
+        second, _ = history.query_page(limit=10, cursor=cursor)
+
+        assert second[0].timestamp == first[-1].timestamp - timedelta(seconds=1)
+
+    def test_time_range_pages(self, history):
+        start = BASE_TIME + timedelta(seconds=3)
+        page, cursor = history.query_page(start_time=start, limit=10)
+        rest, _ = history.query_page(start_time=start, limit=100, cursor=cursor)
+
+        assert len(page) + len(rest) == 22
+
+    @pytest.mark.parametrize("limit", [0, -1])
+    def test_empty_page_for_non_positive_limit(self, history, limit):
+        assert history.query_page(limit=limit) == ([], None)
+
+    @pytest.mark.parametrize("cursor", ["garbage!", encode_cursor(5)[:-2] + "zz", "aDE6"])
+    def test_invalid_cursor(self, history, cursor):
+        with pytest.raises(ValueError):
+            history.query_page(cursor=cursor)
+
+    def test_unknown_filter(self, history):
+        with pytest.raises(ValueError):
+            history.query_page({"colour": "blue"})
+
+
+class TestBusinessKeyIndexes:
+    """circuit_id / product_id / resource_id / resource_type_id / request_id lookup"""
+
+    KEYS = ("circuit_id", "product_id", "resource_id", "resource_type_id", "request_id")
+
+    @pytest.fixture
+    def history(self):
+        history = CorrelationHistory(5)
+        for i in range(8):
+            history.append(make_event(i, **{key: f"{key}-{i % 3}" for key in self.KEYS}))
+        return history
+
+    @pytest.mark.parametrize("key", KEYS)
+    def test_lookup_by_key(self, history, key):
+        results = history.query(**{key: f"{key}-1"})
+
+        assert [r.timestamp.second for r in results] == [7, 4]
+
+    @pytest.mark.parametrize("key", KEYS)
+    def test_index_maintained_on_eviction(self, history, key):
+        """Only retained correlations (3..7) remain indexed"""
+        index = history.index(key)
+
+        assert {value: len(index[value]) for value in index} == {f"{key}-0": 2, f"{key}-1": 2, f"{key}-2": 1}
+
+    def test_lookup_reads_only_index_entry(self, history):
+        """A business-key query touches only that key's correlations"""
+        candidates = list(history._candidate_seqs({"circuit_id": "circuit_id-2"}, None, None, None))
+
+        assert candidates == [5]
+
+    def test_none_values_not_indexed(self):
+        history = CorrelationHistory(5)
+        history.append(make_event(1))
+
+        assert len(history.index("circuit_id")) == 0
+
+
+class TestReplace:
+    """In-place updates of re-emitted correlations"""
+
+    def test_replace_keeps_position_and_timestamp(self):
+        history = CorrelationHistory(5)
+        events = [make_event(i) for i in range(3)]
+        for event in events:
+            history.append(event)
+
+        update = events[1].model_copy(update={"log_count": 7, "timestamp": BASE_TIME + timedelta(hours=1)})
+        assert history.replace(update)
+
+        assert len(history) == 3
+        assert history[1].log_count == 7
+        assert history[1].timestamp == events[1].timestamp
+        assert len(history.query(start_time=BASE_TIME, end_time=BASE_TIME + timedelta(seconds=5))) == 3
+
+    def test_replace_moves_changed_index_entries(self):
+        history = CorrelationHistory(5)
+        events = [make_event(i, circuit_id="C1") for i in range(3)]
+        for event in events:
+            history.append(event)
+
+        history.replace(events[0].model_copy(update={"circuit_id": "C2", "service": "arda"}))
+
+        assert [e.trace_id for e in history.index("circuit_id")["C1"]] == ["trace-1", "trace-2"]
+        assert [e.trace_id for e in history.index("circuit_id")["C2"]] == ["trace-0"]
+        history.append(make_event(3, circuit_id="C2"))
+        history.replace(events[2].model_copy(update={"circuit_id": "C2"}))
+        assert [e.trace_id for e in history.index("circuit_id")["C2"]] == ["trace-0", "trace-2", "trace-3"]
+        assert "beorn" in history.index("service") and "arda" in history.index("service")
+
+    def test_replace_after_eviction(self):
+        history = CorrelationHistory(2)
+        evicted = make_event(0)
+        history.append(evicted)
+        history.append(make_event(1))
+        history.append(make_event(2))
+
+        assert not history.replace(evicted)
+        assert len(history) == 2
@@ -0,0 +1,117 @@
+"""Tests for correlation query pagination and NDJSON streaming"""
+import json
+import uuid
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models import CorrelationEvent
+from app.pipeline.correlator import CorrelationEngine
+from app.routes import correlations
+
+
+BASE_TIME = datetime(2025, 10, 15, 10, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def engine():
+    engine = CorrelationEngine(window_seconds=60, exporter_manager=AsyncMock())
+    for i in range(30):
+        engine._add_to_correlation_history(CorrelationEvent(
+            correlation_id=str(uuid.uuid4()),
+            trace_id=f"trace-{i}",
+            timestamp=BASE_TIME + timedelta(seconds=i),
+            service="beorn" if i % 3 else "arda",
+            env="dev",
+            circuit_id=f"C{i % 2}",
+            resource_id=f"R{i % 5}",
+            request_id=f"req-{i}",
+        ))
+    return engine
+
+
+@pytest.fixture
+def client(engine):
+    app = FastAPI()
+    app.include_router(correlations.router, prefix="/api")
+    app.state.correlation_engine = engine
+    return TestClient(app)
+
+
+class TestCorrelationPagination:
+    """/api/correlations cursors and filters"""
+
+    def test_cursor_walks_all_pages(self, client):
+        seen, params = [], {"limit": 8}
+        while True:
+            response = client.get("/api/correlations", params=params)
+            assert response.status_code == 200
+            seen.extend(c["trace_id"] for c in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+            if not cursor:
+                break
+            params = {"limit": 8, "cursor": cursor}
+
+        assert seen == [f"trace-{i}" for i in range(29, -1, -1)]
+
+    def test_combined_filters(self, client):
+        response = client.get("/api/correlations", params={
+            "service": "beorn",
+            "circuit_id": "C1",
+            "start_time": (BASE_TIME + timedelta(seconds=10)).isoformat(),
+        })
+
+        assert [c["trace_id"] for c in response.json()] == [
+            f"trace-{i}" for i in range(29, 9, -1) if i % 3 and i % 2
+        ]
+        assert "X-Next-Cursor" not in response.headers
+
+    @pytest.mark.parametrize("params, expected", [
+        ({"request_id": "req-7"}, ["trace-7"]),
+        ({"resource_id": "R2"}, ["trace-27", "trace-22", "trace-17", "trace-12", "trace-7", "trace-2"]),
+        ({"resource_id": "R2", "circuit_id": "C0"}, ["trace-22", "trace-12", "trace-2"]),
+        ({"request_id": "req-unknown"}, []),
+    ])
+    def test_business_key_filters(self, client, params, expected):
+        response = client.get("/api/correlations", params=params)
+
+        assert [c["trace_id"] for c in response.json()] == expected
+
+    def test_zero_limit_is_422(self, client):
+        response = client.get("/api/correlations", params={"limit": 0})
+
+        assert response.status_code == 422
+
+    def test_invalid_cursor_is_400(self, client):
+        response = client.get("/api/correlations", params={"cursor": "not-a-cursor"})
+
+        assert response.status_code == 400
+
+
+class TestCorrelationStream:
+    """/api/correlations/stream NDJSON output"""
+
+    def test_streams_all_matches(self, client, monkeypatch):
+        monkeypatch.setattr(correlations, "STREAM_PAGE_SIZE", 4)
+
+        response = client.get("/api/correlations/stream", params={"service": "beorn"})
+
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 20
+        assert all(line["service"] == "beorn" for line in lines)
+
+    def test_stream_limit(self, client, monkeypatch):
+        monkeypatch.setattr(correlations, "STREAM_PAGE_SIZE", 4)
+
+        response = client.get("/api/correlations/stream", params={"limit": 6})
+
+        assert len(response.text.splitlines()) == 6
+
+    def test_stream_invalid_cursor_is_400(self, client):
+        response = client.get("/api/correlations/stream", params={"cursor": "bad"})
+
+        assert response.status_code == 400
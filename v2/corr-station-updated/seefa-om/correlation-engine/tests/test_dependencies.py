@@ -389,6 +389,7 @@ class TestServiceFactories:
             mock_settings.redis_url = "redis://localhost:6379"
             mock_settings.redis_key_prefix = "test:"
             mock_settings.redis_max_connections = 50
+            mock_settings.state_codec = "json"
 
             manager = create_state_manager()
 
@@ -59,6 +59,12 @@ class TestLokiExporter:
         assert 'env="dev"' in label_str
         assert 'trace_id="abc123"' in label_str
 
+    def test_labels_to_string_escapes_values(self, loki_exporter):
+        """Quotes, backslashes and newlines in values are escaped"""
+        label_str = loki_exporter._labels_to_string({"trace_id": 'a"b\\c\nd'})
+
+        assert label_str == '{trace_id="a\\"b\\\\c\\nd"}'
+
     def test_timestamp_to_nanoseconds(self, loki_exporter):
         """Test timestamp conversion to nanoseconds"""
         timestamp = "2025-10-15T10:30:00.000Z"
@@ -0,0 +1,246 @@
+"""Tests for the durable ingest spool"""
+import asyncio
+import threading
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+
+from app.models import LogBatch, LogRecord, ResourceInfo
+from app.pipeline.correlator import CorrelationEngine
+from app.pipeline.ingest_spool import (
+    IngestSpool,
+    SpoolFull,
+    decode_log_batch,
+    decode_trace_batch,
+    encode_log_batch,
+    encode_trace_batch,
+)
+
+SEGMENT = 4096
+
+
+def make_spool(tmp_path, **kwargs) -> IngestSpool:
+    kwargs.setdefault("segment_bytes", SEGMENT)
+    return IngestSpool("test", str(tmp_path), str.encode, bytes.decode, **kwargs)
+
+
+async def drain(spool: IngestSpool, count: int, ack: bool = True):
+    items = []
+    for _ in range(count):
+        token, item = await asyncio.wait_for(spool.get(), timeout=1)
+        items.append(item)
+        if ack:
+            spool.ack(token)
+    return items
+
+
+def make_batch(message: str) -> LogBatch:
+    return LogBatch(
+        resource=ResourceInfo(service="beorn", host="host-1", env="dev"),
+        records=[LogRecord(timestamp="2025-10-15T10:30:00Z", message=message, trace_id="4bf92f3577b34da6a3ce929d0e0e4736")],
+    )
+
+
+class TestIngestSpool:
+    """Segment log, offsets and replay"""
+
+    @pytest.mark.asyncio
+    async def test_append_and_get_in_order(self, tmp_path):
+        spool = make_spool(tmp_path)
+
+        for i in range(5):
+            spool.append(f"item-{i}")
+
+        assert await drain(spool, 5) == [f"item-{i}" for i in range(5)]
+        assert spool.backlog_bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_get_waits_for_append(self, tmp_path):
+        spool = make_spool(tmp_path)
+        waiter = asyncio.create_task(spool.get())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        await spool.put("late")
+
+        _, item = await asyncio.wait_for(waiter, timeout=1)
+        assert item == "late"
+
+    @pytest.mark.asyncio
+    async def test_rolls_segments_and_deletes_consumed(self, tmp_path):
+        spool = make_spool(tmp_path)
+        items = [f"{i:04d}" + "x" * 500 for i in range(20)]
+
+        for item in items:
+            spool.append(item)
+        assert len(list(spool.path.glob("*.seg"))) == 3
+
+        assert await drain(spool, 20) == items
+        assert [p.name for p in spool.path.glob("*.seg")] == ["0000000002.seg"]
+
+    @pytest.mark.asyncio
+    async def test_put_writes_on_writer_thread(self, tmp_path):
+        threads = []
+
+        def serialize(item: str) -> bytes:
+            threads.append(threading.current_thread())
+            return item.encode()
+
+        spool = IngestSpool("test", str(tmp_path), serialize, bytes.decode, segment_bytes=SEGMENT, fsync="always")
+        await asyncio.gather(*(spool.put(f"item-{i}") for i in range(5)))
+
+        assert threading.main_thread() not in threads
+        assert await drain(spool, 5) == [f"item-{i}" for i in range(5)]
+
+    @pytest.mark.asyncio
+    async def test_ack_while_writer_rolls_segments(self, tmp_path):
+        spool = make_spool(tmp_path)
+        items = [f"{i:04d}" + "x" * 500 for i in range(200)]
+
+        async def consume():
+            return await drain(spool, len(items))
+
+        consumer = asyncio.create_task(consume())
+        for item in items:
+            await spool.put(item)
+
+        assert await asyncio.wait_for(consumer, timeout=5) == items
+        assert len(list(spool.path.glob("*.seg"))) == 1
+
+    @pytest.mark.asyncio
+    async def test_depth_counts_unread_records(self, tmp_path):
+        spool = make_spool(tmp_path)
+        for i in range(4):
+            await spool.put(f"item-{i}")
+        assert spool.depth == 4
+
+        await drain(spool, 1, ack=False)
+        assert spool.depth == 3
+        spool.close()
+
+        assert make_spool(tmp_path).depth == 4  # the unacknowledged record is replayed
+
+    @pytest.mark.asyncio
+    async def test_replays_unacknowledged_after_restart(self, tmp_path):
+        spool = make_spool(tmp_path)
+        for i in range(6):
+            spool.append(f"item-{i}")
+        await drain(spool, 2)
+        await drain(spool, 1, ack=False)  # in flight when the process stops
+        spool.close()
+
+        reopened = make_spool(tmp_path)
+
+        assert await drain(reopened, 4) == ["item-2", "item-3", "item-4", "item-5"]
+        reopened.append("item-6")
+        assert await drain(reopened, 1) == ["item-6"]
+
+    @pytest.mark.asyncio
+    async def test_commit_is_low_water_mark(self, tmp_path):
+        spool = make_spool(tmp_path, fsync="always")
+        for i in range(3):
+            spool.append(f"item-{i}")
+        tokens = [(await spool.get())[0] for _ in range(3)]
+
+        spool.ack(tokens[1])
+        spool.ack(tokens[2])
+        assert spool.backlog_bytes == tokens[2]  # item-0 still processing
+
+        spool.ack(tokens[0])
+        assert spool.backlog_bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_torn_tail_record_discarded(self, tmp_path):
+        spool = make_spool(tmp_path)
+        spool.append("complete")
+        spool.append("torn")
+        spool.close()
+        segment = tmp_path / "test" / "0000000000.seg"
+        data = bytearray(segment.read_bytes())
+        data[8 + len("complete") + 8] ^= 0xFF  # corrupt the second payload
+        segment.write_bytes(bytes(data))
+
+        reopened = make_spool(tmp_path)
+
+        assert await drain(reopened, 1) == ["complete"]
+        assert reopened.backlog_bytes == 0
+
+    def test_max_bytes(self, tmp_path):
+        spool = make_spool(tmp_path, max_bytes=100)
+        spool.append("x" * 50)
+
+        with pytest.raises(SpoolFull):
+            spool.append("x" * 50)
+
+    def test_record_larger_than_segment(self, tmp_path):
+        with pytest.raises(ValueError):
+            make_spool(tmp_path).append("x" * SEGMENT)
+
+    def test_unknown_fsync_policy(self, tmp_path):
+        with pytest.raises(ValueError):
+            make_spool(tmp_path, fsync="sometimes")
+
+
+class TestPayloadCodecs:
+    """Engine payloads round-trip through the spool"""
+
+    def test_log_batch(self):
+        batch = make_batch("hello")
+
+        assert decode_log_batch(encode_log_batch(batch)) == batch
+
+    def test_protobuf_and_json_traces(self):
+        data = TracesData()
+        data.resource_spans.add().scope_spans.add().spans.add().name = "GET /circuit"
+        payload = {"resourceSpans": [{"scopeSpans": [{"spans": [{"name": "GET /circuit"}]}]}]}
+
+        assert decode_trace_batch(encode_trace_batch(data)) == data
+        assert decode_trace_batch(encode_trace_batch(payload)) == payload
+
+
+class TestEngineSpool:
+    """CorrelationEngine reads ingest from the spool when enabled"""
+
+    @pytest.fixture
+    def spool_settings(self, tmp_path):
+        with patch("app.pipeline.correlator.settings") as mock_settings:
+            mock_settings.ingest_spool_enabled = True
+            mock_settings.ingest_spool_dir = str(tmp_path)
+            mock_settings.ingest_spool_segment_mb = 1
+            mock_settings.ingest_spool_max_mb = 16
+            mock_settings.ingest_spool_fsync = "never"
+            mock_settings.ingest_spool_fsync_interval = 1.0
+            mock_settings.enable_normalizer_pool = False
+            mock_settings.enable_trace_synthesis = False
+            mock_settings.max_correlation_history = 100
+            mock_settings.max_queue_size = 10
+            mock_settings.export_queue_size = 10
+            mock_settings.log_consumer_workers = 2
+            mock_settings.trace_consumer_workers = 1
+            mock_settings.export_consumer_workers = 1
+            yield mock_settings
+
+    @pytest.mark.asyncio
+    async def test_batches_survive_restart(self, spool_settings):
+        engine = CorrelationEngine(window_seconds=60, exporter_manager=AsyncMock())
+        for i in range(3):
+            await engine.add_logs(make_batch(f"log {i}"))
+
+        assert engine.log_queue.empty()
+        assert engine._ingest_depth("logs") == 3
+        engine.log_spool.close()
+        engine.trace_spool.close()
+
+        restarted = CorrelationEngine(window_seconds=60, exporter_manager=AsyncMock())
+        task = asyncio.create_task(restarted.run())
+        for _ in range(100):
+            if sum(map(len, restarted.current_window.logs_by_trace.values())) == 3 and restarted.log_spool.backlog_bytes == 0:
+                break
+            await asyncio.sleep(0.01)
+        restarted.stop()
+        await asyncio.wait_for(task, timeout=5)
+
+        messages = sorted(log["message"] for logs in restarted.current_window.logs_by_trace.values() for log in logs)
+        assert messages == ["log 0", "log 1", "log 2"]
+        assert restarted.log_export_queue.qsize() + restarted.exporter_manager.export_logs.await_count == 3
@@ -0,0 +1,212 @@
+"""Tests for batched Loki push and protobuf encoding"""
+import asyncio
+import gzip
+import json
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+from app.models import LogBatch, LogRecord, ResourceInfo
+from app.pipeline import exporters, otlp_decoder
+from app.pipeline.exporters import LokiExporter
+from app.pipeline.loki_proto import encode_push_request
+
+
+def push_request_class():
+    """Build logproto.PushRequest from a descriptor to parse encoder output"""
+    file_proto = descriptor_pb2.FileDescriptorProto(name="test_logproto.proto", package="testlogproto")
+    timestamp = file_proto.message_type.add(name="Timestamp")
+    timestamp.field.add(name="seconds", number=1, type=3, label=1)  # int64
+    timestamp.field.add(name="nanos", number=2, type=5, label=1)  # int32
+    entry = file_proto.message_type.add(name="EntryAdapter")
+    entry.field.add(name="timestamp", number=1, type=11, label=1, type_name=".testlogproto.Timestamp")
+    entry.field.add(name="line", number=2, type=9, label=1)
+    stream = file_proto.message_type.add(name="StreamAdapter")
+    stream.field.add(name="labels", number=1, type=9, label=1)
+    stream.field.add(name="entries", number=2, type=11, label=3, type_name=".testlogproto.EntryAdapter")
+    push = file_proto.message_type.add(name="PushRequest")
+    push.field.add(name="streams", number=1, type=11, label=3, type_name=".testlogproto.StreamAdapter")
+
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file_proto)
+    return message_factory.GetMessageClass(pool.FindMessageTypeByName("testlogproto.PushRequest"))
+
+
+def make_batch(service="beorn", trace_id=None, count=1, start_ns=1700000000123456789):
+    return LogBatch(
+        resource=ResourceInfo(service=service, host="host-1", env="dev"),
+        records=[
+            LogRecord(
+                timestamp="2023-11-14T22:13:20Z",
+                severity="INFO",
+                message=f"{service} message {i}",
+                trace_id=trace_id,
+                time_unix_nano=start_ns + i,
+            )
+            for i in range(count)
+        ],
+    )
+
+
+def sent_streams(post_mock, call: int = 0):
+    """Decode the JSON push body sent in a mocked post call"""
+    return json.loads(post_mock.await_args_list[call].kwargs["content"])["streams"]
+
+
+@pytest.fixture
+def loki():
+    """Batching LokiExporter (JSON encoding) with a mocked HTTP client"""
+    exporter = LokiExporter("http://loki:3100/loki/api/v1/push", batching=True, batch_linger=60, batch_max_entries=5)
+    exporter.client.post = AsyncMock(return_value=Mock())
+    return exporter
+
+
+class TestPushRequestEncoding:
+    """Hand-written PushRequest wire encoding"""
+
+    def test_round_trips_through_protobuf(self):
+        """Encoded bytes parse as logproto.PushRequest"""
+        body = encode_push_request([
+            ('{env="dev",service="beorn"}', [(1700000000123456789, "first"), (1700000001000000000, "second")]),
+            ('{env="dev",service="arda"}', [(5, "tiny")]),
+        ])
+
+        request = push_request_class()()
+        request.ParseFromString(body)
+
+        assert [s.labels for s in request.streams] == ['{env="dev",service="beorn"}', '{env="dev",service="arda"}']
+        first = request.streams[0].entries[0]
+        assert (first.timestamp.seconds, first.timestamp.nanos, first.line) == (1700000000, 123456789, "first")
+        assert request.streams[0].entries[1].timestamp.nanos == 0
+        assert request.streams[1].entries[0].timestamp.nanos == 5
+
+    def test_non_ascii_lines(self):
+        """Lengths are byte lengths, not character counts"""
+        request = push_request_class()()
+        request.ParseFromString(encode_push_request([("{a=\"b\"}", [(1, "héllo ✓" * 50)])]))
+
+        assert request.streams[0].entries[0].line == "héllo ✓" * 50
+
+
+class TestLokiBatching:
+    """Stream buffer flush behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_aggregates_streams_across_batches(self, loki):
+        """Entries sharing a label set from different batches form one stream"""
+        await loki.export_logs(make_batch("beorn", count=2))
+        await loki.export_logs(make_batch("arda", count=1))
+        assert not loki.client.post.called
+
+        await loki.export_logs(make_batch("beorn", count=2, start_ns=1600000000000000000))
+
+        assert loki.client.post.await_count == 1
+        streams = {s["stream"]["service"]: s["values"] for s in sent_streams(loki.client.post)}
+        assert len(streams["beorn"]) == 4
+        assert len(streams["arda"]) == 1
+        # Entries are sorted by timestamp within each stream
+        timestamps = [int(ts) for ts, _ in streams["beorn"]]
+        assert timestamps == sorted(timestamps)
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_linger(self, loki):
+        """A partial buffer is pushed once the linger time passes"""
+        loki.batch_linger = 0.05
+        await loki.export_logs(make_batch())
+
+        await asyncio.sleep(0.15)
+
+        assert loki.client.post.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_uses_otlp_nanoseconds(self, loki):
+        """Timestamps keep full OTLP nanosecond precision"""
+        await loki.export_logs(make_batch())
+        await loki.flush()
+
+        assert sent_streams(loki.client.post)[0]["values"][0][0] == "1700000000123456789"
+
+    @pytest.mark.asyncio
+    async def test_close_flushes(self, loki):
+        """close() pushes whatever is still buffered"""
+        loki.client.aclose = AsyncMock()
+        await loki.export_logs(make_batch())
+
+        await loki.close()
+
+        assert loki.client.post.await_count == 1
+        assert loki.client.aclose.called
+
+    @pytest.mark.asyncio
+    async def test_protobuf_snappy(self, monkeypatch):
+        """Protobuf encoding sends a snappy-compressed PushRequest"""
+        fake_snappy = Mock(compress=Mock(side_effect=lambda body: b"snappy:" + body))
+        monkeypatch.setattr(exporters, "SNAPPY_AVAILABLE", True)
+        monkeypatch.setattr(exporters, "snappy", fake_snappy, raising=False)
+        exporter = LokiExporter("http://loki:3100/loki/api/v1/push", batching=True, encoding="protobuf")
+        exporter.client.post = AsyncMock(return_value=Mock())
+
+        await exporter.export_logs(make_batch(count=3))
+        await exporter.flush()
+
+        kwargs = exporter.client.post.await_args.kwargs
+        assert kwargs["headers"]["Content-Type"] == "application/x-protobuf"
+        request = push_request_class()()
+        request.ParseFromString(kwargs["content"][len(b"snappy:"):])
+        assert len(request.streams[0].entries) == 3
+
+    @pytest.mark.asyncio
+    async def test_json_gzip(self, loki):
+        """compress=True gzips JSON push bodies"""
+        loki.compress = True
+        await loki.export_logs(make_batch(count=2))
+        await loki.flush()
+
+        kwargs = loki.client.post.await_args.kwargs
+        assert kwargs["headers"]["Content-Encoding"] == "gzip"
+        assert len(json.loads(gzip.decompress(kwargs["content"]))["streams"][0]["values"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_protobuf_escapes_label_values(self, monkeypatch):
+        """A quote in a client-supplied trace_id stays inside its label value"""
+        monkeypatch.setattr(exporters, "SNAPPY_AVAILABLE", True)
+        monkeypatch.setattr(exporters, "snappy", Mock(compress=lambda body: body), raising=False)
+        exporter = LokiExporter("http://loki:3100/loki/api/v1/push", batching=True, encoding="protobuf")
+        exporter.client.post = AsyncMock(return_value=Mock())
+
+        await exporter.export_logs(make_batch(trace_id='abc"} bad'))
+        await exporter.flush()
+
+        request = push_request_class()()
+        request.ParseFromString(exporter.client.post.await_args.kwargs["content"])
+        assert 'trace_id="abc\\"} bad"' in request.streams[0].labels
+
+    def test_protobuf_falls_back_without_snappy(self, monkeypatch):
+        """Without python-snappy the exporter pushes JSON"""
+        monkeypatch.setattr(exporters, "SNAPPY_AVAILABLE", False)
+
+        exporter = LokiExporter("http://loki:3100/loki/api/v1/push", batching=True, encoding="protobuf")
+
+        assert not exporter.use_protobuf
+
+
+class TestTimestamps:
+    """Nanosecond timestamps carried from OTLP"""
+
+    def test_decoder_keeps_time_unix_nano(self):
+        """OTLP/JSON timeUnixNano is kept on the record"""
+        batches = otlp_decoder.log_batches_from_json({
+            "resourceLogs": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "beorn"}}]},
+                "scopeLogs": [{"logRecords": [{"timeUnixNano": "1700000000123456789", "body": {"stringValue": "x"}}]}],
+            }]
+        })
+
+        assert batches[0].records[0].time_unix_nano == 1700000000123456789
+
+    def test_iso_fallback_is_exact(self):
+        """ISO timestamps convert without float rounding"""
+        exporter = LokiExporter("http://loki:3100/loki/api/v1/push")
+
+        assert exporter._to_nanoseconds("2023-11-14T22:13:20.123456Z") == 1700000000123456000
@@ -0,0 +1,68 @@
+"""Tests for the single-pass MDSO extractor"""
+import pytest
+
+from app.mdso_patterns import MDSOPatterns, ErrorCategorizer, MDSOExtractor
+
+
+MESSAGES = [
+    "Creating service for circuit: 80.L1XX.005054..CHTR on device JFVLINBJ2CW.CHTRSE.COM",
+    "Processing resource: 550e8400-e29b-41d4-a716-446655440000 for deployment",
+    "service: ELAN provisioning started by service_mapper",
+    "Resource state changed to CREATE_IN_PROGRESS",
+    "Orchestration DELETE_FAILED with DE-1000 on FRE_51.L1XX.009999..CHTR",
+    "Error: unable to connect to device NYCMNYBW1AW.CHTRSE.COM",
+    "GRANITE DESIGN | missing path element for 51.L1XX.000001..TWCC",
+    "10.0.0.300/24 does not appear to be an IPv4 or IPv6 address",
+    "IP 192.168.1.1/30 is not a network address.",
+    "IP 10.1.1.1 already exists on device AUSTTXGR1ZW",
+    "DEVICE ROLE CPE is INVALID for AUSTTXGR1ZW.CHTRSE.COM.",
+    "DEVICE ROLE PE is INVALID for DLLSTX01CW1.",
+    "Node name: bad_node is not valid",
+    "Exception raised while handling ERR-42 for 2001:0db8:85a3::8a2e:0370:7334",
+    "type: fia requested by NETWORK_SERVICE via DEF-7",
+    "plain informational message with nothing to extract",
+    "",
+]
+
+
+@pytest.fixture
+def extractor():
+    return MDSOExtractor()
+
+
+class TestMDSOExtractor:
+    """MDSOExtractor matches the per-pattern extractors exactly"""
+
+    @pytest.mark.parametrize("message", MESSAGES)
+    def test_identifiers_match_extract_all(self, extractor, message):
+        """Every identifier field equals MDSOPatterns.extract_all_identifiers"""
+        result = extractor.extract(message, categorize=False)
+
+        assert result == MDSOPatterns.extract_all_identifiers(message)
+
+    @pytest.mark.parametrize("message", MESSAGES)
+    def test_category_matches_categorizer(self, extractor, message):
+        """Categorization equals ErrorCategorizer.categorize"""
+        result = extractor.extract(message, fields=())
+
+        assert result == ErrorCategorizer().categorize(message)
+
+    def test_field_subset(self, extractor):
+        """Only the requested fields are returned"""
+        result = extractor.extract(MESSAGES[0], fields=("circuit_id", "fqdn"), categorize=False)
+
+        assert set(result) == {"circuit_id", "fqdn"}
+        assert result["circuit_id"] == "80.L1XX.005054..CHTR"
+
+    def test_categorization_priority(self, extractor):
+        """Connectivity errors win over generic error words"""
+        result = extractor.extract("ERROR: Unable to connect to device X", fields=())
+
+        assert result["category"] == "CONNECTIVITY_ERROR"
+        assert result["severity"] == "CRITICAL"
+
+    def test_category_result_is_a_copy(self, extractor):
+        """Callers can mutate the result without touching shared rule data"""
+        extractor.extract("unable to connect to device", fields=())["category"] = "changed"
+
+        assert extractor.extract("unable to connect to device", fields=())["category"] == "CONNECTIVITY_ERROR"
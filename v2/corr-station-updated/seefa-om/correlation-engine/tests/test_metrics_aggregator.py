@@ -0,0 +1,200 @@
+"""Tests for OTLP metrics ingestion and per-circuit aggregation"""
+import time
+import uuid
+import pytest
+from unittest.mock import MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from google.protobuf.json_format import MessageToDict
+from opentelemetry.proto.metrics.v1.metrics_pb2 import (
+    AGGREGATION_TEMPORALITY_CUMULATIVE,
+    AGGREGATION_TEMPORALITY_DELTA,
+    MetricsData,
+)
+
+from app.pipeline import metrics_aggregator, otlp_decoder, otlp_stream
+from app.pipeline.metrics_aggregator import MetricsAggregator
+from app.routes import otlp
+
+
+def make_metrics(service, points, name="http.server.request.duration", unit="s",
+                 temporality=AGGREGATION_TEMPORALITY_DELTA, start=None, resource_circuit=None) -> MetricsData:
+    """MetricsData with one duration histogram; points are (count, sum, attributes)"""
+    data = MetricsData()
+    rm = data.resource_metrics.add()
+    attr = rm.resource.attributes.add()
+    attr.key, attr.value.string_value = "service.name", service
+    if resource_circuit:
+        attr = rm.resource.attributes.add()
+        attr.key, attr.value.string_value = "circuit_id", resource_circuit
+    metric = rm.scope_metrics.add().metrics.add(name=name, unit=unit)
+    metric.histogram.aggregation_temporality = temporality
+    for count, total, attributes in points:
+        point = metric.histogram.data_points.add(count=count, sum=total)
+        point.start_time_unix_nano = start if start is not None else time.time_ns()
+        for key, value in attributes.items():
+            kv = point.attributes.add(key=key)
+            if isinstance(value, int):
+                kv.value.int_value = value
+            else:
+                kv.value.string_value = value
+    return data
+
+
+def sample(counter, service, circuit_id):
+    return counter.labels(service=service, circuit_id=circuit_id)._value.get()
+
+
+REQUESTS = metrics_aggregator.CIRCUIT_REQUESTS
+ERRORS = metrics_aggregator.CIRCUIT_ERRORS
+DURATION = metrics_aggregator.CIRCUIT_DURATION
+
+
+@pytest.fixture
+def service():
+    """Unique service label so counters do not leak between tests"""
+    return f"svc-{uuid.uuid4().hex[:8]}"
+
+
+class TestMetricsAggregator:
+    """RED series per service and circuit"""
+
+    def test_delta_histogram(self, service):
+        aggregator = MetricsAggregator()
+        data = make_metrics(service, [
+            (10, 2.5, {"circuit_id": "CID-1", "http.response.status_code": 200}),
+            (2, 0.5, {"circuit_id": "CID-1", "http.response.status_code": 503}),
+        ])
+
+        assert aggregator.add(data) == 2
+
+        assert sample(REQUESTS, service, "CID-1") == 12
+        assert sample(ERRORS, service, "CID-1") == 2
+        assert sample(DURATION, service, "CID-1") == pytest.approx(3.0)
+
+    def test_cumulative_converted_to_increments(self, service):
+        aggregator = MetricsAggregator()
+        start = time.time_ns()
+
+        aggregator.add(make_metrics(service, [(5, 1.0, {"circuit_id": "CID-1"})],
+                                    temporality=AGGREGATION_TEMPORALITY_CUMULATIVE, start=start))
+        aggregator.add(make_metrics(service, [(8, 1.6, {"circuit_id": "CID-1"})],
+                                    temporality=AGGREGATION_TEMPORALITY_CUMULATIVE, start=start))
+
+        assert sample(REQUESTS, service, "CID-1") == 8
+        assert sample(DURATION, service, "CID-1") == pytest.approx(1.6)
+
+    def test_cumulative_reset(self, service):
+        aggregator = MetricsAggregator()
+        start = time.time_ns()
+
+        aggregator.add(make_metrics(service, [(5, 1.0, {})], temporality=AGGREGATION_TEMPORALITY_CUMULATIVE, start=start))
+        aggregator.add(make_metrics(service, [(3, 0.3, {})], temporality=AGGREGATION_TEMPORALITY_CUMULATIVE, start=start + 1))
+
+        assert sample(REQUESTS, service, "none") == 8
+
+    def test_stream_started_before_aggregator_sets_baseline(self, service):
+        aggregator = MetricsAggregator()
+        start = aggregator.started_at_ns - 10**9
+
+        aggregator.add(make_metrics(service, [(100, 10.0, {})], temporality=AGGREGATION_TEMPORALITY_CUMULATIVE, start=start))
+        aggregator.add(make_metrics(service, [(104, 10.4, {})], temporality=AGGREGATION_TEMPORALITY_CUMULATIVE, start=start))
+
+        assert sample(REQUESTS, service, "none") == 4
+
+    def test_unit_and_resource_circuit(self, service):
+        aggregator = MetricsAggregator()
+
+        aggregator.add(make_metrics(service, [(4, 250.0, {"http.status_code": "500"})],
+                                    name="http.server.duration", unit="ms", resource_circuit="CID-9"))
+
+        assert sample(DURATION, service, "CID-9") == pytest.approx(0.25)
+        assert sample(ERRORS, service, "CID-9") == 4
+
+    def test_circuit_cardinality_cap(self, service):
+        aggregator = MetricsAggregator(max_circuits=2)
+
+        aggregator.add(make_metrics(service, [(1, 0.1, {"circuit_id": f"CID-{i}"}) for i in range(4)]))
+
+        assert sample(REQUESTS, service, "CID-0") == 1
+        assert sample(REQUESTS, service, "CID-1") == 1
+        assert sample(REQUESTS, service, "other") == 2
+
+    def test_other_metrics_only_counted(self, service):
+        aggregator = MetricsAggregator()
+        data = MetricsData()
+        rm = data.resource_metrics.add()
+        rm.resource.attributes.add(key="service.name").value.string_value = service
+        rm.scope_metrics.add().metrics.add(name="process.cpu.time").sum.data_points.add(as_double=1.0)
+
+        assert aggregator.add(data) == 1
+
+        assert metrics_aggregator.OTLP_METRIC_POINTS.labels(service=service, type="sum")._value.get() == 1
+        assert sample(REQUESTS, service, "none") == 0
+
+
+class TestMetricsDecode:
+    """OTLP/JSON and streamed protobuf decode to the same MetricsData"""
+
+    def test_json_round_trip_with_exemplars(self):
+        data = make_metrics("beorn", [(3, 0.3, {"circuit_id": "CID-1"})], start=1)
+        exemplar = data.resource_metrics[0].scope_metrics[0].metrics[0].histogram.data_points[0].exemplars.add()
+        exemplar.trace_id = bytes.fromhex("4bf92f3577b34da6a3ce929d0e0e4736")
+        exemplar.as_double = 0.1
+        document = MessageToDict(data)
+        document_exemplar = document["resourceMetrics"][0]["scopeMetrics"][0]["metrics"][0]["histogram"]["dataPoints"][0]["exemplars"][0]
+        document_exemplar["traceId"] = "4bf92f3577b34da6a3ce929d0e0e4736"  # OTLP/JSON uses hex IDs
+
+        assert otlp_decoder.metrics_data_from_json(document) == data
+
+    @pytest.mark.asyncio
+    async def test_streamed_parts(self):
+        data = MetricsData()
+        scope = data.resource_metrics.add().scope_metrics.add()
+        for i in range(200):
+            scope.metrics.add(name=f"metric.{i}").gauge.data_points.add(as_int=i)
+
+        async def chunks():
+            yield data.SerializeToString()
+
+        parts = [part async for part in otlp_stream.iter_otlp_parts(chunks(), otlp_stream.METRICS, 1024)]
+
+        assert len(parts) > 1
+        assert sum(len(p.resource_metrics[0].scope_metrics[0].metrics) for p in parts) == 200
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.include_router(otlp.router, prefix="/api/otlp/v1")
+    app.state.metrics_aggregator = MetricsAggregator()
+    app.state.correlation_engine = MagicMock()
+    return TestClient(app)
+
+
+class TestMetricsRoute:
+    """POST /api/otlp/v1/metrics"""
+
+    def test_protobuf(self, client, service):
+        data = make_metrics(service, [(7, 0.7, {"circuit_id": "CID-1"})])
+
+        response = client.post("/api/otlp/v1/metrics", content=data.SerializeToString(),
+                               headers={"Content-Type": "application/x-protobuf"})
+
+        assert response.status_code == 202
+        assert response.json()["data_point_count"] == 1
+        assert sample(REQUESTS, service, "CID-1") == 7
+
+    def test_json(self, client, service):
+        document = MessageToDict(make_metrics(service, [(2, 0.2, {"circuit_id": "CID-2"})]))
+
+        response = client.post("/api/otlp/v1/metrics", json=document)
+
+        assert response.status_code == 202
+        assert sample(REQUESTS, service, "CID-2") == 2
+
+    def test_invalid_json_document(self, client):
+        response = client.post("/api/otlp/v1/metrics", json={"resourceLogs": []})
+
+        assert response.status_code == 400
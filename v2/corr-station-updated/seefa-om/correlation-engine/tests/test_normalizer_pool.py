@@ -0,0 +1,85 @@
+"""Tests for off-loop log normalization"""
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+from app.models import LogBatch, LogRecord, ResourceInfo
+from app.pipeline.normalizer import LogNormalizer
+from app.pipeline.normalizer_pool import NormalizerPool
+
+
+@pytest.fixture
+def mdso_batch():
+    """Log batch with MDSO-shaped messages and mixed severities"""
+    records = []
+    for i in range(23):
+        records.append(LogRecord(
+            timestamp=datetime.now(timezone.utc).isoformat(),
+            severity="ERROR" if i % 5 == 0 else "INFO",
+            message=(
+                f"record {i}: circuit 51.L1XX.{i:06d}..CHTR state CREATE_IN_PROGRESS "
+                f"device NYCMNYBW1AW.CHTRSE.COM trace_id={i:032x}"
+            ),
+        ))
+    return LogBatch(
+        resource=ResourceInfo(service="beorn", host="host-1", env="prod"),
+        records=records,
+    )
+
+
+class TestNormalizerPool:
+    """NormalizerPool output matches the inline normalizer"""
+
+    @pytest.mark.asyncio
+    async def test_thread_pool_preserves_order(self, mdso_batch):
+        """Chunks are reassembled in record order"""
+        pool = NormalizerPool(workers=3, chunk_size=4, executor="thread")
+        try:
+            result = await pool.normalize_log_batch(mdso_batch)
+        finally:
+            pool.shutdown()
+
+        assert result == LogNormalizer().normalize_log_batch(mdso_batch)
+        assert [r["trace_id"] for r in result] == [f"{i:032x}" for i in range(23)]
+
+    @pytest.mark.asyncio
+    async def test_process_pool_matches_inline(self, mdso_batch):
+        """Process workers produce the same records as the inline normalizer"""
+        pool = NormalizerPool(workers=2, chunk_size=10, executor="process")
+        try:
+            result = await pool.normalize_log_batch(mdso_batch)
+        finally:
+            pool.shutdown()
+
+        assert result == LogNormalizer().normalize_log_batch(mdso_batch)
+
+    @pytest.mark.asyncio
+    async def test_empty_batch(self):
+        """Empty batches never touch the executor"""
+        pool = NormalizerPool(executor="thread")
+        batch = LogBatch(resource=ResourceInfo(service="s", host="h", env="dev"), records=[])
+
+        assert await pool.normalize_log_batch(batch) == []
+        assert pool._executor is None
+
+    def test_auto_executor_resolves(self):
+        """auto picks a concrete executor type"""
+        assert NormalizerPool(executor="auto").executor_type in ("process", "thread")
+
+    def test_unknown_executor_rejected(self):
+        """Unknown executor names raise ValueError"""
+        with pytest.raises(ValueError):
+            NormalizerPool(executor="fiber")
+
+    @pytest.mark.asyncio
+    async def test_engine_uses_pool_when_enabled(self, mdso_batch, monkeypatch):
+        """CorrelationEngine routes log normalization through the pool when opted in"""
+        from app.config import settings
+        from app.pipeline.correlator import CorrelationEngine
+
+        monkeypatch.setattr(settings, "enable_normalizer_pool", True)
+        monkeypatch.setattr(settings, "normalizer_pool_executor", "thread")
+        engine = CorrelationEngine(window_seconds=60, exporter_manager=AsyncMock())
+
+        assert isinstance(engine.normalizer_pool, NormalizerPool)
+        engine.normalizer_pool.shutdown()
@@ -0,0 +1,209 @@
+"""Tests for native OTLP protobuf decoding"""
+import pytest
+from google.protobuf.json_format import ParseDict
+
+from opentelemetry.proto.logs.v1.logs_pb2 import LogsData
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+
+from app.pipeline import otlp_decoder
+
+
+TRACE_ID_HEX = "5b8efff798038103d269b633813fc60c"
+SPAN_ID_HEX = "eee19b7ec3c1b174"
+
+
+def _attr(key, value):
+    return {"key": key, "value": {"stringValue": value}}
+
+
+@pytest.fixture
+def logs_json():
+    """OTLP/JSON logs payload with two resources"""
+    return {
+        "resourceLogs": [
+            {
+                "resource": {"attributes": [
+                    _attr("service.name", "beorn"),
+                    _attr("host.name", "host-1"),
+                    _attr("deployment.environment", "prod"),
+                ]},
+                "scopeLogs": [{
+                    "logRecords": [
+                        {
+                            "timeUnixNano": "1700000000123456789",
+                            "severityNumber": 17,
+                            "body": {"stringValue": "Circuit 51.L1XX.009999..CHTR failed"},
+                            "traceId": TRACE_ID_HEX,
+                            "spanId": SPAN_ID_HEX,
+                            "attributes": [
+                                _attr("circuit_id", "51.L1XX.009999..CHTR"),
+                                _attr("request_id", "req-1"),
+                                {"key": "retries", "value": {"intValue": "3"}},
+                            ],
+                        },
+                        {
+                            "timeUnixNano": "1700000001000000000",
+                            "body": {"stringValue": "no trace context"},
+                        },
+                    ]
+                }],
+            },
+            {
+                "resource": {"attributes": [_attr("service.name", "arda")]},
+                "scopeLogs": [{"logRecords": [{
+                    "timeUnixNano": "1700000002000000000",
+                    "body": {"stringValue": "hello"},
+                    "severityNumber": 13,
+                }]}],
+            },
+            {
+                "resource": {"attributes": [_attr("service.name", "empty")]},
+                "scopeLogs": [{"logRecords": []}],
+            },
+        ]
+    }
+
+
+@pytest.fixture
+def traces_json():
+    """OTLP/JSON traces payload"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                _attr("service.name", "palantir"),
+                _attr("deployment.environment", "staging"),
+            ]},
+            "scopeSpans": [{
+                "spans": [
+                    {
+                        "traceId": TRACE_ID_HEX,
+                        "spanId": SPAN_ID_HEX,
+                        "name": "GET /circuit",
+                        "startTimeUnixNano": "1700000000000000000",
+                        "attributes": [
+                            _attr("circuit_id", "51.L1XX.009999..CHTR"),
+                            _attr("resource_id", "3f2b8c1e-1111-2222-3333-444455556666"),
+                        ],
+                    },
+                    {
+                        "traceId": TRACE_ID_HEX,
+                        "spanId": "0000000000000001",
+                        "name": "child",
+                        "startTimeUnixNano": "1700000000500000000",
+                    },
+                ]
+            }],
+        }]
+    }
+
+
+def _logs_proto(payload):
+    """Build LogsData from OTLP/JSON (OTLP uses hex IDs, proto3 JSON expects base64)"""
+    message = LogsData()
+    for resource_log in payload["resourceLogs"]:
+        rl = message.resource_logs.add()
+        ParseDict({"resource": resource_log.get("resource", {})}, rl)
+        for scope_log in resource_log.get("scopeLogs", []):
+            sl = rl.scope_logs.add()
+            for record in scope_log.get("logRecords", []):
+                stripped = {k: v for k, v in record.items() if k not in ("traceId", "spanId")}
+                lr = ParseDict(stripped, sl.log_records.add())
+                if "traceId" in record:
+                    lr.trace_id = bytes.fromhex(record["traceId"])
+                if "spanId" in record:
+                    lr.span_id = bytes.fromhex(record["spanId"])
+    return message
+
+
+def _traces_proto(payload):
+    """Build TracesData from OTLP/JSON"""
+    message = TracesData()
+    for resource_span in payload["resourceSpans"]:
+        rs = message.resource_spans.add()
+        ParseDict({"resource": resource_span.get("resource", {})}, rs)
+        for scope_span in resource_span.get("scopeSpans", []):
+            ss = rs.scope_spans.add()
+            for span in scope_span.get("spans", []):
+                stripped = {k: v for k, v in span.items() if k not in ("traceId", "spanId")}
+                sp = ParseDict(stripped, ss.spans.add())
+                sp.trace_id = bytes.fromhex(span["traceId"])
+                sp.span_id = bytes.fromhex(span["spanId"])
+    return message
+
+
+class TestLogDecoding:
+    """LogBatch decoding from JSON and protobuf"""
+
+    def test_json_decode_groups_by_resource(self, logs_json):
+        """One LogBatch per resource, empty resources skipped"""
+        batches = otlp_decoder.log_batches_from_json(logs_json)
+
+        assert [b.resource.service for b in batches] == ["beorn", "arda"]
+        assert len(batches[0].records) == 2
+        assert batches[1].resource.host == "unknown"
+        assert batches[1].resource.env == "dev"
+
+    def test_json_decode_record_fields(self, logs_json):
+        """Record fields are extracted from OTLP attributes"""
+        record = otlp_decoder.log_batches_from_json(logs_json)[0].records[0]
+
+        assert record.severity == "ERROR"
+        assert record.trace_id == TRACE_ID_HEX
+        assert record.span_id == SPAN_ID_HEX
+        assert record.circuit_id == "51.L1XX.009999..CHTR"
+        assert record.request_id == "req-1"
+        assert "retries" not in record.labels
+        assert record.timestamp.startswith("2023-11-14T22:13:20.123")
+
+    def test_proto_decode_matches_json(self, logs_json):
+        """Native protobuf path yields the same records as the JSON path"""
+        from_json = otlp_decoder.log_batches_from_json(logs_json)
+        from_proto = otlp_decoder.log_batches_from_proto(_logs_proto(logs_json))
+
+        assert len(from_proto) == len(from_json)
+        for proto_batch, json_batch in zip(from_proto, from_json):
+            assert proto_batch.resource.model_dump() == json_batch.resource.model_dump()
+            assert [r.model_dump() for r in proto_batch.records] == [r.model_dump() for r in json_batch.records]
+
+    def test_proto_decode_missing_ids_are_none(self, logs_json):
+        """Empty trace/span ID bytes decode to None, not an empty string"""
+        record = otlp_decoder.log_batches_from_proto(_logs_proto(logs_json))[0].records[1]
+
+        assert record.trace_id is None
+        assert record.span_id is None
+        assert record.severity == "INFO"
+
+
+class TestSpanDecoding:
+    """Normalized span decoding from JSON and protobuf"""
+
+    def test_json_spans(self, traces_json):
+        """Spans are normalized with resource and correlation attributes"""
+        spans = otlp_decoder.spans_from_json(traces_json)
+
+        assert len(spans) == 2
+        assert spans[0]["trace_id"] == TRACE_ID_HEX
+        assert spans[0]["service"] == "palantir"
+        assert spans[0]["env"] == "staging"
+        assert spans[0]["circuit_id"] == "51.L1XX.009999..CHTR"
+        assert spans[1]["circuit_id"] is None
+
+    def test_proto_spans_match_json(self, traces_json):
+        """Native protobuf path yields the same span dicts as the JSON path"""
+        proto_spans = otlp_decoder.spans_from_proto(_traces_proto(traces_json))
+
+        assert proto_spans == otlp_decoder.spans_from_json(traces_json)
+
+    def test_count_spans(self, traces_json):
+        """Span counting works for both payload types"""
+        assert otlp_decoder.count_spans(traces_json) == 2
+        assert otlp_decoder.count_spans(_traces_proto(traces_json)) == 2
+
+    def test_engine_normalize_dispatches_on_type(self, traces_json):
+        """CorrelationEngine._normalize_trace accepts TracesData directly"""
+        from unittest.mock import AsyncMock
+        from app.pipeline.correlator import CorrelationEngine
+
+        engine = CorrelationEngine(window_seconds=60, exporter_manager=AsyncMock())
+
+        assert engine._normalize_trace(_traces_proto(traces_json)) == engine._normalize_trace(traces_json)
@@ -0,0 +1,236 @@
+"""Tests for streaming OTLP body reading and incremental protobuf decoding"""
+import gzip
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from google.protobuf.message import DecodeError
+from opentelemetry.proto.logs.v1.logs_pb2 import LogsData
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+
+from app.pipeline import otlp_decoder, otlp_stream
+from app.routes import otlp
+
+
+def make_logs(resources=1, scopes=1, records=10, body_size=50) -> LogsData:
+    data = LogsData()
+    for r in range(resources):
+        rl = data.resource_logs.add()
+        attr = rl.resource.attributes.add()
+        attr.key, attr.value.string_value = "service.name", f"svc-{r}"
+        rl.schema_url = "https://opentelemetry.io/schemas/1.21.0"
+        for s in range(scopes):
+            sl = rl.scope_logs.add()
+            sl.scope.name = f"scope-{s}"
+            for i in range(records):
+                record = sl.log_records.add()
+                record.time_unix_nano = 1_700_000_000_000_000_000 + i
+                record.body.string_value = f"r{r} s{s} log {i} " + "x" * body_size
+                record.trace_id = bytes.fromhex("4bf92f3577b34da6a3ce929d0e0e4736")
+    return data
+
+
+def make_traces(spans=200) -> TracesData:
+    data = TracesData()
+    rs = data.resource_spans.add()
+    attr = rs.resource.attributes.add()
+    attr.key, attr.value.string_value = "service.name", "arda"
+    ss = rs.scope_spans.add()
+    ss.scope.name = "arda.tracer"
+    for i in range(spans):
+        span = ss.spans.add()
+        span.trace_id = bytes.fromhex("4bf92f3577b34da6a3ce929d0e0e4736")
+        span.span_id = i.to_bytes(8, "big")
+        span.name = f"span {i}"
+        span.start_time_unix_nano = 1_700_000_000_000_000_000 + i
+    return data
+
+
+async def chunked(payload: bytes, size: int = 1000):
+    for i in range(0, len(payload), size):
+        yield payload[i:i + size]
+
+
+async def collect_parts(payload: bytes, layout, part_bytes: int):
+    return [part async for part in otlp_stream.iter_otlp_parts(chunked(payload), layout, part_bytes)]
+
+
+def log_messages(parts):
+    return [
+        (record.body.string_value, rl.resource.attributes[0].value.string_value, sl.scope.name)
+        for part in parts
+        for rl in part.resource_logs
+        for sl in rl.scope_logs
+        for record in sl.log_records
+    ]
+
+
+class TestIncrementalDecode:
+    """iter_otlp_parts splits protobuf streams without losing records"""
+
+    @pytest.mark.asyncio
+    async def test_small_resources_parsed_whole(self):
+        data = make_logs(resources=3)
+
+        parts = await collect_parts(data.SerializeToString(), otlp_stream.LOGS, part_bytes=64 * 1024)
+
+        assert len(parts) == 3
+        assert [part.resource_logs[0] for part in parts] == list(data.resource_logs)
+
+    @pytest.mark.asyncio
+    async def test_large_resource_split_by_scope(self):
+        data = make_logs(scopes=8, records=20)
+
+        parts = await collect_parts(data.SerializeToString(), otlp_stream.LOGS, part_bytes=4096)
+
+        assert len(parts) > 1
+        assert log_messages(parts) == log_messages([data])
+        for part in parts:
+            assert part.resource_logs[0].resource == data.resource_logs[0].resource
+            assert len(part.resource_logs[0].SerializeToString()) < 2 * 4096
+
+    @pytest.mark.asyncio
+    async def test_large_scope_split_by_record(self):
+        data = make_logs(records=500)
+
+        parts = await collect_parts(data.SerializeToString(), otlp_stream.LOGS, part_bytes=4096)
+
+        assert len(parts) > 5
+        assert log_messages(parts) == log_messages([data])
+        assert parts[-1].resource_logs[0].schema_url == data.resource_logs[0].schema_url
+        batches = [b for part in parts for b in otlp_decoder.log_batches_from_proto(part)]
+        assert sum(len(b.records) for b in batches) == 500
+        assert {b.resource.service for b in batches} == {"svc-0"}
+
+    @pytest.mark.asyncio
+    async def test_traces_split_keep_scope(self):
+        data = make_traces(spans=300)
+
+        parts = await collect_parts(data.SerializeToString(), otlp_stream.TRACES, part_bytes=2048)
+
+        assert len(parts) > 1
+        assert all(p.resource_spans[0].scope_spans[0].scope.name == "arda.tracer" for p in parts)
+        assert sum(otlp_decoder.count_spans(p) for p in parts) == 300
+        spans = [s for p in parts for s in otlp_decoder.spans_from_proto(p)]
+        assert spans == otlp_decoder.spans_from_proto(data)
+
+    @pytest.mark.asyncio
+    async def test_truncated_stream(self):
+        payload = make_logs(records=100).SerializeToString()
+
+        with pytest.raises(DecodeError):
+            await collect_parts(payload[:-10], otlp_stream.LOGS, part_bytes=1024)
+
+    @pytest.mark.asyncio
+    async def test_empty_body(self):
+        assert await collect_parts(b"", otlp_stream.LOGS, part_bytes=1024) == []
+
+
+def make_client(engine, **limits):
+    app = FastAPI()
+    app.include_router(otlp.router, prefix="/api/otlp/v1")
+    app.state.correlation_engine = engine
+    app.state.LOG_RECORDS_RECEIVED = MagicMock()
+    app.state.TRACES_RECEIVED = MagicMock()
+    return TestClient(app)
+
+
+@pytest.fixture
+def engine():
+    engine = MagicMock()
+    engine.add_logs = AsyncMock()
+    engine.add_traces = AsyncMock()
+    return engine
+
+
+@pytest.fixture
+def limits():
+    with patch("app.routes.otlp.settings") as mock_settings:
+        mock_settings.max_request_body_size = 64 * 1024
+        mock_settings.max_protobuf_size = 256 * 1024
+        mock_settings.max_json_size = 256 * 1024
+        mock_settings.otlp_stream_part_bytes = 4096
+        yield mock_settings
+
+
+PROTOBUF = {"Content-Type": "application/x-protobuf"}
+
+
+class TestStreamingRoutes:
+    """OTLP routes read bodies incrementally with hard caps"""
+
+    def test_protobuf_logs_queued_in_parts(self, engine, limits):
+        payload = make_logs(records=300).SerializeToString()
+
+        response = make_client(engine).post("/api/otlp/v1/logs", content=payload, headers=PROTOBUF)
+
+        assert response.status_code == 202
+        assert response.json()["count"] == 300
+        assert engine.add_logs.await_count > 1
+
+    def test_gzip_protobuf_traces(self, engine, limits):
+        data = make_traces(spans=50)
+
+        response = make_client(engine).post(
+            "/api/otlp/v1/traces", content=gzip.compress(data.SerializeToString()),
+            headers={**PROTOBUF, "Content-Encoding": "gzip"},
+        )
+
+        assert response.status_code == 202
+        assert response.json()["span_count"] == 50
+        assert engine.add_traces.await_args.args[0] == data
+
+    def test_zstd_json_logs(self, engine, limits):
+        zstandard = pytest.importorskip("zstandard")
+        payload = {"resourceLogs": [{"scopeLogs": [{"logRecords": [{"body": {"stringValue": "hello"}}]}]}]}
+
+        response = make_client(engine).post(
+            "/api/otlp/v1/logs", content=zstandard.ZstdCompressor().compress(json.dumps(payload).encode()),
+            headers={"Content-Type": "application/json", "Content-Encoding": "zstd"},
+        )
+
+        assert response.status_code == 202
+        assert response.json()["count"] == 1
+
+    def test_chunked_upload_without_content_length_capped(self, engine, limits):
+        def body():
+            for _ in range(100):
+                yield b"x" * 1024
+
+        response = make_client(engine).post("/api/otlp/v1/logs", content=body(), headers=PROTOBUF)
+
+        assert response.status_code == 413
+        assert "too large" in response.json()["detail"].lower()
+
+    def test_decompression_bomb_capped(self, engine, limits):
+        bomb = gzip.compress(b"\0" * (10 * 1024 * 1024))
+        assert len(bomb) < limits.max_request_body_size
+
+        response = make_client(engine).post(
+            "/api/otlp/v1/traces", content=bomb, headers={**PROTOBUF, "Content-Encoding": "gzip"},
+        )
+
+        assert response.status_code == 413
+
+    def test_unsupported_encoding(self, engine, limits):
+        response = make_client(engine).post(
+            "/api/otlp/v1/logs", content=b"{}", headers={"Content-Type": "application/json", "Content-Encoding": "br"},
+        )
+
+        assert response.status_code == 415
+
+    def test_corrupt_gzip(self, engine, limits):
+        response = make_client(engine).post(
+            "/api/otlp/v1/logs", content=b"\x1f\x8b garbage", headers={**PROTOBUF, "Content-Encoding": "gzip"},
+        )
+
+        assert response.status_code == 400
+
+    def test_invalid_json(self, engine, limits):
+        response = make_client(engine).post(
+            "/api/otlp/v1/logs", content=b"{not json", headers={"Content-Type": "application/json"},
+        )
+
+        assert response.status_code == 400
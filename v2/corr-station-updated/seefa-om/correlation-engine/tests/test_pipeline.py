@@ -2,7 +2,7 @@
 Tests for Correlation Engine Pipeline Components
 """
 import pytest
-from datetime import datetime
+from datetime import datetime, timezone
 
 from app.pipeline.normalizer import LogNormalizer
 from app.models import LogBatch, LogRecord, ResourceInfo
@@ -194,6 +194,120 @@ class TestCorrelationWindow:
         assert correlations[0].service == "test"
 
 
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def session_record(trace_id: str, second: int, **fields) -> dict:
+    return {"trace_id": trace_id, "timestamp": f"2025-10-15T10:30:{second:02d}Z", "service": "beorn", **fields}
+
+
+class TestTraceSessionWindow:
+    """Tests for per-trace event-time windows"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def window(self, clock):
+        from app.pipeline.correlator import TraceSessionWindow
+
+        return TraceSessionWindow(quiet_seconds=5, allowed_lateness_seconds=30, clock=clock)
+
+    def test_emits_trace_once_quiet(self, window, clock):
+        window.add_log(session_record("t1", 0, circuit_id="C1"))
+        clock.now += 3
+        window.add_trace(session_record("t1", 1))
+
+        clock.now += 4
+        window.add_log(session_record("t2", 1))
+        assert window.seconds_until_close() == pytest.approx(1)
+        assert window.create_correlations() == []
+
+        clock.now += 1
+        [correlation] = window.create_correlations()
+        assert (correlation.trace_id, correlation.log_count, correlation.span_count) == ("t1", 1, 1)
+        assert correlation.circuit_id == "C1"
+        assert correlation.metadata["revision"] == 0
+        assert correlation.metadata["first_event"] == "2025-10-15T10:30:00+00:00"
+
+    def test_late_records_update_same_correlation(self, window, clock):
+        window.add_log(session_record("t1", 0))
+        clock.now += 5
+        [first] = window.create_correlations()
+
+        clock.now += 10
+        window.add_log(session_record("t1", 2))
+        clock.now += 5
+        [update] = window.create_correlations()
+
+        assert update.correlation_id == first.correlation_id
+        assert update.timestamp == first.timestamp
+        assert update.log_count == 2
+        assert update.metadata["revision"] == 1
+
+    def test_records_after_finalize_are_late(self, window, clock):
+        from app.pipeline.correlator import LATE_RECORDS
+
+        window.add_log(session_record("t1", 0))
+        clock.now += 5
+        window.create_correlations()
+        clock.now += 30
+        window.create_correlations()
+        assert len(window) == 0
+
+        late_before = LATE_RECORDS.labels(type="logs")._value.get()
+        window.add_log(session_record("t1", 1))
+
+        assert LATE_RECORDS.labels(type="logs")._value.get() == late_before + 1
+        clock.now += 5
+        assert window.create_correlations() == []
+
+    def test_watermark_finalizes_sessions(self, window, clock):
+        window.add_log(session_record("t1", 0))
+        clock.now += 5
+        window.create_correlations()
+
+        window.add_log(session_record("t2", 45))  # watermark moves to 10:30:15
+        clock.now += 5
+        [correlation] = window.create_correlations()
+
+        assert correlation.trace_id == "t2"
+        assert window.watermark == pytest.approx(datetime(2025, 10, 15, 10, 30, 15, tzinfo=timezone.utc).timestamp())
+        assert len(window) == 1  # t1 finalized, t2 still accepting late records
+
+    def test_future_dated_record_capped_at_arrival(self, clock):
+        from app.pipeline.correlator import TraceSessionWindow
+
+        arrival = datetime(2025, 10, 15, 10, 30, 10, tzinfo=timezone.utc).timestamp()
+        window = TraceSessionWindow(
+            quiet_seconds=5, allowed_lateness_seconds=30, max_clock_skew_seconds=5,
+            clock=clock, wall_clock=lambda: arrival,
+        )
+        window.add_log(session_record("t1", 0))
+        clock.now += 5
+        window.create_correlations()
+
+        window.add_log({"trace_id": "t2", "timestamp": "2030-01-01T00:00:00Z", "service": "beorn"})
+        clock.now += 5
+        window.create_correlations()
+
+        assert window.watermark == pytest.approx(arrival + 5 - 30)
+        assert len(window) == 2  # t1 still accepts late records
+        window.add_log(session_record("t1", 2))
+        clock.now += 5
+        [update] = window.create_correlations()
+        assert (update.trace_id, update.metadata["revision"]) == ("t1", 1)
+
+    def test_roll_keeps_sessions(self, window):
+        assert window.roll() is window
+
+
 class TestCorrelationEngine:
     """Tests for main correlation engine"""
 
@@ -231,6 +345,38 @@ class TestCorrelationEngine:
         # Queue should have one item
         assert not engine.log_queue.empty()
 
+    @pytest.mark.asyncio
+    async def test_session_window_updates_replace_history(self):
+        """Re-emitted traces replace their history entry and export no second correlation span"""
+        from unittest.mock import AsyncMock, patch
+        from app.pipeline.correlator import CorrelationEngine, TraceSessionWindow
+
+        with patch("app.pipeline.correlator.settings") as mock_settings:
+            mock_settings.correlation_window_mode = "session"
+            mock_settings.correlation_quiet_seconds = 5
+            mock_settings.correlation_allowed_lateness_seconds = 30
+            mock_settings.correlation_max_clock_skew_seconds = 5
+            mock_settings.max_correlation_history = 100
+            mock_settings.enable_normalizer_pool = False
+            mock_settings.enable_trace_synthesis = False
+            mock_settings.ingest_spool_enabled = False
+            mock_settings.max_queue_size = 10
+            mock_settings.export_queue_size = 10
+            engine = CorrelationEngine(window_seconds=60, exporter_manager=AsyncMock())
+        clock = FakeClock()
+        engine.current_window = TraceSessionWindow(quiet_seconds=5, allowed_lateness_seconds=30, clock=clock)
+
+        engine.current_window.add_log(session_record("t1", 0))
+        clock.now += 5
+        await engine._close_window()
+        engine.current_window.add_log(session_record("t1", 3))
+        clock.now += 5
+        await engine._close_window()
+
+        assert len(engine.correlation_history) == 1
+        assert engine.correlation_history[0].log_count == 2
+        assert engine.exporter_manager.export_correlation_span.await_count == 1
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
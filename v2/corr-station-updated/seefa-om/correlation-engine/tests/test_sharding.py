@@ -0,0 +1,332 @@
+"""Tests for consistent-hash sharding and peer forwarding"""
+import json
+import uuid
+import pytest
+from collections import Counter
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+
+from app.correlation.trace_synthesizer import TraceSegment
+from app.models import LogBatch, LogRecord, ResourceInfo
+from app.pipeline.correlator import CorrelationEngine
+from app.pipeline.sharding import HashRing, RedisMembership, ShardRouter, StaticMembership
+from app.routes import shard
+
+NODE_A = "http://corr-a:8080"
+NODE_B = "http://corr-b:8080"
+
+
+def trace_ids(count: int):
+    return [uuid.uuid4().hex for _ in range(count)]
+
+
+def make_batch(ids) -> LogBatch:
+    return LogBatch(
+        resource=ResourceInfo(service="beorn", host="host-1", env="dev"),
+        records=[
+            LogRecord(timestamp="2025-10-15T10:30:00Z", message=f"log {i}", trace_id=trace_id)
+            for i, trace_id in enumerate(ids)
+        ],
+    )
+
+
+def make_traces(ids) -> TracesData:
+    data = TracesData()
+    rs = data.resource_spans.add()
+    attr = rs.resource.attributes.add()
+    attr.key, attr.value.string_value = "service.name", "arda"
+    ss = rs.scope_spans.add()
+    ss.scope.name = "arda.tracer"
+    for trace_id in ids:
+        span = ss.spans.add()
+        span.trace_id = bytes.fromhex(trace_id)
+        span.span_id = bytes.fromhex("00f067aa0ba902b7")
+        span.name = "GET /circuit"
+    return data
+
+
+def make_router(handler=None, nodes=(NODE_A, NODE_B)) -> ShardRouter:
+    transport = httpx.MockTransport(handler or (lambda request: httpx.Response(202)))
+    router = ShardRouter(NODE_A, StaticMembership(nodes), client=httpx.AsyncClient(transport=transport))
+    router.ring.set_nodes(nodes)
+    return router
+
+
+class TestHashRing:
+    """Key placement"""
+
+    NODES = [f"http://corr-{i}:8080" for i in range(4)]
+
+    def test_balanced(self):
+        ring = HashRing(self.NODES)
+
+        counts = Counter(ring.node_for(key) for key in trace_ids(20000))
+
+        assert set(counts) == set(self.NODES)
+        assert all(0.15 < count / 20000 < 0.35 for count in counts.values())
+
+    def test_adding_node_moves_only_its_share(self):
+        ring = HashRing(self.NODES)
+        keys = trace_ids(5000)
+        before = {key: ring.node_for(key) for key in keys}
+
+        ring.set_nodes(self.NODES + ["http://corr-4:8080"])
+        moved = [key for key in keys if ring.node_for(key) != before[key]]
+
+        assert all(ring.node_for(key) == "http://corr-4:8080" for key in moved)
+        assert 0.1 < len(moved) / len(keys) < 0.3
+
+    def test_same_placement_on_every_instance(self):
+        keys = trace_ids(100)
+
+        assert [HashRing(self.NODES).node_for(k) for k in keys] == \
+            [HashRing(reversed(self.NODES)).node_for(k) for k in keys]
+
+    def test_empty_ring(self):
+        with pytest.raises(LookupError):
+            HashRing().node_for("abc")
+
+
+class TestPartitioning:
+    """Splitting payloads by owner"""
+
+    def test_split_logs_by_trace_id(self):
+        router = make_router()
+        batch = make_batch(trace_ids(50) + [None])
+
+        parts = router.split_logs(batch)
+
+        assert sum(len(part.records) for part in parts.values()) == 51
+        for node, part in parts.items():
+            assert part.resource == batch.resource
+            assert all(router.owner(r.trace_id) == node for r in part.records)
+        assert parts[NODE_A].records[-1].trace_id is None  # keyless records stay local
+
+    def test_trace_id_case_insensitive(self):
+        router = make_router()
+        trace_id = trace_ids(1)[0]
+
+        assert router.owner(trace_id.upper()) == router.owner(trace_id) == router.owner(bytes.fromhex(trace_id))
+
+    def test_single_node_returns_batch_unchanged(self):
+        router = make_router(nodes=(NODE_A,))
+        batch = make_batch(trace_ids(10))
+
+        assert router.split_logs(batch) == {NODE_A: batch}
+        assert router.split_logs(batch)[NODE_A] is batch
+
+    def test_split_proto_traces(self):
+        router = make_router()
+        ids = trace_ids(40)
+
+        parts = router.split_traces(make_traces(ids))
+
+        seen = []
+        for node, part in parts.items():
+            rs = part.resource_spans[0]
+            assert rs.resource.attributes[0].value.string_value == "arda"
+            assert rs.scope_spans[0].scope.name == "arda.tracer"
+            spans = [span.trace_id.hex() for span in rs.scope_spans[0].spans]
+            assert all(router.owner(trace_id) == node for trace_id in spans)
+            seen.extend(spans)
+        assert sorted(seen) == sorted(ids)
+
+    def test_local_proto_traces_not_copied(self):
+        router = make_router()
+        ids = [t for t in trace_ids(200) if router.owner(t) == NODE_A][:5]
+        data = make_traces(ids)
+
+        assert router.split_traces(data)[NODE_A] is data
+
+    def test_split_json_traces(self):
+        router = make_router()
+        ids = trace_ids(40)
+        payload = {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "arda"}}]},
+            "scopeSpans": [{"spans": [{"traceId": t, "spanId": "00f067aa0ba902b7"} for t in ids]}],
+        }]}
+
+        parts = router.split_traces(payload)
+
+        assert set(parts) == {NODE_A, NODE_B}
+        assert sorted(
+            span["traceId"]
+            for part in parts.values()
+            for span in part["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        ) == sorted(ids)
+
+    def test_split_segments_by_circuit(self):
+        router = make_router()
+        segments = [
+            TraceSegment(trace_id=t, span_id="s", service="beorn", timestamp=datetime.now(timezone.utc), circuit_id=f"C{i % 7}")
+            for i, t in enumerate(trace_ids(30))
+        ]
+
+        parts = router.split_segments(segments)
+
+        for node, node_segments in parts.items():
+            assert {router.owner(s.circuit_id) for s in node_segments} == {node}
+
+
+class TestForwarding:
+    """Remote parts are POSTed to the owner, failures fall back to local"""
+
+    @pytest.mark.asyncio
+    async def test_route_forwards_remote_parts(self):
+        received = []
+
+        def handler(request):
+            received.append((str(request.url), request.headers["content-type"], request.content))
+            return httpx.Response(202)
+
+        router = make_router(handler)
+        batch = make_batch(trace_ids(30))
+        parts = router.split_logs(batch)
+
+        local = await router.route("logs", parts, lambda b: len(b.records))
+
+        assert local == [parts[NODE_A]]
+        [(url, content_type, body)] = received
+        assert url == f"{NODE_B}/internal/shard/logs"
+        assert LogBatch.model_validate_json(body) == parts[NODE_B]
+
+    @pytest.mark.asyncio
+    async def test_traces_forwarded_as_protobuf(self):
+        received = []
+        router = make_router(lambda request: received.append(request) or httpx.Response(202))
+        parts = router.split_traces(make_traces(trace_ids(30)))
+
+        await router.route("traces", parts, lambda p: 1)
+
+        assert received[0].headers["content-type"] == "application/x-protobuf"
+        forwarded = TracesData()
+        forwarded.ParseFromString(received[0].content)
+        assert forwarded == parts[NODE_B]
+
+    @pytest.mark.asyncio
+    async def test_unreachable_owner_processed_locally(self):
+        router = make_router(lambda request: httpx.Response(503))
+        parts = router.split_logs(make_batch(trace_ids(30)))
+
+        local = await router.route("logs", parts, lambda b: len(b.records))
+
+        assert local == [parts[NODE_A], parts[NODE_B]]
+
+
+class TestEngineRouting:
+    """CorrelationEngine entry points honour the router"""
+
+    @pytest.fixture
+    def engine(self):
+        return CorrelationEngine(window_seconds=60, exporter_manager=AsyncMock(), shard_router=make_router())
+
+    @pytest.mark.asyncio
+    async def test_add_logs_queues_only_local_records(self, engine):
+        batch = make_batch(trace_ids(30))
+
+        await engine.add_logs(batch)
+
+        queued = engine.log_queue.get_nowait()
+        assert queued.records and all(engine.shard_router.owner(r.trace_id) == NODE_A for r in queued.records)
+        assert engine.log_queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_forwarded_batches_not_rerouted(self, engine):
+        batch = make_batch(trace_ids(30))
+
+        await engine.add_logs(batch, forwarded=True)
+
+        assert engine.log_queue.get_nowait() is batch
+
+
+class TestRedisMembership:
+    """Heartbeat-based membership in the state store"""
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_expiry_and_leave(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        membership = RedisMembership(fakeredis.FakeAsyncRedis(), key="test:members", ttl_seconds=15)
+
+        await membership.heartbeat(NODE_A)
+        await membership.heartbeat(NODE_B)
+        await membership.client.zadd("test:members", {"http://stale:8080": 0})
+        assert sorted(await membership.members()) == [NODE_A, NODE_B]
+
+        await membership.leave(NODE_B)
+        assert await membership.members() == [NODE_A]
+
+    @pytest.mark.asyncio
+    async def test_router_refresh_builds_ring(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.FakeAsyncRedis()
+        router = ShardRouter(NODE_A, RedisMembership(client, key="test:members"))
+        await RedisMembership(client, key="test:members").heartbeat(NODE_B)
+
+        await router.refresh()
+
+        assert router.ring.nodes == (NODE_A, NODE_B)
+        await router.stop()
+        assert await RedisMembership(client, key="test:members").members() == [NODE_B]
+
+
+class TestInternalRoutes:
+    """/internal/shard endpoints queue without re-routing"""
+
+    @pytest.fixture
+    def engine(self):
+        engine = CorrelationEngine(window_seconds=60, exporter_manager=AsyncMock(), shard_router=make_router())
+        engine.add_logs = AsyncMock()
+        engine.add_traces = AsyncMock()
+        engine.add_synthesis_segments = MagicMock()
+        return engine
+
+    @pytest.fixture
+    def client(self, engine):
+        app = FastAPI()
+        app.include_router(shard.router, prefix="/internal/shard")
+        app.state.correlation_engine = engine
+        return TestClient(app)
+
+    def test_logs(self, client, engine):
+        batch = make_batch(trace_ids(3))
+
+        response = client.post("/internal/shard/logs", content=batch.model_dump_json())
+
+        assert response.status_code == 202
+        engine.add_logs.assert_awaited_once_with(batch, forwarded=True)
+
+    def test_protobuf_traces(self, client, engine):
+        data = make_traces(trace_ids(3))
+
+        response = client.post(
+            "/internal/shard/traces", content=data.SerializeToString(),
+            headers={"Content-Type": "application/x-protobuf"},
+        )
+
+        assert response.status_code == 202
+        assert engine.add_traces.await_args.args[0] == data
+        assert engine.add_traces.await_args.kwargs == {"forwarded": True}
+
+    def test_invalid_traces(self, client):
+        response = client.post("/internal/shard/traces", content=b"{not json")
+
+        assert response.status_code == 400
+
+    def test_segments(self, client, engine):
+        segment = {"trace_id": "t1", "span_id": "s1", "service": "beorn",
+                   "timestamp": "2025-10-15T10:30:00+00:00", "circuit_id": "C1"}
+
+        response = client.post("/internal/shard/segments", content=json.dumps([segment]))
+
+        assert response.status_code == 202
+        [parsed] = engine.add_synthesis_segments.call_args.args[0]
+        assert parsed.circuit_id == "C1"
+        assert parsed.timestamp == datetime(2025, 10, 15, 10, 30, tzinfo=timezone.utc)
+
+    def test_members(self, client):
+        assert client.get("/internal/shard/members").json()["members"] == [NODE_A, NODE_B]
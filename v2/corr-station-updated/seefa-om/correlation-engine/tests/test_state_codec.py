@@ -0,0 +1,133 @@
+"""Tests for CorrelationEntry state codecs"""
+import pytest
+from datetime import datetime, timezone
+
+from app.pipeline import state_codec
+from app.pipeline.state_codec import JsonCodec, MsgpackCodec, decode_entry, get_codec
+from app.pipeline.state_manager import CorrelationEntry, RedisStateManager
+
+pytest.importorskip("msgpack")
+
+TS = datetime(2025, 10, 15, 10, 30, 0, 123456, tzinfo=timezone.utc)
+
+
+def make_entry(trace_id="4bf92f3577b34da6a3ce929d0e0e4736", log_count=2) -> CorrelationEntry:
+    return CorrelationEntry(
+        correlation_id="corr-1",
+        trace_id=trace_id,
+        service="beorn",
+        env="prod",
+        first_seen=TS,
+        last_updated=TS,
+        spans=[{"span_id": "00f067aa0ba902b7", "name": "GET /circuit", "duration_ms": 12.5}],
+        logs=[
+            {"message": f"circuit lookup step {i} for CID-12345", "severity": "INFO", "attrs": {"i": i}}
+            for i in range(log_count)
+        ],
+        metadata={"circuit_id": "CID-12345", "log_count": log_count},
+    )
+
+
+def assert_same(decoded: CorrelationEntry, entry: CorrelationEntry):
+    assert decoded.to_dict() == entry.to_dict()
+
+
+class TestMsgpackCodec:
+    """Binary round trips and layout"""
+
+    @pytest.mark.parametrize("trace_id", [
+        "4bf92f3577b34da6a3ce929d0e0e4736",
+        "4BF92F3577B34DA6A3CE929D0E0E4736",  # uppercase stays text to round-trip exactly
+        "not-hex",
+        None,
+    ])
+    def test_round_trip(self, trace_id):
+        entry = make_entry(trace_id=trace_id)
+
+        assert_same(MsgpackCodec().decode(MsgpackCodec().encode(entry)), entry)
+
+    def test_smaller_than_json(self):
+        entry = make_entry()
+
+        assert len(MsgpackCodec(compress_logs=False).encode(entry)) < len(JsonCodec().encode(entry))
+
+    def test_version_header(self):
+        data = MsgpackCodec(compress_logs=False).encode(make_entry())
+
+        assert data[:3] == bytes((state_codec.MAGIC, state_codec.FORMAT_VERSION, 0))
+
+    def test_naive_timestamps_read_back_as_utc(self):
+        entry = make_entry()
+        entry.first_seen = TS.replace(tzinfo=None)
+
+        decoded = MsgpackCodec().decode(MsgpackCodec().encode(entry))
+
+        assert decoded.first_seen == TS
+
+    def test_large_logs_compressed(self):
+        pytest.importorskip("zstandard")
+        entry = make_entry(log_count=200)
+        codec = MsgpackCodec(compress_logs=True)
+
+        data = codec.encode(entry)
+
+        assert data[2] & state_codec.FLAG_LOGS_ZSTD
+        assert len(data) < len(MsgpackCodec(compress_logs=False).encode(entry)) / 3
+        assert_same(codec.decode(data), entry)
+
+    def test_small_logs_left_uncompressed(self):
+        pytest.importorskip("zstandard")
+
+        data = MsgpackCodec(compress_logs=True).encode(make_entry(log_count=1))
+
+        assert data[2] == 0
+
+
+class TestVersionDispatch:
+    """Any codec reads every known format"""
+
+    def test_msgpack_codec_reads_legacy_json(self):
+        entry = make_entry()
+
+        assert_same(MsgpackCodec().decode(entry.to_json()), entry)
+
+    def test_json_codec_reads_msgpack(self):
+        entry = make_entry()
+
+        assert_same(JsonCodec().decode(MsgpackCodec().encode(entry)), entry)
+
+    def test_unknown_version_rejected(self):
+        data = bytearray(MsgpackCodec().encode(make_entry()))
+        data[1] = 99
+
+        with pytest.raises(ValueError):
+            decode_entry(bytes(data))
+
+    def test_get_codec(self):
+        assert isinstance(get_codec("json"), JsonCodec)
+        assert isinstance(get_codec("msgpack", compress_logs=False), MsgpackCodec)
+        with pytest.raises(ValueError):
+            get_codec("pickle")
+
+
+class TestRedisWithCodec:
+    """Rolling upgrade: JSON and msgpack values side by side"""
+
+    @pytest.mark.asyncio
+    async def test_mixed_formats_readable(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        client = fakeredis.FakeAsyncRedis()
+        old = RedisStateManager(key_prefix="codec:", client=client)
+        new = RedisStateManager(key_prefix="codec:", codec=MsgpackCodec(), client=client)
+        first, second = make_entry(), make_entry(trace_id="ab" * 16)
+        second.correlation_id = "corr-2"
+
+        await old.set_correlation("corr-1", first)
+        await new.set_many({"corr-2": second})
+
+        for manager in (old, new):
+            found = await manager.get_many(["corr-1", "corr-2"])
+            assert_same(found["corr-1"], first)
+            assert_same(found["corr-2"], second)
+        assert (await client.get("codec:corr-2"))[0] == state_codec.MAGIC
+        await client.aclose()
@@ -1,6 +1,9 @@
 """Tests for state managers (in-memory and Redis)"""
 import pytest
 from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+from app.pipeline.correlator import CorrelationEngine
 from app.pipeline.state_manager import (
     CorrelationEntry,
     StateManager,
@@ -9,6 +12,19 @@ from app.pipeline.state_manager import (
 )
 
 
+async def make_redis_client():
+    """fakeredis when installed, otherwise a local Redis server"""
+    try:
+        import fakeredis
+        return fakeredis.FakeAsyncRedis()
+    except ImportError:
+        pass
+    import redis.asyncio as redis
+    client = redis.from_url("redis://localhost:6379")
+    await client.ping()
+    return client
+
+
 class TestCorrelationEntry:
     """Test CorrelationEntry serialization"""
 
@@ -210,8 +226,97 @@ class TestInMemoryStateManager:
         await manager.close()
 
 
-# Note: Redis tests require a running Redis instance
-# These are integration tests and may be skipped in CI without Redis
+class TestInMemoryTimeIndex:
+    """Sorted time index with lazy tombstones"""
+
+    BASE = datetime(2025, 10, 15, 10, 0, tzinfo=timezone.utc)
+
+    @pytest.fixture
+    async def manager(self):
+        manager = InMemoryStateManager()
+        # Out-of-order arrival: 0, 7, 14, ... mod 20
+        for i in range(20):
+            n = i * 7 % 20
+            await manager.set_correlation(f"corr-{n}", make_entry(n, self.BASE))
+        return manager
+
+    @pytest.mark.asyncio
+    async def test_index_sorted_and_range_ordered(self, manager):
+        results = await manager.get_correlations_by_time_range(
+            self.BASE + timedelta(seconds=5), self.BASE + timedelta(seconds=9)
+        )
+
+        assert manager.time_index == sorted(manager.time_index)
+        assert [r.correlation_id for r in results] == [f"corr-{i}" for i in range(5, 10)]
+
+    @pytest.mark.asyncio
+    async def test_reset_moves_entry(self, manager):
+        """Re-setting with a new timestamp leaves the old position as a tombstone"""
+        await manager.set_correlation("corr-3", make_entry(30, self.BASE))
+
+        early = await manager.get_correlations_by_time_range(self.BASE, self.BASE + timedelta(seconds=19))
+        late = await manager.get_correlations_by_time_range(self.BASE + timedelta(seconds=20))
+
+        assert "corr-3" not in [r.correlation_id for r in early]
+        assert [r.correlation_id for r in late] == ["corr-30"]  # entry's own id, stored under corr-3
+
+    @pytest.mark.asyncio
+    async def test_deleted_entries_skipped(self, manager):
+        await manager.delete_correlation("corr-6")
+
+        results = await manager.get_correlations_by_time_range(self.BASE, self.BASE + timedelta(seconds=19))
+
+        assert len(results) == 19
+        assert len(manager.time_index) == 20  # tombstone kept until compaction
+
+    @pytest.mark.asyncio
+    async def test_tombstones_compacted(self, manager):
+        manager.MIN_COMPACT_TOMBSTONES = 0
+        for i in range(11):
+            await manager.delete_correlation(f"corr-{i}")
+
+        assert len(manager.time_index) == 9
+        assert manager._tombstones == 0
+
+    @pytest.mark.asyncio
+    async def test_cleanup_removes_prefix(self, manager):
+        await manager.delete_correlation("corr-2")
+        await manager.set_correlation("corr-1", make_entry(15, self.BASE))
+
+        deleted = await manager.cleanup_old_correlations(self.BASE + timedelta(seconds=10))
+
+        # corr-0 and 3..9 deleted; corr-2 was already gone, corr-1 moved to t=15
+        assert deleted == 8
+        assert await manager.get_correlation_count() == 11
+        assert manager.time_index[0][0] >= self.BASE + timedelta(seconds=10)
+        assert manager._tombstones == 0  # both tombstones (t=1, t=2) were in the prefix
+
+    @pytest.mark.asyncio
+    async def test_delete_then_reset_same_timestamp(self, manager):
+        """The old index item stays dead when the entry comes back unchanged"""
+        entry = make_entry(3, self.BASE)
+        await manager.delete_correlation("corr-3")
+        await manager.set_correlation("corr-3", entry)
+
+        results = await manager.get_correlations_by_time_range(self.BASE, self.BASE + timedelta(seconds=19))
+
+        assert [r.correlation_id for r in results].count("corr-3") == 1
+        assert len(results) == 20
+
+    @pytest.mark.asyncio
+    async def test_repeated_updates_compacted(self, manager):
+        """Re-sets with new timestamps trigger compaction, not just deletes"""
+        manager.MIN_COMPACT_TOMBSTONES = 0
+        for i in range(100):
+            await manager.set_correlation("corr-0", make_entry(20 + i, self.BASE))
+
+        assert len(manager.time_index) <= 2 * await manager.get_correlation_count() + 1
+        results = await manager.get_correlations_by_time_range(self.BASE)
+        assert len(results) == 20
+
+
+# Note: Redis tests run against fakeredis when installed, otherwise a local
+# Redis instance; they are skipped when neither is available
 
 @pytest.mark.integration
 class TestRedisStateManager:
@@ -220,17 +325,13 @@ class TestRedisStateManager:
     @pytest.fixture
     async def manager(self):
         """Create manager and cleanup after test"""
-        manager = RedisStateManager(
-            redis_url="redis://localhost:6379",
-            key_prefix="test_corr:"
-        )
-
         try:
-            # Try to connect
-            await manager._ensure_connected()
+            client = await make_redis_client()
         except (ImportError, Exception) as e:
             pytest.skip(f"Redis not available: {e}")
 
+        manager = RedisStateManager(key_prefix="test_corr:", client=client)
+
         yield manager
 
         # Cleanup
@@ -416,3 +517,117 @@ class TestStateManagerInterface:
         # Would work with Redis too (if available)
         # redis_mgr = RedisStateManager()
         # result = await store_and_retrieve(redis_mgr, entry)
+
+
+def make_entry(i: int, base: datetime) -> CorrelationEntry:
+    ts = base + timedelta(seconds=i)
+    return CorrelationEntry(
+        correlation_id=f"corr-{i}", trace_id=f"trace-{i}", service="beorn",
+        env="dev", first_seen=ts, last_updated=ts,
+    )
+
+
+class TestRedisBatchOperations:
+    """Pipelined set_many, MGET get_many and paged time-range reads"""
+
+    BASE = datetime(2025, 10, 15, 10, 0, tzinfo=timezone.utc)
+
+    @pytest.fixture
+    async def manager(self):
+        try:
+            client = await make_redis_client()
+        except Exception as e:
+            pytest.skip(f"Redis not available: {e}")
+
+        manager = RedisStateManager(key_prefix="test_batch:", batch_size=2, client=client)
+        yield manager
+
+        keys = await client.keys("test_batch:*")
+        if keys:
+            await client.delete(*keys)
+        await manager.close()
+
+    @pytest.fixture
+    def entries(self):
+        return {f"corr-{i}": make_entry(i, self.BASE) for i in range(5)}
+
+    @pytest.mark.asyncio
+    async def test_set_many_pipelines_per_batch(self, manager, entries):
+        """5 entries with batch_size=2 take 3 pipelines and no single-key calls"""
+        with patch.object(manager.redis, "pipeline", wraps=manager.redis.pipeline) as pipeline, \
+                patch.object(manager.redis, "set", wraps=manager.redis.set) as single_set:
+            await manager.set_many(entries, ttl_seconds=60)
+
+        assert pipeline.call_count == 3
+        single_set.assert_not_called()
+        assert await manager.get_correlation_count() == 5
+        assert 0 < await manager.redis.ttl("test_batch:corr-4") <= 60
+
+    @pytest.mark.asyncio
+    async def test_get_many_uses_mget(self, manager, entries):
+        await manager.set_many(entries)
+
+        with patch.object(manager.redis, "mget", wraps=manager.redis.mget) as mget, \
+                patch.object(manager.redis, "get", wraps=manager.redis.get) as single_get:
+            found = await manager.get_many(["corr-0", "missing", "corr-3"])
+
+        assert mget.call_count == 2
+        single_get.assert_not_called()
+        assert sorted(found) == ["corr-0", "corr-3"]
+        assert found["corr-3"].trace_id == "trace-3"
+        assert found["corr-3"].last_updated == self.BASE + timedelta(seconds=3)
+
+    @pytest.mark.asyncio
+    async def test_time_range_pages_through_index(self, manager, entries):
+        """Results span several ZRANGEBYSCORE pages, in time order, skipping expired keys"""
+        await manager.set_many(entries)
+        await manager.redis.delete("test_batch:corr-2")  # expired, still in the index
+
+        with patch.object(manager.redis, "zrangebyscore", wraps=manager.redis.zrangebyscore) as zrange:
+            results = await manager.get_correlations_by_time_range(
+                self.BASE, self.BASE + timedelta(seconds=4)
+            )
+
+        assert [r.correlation_id for r in results] == ["corr-0", "corr-1", "corr-3", "corr-4"]
+        assert zrange.call_count == 3
+        assert [c.kwargs["start"] for c in zrange.call_args_list] == [0, 2, 4]
+
+    @pytest.mark.asyncio
+    async def test_empty_batches_skip_redis(self, manager):
+        with patch.object(manager.redis, "pipeline") as pipeline:
+            await manager.set_many({})
+            assert await manager.get_many([]) == {}
+
+        pipeline.assert_not_called()
+
+
+class TestEngineWindowPersistence:
+    """Closed windows are written to the state manager in one batch"""
+
+    @pytest.mark.asyncio
+    async def test_close_window_calls_set_many_once(self):
+        state_manager = InMemoryStateManager()
+        state_manager.set_many = AsyncMock(wraps=state_manager.set_many)
+        engine = CorrelationEngine(window_seconds=60, exporter_manager=AsyncMock(), state_manager=state_manager)
+        for i in range(3):
+            engine.current_window.add_log({"trace_id": f"trace-{i}", "service": "beorn", "circuit_id": "C1"})
+
+        await engine._close_window()
+
+        state_manager.set_many.assert_awaited_once()
+        assert await state_manager.get_correlation_count() == 3
+        entry = next(iter(state_manager.correlations.values()))
+        assert entry.service == "beorn"
+        assert entry.metadata["circuit_id"] == "C1"
+        assert entry.metadata["log_count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_persist_failure_does_not_break_window_close(self):
+        state_manager = AsyncMock()
+        state_manager.set_many.side_effect = ConnectionError("redis down")
+        engine = CorrelationEngine(window_seconds=60, exporter_manager=AsyncMock(), state_manager=state_manager)
+        engine.current_window.add_log({"trace_id": "trace-1", "service": "beorn"})
+
+        await engine._close_window()
+
+        assert len(engine.correlation_history) == 1
@@ -0,0 +1,214 @@
+"""Tests for batched Tempo span export"""
+import asyncio
+import gzip
+import uuid
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, Mock
+
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+from opentelemetry.proto.trace.v1.trace_pb2 import TracesData
+
+from app.config import settings
+from app.models import CorrelationEvent
+from app.pipeline.exporters import TempoExporter
+
+
+TRACE_ID_HEX = "5b8efff798038103d269b633813fc60c"
+
+
+def make_correlation(trace_id: str = TRACE_ID_HEX) -> CorrelationEvent:
+    return CorrelationEvent(
+        correlation_id=str(uuid.uuid4()),
+        trace_id=trace_id,
+        timestamp=datetime.now(timezone.utc),
+        service="beorn",
+        env="dev",
+        log_count=2,
+        span_count=1,
+        metadata={},
+    )
+
+
+def make_bridge_span() -> dict:
+    return {
+        "trace_id": TRACE_ID_HEX,
+        "span_id": "eee19b7ec3c1b174",
+        "parent_span_id": "0000000000000001",
+        "name": "beorn_to_arda_bridge",
+        "kind": 3,
+        "start_time_unix_nano": 1700000000000000000,
+        "end_time_unix_nano": 1700000001000000000,
+        "attributes": {"synthetic": True, "correlation.confidence": 0.9},
+        "links": [{"trace_id": "6b8efff798038103d269b633813fc60c", "span_id": "fee19b7ec3c1b174"}],
+    }
+
+
+def make_otlp_json() -> dict:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "arda"}}]},
+            "scopeSpans": [{"spans": [{
+                "traceId": TRACE_ID_HEX,
+                "spanId": "0000000000000002",
+                "name": "GET /circuit",
+                "startTimeUnixNano": "1700000000000000000",
+            }]}],
+        }]
+    }
+
+
+def sent_request(post_mock, call: int = 0) -> ExportTraceServiceRequest:
+    """Decode the ExportTraceServiceRequest sent in a mocked post call"""
+    kwargs = post_mock.await_args_list[call].kwargs
+    body = kwargs["content"]
+    if kwargs["headers"].get("Content-Encoding") == "gzip":
+        body = gzip.decompress(body)
+    request = ExportTraceServiceRequest()
+    request.ParseFromString(body)
+    return request
+
+
+def span_names(request: ExportTraceServiceRequest):
+    return [span.name for rs in request.resource_spans for ss in rs.scope_spans for span in ss.spans]
+
+
+@pytest.fixture
+def tempo():
+    """Batching TempoExporter with a mocked HTTP client"""
+    exporter = TempoExporter(
+        "http://tempo:4318", batching=True, batch_max_spans=3, batch_max_age=60, compress=False
+    )
+    exporter.client.post = AsyncMock(return_value=Mock())
+    return exporter
+
+
+class TestTempoBatching:
+    """Span buffer flush and merge behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_buffers_until_size_limit(self, tempo):
+        """Spans are held until batch_max_spans is reached, then sent together"""
+        await tempo.export_correlation_span(make_correlation())
+        await tempo.export_correlation_span(make_correlation())
+        assert not tempo.client.post.called
+
+        await tempo.export_correlation_span(make_correlation())
+
+        assert tempo.client.post.await_count == 1
+        kwargs = tempo.client.post.await_args.kwargs
+        assert kwargs["headers"]["Content-Type"] == "application/x-protobuf"
+        assert span_names(sent_request(tempo.client.post)) == ["correlation.beorn"] * 3
+
+    @pytest.mark.asyncio
+    async def test_flushes_by_age(self, tempo):
+        """A partial buffer is flushed once its oldest span reaches max age"""
+        tempo.batch_max_age = 0.05
+        await tempo.export_correlation_span(make_correlation())
+
+        await asyncio.sleep(0.15)
+
+        assert tempo.client.post.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_merges_all_span_sources(self, tempo):
+        """Correlation, bridge and pass-through spans share one request"""
+        tempo.batch_max_spans = 100
+        traces_data = TracesData()
+        traces_data.resource_spans.add().scope_spans.add().spans.add(name="proto-span")
+
+        await tempo.export_correlation_span(make_correlation())
+        await tempo.export_bridge_span(make_bridge_span())
+        await tempo.export_traces(make_otlp_json())
+        await tempo.export_traces(traces_data)
+        await tempo.flush()
+
+        assert tempo.client.post.await_count == 1
+        request = sent_request(tempo.client.post)
+        assert span_names(request) == ["correlation.beorn", "beorn_to_arda_bridge", "GET /circuit", "proto-span"]
+
+        bridge = request.resource_spans[1].scope_spans[0].spans[0]
+        assert bridge.trace_id.hex() == TRACE_ID_HEX
+        assert bridge.parent_span_id.hex() == "0000000000000001"
+        assert bridge.links[0].span_id.hex() == "fee19b7ec3c1b174"
+
+    @pytest.mark.asyncio
+    async def test_gzip(self, tempo):
+        """compress=True gzips the protobuf body"""
+        tempo.compress = True
+        for _ in range(3):
+            await tempo.export_correlation_span(make_correlation())
+
+        assert tempo.client.post.await_args.kwargs["headers"]["Content-Encoding"] == "gzip"
+        assert len(span_names(sent_request(tempo.client.post))) == 3
+
+    @pytest.mark.asyncio
+    async def test_invalid_ids_dropped(self, tempo):
+        """Documents with non-hex IDs are dropped instead of poisoning the batch"""
+        bad = make_bridge_span()
+        bad["trace_id"] = "not-hex"
+
+        await tempo.export_bridge_span(bad)
+        await tempo.flush()
+
+        assert not tempo.client.post.called
+
+    @pytest.mark.asyncio
+    async def test_circuit_open_skips_flush(self, tempo):
+        """Open circuit breaker drops the flush without a request"""
+        tempo.circuit_breaker.state = "open"
+        tempo.circuit_breaker.last_failure_time = datetime.now()
+
+        for _ in range(3):
+            await tempo.export_correlation_span(make_correlation())
+
+        assert not tempo.client.post.called
+        assert tempo._buffer == []
+
+    @pytest.mark.asyncio
+    async def test_flush_retries(self, tempo, monkeypatch):
+        """Failed flushes are retried with backoff"""
+        monkeypatch.setattr(settings, "export_retry_delay", 0)
+        tempo.client.post.side_effect = [Exception("boom"), Mock()]
+
+        for _ in range(3):
+            await tempo.export_correlation_span(make_correlation())
+
+        assert tempo.client.post.await_count == 2
+        assert sent_request(tempo.client.post, 0) == sent_request(tempo.client.post, 1)
+
+    @pytest.mark.asyncio
+    async def test_close_flushes(self, tempo):
+        """close() sends whatever is still buffered"""
+        tempo.client.aclose = AsyncMock()
+        await tempo.export_correlation_span(make_correlation())
+
+        await tempo.close()
+
+        assert tempo.client.post.await_count == 1
+        assert tempo.client.aclose.called
+
+    @pytest.mark.asyncio
+    async def test_unbatched_posts_immediately(self):
+        """batching=False keeps one request per call"""
+        exporter = TempoExporter("http://tempo:4318")
+        exporter.client.post = AsyncMock(return_value=Mock())
+
+        await exporter.export_correlation_span(make_correlation())
+
+        assert exporter.client.post.await_count == 1
+        assert "json" in exporter.client.post.await_args.kwargs
+
+    @pytest.mark.asyncio
+    async def test_unbatched_gzip(self):
+        """compress=True also gzips unbatched pass-through requests"""
+        exporter = TempoExporter("http://tempo:4318", compress=True)
+        exporter.client.post = AsyncMock(return_value=Mock())
+        traces = TracesData()
+        traces.resource_spans.add().scope_spans.add().spans.add(name="GET /circuit")
+
+        await exporter.export_traces(traces)
+
+        kwargs = exporter.client.post.await_args.kwargs
+        assert kwargs["headers"]["Content-Encoding"] == "gzip"
+        assert TracesData.FromString(gzip.decompress(kwargs["content"])) == traces
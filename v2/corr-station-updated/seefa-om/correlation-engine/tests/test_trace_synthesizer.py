@@ -0,0 +1,180 @@
+"""Tests for TraceSynthesizer parent lookup and segment expiry"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+from app.correlation.trace_synthesizer import TraceSynthesizer, TraceSegment
+
+
+def make_segment(service, seconds_ago, trace_id=None, **keys):
+    """Helper to create a segment ``seconds_ago`` seconds in the past"""
+    return TraceSegment(
+        trace_id=trace_id or f"{service}-trace",
+        span_id=f"{service}-span",
+        service=service,
+        timestamp=datetime.now(timezone.utc) - timedelta(seconds=seconds_ago),
+        **keys,
+    )
+
+
+@pytest.fixture
+def synthesizer():
+    return TraceSynthesizer(correlation_window_seconds=60)
+
+
+@pytest.fixture
+def engine():
+    """CorrelationEngine with trace synthesis enabled"""
+    from app.pipeline.correlator import CorrelationEngine
+
+    engine = CorrelationEngine(window_seconds=60, exporter_manager=AsyncMock())
+    assert engine.trace_synthesizer is not None
+    return engine
+
+
+class TestParentLookup:
+    """Indexed parent lookup"""
+
+    def test_finds_parent_by_circuit_id(self, synthesizer):
+        """Parent sharing circuit_id is matched"""
+        parent = make_segment("beorn", 5, circuit_id="51.L1XX.000001..CHTR")
+        child = make_segment("arda", 1, circuit_id="51.L1XX.000001..CHTR")
+        synthesizer.add_segment(parent)
+        synthesizer.add_segment(child)
+
+        match = synthesizer.find_parent_trace(child)
+
+        assert match is not None
+        assert match[0] is parent
+        assert match[1] == pytest.approx(0.95)  # circuit 100 + proximity 40 + beorn→arda flow 50
+
+    def test_ignores_segments_without_shared_key(self, synthesizer):
+        """Segments with no common business key are never candidates"""
+        synthesizer.add_segment(make_segment("beorn", 5, circuit_id="A"))
+        child = make_segment("arda", 1, circuit_id="B")
+        synthesizer.add_segment(child)
+
+        assert synthesizer._candidates(child) == [child]
+        assert synthesizer.find_parent_trace(child) is None
+
+    def test_candidates_deduplicated_across_keys(self, synthesizer):
+        """A parent matching on several keys is scored once"""
+        parent = make_segment("beorn", 5, circuit_id="C", resource_id="R", product_id="P")
+        child = make_segment("arda", 1, circuit_id="C", resource_id="R")
+        synthesizer.add_segment(parent)
+        synthesizer.add_segment(child)
+
+        assert synthesizer._candidates(child) == [parent, child]
+
+    def test_prefers_stronger_key_match(self, synthesizer):
+        """circuit_id + resource_id beats circuit_id alone"""
+        weak = make_segment("beorn", 3, trace_id="weak", circuit_id="C")
+        strong = make_segment("palantir", 5, trace_id="strong", circuit_id="C", resource_id="R")
+        child = make_segment("arda", 1, circuit_id="C", resource_id="R")
+        for segment in (weak, strong, child):
+            synthesizer.add_segment(segment)
+
+        assert synthesizer.find_parent_trace(child)[0] is strong
+
+    def test_skips_newer_parent(self, synthesizer):
+        """Parents newer than the child violate causality"""
+        child = make_segment("arda", 10, circuit_id="C")
+        synthesizer.add_segment(make_segment("beorn", 1, circuit_id="C"))
+        synthesizer.add_segment(child)
+
+        assert synthesizer.find_parent_trace(child) is None
+
+
+class TestExpiry:
+    """Window expiry from the arrival-ordered deque"""
+
+    def test_expired_segments_leave_index(self, synthesizer):
+        """Segments older than the window are dropped from deque and index"""
+        synthesizer.add_segment(make_segment("beorn", 120, circuit_id="C"))
+        synthesizer.add_segment(make_segment("arda", 1, circuit_id="D"))
+
+        assert len(synthesizer.segments) == 1
+        assert ("circuit_id", "C") not in synthesizer._index
+        assert synthesizer.get_stats()["active_segments"] == 1
+
+    def test_naive_timestamps_supported(self, synthesizer):
+        """Naive UTC timestamps expire against naive now()"""
+        old = TraceSegment(
+            trace_id="t", span_id="s", service="beorn",
+            timestamp=datetime.utcnow() - timedelta(seconds=120), circuit_id="C",
+        )
+        synthesizer.add_segment(old)
+
+        assert len(synthesizer.segments) == 0
+
+
+class TestPending:
+    """Pending segments for incremental synthesis"""
+
+    def test_take_pending_returns_new_segments_once(self, synthesizer):
+        """Each added segment is handed out exactly once"""
+        first = make_segment("beorn", 2, circuit_id="C")
+        second = make_segment("arda", 1, circuit_id="C")
+        synthesizer.add_segment(first)
+        synthesizer.add_segment(second)
+
+        assert synthesizer.take_pending() == [first, second]
+        assert synthesizer.take_pending() == []
+
+
+class TestIncrementalSynthesis:
+    """Engine links each segment once and exports each bridge once"""
+
+    @pytest.mark.asyncio
+    async def test_bridge_exported_once_across_passes(self, engine):
+        """Repeated synthesis passes do not re-export existing bridges"""
+        engine.trace_synthesizer.add_segment(make_segment("beorn", 5, circuit_id="C"))
+        engine.trace_synthesizer.add_segment(make_segment("arda", 1, circuit_id="C"))
+
+        await engine._perform_trace_synthesis()
+        await engine._perform_trace_synthesis()
+
+        assert engine.exporter_manager.export_bridge_span.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_late_parent_rematches_child(self, engine):
+        """A parent arriving after its child still produces the bridge"""
+        child = make_segment("arda", 1, circuit_id="C")
+        engine.trace_synthesizer.add_segment(child)
+        await engine._perform_trace_synthesis()
+        assert engine.exporter_manager.export_bridge_span.await_count == 0
+
+        engine.trace_synthesizer.add_segment(make_segment("beorn", 5, circuit_id="C"))
+        await engine._perform_trace_synthesis()
+
+        bridge = engine.exporter_manager.export_bridge_span.await_args.args[0]
+        assert bridge["trace_id"] == "beorn-trace"
+        assert bridge["links"][0]["trace_id"] == child.trace_id
+        assert engine.trace_synthesizer.is_matched(child)
+
+    @pytest.mark.asyncio
+    async def test_redelivered_segment_is_idempotent(self, engine):
+        """The same parent/child pair delivered twice yields one bridge"""
+        engine.trace_synthesizer.add_segment(make_segment("beorn", 5, circuit_id="C"))
+        engine.trace_synthesizer.add_segment(make_segment("arda", 1, circuit_id="C"))
+        await engine._perform_trace_synthesis()
+
+        # OTLP retry re-sends the child span with identical IDs
+        engine.trace_synthesizer.add_segment(make_segment("arda", 1, circuit_id="C"))
+        await engine._perform_trace_synthesis()
+
+        assert engine.exporter_manager.export_bridge_span.await_count == 1
+
+    def test_claim_bridge_span_id(self, synthesizer):
+        """Bridge IDs can be claimed once per window"""
+        assert synthesizer.claim_bridge_span_id("abc")
+        assert not synthesizer.claim_bridge_span_id("abc")
+
+    def test_unmatched_children_bounded(self, synthesizer):
+        """Late-parent re-match considers at most max_children"""
+        for i in range(10):
+            synthesizer.add_segment(make_segment("arda", 1, trace_id=f"child-{i}", circuit_id="C"))
+        parent = make_segment("beorn", 5, circuit_id="C")
+        synthesizer.add_segment(parent)
+
+        assert len(synthesizer.unmatched_children(parent, max_children=3)) == 3
@@ -0,0 +1,182 @@
+"""Tests for CorrelationEngine consumer worker pools"""
+import pytest
+import asyncio
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+from app.pipeline.correlator import CorrelationEngine
+from app.models import LogBatch, LogRecord, ResourceInfo
+
+
+@pytest.fixture
+def mock_exporter_manager():
+    """Mock ExporterManager"""
+    manager = AsyncMock()
+    manager.export_logs = AsyncMock()
+    manager.export_traces = AsyncMock()
+    manager.export_correlation_span = AsyncMock()
+    manager.close = AsyncMock()
+    return manager
+
+
+@pytest.fixture
+def correlation_engine(mock_exporter_manager):
+    """Create CorrelationEngine with small worker pools"""
+    engine = CorrelationEngine(window_seconds=60, exporter_manager=mock_exporter_manager)
+    engine.log_consumer_workers = 2
+    engine.trace_consumer_workers = 2
+    engine.export_consumer_workers = 3
+    return engine
+
+
+def make_log_batch(trace_id: str, service: str = "test-service") -> LogBatch:
+    """Helper to create a one-record log batch"""
+    return LogBatch(
+        resource=ResourceInfo(service=service, host="test-host", env="dev"),
+        records=[
+            LogRecord(
+                timestamp=datetime.now(timezone.utc).isoformat(),
+                severity="INFO",
+                message="Test log",
+                trace_id=trace_id,
+            )
+        ],
+    )
+
+
+def make_trace_batch(trace_id: str) -> dict:
+    """Helper to create a one-span OTLP/JSON trace batch"""
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "test-service"}}]},
+            "scopeSpans": [{"spans": [{
+                "traceId": trace_id,
+                "spanId": "span-1",
+                "name": "op",
+                "startTimeUnixNano": "1699971234000000000",
+            }]}],
+        }]
+    }
+
+
+async def wait_for(predicate, timeout: float = 1.0):
+    """Poll until predicate() is true or timeout expires"""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+async def stop_engine(engine, task):
+    """Stop engine and wait for the run task to finish"""
+    engine.stop()
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+class TestWorkerPool:
+    """Consumer worker pool behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_workers_started_per_queue(self, correlation_engine):
+        """run() starts log, trace and per-signal export workers"""
+        task = asyncio.create_task(correlation_engine.run())
+        await asyncio.sleep(0.05)
+
+        # 2 log + 2 trace + 3 log-export + 3 trace-export
+        assert len(correlation_engine._workers) == 10
+
+        await stop_engine(correlation_engine, task)
+        assert correlation_engine._workers == []
+
+    @pytest.mark.asyncio
+    async def test_slow_log_export_does_not_block_traces(self, correlation_engine, mock_exporter_manager):
+        """A stalled Loki export must not stall normalization or trace export"""
+        release = asyncio.Event()
+
+        async def stalled_export(batch):
+            await release.wait()
+
+        mock_exporter_manager.export_logs.side_effect = stalled_export
+
+        task = asyncio.create_task(correlation_engine.run())
+        for i in range(5):
+            await correlation_engine.add_logs(make_log_batch(f"trace-{i}"))
+        await correlation_engine.add_traces(make_trace_batch("trace-0"))
+
+        assert await wait_for(lambda: mock_exporter_manager.export_traces.called)
+
+        # All logs were normalized into the window while exports are stuck
+        assert await wait_for(lambda: len(correlation_engine.current_window.logs_by_trace) == 5)
+        assert "trace-0" in correlation_engine.current_window.traces_by_trace
+
+        release.set()
+        await stop_engine(correlation_engine, task)
+
+    @pytest.mark.asyncio
+    async def test_exports_run_concurrently(self, correlation_engine, mock_exporter_manager):
+        """Export workers drain the export queue in parallel"""
+        in_flight = 0
+        peak = 0
+        release = asyncio.Event()
+
+        async def tracked_export(batch):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await release.wait()
+            in_flight -= 1
+
+        mock_exporter_manager.export_logs.side_effect = tracked_export
+
+        task = asyncio.create_task(correlation_engine.run())
+        for i in range(6):
+            await correlation_engine.add_logs(make_log_batch(f"trace-{i}"))
+
+        assert await wait_for(lambda: peak == correlation_engine.export_consumer_workers)
+
+        release.set()
+        assert await wait_for(lambda: mock_exporter_manager.export_logs.call_count == 6)
+        await stop_engine(correlation_engine, task)
+
+    @pytest.mark.asyncio
+    async def test_consumer_survives_bad_batch(self, correlation_engine, mock_exporter_manager):
+        """A batch that fails normalization does not kill its worker"""
+        correlation_engine.log_consumer_workers = 1
+        task = asyncio.create_task(correlation_engine.run())
+
+        await correlation_engine.log_queue.put(object())
+        await correlation_engine.add_logs(make_log_batch("good-trace"))
+
+        assert await wait_for(lambda: "good-trace" in correlation_engine.current_window.logs_by_trace)
+        await stop_engine(correlation_engine, task)
+
+
+class TestEventDrivenLoop:
+    """Coordinator loop wakes on deadlines and stop(), not a poll tick"""
+
+    @pytest.mark.asyncio
+    async def test_window_closes_on_deadline(self, mock_exporter_manager):
+        """Window close fires at the deadline rather than on the next 1s tick"""
+        engine = CorrelationEngine(window_seconds=0.3, exporter_manager=mock_exporter_manager)
+        task = asyncio.create_task(engine.run())
+        await engine.add_logs(make_log_batch("deadline-trace"))
+
+        assert await wait_for(lambda: mock_exporter_manager.export_correlation_span.called, timeout=0.6)
+        assert engine.correlation_history[0].trace_id == "deadline-trace"
+        await stop_engine(engine, task)
+
+    @pytest.mark.asyncio
+    async def test_stop_exits_without_cancel(self, correlation_engine):
+        """stop() wakes the idle loop so run() returns promptly"""
+        task = asyncio.create_task(correlation_engine.run())
+        await asyncio.sleep(0.05)
+
+        correlation_engine.stop()
+        await asyncio.wait_for(task, timeout=0.5)
+        assert correlation_engine._workers == []
@@ -21,6 +21,18 @@ class AppConfig(BaseSettings):
     SENTRY_DNS: str = ""
     USAGE_DESIGNATION: str = "STAGE"
 
+    # Pooled upstream HTTP sessions (common_sense.dll.http_pool)
+    HTTP_POOL_CONNECTIONS: int = 10
+    HTTP_POOL_MAXSIZE: int = 16
+    HTTP_MAX_RETRIES: int = 2
+    HTTP_RETRY_BACKOFF: float = 0.5
+
+    # Read-your-writes polling after Granite creates (arda_app.dll.granite.READ_AFTER_WRITE)
+    GRANITE_READ_AFTER_WRITE_BACKOFF: float = 0.1
+    GRANITE_READ_AFTER_WRITE_TIMEOUT: float = 3.0
+    # Pause after a write READ_AFTER_WRITE has no read-back for (updates, unlisted endpoints)
+    GRANITE_WRITE_FALLBACK_WAIT: float = 0.25
+
     @model_validator(mode="after")
     def environ_check(self) -> "AppConfig":
         if not self.USAGE_DESIGNATION:
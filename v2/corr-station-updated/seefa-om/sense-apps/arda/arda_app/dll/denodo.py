@@ -6,6 +6,7 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from common_sense.common.errors import abort, remove_api_key
+from common_sense.dll import http_pool
 from arda_app.common import url_config, auth_config
 from arda_app.dll.utils import get_hydra_headers
 
@@ -20,7 +21,7 @@ def denodo_get(endpoint, params=None):
         if x > 0:
             sleep(5)
         try:
-            resp = requests.get(url, headers=get_hydra_headers(), params=params, verify=False, timeout=60)
+            resp = http_pool.get("hydra", url, headers=get_hydra_headers(), params=params, verify=False, timeout=60)
             if resp.text.startswith("\n<!DOCTYPE"):
                 logger.exception(f"Invalid response from Denodo: {url}")
                 continue
@@ -3,16 +3,60 @@ from typing import Any, Union
 import logging
 import requests
 
-from time import sleep
+from time import monotonic, sleep
 
 from arda_app.common import url_config, auth_config, app_config
 from arda_app.common.utils import sanitize_site_string
 from arda_app.common.endpoints import GRANITE_COMMON_PATH
 from common_sense.common.errors import abort
+from common_sense.dll import http_pool
 
 logger = logging.getLogger(__name__)
 
 
+def _created_path_url(payload, data):
+    if data.get("retString") == "Path Added" and data.get("pathInstanceId"):
+        return f"/paths?CIRC_PATH_INST_ID={data['pathInstanceId']}"
+
+
+def _created_shelf_url(payload, data):
+    if data.get("retString") == "Shelf Added" and payload.get("SHELF_NAME"):
+        return f"/equipmentBuildouts?EQUIP_NAME={payload['SHELF_NAME'].split('/')[0]}"
+
+
+def _created_card_url(payload, data):
+    # Callers re-read the shelf buildout for the PORT_INST_ID the card adds to its slot
+    if "httpCode" not in data and payload.get("SHELF_NAME") and payload.get("SLOT_INST_ID"):
+        slot = str(payload["SLOT_INST_ID"])
+        return (
+            f"/equipmentBuildouts?EQUIP_NAME={payload['SHELF_NAME'].split('/')[0]}",
+            lambda record: str(record.get("SLOT_INST_ID")) == slot and record.get("PORT_INST_ID"),
+        )
+
+
+def _created_network_url(payload, data):
+    if data.get("ntwkInstanceId"):
+        return f"/networks?NETWORK_INST_ID={data['ntwkInstanceId']}"
+
+
+def _created_amo_url(payload, data):
+    if data.get("amoName"):
+        return f"/amoUDAs?NAME={data['amoName']}"
+
+
+# Read-your-writes policy per (method, endpoint): builds the GET that returns the record just
+# written, optionally with a check each returned record must pass, and the write only returns
+# once Granite serves it. Other writes wait GRANITE_WRITE_FALLBACK_WAIT instead.
+READ_AFTER_WRITE = {
+    ("POST", "/paths"): _created_path_url,
+    ("POST", "/shelves"): _created_shelf_url,
+    ("PUT", "/shelves"): _created_shelf_url,
+    ("POST", "/cards"): _created_card_url,
+    ("POST", "/networks"): _created_network_url,
+    ("POST", "/amos"): _created_amo_url,
+}
+
+
 def get_headers(api_key=None):
     if not api_key:
         if app_config.USAGE_DESIGNATION == "PRODUCTION":
@@ -48,9 +92,10 @@ def _handle_granite_resp(url, method, resp=None, payload=None, timeout=False):
     else:
         if resp.status_code == 200:
             try:
+                data = resp.json()
                 if method in ["POST", "PUT"]:
-                    sleep(2)
-                return resp.json()
+                    _wait_for_write(url, method, payload, data)
+                return data
             except (ValueError, AttributeError):
                 message = (
                     f"Failed to decode JSON for Granite response. Status Code: {resp.status_code} "
@@ -67,6 +112,50 @@ def _handle_granite_resp(url, method, resp=None, payload=None, timeout=False):
             abort(500, message)
 
 
+def _wait_for_write(url, method, payload, data):
+    """Poll, with exponential backoff, until Granite serves the record a write created"""
+    policy = READ_AFTER_WRITE.get((method, url.split(GRANITE_COMMON_PATH, 1)[-1].split("?")[0]))
+    read_endpoint = policy(payload or {}, data) if policy and isinstance(data, dict) else None
+    if not read_endpoint:
+        sleep(app_config.GRANITE_WRITE_FALLBACK_WAIT)
+        return
+    match = None
+    if isinstance(read_endpoint, tuple):
+        read_endpoint, match = read_endpoint
+
+    delay = app_config.GRANITE_READ_AFTER_WRITE_BACKOFF
+    deadline = monotonic() + app_config.GRANITE_READ_AFTER_WRITE_TIMEOUT
+    while not _granite_has_records(read_endpoint, match):
+        if monotonic() + delay > deadline:
+            logger.warning(f"Granite has not committed {method} {url} yet - READ: {read_endpoint}")
+            return
+        sleep(delay)
+        delay *= 2
+
+
+def _wait_for_returned_write(url, method, payload, resp):
+    """_wait_for_write for callers that take the raw response (return_resp=True)"""
+    if resp.status_code == 200:
+        try:
+            data = resp.json()
+        except ValueError:
+            return
+        _wait_for_write(url, method, payload, data)
+
+
+def _granite_has_records(endpoint, match=None):
+    url = f"{url_config.GRANITE_BASE_URL}{GRANITE_COMMON_PATH}{endpoint}"
+    try:
+        resp = http_pool.get("granite", url, headers=get_headers(), timeout=30, verify=False)
+        records = resp.json()
+    except (ValueError, requests.RequestException):
+        return False
+    # Granite answers a query without matches with a {"retString": ...} dict
+    if resp.status_code != 200 or not isinstance(records, list):
+        return False
+    return any(match(record) for record in records) if match else len(records) > 0
+
+
 def get_granite(endpoint, timeout=60, return_resp=False, retry=0, key="") -> Any:
     """Send a GET call to the Granite API and return
     the JSON-formatted response"""
@@ -77,7 +166,7 @@ def get_granite(endpoint, timeout=60, return_resp=False, retry=0, key="") -> Any
     # At least 1 try and N "retry" times to query and read data from Granite (default 1-shot)
     for _ in range(retry + 1):
         try:
-            resp = requests.get(url, headers=headers, timeout=timeout, verify=False)
+            resp = http_pool.get("granite", url, headers=headers, timeout=timeout, verify=False)
             if resp.text.startswith("<!DOCTYPE"):
                 sleep(60)
                 continue
@@ -98,9 +187,10 @@ def post_granite(endpoint, payload, timeout=60, return_resp=False) -> Any:
     url = f"{url_config.GRANITE_BASE_URL}{GRANITE_COMMON_PATH}{endpoint}"
     headers = get_headers()
     try:
-        resp = requests.post(url, headers=headers, json=payload, verify=False, timeout=timeout)
+        resp = http_pool.post("granite", url, headers=headers, json=payload, verify=False, timeout=timeout)
 
         if return_resp and "<!DOCTYPE" not in resp.text:
+            _wait_for_returned_write(url, "POST", payload, resp)
             return resp
         return _handle_granite_resp(url, "POST", resp=resp, payload=payload)
     except (ConnectionError, requests.ConnectionError, requests.ConnectTimeout, requests.ReadTimeout):
@@ -115,9 +205,10 @@ def put_granite(endpoint, payload, timeout=60, return_resp=False):
     headers = get_headers()
     try:
         payload["BREAK_LOCK"] = "TRUE"  # Prevent lock errors
-        resp = requests.put(url, headers=headers, json=payload, verify=False, timeout=timeout)
+        resp = http_pool.put("granite", url, headers=headers, json=payload, verify=False, timeout=timeout)
 
         if return_resp and "<!DOCTYPE" not in resp.text:
+            _wait_for_returned_write(url, "PUT", payload, resp)
             return resp
         return _handle_granite_resp(url, "PUT", resp=resp, payload=payload)
     except (ConnectionError, requests.ConnectionError, requests.ConnectTimeout, requests.ReadTimeout):
@@ -131,7 +222,7 @@ def delete_granite(endpoint, payload, timeout=60, return_resp=False) -> Any:
     url = f"{url_config.GRANITE_BASE_URL}{GRANITE_COMMON_PATH}{endpoint}"
     headers = get_headers()
     try:
-        resp = requests.delete(url, headers=headers, json=payload, verify=False, timeout=timeout)
+        resp = http_pool.delete("granite", url, headers=headers, json=payload, verify=False, timeout=timeout)
 
         if return_resp and "<!DOCTYPE" not in resp.text:
             return resp
@@ -7,13 +7,17 @@ from typing import Tuple
 
 from arda_app.common import url_config, auth_config
 from common_sense.common.errors import abort
+from common_sense.dll import http_pool
 from arda_app.dll.granite import get_device_fqdn, get_device_model, get_device_vendor
 from arda_app.dll.ipc import get_device_by_hostname
 from arda_app.dll.sense import get_sense
 from common_sense.common.device import verify_device_connectivity
+from common_sense.dll.token_cache import TokenCache
 
 logger = logging.getLogger(__name__)
 
+TOKEN_EXPIRES_IN = 60
+
 
 def _generate_header(token=None):
     header = {"Content-Type": "application/json", "Accept": "application/json"}
@@ -22,7 +26,7 @@ def _generate_header(token=None):
     return header
 
 
-def _create_token():
+def _request_token():
     """get a token to authenticate calls to MDSO"""
 
     headers = _generate_header()
@@ -31,12 +35,17 @@ def _create_token():
         "username": auth_config.MDSO_USER_PROD,
         "password": auth_config.MDSO_PASS_PROD,
         "tenant": "master",
-        "expires_in": 60,
+        "expires_in": TOKEN_EXPIRES_IN,
         "grant_type": "password",
     }
     try:
-        r = requests.post(
-            f"{url_config.MDSO_PROD_URL}/tron/api/v1/oauth2/tokens", headers=headers, json=data, verify=False, timeout=30
+        r = http_pool.post(
+            "mdso",
+            f"{url_config.MDSO_PROD_URL}/tron/api/v1/oauth2/tokens",
+            headers=headers,
+            json=data,
+            verify=False,
+            timeout=30,
         )
         if r.status_code in [200, 201]:
             token = r.json()["accessToken"]
@@ -47,26 +56,26 @@ def _create_token():
         abort(500, "Error Code: M002 - Connection Timeout at authentication with MDSO.")
 
 
-def _delete_token(token):
-    if token:
-        headers = _generate_header(token)
-        try:
-            requests.delete(
-                f"{url_config.MDSO_PROD_URL}/tron/api/v1/oauth2/tokens/{token}",
-                headers=headers,
-                verify=False,
-                timeout=300,
-            )
-        except Exception:
-            logger.info("Unable to delete token")
+_tokens = TokenCache(_request_token, ttl=TOKEN_EXPIRES_IN)
+
+
+def _create_token():
+    return _tokens.get()
 
 
 def mdso_get(endpoint, params=None, timeout=30):
     token = _create_token()
-    headers = _generate_header(token)
     try:
-        r = requests.get(
-            f"{url_config.MDSO_PROD_URL}{endpoint}", headers=headers, params=params, timeout=timeout, verify=False
+        r = _tokens.send(
+            lambda token: http_pool.get(
+                "mdso",
+                f"{url_config.MDSO_PROD_URL}{endpoint}",
+                headers=_generate_header(token),
+                params=params,
+                timeout=timeout,
+                verify=False,
+            ),
+            token,
         )
         if r.status_code == 200:
             logger.info(f"GET response from MDSO: \n{r.json()}")
@@ -80,20 +89,20 @@ def mdso_get(endpoint, params=None, timeout=30):
     except (ConnectionError, requests.Timeout, requests.ConnectionError):
         abort(500, f"Timeout - Error Code: M004 - Timeout at MDSO for request: {endpoint}.")
 
-    finally:
-        _delete_token(token)
-
 
 def mdso_post(endpoint, payload, timeout=60):
     token = _create_token()
-    headers = _generate_header(token)
     try:
-        r = requests.post(
-            f"{url_config.MDSO_PROD_URL}{endpoint}",
-            headers=headers,
-            json=payload if payload else None,
-            timeout=timeout,
-            verify=False,
+        r = _tokens.send(
+            lambda token: http_pool.post(
+                "mdso",
+                f"{url_config.MDSO_PROD_URL}{endpoint}",
+                headers=_generate_header(token),
+                json=payload if payload else None,
+                timeout=timeout,
+                verify=False,
+            ),
+            token,
         )
         if r.status_code in {201, 202}:
             logger.info(f"MDSO POST response: \n{r.json()}")
@@ -107,16 +116,20 @@ def mdso_post(endpoint, payload, timeout=60):
     except (ConnectionError, requests.Timeout, requests.ConnectionError):
         abort(500, f"Timeout - Error Code: M006 - Timeout at MDSO for request: {endpoint} | payload: {payload}")
 
-    finally:
-        _delete_token(token)
-
 
 def mdso_delete(endpoint, params=None, timeout=30):
     token = _create_token()
-    headers = _generate_header(token)
     try:
-        r = requests.delete(
-            f"{url_config.MDSO_PROD}{endpoint}", headers=headers, params=params, timeout=timeout, verify=False
+        r = _tokens.send(
+            lambda token: http_pool.delete(
+                "mdso",
+                f"{url_config.MDSO_PROD}{endpoint}",
+                headers=_generate_header(token),
+                params=params,
+                timeout=timeout,
+                verify=False,
+            ),
+            token,
         )
         if r.status_code == 204:
             return
@@ -126,8 +139,6 @@ def mdso_delete(endpoint, params=None, timeout=30):
 
     except Exception as e:
         logger.debug(f"URL: {endpoint}\nDelete error: {e}")
-    finally:
-        _delete_token(token)
 
 
 def _get_network_device(hostname, timeout=30, retry=2, quick_return=False):
@@ -0,0 +1,166 @@
+"""Benchmark: Granite write latency with read-your-writes polling vs the old fixed sleep
+
+Replays the Granite calls of a circuit design against a local Granite stub. The
+stub makes created paths and shelves visible to reads only after a commit lag,
+like Granite does under load:
+
+- per design: POST /paths, POST /shelves, the read-backs callers make right
+  after them, then PUTs to /ports, /paths and /shelves
+- read-after-write: post_granite/put_granite as shipped (READ_AFTER_WRITE polls
+  the created record with exponential backoff, the PUTs wait
+  GRANITE_WRITE_FALLBACK_WAIT)
+- no-wait: READ_AFTER_WRITE emptied and no fallback wait, i.e. the bare request cost; read-backs
+  that find nothing are counted as stale
+- fixed sleep: the removed ``sleep(2)`` after every POST/PUT, projected as
+  no-wait time + 2 s per write (running it would take minutes)
+
+Usage (from arda/):
+    python -m benchmarks.bench_granite_writes
+    python -m benchmarks.bench_granite_writes --designs 20 --commit-lag-ms 300
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from arda_app.dll import granite
+
+FIXED_SLEEP_S = 2.0
+NO_RECORDS = {"retString": "No records found with the specified search criteria...", "retCode": 1}
+
+
+class GraniteStub(ThreadingHTTPServer):
+    """Granite REST stub whose creates become readable ``commit_lag`` seconds after the write"""
+
+    daemon_threads = True
+
+    def __init__(self, commit_lag):
+        super().__init__(("127.0.0.1", 0), GraniteHandler)
+        self.commit_lag = commit_lag
+        self.visible_at = {}
+        self.ids = itertools.count(2600000)
+        self.lock = threading.Lock()
+
+    def create(self, key):
+        with self.lock:
+            self.visible_at[key] = time.monotonic() + self.commit_lag
+
+    def visible(self, key):
+        with self.lock:
+            return self.visible_at.get(key, float("inf")) <= time.monotonic()
+
+
+class GraniteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self, body):
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _request(self):
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length)) if length else {}
+        return url.path.rsplit("/", 1)[-1], {k: v[0] for k, v in parse_qs(url.query).items()}, body
+
+    def do_GET(self):
+        resource, query, _ = self._request()
+        if resource == "paths" and self.server.visible(("path", query.get("CIRC_PATH_INST_ID"))):
+            self._reply([{"CIRC_PATH_INST_ID": query["CIRC_PATH_INST_ID"]}])
+        elif resource == "equipmentBuildouts" and self.server.visible(("shelf", query.get("EQUIP_NAME"))):
+            self._reply([{"EQUIP_NAME": query["EQUIP_NAME"], "PORT_USE": "USED"}])
+        else:
+            self._reply(NO_RECORDS)
+
+    def do_POST(self):
+        resource, _, body = self._request()
+        if resource == "paths":
+            path_id = str(next(self.server.ids))
+            self.server.create(("path", path_id))
+            self._reply({"retString": "Path Added", "pathInstanceId": path_id})
+        elif resource == "shelves":
+            self.server.create(("shelf", body["SHELF_NAME"].split("/")[0]))
+            self._reply({"retString": "Shelf Added"})
+        else:
+            self._reply({"retString": "Added"})
+
+    def do_PUT(self):
+        self._request()
+        self._reply({"retString": "Updated"})
+
+    def log_message(self, *args):
+        pass
+
+
+def replay_design(n):
+    """Granite calls of one circuit design; returns (writes, stale read-backs)"""
+    tid = f"BENCH{n:05d}W"
+    path = granite.post_granite("/paths", {"PATH_NAME": f"{n}.L1XX.{n:06d}..CHTR", "PATH_STATUS": "Planned"})
+    granite.post_granite("/shelves", {"SHELF_NAME": f"{tid}/999.9999.999.99/RTR", "SITE_NAME": "BENCH"})
+    stale = 0
+    for read_back in (f"/paths?CIRC_PATH_INST_ID={path['pathInstanceId']}", f"/equipmentBuildouts?EQUIP_NAME={tid}"):
+        stale += not isinstance(granite.get_granite(read_back), list)
+    for slot in range(4):
+        granite.put_granite("/ports", {"PORT_INST_ID": f"{n}{slot}", "PORT_STATUS": "ASSIGNED"})
+    for _ in range(6):
+        granite.put_granite("/paths", {"PATH_INST_ID": path["pathInstanceId"], "PATH_STATUS": "Designed"})
+    for _ in range(2):
+        granite.put_granite("/shelves", {"SHELF_NAME": tid, "SHELF_STATUS": "Auto-Designed"})
+    return 14, stale
+
+
+def replay(designs):
+    writes = stale = 0
+    start = time.perf_counter()
+    for n in range(designs):
+        design_writes, design_stale = replay_design(n)
+        writes += design_writes
+        stale += design_stale
+    return time.perf_counter() - start, writes, stale
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--designs", type=int, default=10, help="circuit designs replayed per mode")
+    parser.add_argument("--commit-lag-ms", type=float, default=150, help="delay before the stub serves a create")
+    args = parser.parse_args()
+
+    stub = GraniteStub(args.commit_lag_ms / 1000)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    granite.url_config.GRANITE_BASE_URL = f"http://127.0.0.1:{stub.server_port}"
+
+    policies = dict(granite.READ_AFTER_WRITE)
+    fallback_wait = granite.app_config.GRANITE_WRITE_FALLBACK_WAIT
+    try:
+        read_after_write_s, writes, stale = replay(args.designs)
+        assert stale == 0, f"{stale} read-backs missed a create despite READ_AFTER_WRITE"
+        granite.READ_AFTER_WRITE.clear()
+        granite.app_config.GRANITE_WRITE_FALLBACK_WAIT = 0
+        no_wait_s, _, no_wait_stale = replay(args.designs)
+    finally:
+        granite.READ_AFTER_WRITE.update(policies)
+        granite.app_config.GRANITE_WRITE_FALLBACK_WAIT = fallback_wait
+        stub.shutdown()
+    fixed_sleep_s = no_wait_s + FIXED_SLEEP_S * writes
+
+    print(f"\nGranite write replay: {args.designs} designs, {writes} writes, {args.commit_lag_ms:.0f}ms commit lag")
+    print(f"  {'mode':<18} {'total':>10} {'per design':>12} {'stale reads':>12}")
+    for mode, seconds, misses in (
+        ("fixed sleep (2s)", fixed_sleep_s, 0),
+        ("read-after-write", read_after_write_s, stale),
+        ("no-wait", no_wait_s, no_wait_stale),
+    ):
+        print(f"  {mode:<18} {seconds:>9.2f}s {seconds / args.designs * 1000:>10.0f}ms {misses:>12}")
+    print(f"  speedup vs fixed sleep: {fixed_sleep_s / read_after_write_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,3 +16,9 @@ accesslog = f"{log_path}/gunicorn/gunicorn.log"
 loglevel = "info"
 max_requests_jitter = 200
 timeout = 0
+
+
+def worker_exit(server, worker):
+    from common_sense.dll import http_pool
+
+    http_pool.close_all()
@@ -1,9 +1,12 @@
 import base64
 import pytest
+import requests
 
 from fastapi.testclient import TestClient
 from arda_app.main import app as fastapi_app
 from arda_app.common import auth_config
+from arda_app.dll import mdso
+from common_sense.dll import http_pool
 
 
 @pytest.fixture
@@ -18,6 +21,22 @@ def client(request):
     return client
 
 
+@pytest.fixture(autouse=True)
+def pooled_requests_through_module_api(monkeypatch):
+    """Send http_pool calls through requests.<method> so tests can keep mocking requests.get/post/..."""
+    monkeypatch.setattr(
+        http_pool.PooledSession,
+        "request",
+        lambda self, method, url, **kwargs: getattr(requests, method.lower())(url, **kwargs),
+    )
+
+
+@pytest.fixture(autouse=True)
+def fresh_mdso_tokens():
+    """Start every test without a cached MDSO token"""
+    mdso._tokens.invalidate()
+
+
 @pytest.fixture
 def lab_eline_158():
     """The expected JSON response from Arda for CID 51.L1XX.009158..TWCC"""
@@ -103,6 +103,90 @@ def test_handle_granite_resp(monkeypatch):
         assert granite._handle_granite_resp("URL", "POST", mock_resp) is None
 
 
+@mark.unittest
+def test_handle_granite_resp_read_after_write(monkeypatch):
+    delays, reads = [], []
+    visible = iter([False, False, True])
+    monkeypatch.setattr(granite, "sleep", delays.append)
+    monkeypatch.setattr(granite, "monotonic", lambda: sum(delays))
+    monkeypatch.setattr(granite, "_granite_has_records", lambda endpoint, match: reads.append(endpoint) or next(visible))
+    created = {"retString": "Path Added", "pathInstanceId": "2638669"}
+    mock_resp = MockResponse(f"https://granite{granite.GRANITE_COMMON_PATH}/paths", 200, created)
+
+    # Created path - polled with backoff until Granite serves it
+    assert granite._handle_granite_resp(mock_resp.url, "POST", mock_resp, {"PATH_NAME": "TEST"}) == created
+    assert reads == ["/paths?CIRC_PATH_INST_ID=2638669"] * 3
+    assert delays == [0.1, 0.2]
+
+    # Updates and endpoints without a policy only wait the fallback
+    reads.clear()
+    delays.clear()
+    assert granite._handle_granite_resp(mock_resp.url, "PUT", mock_resp, {"PATH_INST_ID": "1"}) == created
+    mock_resp = MockResponse(f"https://granite{granite.GRANITE_COMMON_PATH}/ports", 200, {"retString": "Port Updated"})
+    assert granite._handle_granite_resp(mock_resp.url, "POST", mock_resp, {}) == {"retString": "Port Updated"}
+    assert reads == []
+    assert delays == [0.25, 0.25]
+
+    # Never visible - gives up at the deadline and still returns the write response
+    delays.clear()
+    monkeypatch.setattr(granite, "_granite_has_records", lambda endpoint, match: False)
+    mock_resp = MockResponse(f"https://granite{granite.GRANITE_COMMON_PATH}/shelves", 200, {"retString": "Shelf Added"})
+    assert granite._handle_granite_resp(mock_resp.url, "POST", mock_resp, {"SHELF_NAME": "TID/999/RTR"}) == {
+        "retString": "Shelf Added"
+    }
+    assert delays == [0.1, 0.2, 0.4, 0.8]
+
+
+@mark.unittest
+def test_read_after_write_policies(monkeypatch):
+    reads = []
+    monkeypatch.setattr(granite, "sleep", lambda *args, **kwargs: None)
+    monkeypatch.setattr(granite, "_granite_has_records", lambda endpoint, match: reads.append((endpoint, match)) or True)
+
+    def write(method, endpoint, payload, data):
+        url = f"https://granite{granite.GRANITE_COMMON_PATH}{endpoint}"
+        granite._handle_granite_resp(url, method, MockResponse(url, 200, data), payload)
+        return reads.pop()
+
+    card = {"SHELF_NAME": "TID/999.9999.999.99/RTR", "CARD_TEMPLATE_NAME": "SFP", "SLOT_INST_ID": 12}
+    endpoint, match = write("POST", "/cards", card, {"retString": "Card Added"})
+    assert endpoint == "/equipmentBuildouts?EQUIP_NAME=TID"
+    assert match({"SLOT_INST_ID": "12", "PORT_INST_ID": "34"})
+    assert not match({"SLOT_INST_ID": "12"})
+    assert not match({"SLOT_INST_ID": "13", "PORT_INST_ID": "34"})
+
+    assert write("POST", "/networks", {}, {"ntwkInstanceId": "2637960"}) == ("/networks?NETWORK_INST_ID=2637960", None)
+    assert write("POST", "/amos", {}, {"amoName": "MN-EDGE.CUST"}) == ("/amoUDAs?NAME=MN-EDGE.CUST", None)
+    shelf = {"SHELF_NAME": "TID/999.9999.999.99/RTR"}
+    assert write("PUT", "/shelves", shelf, {"retString": "Shelf Added"}) == ("/equipmentBuildouts?EQUIP_NAME=TID", None)
+
+    # Shelf updates and failed creates have nothing to read back
+    url = f"https://granite{granite.GRANITE_COMMON_PATH}/shelves"
+    granite._handle_granite_resp(url, "PUT", MockResponse(url, 200, {"retString": "Shelf Updated"}), shelf)
+    url = f"https://granite{granite.GRANITE_COMMON_PATH}/cards"
+    granite._handle_granite_resp(url, "POST", MockResponse(url, 200, {"httpCode": 400, "retString": "No slot"}), card)
+    assert reads == []
+
+
+@mark.unittest
+def test_granite_has_records(monkeypatch):
+    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: MockResponse("URL", 200, [{"EQUIP_NAME": "TID"}]))
+    assert granite._granite_has_records("/equipmentBuildouts?EQUIP_NAME=TID") is True
+
+    def in_slot(record):
+        return record.get("SLOT_INST_ID") == "12"
+
+    assert granite._granite_has_records("/equipmentBuildouts?EQUIP_NAME=TID", in_slot) is False
+    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: MockResponse("URL", 200, [{"SLOT_INST_ID": "12"}]))
+    assert granite._granite_has_records("/equipmentBuildouts?EQUIP_NAME=TID", in_slot) is True
+
+    monkeypatch.setattr(requests, "get", lambda *args, **kwargs: MockResponse("URL", 200, {"retString": "No records"}))
+    assert granite._granite_has_records("/equipmentBuildouts?EQUIP_NAME=TID") is False
+
+    monkeypatch.setattr(requests, "get", mock_granite_requests_connection_error)
+    assert granite._granite_has_records("/equipmentBuildouts?EQUIP_NAME=TID") is False
+
+
 @mark.unittest
 def test_get_granite(monkeypatch):
     mock_resp = SimpleNamespace(text="<!DOCTYPE")
@@ -129,12 +213,15 @@ def test_get_granite(monkeypatch):
 
 @mark.unittest
 def test_post_granite(monkeypatch):
-    mock_resp = SimpleNamespace(text="<!NO_DOCTYPE")
+    waits = []
+    mock_resp = SimpleNamespace(text="<!NO_DOCTYPE", status_code=200, json=lambda: {"amoName": "MN-EDGE.CUST"})
     monkeypatch.setattr(requests, "post", lambda *args, **kwargs: mock_resp)
     monkeypatch.setattr(granite, "_handle_granite_resp", lambda *args, **kwargs: None)
+    monkeypatch.setattr(granite, "_wait_for_write", lambda *args: waits.append(args))
 
-    # Test success - return_resp = True
-    assert granite.post_granite("endpoint", "payload", return_resp=True) == mock_resp
+    # Test success - return_resp = True still waits for the write
+    assert granite.post_granite("/amos", "payload", return_resp=True) == mock_resp
+    assert waits[0][1:] == ("POST", "payload", {"amoName": "MN-EDGE.CUST"})
 
     # Test success - return_resp = False
     assert granite.post_granite("endpoint", "payload", return_resp=False) is None
@@ -148,7 +235,7 @@ def test_post_granite(monkeypatch):
 
 @mark.unittest
 def test_put_granite(monkeypatch):
-    mock_resp = SimpleNamespace(text="<!NO_DOCTYPE")
+    mock_resp = SimpleNamespace(text="<!NO_DOCTYPE", status_code=500)
     payload = {"BREAK_LOCK": "FALSE"}
     monkeypatch.setattr(requests, "put", lambda *args, **kwargs: mock_resp)
     monkeypatch.setattr(granite, "_handle_granite_resp", lambda *args, **kwargs: None)
@@ -7,6 +7,7 @@ import urllib3
 
 import beorn_app
 from common_sense.common.errors import abort
+from common_sense.dll import http_pool
 from beorn_app.common.endpoints import DENODO_UDA, GRANITE_ELEMENTS, GRANITE_JSON_PATH, DENODO_CIRCUIT_DEVICES
 from beorn_app.dll.hydra import get_headers
 
@@ -28,7 +29,8 @@ hydra_base_url = beorn_app.url_config.HYDRA_BASE_URL
 def path_update_by_parameters(headers_info, update_parameters):
     """MDSO asynchronous update using the resource API with specified json-formatted parameters"""
     try:
-        response = requests.post(
+        response = http_pool.post(
+            "hydra",
             f"{hydra_base_url}{GRANITE_JSON_PATH}?validate=false",
             headers=headers_info,
             json=update_parameters,
@@ -52,7 +54,8 @@ def call_denodo_for_circuit_devices(cid):
         if retrycount > 0:
             sleep(3)
         try:
-            r = requests.get(
+            r = http_pool.get(
+                "hydra",
                 url=f"{beorn_app.url_config.HYDRA_BASE_URL}{DENODO_CIRCUIT_DEVICES}",
                 headers=headers,
                 params={"cid": cid},
@@ -100,7 +103,7 @@ def call_denodo_for_uda(**kwargs):
         if retrycount > 0:
             sleep(3)
         try:
-            r = requests.get(denodo_uda_url, verify=False, timeout=60)
+            r = http_pool.get("hydra", denodo_uda_url, verify=False, timeout=60)
             if r.status_code != 200:
                 if retrycount > 0:
                     logger.exception(f"Received {r.status_code} status from granite")
@@ -136,7 +139,8 @@ def get_granite_devices_from_cid(cid):
     params = {"CIRC_PATH_HUM_ID": cid}
 
     try:
-        r = requests.get(
+        r = http_pool.get(
+            "granite",
             f"{beorn_app.url_config.GRANITE_BASE_URL}{GRANITE_ELEMENTS}",
             params=params,
             headers=headers,
@@ -5,23 +5,28 @@ import urllib3
 import beorn_app
 
 from common_sense.common.errors import abort
+from common_sense.dll import http_pool
+from common_sense.dll.token_cache import TokenCache
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 logger = logging.getLogger(__name__)
 
+TOKEN_EXPIRES_IN = 60
 
-def create_token():
+
+def _request_token():
     """get a token to authenticate calls to MDSO"""
     headers = {"Content-type": "application/json"}
     data = {
         "username": beorn_app.auth_config.MDSO_USER,
         "password": beorn_app.auth_config.MDSO_PASS,
         "tenant": "master",
-        "expires_in": 60,
+        "expires_in": TOKEN_EXPIRES_IN,
         "grant_type": "password",
     }
     try:
-        r = requests.post(
+        r = http_pool.post(
+            "mdso",
             f"{beorn_app.url_config.MDSO_BASE_URL}/tron/api/v1/oauth2/tokens",
             headers=headers,
             json=data,
@@ -49,15 +54,17 @@ def create_token():
         abort(500)
 
 
+# The worker's only MDSO token cache, also used by beorn_app.dll.mdso
+tokens = TokenCache(_request_token, ttl=TOKEN_EXPIRES_IN)
+
+
+def create_token():
+    """get a token to authenticate calls to MDSO"""
+    return tokens.get()
+
+
 def delete_token(token):
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-        "Authorization": "token {}".format(token),
-    }
-    requests.delete(
-        f"{beorn_app.url_config.MDSO_BASE_URL}/tron/api/v1/oauth2/tokens/{token}",
-        headers=headers,
-        verify=False,
-        timeout=300,
-    )
+    """Release a token from create_token
+
+    The token is shared with other threads and left to expire, so nothing is deleted in MDSO.
+    """
@@ -18,6 +18,12 @@ class AppConfig(BaseSettings):
     MS_NAME: str = "BEORN"
     USAGE_DESIGNATION: str = "STAGE"
 
+    # Pooled upstream HTTP sessions (common_sense.dll.http_pool)
+    HTTP_POOL_CONNECTIONS: int = 10
+    HTTP_POOL_MAXSIZE: int = 16
+    HTTP_MAX_RETRIES: int = 2
+    HTTP_RETRY_BACKOFF: float = 0.5
+
     @model_validator(mode="after")
     def environ_check(self) -> "AppConfig":
         if not self.USAGE_DESIGNATION:
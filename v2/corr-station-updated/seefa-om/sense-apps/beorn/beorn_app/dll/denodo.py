@@ -5,6 +5,7 @@ import requests
 
 import beorn_app
 from common_sense.common.errors import abort
+from common_sense.dll import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +18,7 @@ def denodo_hydra_get(endpoint):
         if retrycount > 0:
             sleep(3)
         try:
-            r = requests.get(url, verify=False, timeout=60)
+            r = http_pool.get("hydra", url, verify=False, timeout=60)
             if r.status_code in [200, 201, 202, 204]:
                 return r.json()
             else:
@@ -46,7 +47,7 @@ def denodo_get(endpoint, **kwargs):
         if retrycount > 0:
             sleep(3)
         try:
-            r = requests.get(url, verify=False, timeout=60)
+            r = http_pool.get("hydra", url, verify=False, timeout=60)
             if r.status_code // 100 == 2:
                 return r.json()
             else:
@@ -5,6 +5,7 @@ from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout
 
 import beorn_app
 from common_sense.common.errors import abort
+from common_sense.dll import http_pool
 from beorn_app.common.endpoints import GRANITE_ELEMENTS, GRANITE_PATHS, GRANITE_UDA
 from beorn_app.dll.hydra import get_headers
 
@@ -17,7 +18,7 @@ def granite_get(endpoint, params=None, timeout=60, retry=0, best_effort=False):
     err_msg = ""
     for _ in range(retry + 1):
         try:
-            resp = requests.get(url=url, headers=headers, params=params, timeout=timeout, verify=False)
+            resp = http_pool.get("granite", url=url, headers=headers, params=params, timeout=timeout, verify=False)
             if resp.status_code == 200:
                 granite_resp = resp.json()
                 # Check for CID not found
@@ -46,8 +47,13 @@ def granite_put(endpoint, payload):
     the JSON-formatted response"""
     headers = get_headers()
     try:
-        r = requests.put(
-            f"{beorn_app.url_config.GRANITE_BASE_URL}{endpoint}", headers=headers, json=payload, verify=False, timeout=60
+        r = http_pool.put(
+            "granite",
+            f"{beorn_app.url_config.GRANITE_BASE_URL}{endpoint}",
+            headers=headers,
+            json=payload,
+            verify=False,
+            timeout=60,
         )
         if r.status_code != 200:
             abort(
@@ -146,7 +152,7 @@ def get_mne_network_id(circuit_id, timeout=60):
     params = {"CIRC_PATH_HUM_ID": circuit_id}
 
     try:
-        response = requests.get(url_paths, headers=headers, params=params, timeout=timeout, verify=False)
+        response = http_pool.get("granite", url_paths, headers=headers, params=params, timeout=timeout, verify=False)
         path_inst_id = response.json()[0]["pathInstanceId"]
         params = {"CIRC_PATH_INST_ID": path_inst_id}
     except (ConnectionError, ConnectTimeout, ReadTimeout):
@@ -155,7 +161,7 @@ def get_mne_network_id(circuit_id, timeout=60):
         abort(502, "Circuit ID not found")
 
     try:
-        response = requests.get(url_udas, headers=headers, params=params, timeout=timeout, verify=False)
+        response = http_pool.get("granite", url_udas, headers=headers, params=params, timeout=timeout, verify=False)
         udas = response.json()
     except (ConnectionError, ConnectTimeout, ReadTimeout):
         abort(504, "Timeout")
@@ -177,7 +183,7 @@ def update_mne_network_id(circuit_id, network_id, timeout=60):
     params = {"CIRC_PATH_HUM_ID": circuit_id}
 
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=timeout, verify=False)
+        response = http_pool.get("granite", url, headers=headers, params=params, timeout=timeout, verify=False)
         path_inst_id = response.json()[0]["pathInstanceId"]
     except (ConnectionError, ConnectTimeout, ReadTimeout):
         abort(504, "Timeout")
@@ -186,7 +192,7 @@ def update_mne_network_id(circuit_id, network_id, timeout=60):
 
     payload = {"PATH_INST_ID": path_inst_id, "UDA": {"MERAKI SERVICES": {"MERAKI NETWORK ID": network_id}}}
     try:
-        response = requests.put(url, headers=headers, json=payload, verify=False, timeout=timeout)
+        response = http_pool.put("granite", url, headers=headers, json=payload, verify=False, timeout=timeout)
     except (ConnectionError, ConnectTimeout, ReadTimeout):
         abort(504, "Timeout")
 
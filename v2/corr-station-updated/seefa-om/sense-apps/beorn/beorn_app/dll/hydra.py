@@ -1,10 +1,10 @@
 import logging
-import requests
 import beorn_app
 from datetime import datetime, timezone
 
 from time import sleep
 from common_sense.common.errors import abort
+from common_sense.dll import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +35,7 @@ def hydra_get(endpoint, params=None, failout=True):
         if count > 0:
             sleep(5)
         try:
-            r = requests.get(url, headers=headers, params=params, verify=False, timeout=60)
+            r = http_pool.get("hydra", url, headers=headers, params=params, verify=False, timeout=60)
             if r.status_code in [200, 201, 202, 204]:
                 return r.json()
             else:
@@ -7,6 +7,8 @@ from time import sleep
 import beorn_app
 
 from common_sense.common.errors import abort
+from common_sense.dll import http_pool
+from beorn_app.common.mdso_auth import create_token, tokens
 from beorn_app.common.mdso_operations import resource_status
 
 logger = logging.getLogger(__name__)
@@ -16,58 +18,18 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 RESOURCES_PATH = "/bpocore/market/api/v1/resources"
 
 
-def _create_token():
-    """get a token to authenticate calls to MDSO"""
-    headers = {"Content-type": "application/json", "Accept": "application/json"}
-    data = {
-        "username": beorn_app.auth_config.MDSO_USER,
-        "password": beorn_app.auth_config.MDSO_PASS,
-        "tenant": "master",
-        "expires_in": 60,
-        "grant_type": "password",
-    }
-    try:
-        logger.info(data)
-        logger.info(f"{beorn_app.url_config.MDSO_BASE_URL}/tron/api/v1/oauth2/tokens")
-        r = requests.post(
-            f"{beorn_app.url_config.MDSO_BASE_URL}/tron/api/v1/oauth2/tokens",
-            headers=headers,
-            json=data,
-            verify=False,
-            timeout=30,
-        )
-        if r.status_code in [200, 201]:
-            try:
-                return r.json()["accessToken"]
-            except ValueError:
-                abort(502, "Could not parse response from MDSO for authentication")
-        else:
-            abort(502, f"Error Code: M001 - Unexpected status code: {r.status_code} at authentication with MDSO")
-    except (ConnectionError, requests.ConnectionError):
-        abort(502, "Failed to initialize connection to MDSO to complete authentication")
-    except requests.ReadTimeout:
-        abort(504, "Error Code: M002 - Timed out reading data from MDSO during authentication")
-    except Exception:
-        abort(502, "Unknown exception occurred during authentication with MDSO")
-
-
-def _delete_token(token):
-    if token:
-        headers = {"Content-Type": "application/json", "Accept": "application/json", "Authorization": f"Bearer {token}"}
-        requests.delete(
-            f"{beorn_app.url_config.MDSO_BASE_URL}/tron/api/v1/oauth2/tokens/{token}",
-            headers=headers,
-            verify=False,
-            timeout=300,
-        )
-
-
 def mdso_get(endpoint, timeout=30):
-    token = _create_token()
-    headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
+    token = create_token()
     try:
-        r = requests.get(
-            f"{beorn_app.url_config.MDSO_BASE_URL}{endpoint}", headers=headers, timeout=timeout, verify=False
+        r = tokens.send(
+            lambda token: http_pool.get(
+                "mdso",
+                f"{beorn_app.url_config.MDSO_BASE_URL}{endpoint}",
+                headers={"Accept": "application/json", "Authorization": f"Bearer {token}"},
+                timeout=timeout,
+                verify=False,
+            ),
+            token,
         )
         if r.status_code == 200:
             try:
@@ -83,16 +45,25 @@ def mdso_get(endpoint, timeout=30):
         abort(502, f"Failed to initialize connection to MDSO to complete: {endpoint}")
     except requests.ReadTimeout:
         abort(504, f"Error Code: M004 - Timed out reading data from MDSO to complete {endpoint}")
-    finally:
-        _delete_token(token)
 
 
 def mdso_post(endpoint, data, timeout=30, resync=False):
-    token = _create_token()
-    headers = {"Accept": "application/json", "Content-Type": "application/json", "Authorization": f"Bearer {token}"}
+    token = create_token()
     try:
-        r = requests.post(
-            f"{beorn_app.url_config.MDSO_BASE_URL}{endpoint}", headers=headers, json=data, verify=False, timeout=timeout
+        r = tokens.send(
+            lambda token: http_pool.post(
+                "mdso",
+                f"{beorn_app.url_config.MDSO_BASE_URL}{endpoint}",
+                headers={
+                    "Accept": "application/json",
+                    "Content-Type": "application/json",
+                    "Authorization": f"Bearer {token}",
+                },
+                json=data,
+                verify=False,
+                timeout=timeout,
+            ),
+            token,
         )
         if r.status_code == 201:
             try:
@@ -120,16 +91,21 @@ def mdso_post(endpoint, data, timeout=30, resync=False):
         )
     except Exception:
         abort(502, f"MDSO POST - Unknown exception occurred at MDSO for endpoint: {endpoint} | payload: {data}")
-    finally:
-        _delete_token(token)
 
 
 def mdso_post_request(endpoint, data, timeout=30):
-    token = _create_token()
-    headers = {"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
+    token = create_token()
     try:
-        r = requests.post(
-            f"{beorn_app.url_config.MDSO_BASE_URL}{endpoint}", headers=headers, data=data, verify=False, timeout=timeout
+        r = tokens.send(
+            lambda token: http_pool.post(
+                "mdso",
+                f"{beorn_app.url_config.MDSO_BASE_URL}{endpoint}",
+                headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"},
+                data=data,
+                verify=False,
+                timeout=timeout,
+            ),
+            token,
         )
         if r.status_code == 201:
             try:
@@ -152,8 +128,6 @@ def mdso_post_request(endpoint, data, timeout=30):
         )
     except Exception:
         abort(502, f"MDSO POST - Unknown exception occurred at MDSO for endpoint: {endpoint} | payload: {data}")
-    finally:
-        _delete_token(token)
 
 
 def service_id_lookup(cid, resource_type="NetworkService"):
@@ -262,7 +236,7 @@ def poll_resource_status(resource_id):
     cpe_ip = "no ip found"
 
     while timer >= 0:
-        token = _create_token()
+        token = create_token()
         headers = {"Accept": "application/json", "Content-Type": "application/json", "Authorization": f"token {token}"}
 
         logger.info("TIMER = %s" % str(timer))
@@ -284,7 +258,6 @@ def poll_resource_status(resource_id):
             if cpe_ip_resource["orchState"] == "active":
                 logger.info("CONFIRMED CPE_IP_RESOURCE ORCH STATE IS ACTIVE")
                 cpe_ip = cpe_ip_resource["properties"]["ip"]
-                _delete_token(token)
                 return {"CPE_IP": cpe_ip, "FAIL_REASON": None}, 200
 
             elif cpe_ip_resource["orchState"] == "failed":
@@ -293,11 +266,9 @@ def poll_resource_status(resource_id):
                 else:
                     err_msg = "MDSO IP Provider Resource FAIL"
 
-                _delete_token(token)
                 return {"CPE_IP": cpe_ip, "FAIL_REASON": err_msg}, 400
 
         if timer < 0:
-            _delete_token(token)
             if not err_msg:
                 err_msg = "Timed out awaiting IP from MDSO"
 
@@ -360,7 +331,7 @@ def create_resource(body, product="merakiServices"):
 
 def pill_poll_resource_status(resource_id):
     for pprs_timer in range(0, 7):
-        token = _create_token()
+        token = create_token()
         headers = {"Accept": "application/json", "Content-Type": "application/json", "Authorization": f"token {token}"}
 
         logger.info(f"pprs_timer = {pprs_timer}")
@@ -384,7 +355,6 @@ def pill_poll_resource_status(resource_id):
                 logger.info("CONFIRMED PILL_RESOURCE ORCH STATE IS ACTIVE")
                 logger.info(f"pill resource: {pill_resource}")
                 pill_details = pill_resource["properties"]["pill_details"]
-                _delete_token(token)
                 return pill_details, 200
 
             elif pill_resource["orchState"] != "activating":
@@ -394,11 +364,9 @@ def pill_poll_resource_status(resource_id):
                 else:
                     err_msg = "MDSO PILL RESOURCE FAILED"
                     err_code = "PILL999"
-                _delete_token(token)
                 return {"pill_error_code": err_code, "pill_error": err_msg}, 400
 
         sleep(5)
 
-    _delete_token(token)
     err_msg = "Timed out awaiting light levels from MDSO"
     return {"pill_error_code": "PILL998", "pill_error": err_msg}, 400
@@ -0,0 +1,187 @@
+"""Pooled keep-alive HTTP sessions for upstream APIs (Granite, Hydra/Denodo, MDSO)
+
+``requests.get``/``requests.post`` build and tear down a Session, and with it a
+connection pool, on every call, so each upstream request paid a fresh TCP+TLS
+handshake. This module keeps one ``requests.Session`` per upstream per process,
+shared by every gunicorn thread of the worker (urllib3's connection pools are
+thread-safe). Call sites keep their own timeouts, ``verify`` flags and error
+handling, and the ``requests`` exceptions are unchanged::
+
+    from common_sense.dll import http_pool
+
+    resp = http_pool.get("granite", url, headers=headers, timeout=60, verify=False)
+
+Settings, read from the app's ``AppConfig``:
+
+- ``HTTP_POOL_CONNECTIONS``: hosts pooled per upstream session (default 10)
+- ``HTTP_POOL_MAXSIZE``: keep-alive connections kept per host (default 16, one
+  per gthread)
+- ``HTTP_MAX_RETRIES``: retries of connection failures, which never reached the
+  upstream and are safe for any method (default 2). Read timeouts and error
+  statuses are left to the caller, as before.
+- ``HTTP_RETRY_BACKOFF``: urllib3 backoff factor between those retries (default 0.5)
+
+Sessions do not keep cookies, so nothing leaks between callers that share them.
+``pool_stats()`` returns requests and new connections per upstream; the same
+counts are exported as OpenTelemetry metrics when the API is installed.
+"""
+import importlib
+import logging
+import threading
+from http import cookiejar
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+try:
+    from opentelemetry import metrics
+
+    meter = metrics.get_meter(__name__)
+    REQUESTS_COUNTER = meter.create_counter(
+        "sense.http.client.requests", description="Requests sent through pooled upstream sessions"
+    )
+    CONNECTIONS_COUNTER = meter.create_counter(
+        "sense.http.client.connections.created", description="New connections opened by pooled upstream sessions"
+    )
+except ImportError:
+    REQUESTS_COUNTER = CONNECTIONS_COUNTER = None
+
+logger = logging.getLogger(__name__)
+
+# Modules holding each app's AppConfig instance
+APP_CONFIG_MODULES = ("arda_app.common", "beorn_app", "palantir_app")
+
+DEFAULTS = {
+    "HTTP_POOL_CONNECTIONS": 10,
+    "HTTP_POOL_MAXSIZE": 16,
+    "HTTP_MAX_RETRIES": 2,
+    "HTTP_RETRY_BACKOFF": 0.5,
+}
+
+_sessions = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+def _setting(name):
+    """Pool setting from the running app's AppConfig (looked up lazily to avoid import cycles)"""
+    for module in APP_CONFIG_MODULES:
+        try:
+            return getattr(importlib.import_module(module).app_config, name, DEFAULTS[name])
+        except (ImportError, AttributeError):
+            continue
+    return DEFAULTS[name]
+
+
+def _count(upstream, key, counter):
+    with _lock:
+        stats = _stats.setdefault(upstream, {"requests": 0, "connections_created": 0})
+        stats[key] += 1
+    if counter is not None:
+        counter.add(1, {"upstream": upstream})
+
+
+def _counting_pool(pool_cls, upstream):
+    """Connection pool class that records every new connection for ``upstream``"""
+
+    def _new_conn(self):
+        _count(upstream, "connections_created", CONNECTIONS_COUNTER)
+        return pool_cls._new_conn(self)
+
+    return type(pool_cls.__name__, (pool_cls,), {"_new_conn": _new_conn})
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose pools count the connections they open"""
+
+    def __init__(self, upstream, **kwargs):
+        self.upstream = upstream
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _counting_pool(HTTPConnectionPool, self.upstream),
+            "https": _counting_pool(HTTPSConnectionPool, self.upstream),
+        }
+
+
+class PooledSession(requests.Session):
+    """Keep-alive session for one upstream"""
+
+    def __init__(self, upstream):
+        super().__init__()
+        self.upstream = upstream
+        self.cookies.set_policy(cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+        retries = Retry(
+            total=None,
+            connect=_setting("HTTP_MAX_RETRIES"),
+            read=0,
+            status=0,
+            other=0,
+            redirect=False,
+            backoff_factor=_setting("HTTP_RETRY_BACKOFF"),
+            raise_on_status=False,
+        )
+        adapter = PooledAdapter(
+            upstream,
+            pool_connections=_setting("HTTP_POOL_CONNECTIONS"),
+            pool_maxsize=_setting("HTTP_POOL_MAXSIZE"),
+            max_retries=retries,
+        )
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+
+def get_session(upstream):
+    """The process-wide session for ``upstream``, created on first use"""
+    session = _sessions.get(upstream)
+    if session is None:
+        with _lock:
+            session = _sessions.get(upstream)
+            if session is None:
+                session = _sessions[upstream] = PooledSession(upstream)
+                logger.debug(f"Created pooled HTTP session for upstream '{upstream}'")
+    return session
+
+
+def request(upstream, method, url, **kwargs):
+    """Send a request through the pooled session for ``upstream``"""
+    _count(upstream, "requests", REQUESTS_COUNTER)
+    return get_session(upstream).request(method, url, **kwargs)
+
+
+def get(upstream, url, **kwargs):
+    return request(upstream, "GET", url, **kwargs)
+
+
+def post(upstream, url, **kwargs):
+    return request(upstream, "POST", url, **kwargs)
+
+
+def put(upstream, url, **kwargs):
+    return request(upstream, "PUT", url, **kwargs)
+
+
+def delete(upstream, url, **kwargs):
+    return request(upstream, "DELETE", url, **kwargs)
+
+
+def pool_stats():
+    """Requests sent, connections opened and connections reused per upstream"""
+    with _lock:
+        return {
+            upstream: {**stats, "connections_reused": max(stats["requests"] - stats["connections_created"], 0)}
+            for upstream, stats in _stats.items()
+        }
+
+
+def close_all():
+    """Close every pooled session (e.g. in a gunicorn worker_exit hook)"""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
@@ -0,0 +1,144 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from dll.token_cache import TokenCache
+
+
+class Fetcher:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.error = None
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        if self.error:
+            raise self.error
+        with self.lock:
+            self.calls += 1
+            token = f"token-{self.calls}"
+        time.sleep(self.delay)
+        return token
+
+
+@pytest.mark.unittest
+def test_token_reused_until_refresh_window():
+    fetch = Fetcher()
+    tokens = TokenCache(fetch, ttl=60, refresh_margin=10)
+
+    assert [tokens.get() for _ in range(5)] == ["token-1"] * 5
+    assert fetch.calls == 1
+
+
+@pytest.mark.unittest
+def test_expired_token_refreshed(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    tokens = TokenCache(Fetcher(), ttl=60, refresh_margin=10)
+
+    assert tokens.get() == "token-1"
+    now[0] += 55  # inside the refresh window
+    assert tokens.get() == "token-2"
+    now[0] += 61
+    assert tokens.get() == "token-3"
+
+
+@pytest.mark.unittest
+def test_single_flight_refresh():
+    fetch = Fetcher(delay=0.2)
+    tokens = TokenCache(fetch, ttl=60)
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(tokens.get())) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fetch.calls == 1
+    assert results == ["token-1"] * 16
+
+
+@pytest.mark.unittest
+def test_refresh_window_serves_current_token_while_refreshing(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    tokens = TokenCache(Fetcher(), ttl=60, refresh_margin=10)
+    tokens.get()
+    now[0] += 55
+
+    tokens._refresh_lock.acquire()  # another thread is refreshing
+    try:
+        assert tokens.get() == "token-1"
+    finally:
+        tokens._refresh_lock.release()
+
+
+@pytest.mark.unittest
+def test_failed_early_refresh_keeps_valid_token(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    fetch = Fetcher()
+    tokens = TokenCache(fetch, ttl=60, refresh_margin=10)
+    tokens.get()
+    fetch.error = RuntimeError("MDSO down")
+
+    now[0] += 55
+    assert tokens.get() == "token-1"
+    now[0] += 10
+    with pytest.raises(RuntimeError):
+        tokens.get()
+
+
+@pytest.mark.unittest
+def test_invalidate():
+    tokens = TokenCache(Fetcher(), ttl=60)
+    token = tokens.get()
+
+    tokens.invalidate("some-other-token")
+    assert tokens.get() == token
+
+    tokens.invalidate(token)
+    assert tokens.get() == "token-2"
+
+
+@pytest.mark.unittest
+def test_send_retries_once_with_new_token_on_401():
+    tokens = TokenCache(Fetcher(), ttl=60)
+    sent = []
+
+    def request(token):
+        sent.append(token)
+        return SimpleNamespace(status_code=401 if token == "token-1" else 200)
+
+    assert tokens.send(request).status_code == 200
+    assert sent == ["token-1", "token-2"]
+    assert tokens.get() == "token-2"
+
+
+@pytest.mark.unittest
+def test_send_returns_second_401():
+    tokens = TokenCache(Fetcher(), ttl=60)
+    sent = []
+
+    def request(token):
+        sent.append(token)
+        return SimpleNamespace(status_code=401)
+
+    assert tokens.send(request, token="leased").status_code == 401
+    assert sent == ["leased", "token-1"]
+
+
+@pytest.mark.unittest
+def test_fetch_error_propagates_and_nothing_cached():
+    def fail():
+        raise RuntimeError("MDSO down")
+
+    tokens = TokenCache(fail, ttl=60)
+
+    with pytest.raises(RuntimeError):
+        tokens.get()
+    assert tokens._token is None
@@ -17,3 +17,9 @@ loglevel = "info"
 max_requests_jitter = 200
 timeout = 0
 limit_request_line = 10000
+
+
+def worker_exit(server, worker):
+    from common_sense.dll import http_pool
+
+    http_pool.close_all()
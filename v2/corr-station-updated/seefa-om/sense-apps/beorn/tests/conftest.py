@@ -2,8 +2,11 @@ import json
 import logging
 
 import pytest
+import requests
 
 from beorn_app import app
+from beorn_app.common import mdso_auth
+from common_sense.dll import http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -29,3 +32,19 @@ def client(request):
     app.config["TESTING"] = True
     client = app.test_client()
     return client
+
+
+@pytest.fixture(autouse=True)
+def pooled_requests_through_module_api(monkeypatch):
+    """Send http_pool calls through requests.<method> so tests can keep mocking requests.get/post/..."""
+    monkeypatch.setattr(
+        http_pool.PooledSession,
+        "request",
+        lambda self, method, url, **kwargs: getattr(requests, method.lower())(url, **kwargs),
+    )
+
+
+@pytest.fixture(autouse=True)
+def fresh_mdso_tokens():
+    """Start every test without a cached MDSO token"""
+    mdso_auth.tokens.invalidate()
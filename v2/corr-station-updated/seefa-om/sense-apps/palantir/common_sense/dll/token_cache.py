@@ -0,0 +1,78 @@
+"""Process-wide cache for short-lived upstream auth tokens (MDSO)
+
+The MDSO DLLs created a token before every call and deleted it afterwards,
+three round trips per logical request. A ``TokenCache`` keeps one token per
+credential for the whole worker process and hands it to every gunicorn thread:
+
+    _tokens = TokenCache(_request_token, ttl=60, refresh_margin=10)
+
+    token = _tokens.get()
+
+- The token is refreshed ``refresh_margin`` seconds before its ``ttl`` runs
+  out. Inside that window one thread refreshes while the others keep using the
+  still-valid token; once it has expired, callers wait for the single refresh
+  in flight instead of each requesting their own (single-flight).
+- ``invalidate(token)`` drops a token the upstream rejected (401), so the next
+  caller gets a fresh one. ``send(request)`` does that for a call: on a 401 it
+  sends the request once more with a new token.
+- A refresh that fails before the token has expired keeps serving the cached
+  token; once it has expired, the fetch error reaches the caller.
+
+Cached tokens are never deleted upstream: another thread may still be using a
+token that was just replaced, so they are left to expire on their own.
+"""
+import threading
+import time
+
+
+class TokenCache:
+    """Thread-safe cache of one bearer token with expiry-aware, single-flight refresh"""
+
+    def __init__(self, fetch, ttl, refresh_margin=10):
+        self._fetch = fetch
+        self.ttl = ttl
+        self.refresh_margin = min(refresh_margin, ttl / 2)
+        self._token = None
+        self._expires_at = 0.0
+        self._refresh_lock = threading.Lock()
+
+    def get(self):
+        """A valid token, requested from the upstream only when the cached one is due for refresh"""
+        token, expires_at = self._token, self._expires_at
+        now = time.monotonic()
+        if token and now < expires_at - self.refresh_margin:
+            return token
+        if token and now < expires_at:
+            # Still valid: refresh in this thread only if no other thread is already doing it
+            if not self._refresh_lock.acquire(blocking=False):
+                return token
+        else:
+            self._refresh_lock.acquire()
+        try:
+            if self._token and time.monotonic() < self._expires_at - self.refresh_margin:
+                return self._token  # refreshed by another thread while this one waited
+            try:
+                token = self._fetch()
+            except Exception:
+                if self._token and time.monotonic() < self._expires_at:
+                    return self._token  # early refresh failed, the cached token is still valid
+                raise
+            self._token, self._expires_at = token, time.monotonic() + self.ttl
+            return token
+        finally:
+            self._refresh_lock.release()
+
+    def send(self, request, token=None):
+        """``request(token)`` with ``token`` (default: the cached one), repeated once with a new token on a 401"""
+        token = token or self.get()
+        response = request(token)
+        if response.status_code == 401:
+            self.invalidate(token)
+            response = request(self.get())
+        return response
+
+    def invalidate(self, token=None):
+        """Drop ``token`` (or whatever is cached) so the next ``get`` requests a new one"""
+        with self._refresh_lock:
+            if token is None or token == self._token:
+                self._token, self._expires_at = None, 0.0
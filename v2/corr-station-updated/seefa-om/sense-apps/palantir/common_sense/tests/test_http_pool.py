@@ -0,0 +1,98 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from dll import http_pool
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"ok": true}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", "session=abc")
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    http_pool.close_all()
+    http_pool._stats.clear()
+    yield
+    http_pool.close_all()
+
+
+@pytest.mark.unittest
+def test_connections_reused(server):
+    for _ in range(5):
+        assert http_pool.get("granite", f"{server}/path", timeout=5).json() == {"ok": True}
+    http_pool.post("granite", f"{server}/path", json={"a": 1}, timeout=5)
+
+    assert http_pool.pool_stats()["granite"] == {"requests": 6, "connections_created": 1, "connections_reused": 5}
+
+
+@pytest.mark.unittest
+def test_session_per_upstream(server):
+    http_pool.get("granite", server, timeout=5)
+    http_pool.get("mdso", server, timeout=5)
+
+    assert http_pool.get_session("granite") is http_pool.get_session("granite")
+    assert http_pool.get_session("granite") is not http_pool.get_session("mdso")
+    assert set(http_pool.pool_stats()) == {"granite", "mdso"}
+
+
+@pytest.mark.unittest
+def test_shared_across_threads(server):
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(10):
+                http_pool.get("hydra", server, timeout=5)
+        except Exception as ex:  # pragma: no cover - reported below
+            errors.append(ex)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = http_pool.pool_stats()["hydra"]
+    assert not errors
+    assert stats["requests"] == 80
+    assert stats["connections_created"] <= 8
+
+
+@pytest.mark.unittest
+def test_cookies_not_kept(server):
+    http_pool.get("granite", server, timeout=5)
+
+    assert len(http_pool.get_session("granite").cookies) == 0
+
+
+@pytest.mark.unittest
+def test_connection_errors_raise_requests_exceptions():
+    with pytest.raises(requests.ConnectionError):
+        http_pool.get("granite", "http://127.0.0.1:9/", timeout=1)
@@ -8,6 +8,7 @@ import urllib3
 
 import palantir_app
 from common_sense.common.errors import abort
+from common_sense.dll import http_pool
 
 # from palantir_app.common.mdso_auth import create_token, delete_token
 from palantir_app.dll.mdso import _create_token, _delete_token
@@ -36,7 +37,7 @@ def get_existing_resource(headers, target, port_id):
         f"PortActivation&q=properties.deviceName:{target},properties.portname:{port_id}&limit=1000"
     )
     try:
-        r = requests.get(url, headers=headers, verify=False, timeout=300)
+        r = http_pool.get("mdso", url, headers=headers, verify=False, timeout=300)
         data = json.loads(r.content.decode("utf-8"))
         if r.status_code == 200:
             if data.get("items") and data["items"]:
@@ -80,7 +81,7 @@ def get_product(headers, res_type):
         f"TypeId%3A{res_type}&offset=0&limit=1000"
     )
     try:
-        r = requests.get(url, headers=headers, verify=False, timeout=300)
+        r = http_pool.get("mdso", url, headers=headers, verify=False, timeout=300)
         if r.status_code == 200:
             data = json.loads(r.content.decode("utf-8"))
             if data.get("items") and data["items"]:
@@ -103,15 +104,15 @@ def get_product(headers, res_type):
 def delete_resource(headers, resource_id):
     """Delete a resource, used only in testing"""
     url = f"{mdso_base_url}{RESOURCES_PATH}/{resource_id}?validate=true"
-    r = requests.delete(url, headers=headers, verify=False, timeout=300)
+    r = http_pool.delete("mdso", url, headers=headers, verify=False, timeout=300)
     if r.status_code == 204:
         logger.debug(f"JUST DELETED THIS DUDE - {resource_id}")
-        r = requests.get(url, headers, verify=False, timeout=300)
+        r = http_pool.get("mdso", url, headers=headers, verify=False, timeout=300)
         timeout = 0
         while r.status_code == 200 and timeout < 15:
             time.sleep(2)
             timeout += 1
-            r = requests.get(url, headers, verify=False, timeout=300)
+            r = http_pool.get("mdso", url, headers=headers, verify=False, timeout=300)
         if timeout >= 15:
             return False
     elif r.status_code == 404:
@@ -136,7 +137,8 @@ def create_resource(headers, tid, target, vendor, timer, port_id, product_id):
     }
 
     try:
-        r = requests.post(
+        r = http_pool.post(
+            "mdso",
             f"{mdso_base_url}{RESOURCES_PATH}?validate=false", headers=headers, json=data, verify=False, timeout=300
         )
         if r.status_code == 201:
@@ -175,7 +177,8 @@ def generate_op_id(headers, resource_id, status):
     # payload = {"activate": "true"}  # true for up, false for down
     payload = {"interface": "setPortStatus", "inputs": {"reqdstate": "up" if status == "true" else "down"}}
     try:
-        r = requests.post(
+        r = http_pool.post(
+            "mdso",
             f"{mdso_base_url}{RESOURCES_PATH}/{resource_id}/operations",
             headers=headers,
             json=payload,
@@ -204,7 +207,8 @@ def generate_status_op_id(headers, resource_id):
     payload = {"description": "string", "interface": "getPortStatus", "title": "string"}
 
     try:
-        r = requests.post(
+        r = http_pool.post(
+            "mdso",
             f"{mdso_base_url}{RESOURCES_PATH}/{resource_id}/operations",
             headers=headers,
             json=payload,
@@ -227,7 +231,8 @@ def generate_status_op_id(headers, resource_id):
 def status_call(headers, resource_id, op_id):
     """Call to MDSO to get status on port."""
     try:
-        r = requests.get(
+        r = http_pool.get(
+            "mdso",
             f"{mdso_base_url}{RESOURCES_PATH}/{resource_id}/operations/{op_id}",
             headers=headers,
             verify=False,
@@ -256,7 +261,9 @@ def status_call(headers, resource_id, op_id):
 
 def resource_status(headers, resource_id):
     try:
-        r = requests.get(f"{mdso_base_url}{RESOURCES_PATH}/{resource_id}", headers=headers, verify=False, timeout=300)
+        r = http_pool.get(
+            "mdso", f"{mdso_base_url}{RESOURCES_PATH}/{resource_id}", headers=headers, verify=False, timeout=300
+        )
         if r.status_code == 200:
             return None, r.json()
         elif r.status_code == 404:
@@ -271,7 +278,8 @@ def resource_status(headers, resource_id):
 def get_existing_status_op_id(headers, resource_id):
     """Finds all existing operation ids, sorts them by timestamp"""
     try:
-        r = requests.get(
+        r = http_pool.get(
+            "mdso",
             f"{mdso_base_url}{RESOURCES_PATH}/{resource_id}/operations?offset=0&limit=1000",
             headers=headers,
             verify=False,
@@ -313,7 +321,7 @@ def service_id_lookup(cid, token):
     )
     headers = {"Accept": "application/json", "Authorization": token}
     # pdb.set_trace()
-    r = requests.get(f"{mdso_base_url}{querystring}", headers=headers, verify=False, timeout=30)
+    r = http_pool.get("mdso", f"{mdso_base_url}{querystring}", headers=headers, verify=False, timeout=30)
 
     if r.status_code != 200:
         logger.exception(f"Error - {codes[r.status_code]} when trying to look up the service id for CID {cid}")
@@ -341,7 +349,7 @@ def network_call(cid, token):
 
     # this has circuit topology which is handy, but no differences field
     try:
-        r = requests.get(f"{mdso_base_url}{querystring}", headers=headers, verify=False, timeout=30)
+        r = http_pool.get("mdso", f"{mdso_base_url}{querystring}", headers=headers, verify=False, timeout=30)
         if r.status_code == 200:
             return r.json()["items"]
         else:
@@ -358,7 +366,7 @@ def device_lookup(device, token):
         f"{RESOURCES_PATH}?resourceTypeId=tosca.resourceTypes.NetworkFunction&q=label:{device}&offset=0&limit=1000"
     )
     try:
-        r = requests.get(f"{mdso_base_url}{querystring}", headers=headers, verify=False, timeout=30)
+        r = http_pool.get("mdso", f"{mdso_base_url}{querystring}", headers=headers, verify=False, timeout=30)
         if r.status_code == 200:
             return r.json()["items"]
         else:
@@ -386,7 +394,7 @@ def get_resource_type_resource_list(resource_type, headers=None, query_criteria=
 
         url = f"{mdso_base_url}{RESOURCES_PATH}?resourceTypeId={resource_type}&q={q_string}&offset=0&limit=1000"
     try:
-        r = requests.get(url, headers=headers, verify=False, timeout=300)
+        r = http_pool.get("mdso", url, headers=headers, verify=False, timeout=300)
         if cleanup_token is True:
             _delete_token(token)
         data = json.loads(r.content.decode("utf-8"))
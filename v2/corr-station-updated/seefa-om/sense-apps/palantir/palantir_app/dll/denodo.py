@@ -1,10 +1,9 @@
 import logging
 from time import sleep
 
-import requests
-
 import palantir_app
 from common_sense.common.errors import abort
+from common_sense.dll import http_pool
 from palantir_app.common.utils import get_hydra_headers
 from palantir_app.common.endpoints import DENODO_CIRCUIT_DEVICES, DENODO_SEEK_TID
 
@@ -18,7 +17,7 @@ def denodo_get(endpoint, params=None, operation=""):
         if count > 0:
             sleep(5)
         try:
-            r = requests.get(url, headers=headers, params=params, verify=False, timeout=60)
+            r = http_pool.get("hydra", url, headers=headers, params=params, verify=False, timeout=60)
             if 200 <= r.status_code <= 299:
                 return r.json()
             else:
@@ -6,6 +6,7 @@ from requests import JSONDecodeError
 
 import palantir_app
 from common_sense.common.errors import abort, error_formatter, get_standard_error_summary, GRANITE, MISSING_DATA
+from common_sense.dll import http_pool
 from palantir_app.common.utils import get_hydra_headers, is_ctbh
 from palantir_app.common.endpoints import (
     GRANITE_ELEMENTS,
@@ -34,7 +35,7 @@ def granite_get(endpoint, params=None, timeout=60, return_response_obj=False, ha
     headers = get_hydra_headers(operation)
     url = f"{granite_base_url}{endpoint}"
     try:
-        resp = requests.get(url, headers=headers, params=params, timeout=timeout, verify=False)
+        resp = http_pool.get("granite", url, headers=headers, params=params, timeout=timeout, verify=False)
         if return_response_obj:
             return resp
         if resp.status_code == 200:
@@ -69,7 +70,7 @@ def granite_put(endpoint, payload, best_effort=False, calling_function="not spec
     url = f"{granite_base_url}{endpoint}"
 
     try:
-        r = requests.put(url, headers=headers, json=payload, verify=False, timeout=60)
+        r = http_pool.put("granite", url, headers=headers, json=payload, verify=False, timeout=60)
         if r.status_code in [200, 204]:
             return r.json()
 
@@ -103,7 +104,9 @@ def delete_with_query(endpoint, payload=None, query=None, timeout=60):
     headers = get_hydra_headers()
     url = f"{granite_base_url}{endpoint}"
     try:
-        resp = requests.delete(url, headers=headers, json=payload, params=query, verify=False, timeout=timeout)
+        resp = http_pool.delete(
+            "granite", url, headers=headers, json=payload, params=query, verify=False, timeout=timeout
+        )
         return resp.json()
     except (ConnectionError, requests.ConnectionError, requests.ReadTimeout) as exception:
         abort(
@@ -130,7 +133,7 @@ def granite_delete(endpoint, payload, timeout=60):
     retry_count = 0
     while retry_count <= max_retries:
         try:
-            resp = requests.delete(url, headers=headers, json=payload, verify=False, timeout=timeout)
+            resp = http_pool.delete("granite", url, headers=headers, json=payload, verify=False, timeout=timeout)
             if resp.status_code in [200, 202, 204]:
                 return (200, f"Live Revision Deleted: CID = {CID} , CIRC_PATH_INST_ID = {CIRC_PATH_INST_ID}")
             else:
@@ -199,7 +202,8 @@ def call_granite_for_circuit_devices(cid, url_version, operation="general"):
     }
     granite_elements = None
     try:
-        r = requests.get(
+        r = http_pool.get(
+            "granite",
             f"{granite_base_url}{url_version}?CIRC_PATH_HUM_ID={cid}",
             params=payload,
             headers=headers,
@@ -241,8 +245,8 @@ def get_path_elements_from_filter(cid, level: str, operation: str = "mne"):
     headers = get_hydra_headers(operation, accept_text_html_xml=True)
     params = {"CIRC_PATH_HUM_ID": cid, "LVL": level}
     try:
-        r = requests.get(
-            f"{granite_base_url}{GRANITE_ELEMENTS}", params=params, headers=headers, verify=False, timeout=30
+        r = http_pool.get(
+            "granite", f"{granite_base_url}{GRANITE_ELEMENTS}", params=params, headers=headers, verify=False, timeout=30
         )
         if r.status_code != 200:
             logger.exception(f"Received {r.status_code} status from granite")
@@ -275,7 +279,9 @@ def get_udas(path_name, revision, operation="mne"):
     headers = get_hydra_headers(operation, accept_text_html_xml=True)
     params = {"PATH_NAME": path_name, "REV_NBR": revision}
     try:
-        r = requests.get(f"{granite_base_url}{GRANITE_UDA}", params=params, headers=headers, verify=False, timeout=30)
+        r = http_pool.get(
+            "granite", f"{granite_base_url}{GRANITE_UDA}", params=params, headers=headers, verify=False, timeout=30
+        )
         if r.status_code != 200:
             logger.exception(f"Received {r.status_code} status from granite")
             if r.status_code == 404:
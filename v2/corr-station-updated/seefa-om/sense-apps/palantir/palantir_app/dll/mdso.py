@@ -3,14 +3,20 @@ import json
 import requests
 import urllib3
 
+from functools import partial
+
 import palantir_app
 from common_sense.common.errors import abort
+from common_sense.dll import http_pool
+from common_sense.dll.token_cache import TokenCache
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 logger = logging.getLogger(__name__)
 
 RESOURCES_PATH = "/bpocore/market/api/v1/resources"
 
+TOKEN_EXPIRES_IN = 60
+
 
 def _env_check(production, need_auth=False):
     if production:
@@ -28,7 +34,7 @@ def _env_check(production, need_auth=False):
         return url
 
 
-def _create_token(production=False):
+def _request_token(production=False):
     """get a token to authenticate calls to MDSO"""
 
     headers = {"Content-type": "application/json"}
@@ -38,12 +44,14 @@ def _create_token(production=False):
         "username": auth_info["user"],
         "password": auth_info["password"],
         "tenant": "master",
-        "expires_in": 60,
+        "expires_in": TOKEN_EXPIRES_IN,
         "grant_type": "password",
     }
 
     try:
-        r = requests.post(f"{url}/tron/api/v1/oauth2/tokens", headers=headers, json=data, verify=False, timeout=30)
+        r = http_pool.post(
+            "mdso", f"{url}/tron/api/v1/oauth2/tokens", headers=headers, json=data, verify=False, timeout=30
+        )
         if r.status_code in [200, 201]:
             token = r.json()["accessToken"]
             return token
@@ -55,12 +63,18 @@ def _create_token(production=False):
         abort(504, "Error Code: M002 - Read timeout during authentication with MDSO")
 
 
+# One cache per MDSO environment (production flag)
+_tokens = {
+    production: TokenCache(partial(_request_token, production), ttl=TOKEN_EXPIRES_IN) for production in (False, True)
+}
+
+
+def _create_token(production=False):
+    return _tokens[production].get()
+
+
 def _delete_token(token, production=False):
-    if token:
-        headers = {"Content-Type": "application/json", "Accept": "application/json", "Authorization": f"token {token}"}
-        requests.delete(
-            f"{_env_check(production)}/tron/api/v1/oauth2/tokens/{token}", headers=headers, verify=False, timeout=300
-        )
+    """Kept for callers that pair it with _create_token; tokens from _tokens expire on their own"""
 
 
 def mdso_get(endpoint, params=None, calling_function="None given", production=False, return_response=False):
@@ -71,11 +85,20 @@ def mdso_get(endpoint, params=None, calling_function="None given", production=Fa
         ex: calling_function="get_resource_type_resource_list"
     """
     token = _create_token(production)
-    headers = {"Accept": "application/json", "Authorization": f"token {token}"}
 
     try:
         logger.info(f"Calling mdso_get() via {calling_function}()")
-        r = requests.get(f"{_env_check(production)}{endpoint}", headers=headers, params=params, timeout=60, verify=False)
+        r = _tokens[production].send(
+            lambda token: http_pool.get(
+                "mdso",
+                f"{_env_check(production)}{endpoint}",
+                headers={"Accept": "application/json", "Authorization": f"token {token}"},
+                params=params,
+                timeout=60,
+                verify=False,
+            ),
+            token,
+        )
         if return_response:
             return r
         elif r.status_code in [200, 201]:
@@ -110,8 +133,6 @@ def mdso_get(endpoint, params=None, calling_function="None given", production=Fa
             f"Error Code: M004 - Timeout error - Connected to MDSO and timed out for request: {endpoint}  | "
             f"Function that called mdso_get(): {calling_function}",
         )
-    finally:
-        _delete_token(token)
 
 
 def mdso_post(endpoint, data, calling_function=None, production=False):
@@ -122,11 +143,20 @@ def mdso_post(endpoint, data, calling_function=None, production=False):
         ex: calling_function="_create_port_resource"
     """
     token = _create_token(production)
-    headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
 
     try:
         logger.info(f"Calling mdso_post() via {calling_function}()")
-        r = requests.post(f"{_env_check(production)}{endpoint}", headers=headers, verify=False, json=data, timeout=30)
+        r = _tokens[production].send(
+            lambda token: http_pool.post(
+                "mdso",
+                f"{_env_check(production)}{endpoint}",
+                headers={"Accept": "application/json", "Authorization": f"Bearer {token}"},
+                verify=False,
+                json=data,
+                timeout=30,
+            ),
+            token,
+        )
         if r.status_code == 201:
             try:
                 return r.json()
@@ -164,8 +194,6 @@ def mdso_post(endpoint, data, calling_function=None, production=False):
             f"Error Code: M006 - Timeout error - Connected to MDSO and timed out for request: {endpoint}  | "
             f"Function that called mdso_post(): {calling_function}  | Payload Data: {data}",
         )
-    finally:
-        _delete_token(token)
 
 
 def mdso_patch(resource_id, payload, calling_function=None, production=False):
@@ -189,14 +217,22 @@ def mdso_patch(resource_id, payload, calling_function=None, production=False):
     tool.patch_resource(resource_id, payload)
     """
     token = _create_token(production)
-    header = {"Content-Type": "application/json", "Authorization": f"Bearer {token}"}
     try:
         url = _env_check(production)
         payload = json.dumps(payload)
         patch_url = f"{url}{RESOURCES_PATH}/{resource_id}?validate=false&obfuscate=true"
-        r = requests.patch(patch_url, data=payload, headers=header, verify=False, timeout=300)
-
-        return r
+        return _tokens[production].send(
+            lambda token: http_pool.request(
+                "mdso",
+                "PATCH",
+                patch_url,
+                data=payload,
+                headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"},
+                verify=False,
+                timeout=300,
+            ),
+            token,
+        )
     except (ConnectionError, requests.ConnectTimeout, requests.ConnectionError):
         logger.error(
             f"Couldn't connect to MDSO for request  | Endpoint: {url}  | "
@@ -217,8 +253,6 @@ def mdso_patch(resource_id, payload, calling_function=None, production=False):
             f"Error Code: M006 - Timeout error - Connected to MDSO and timed out for request: {url}  | "
             f"Function that called mdso_delete(): {calling_function}  | Payload Data: {payload}",
         )
-    finally:
-        _delete_token(token)
 
 
 def mdso_delete(resource_id, data=None, calling_function=None, production=False, best_effort=True):
@@ -234,11 +268,20 @@ def mdso_delete(resource_id, data=None, calling_function=None, production=False,
     """
     endpoint = f"{RESOURCES_PATH}/{resource_id}?validate=false"
     token = _create_token(production)
-    headers = {"Accept": "application/json", "Authorization": f"Bearer {token}"}
 
     try:
         logger.info(f"Calling mdso_delete() via {calling_function}()")
-        r = requests.delete(f"{_env_check(production)}{endpoint}", headers=headers, verify=False, json=data, timeout=30)
+        r = _tokens[production].send(
+            lambda token: http_pool.delete(
+                "mdso",
+                f"{_env_check(production)}{endpoint}",
+                headers={"Accept": "application/json", "Authorization": f"Bearer {token}"},
+                verify=False,
+                json=data,
+                timeout=30,
+            ),
+            token,
+        )
         if best_effort or r.status_code == 204:
             try:
                 return r.json()
@@ -276,8 +319,6 @@ def mdso_delete(resource_id, data=None, calling_function=None, production=False,
             f"Error Code: M006 - Timeout error - Connected to MDSO and timed out for request: {endpoint}  | "
             f"Function that called mdso_delete(): {calling_function}  | Payload Data: {data}",
         )
-    finally:
-        _delete_token(token)
 
 
 def service_id_lookup(cid):
@@ -1,8 +1,11 @@
 import json
 
 import pytest
+import requests
 
 import palantir_app
+from palantir_app.dll import mdso
+from common_sense.dll import http_pool
 
 
 @pytest.fixture(autouse=True)
@@ -11,6 +14,23 @@ def no_requests(monkeypatch):
     monkeypatch.delattr("requests.sessions.Session.request")
 
 
+@pytest.fixture(autouse=True)
+def pooled_requests_through_module_api(monkeypatch):
+    """Send http_pool calls through requests.<method> so tests can keep mocking requests.get/post/..."""
+    monkeypatch.setattr(
+        http_pool.PooledSession,
+        "request",
+        lambda self, method, url, **kwargs: getattr(requests, method.lower())(url, **kwargs),
+    )
+
+
+@pytest.fixture(autouse=True)
+def fresh_mdso_tokens():
+    """Start every test without a cached MDSO token"""
+    for tokens in mdso._tokens.values():
+        tokens.invalidate()
+
+
 @pytest.fixture
 def client(request):
     palantir_app.app.config["TESTING"] = True